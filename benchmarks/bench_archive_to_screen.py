@@ -0,0 +1,176 @@
+'''
+@version 1.0
+@brief 页面显示耗时基准：从压缩包/目录/PDF取出页面、解码、缩放并转为QPixmap的每页耗时，
+       对比旧的zipfile+QImageReader路径、内存映射+内存解码路径与PIL兜底解码
+@author 炎刃
+@date 2026-10-19
+'''
+import os
+import io
+import sys
+import json
+import time
+import zipfile
+import argparse
+import tempfile
+import statistics
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from PIL import Image
+from PyQt5.QtGui import QGuiApplication, QImageReader, QPixmap
+from PyQt5.QtCore import Qt, QBuffer, QByteArray, QIODevice
+
+from resource.page_source import open_page_source
+from resource.image_decode import decode_image, _decode_pil
+from resource.lazy_import import load_fitz, BackendUnavailableError
+
+# 模拟的显示区域（物理像素）
+VIEWPORT = (1280, 1600)
+
+
+def make_page(index, size):
+    """生成带渐变与噪点的JPEG页面，压缩率接近真实扫描页"""
+    img = Image.effect_noise(size, 40 + index % 20).convert('RGB')
+    buf = io.BytesIO()
+    img.save(buf, format='JPEG', quality=85)
+    return buf.getvalue()
+
+
+def build_fixtures(directory, pages, size):
+    """生成存储/deflate两种cbz、图片目录与PDF，返回{场景名: 路径}"""
+    data = [make_page(i, size) for i in range(pages)]
+    fixtures = {}
+    for name, compression in (('cbz-stored', zipfile.ZIP_STORED), ('cbz-deflated', zipfile.ZIP_DEFLATED)):
+        path = os.path.join(directory, f'{name}.cbz')
+        with zipfile.ZipFile(path, 'w', compression) as zf:
+            for i, page in enumerate(data):
+                zf.writestr(f'{i:04d}.jpg', page)
+        fixtures[name] = path
+    image_dir = os.path.join(directory, 'dir')
+    os.makedirs(image_dir)
+    for i, page in enumerate(data):
+        with open(os.path.join(image_dir, f'{i:04d}.jpg'), 'wb') as f:
+            f.write(page)
+    fixtures['dir'] = image_dir
+    try:
+        fitz = load_fitz()
+    except BackendUnavailableError:
+        return fixtures
+    path = os.path.join(directory, 'book.pdf')
+    doc = fitz.open()
+    for page in data:
+        pdf_page = doc.new_page(width=size[0] * 72 / 150, height=size[1] * 72 / 150)
+        pdf_page.insert_image(pdf_page.rect, stream=page)
+    doc.save(path)
+    doc.close()
+    fixtures['pdf'] = path
+    return fixtures
+
+
+def to_screen(image):
+    """按显示区域缩放并上传为QPixmap，与阅读器display_image一致"""
+    scaled = image.scaled(VIEWPORT[0], VIEWPORT[1], Qt.KeepAspectRatio, Qt.SmoothTransformation)
+    return QPixmap.fromImage(scaled)
+
+
+def legacy_pages(path):
+    """旧路径：zipfile逐页读取，拷贝进QByteArray后由QImageReader解码；目录直接按文件路径读取"""
+    if os.path.isdir(path):
+        for name in sorted(os.listdir(path)):
+            yield QImageReader(os.path.join(path, name)).read()
+        return
+    with zipfile.ZipFile(path) as zf:
+        for name in zf.namelist():
+            buffer = QBuffer()
+            buffer.setData(QByteArray(zf.read(name)))
+            buffer.open(QIODevice.ReadOnly)
+            yield QImageReader(buffer).read()
+
+
+def memory_pages(path, decoder):
+    source = open_page_source(path)
+    source.set_target_size(*VIEWPORT)
+    try:
+        for index in range(source.page_count):
+            yield decoder(source.read_page_buffer(index), source.page_name(index))
+    finally:
+        source.close()
+
+
+METHODS = {
+    'legacy': legacy_pages,
+    'memory': lambda path: memory_pages(path, decode_image),
+    'pil': lambda path: memory_pages(path, lambda data, name: _decode_pil(data))
+}
+
+
+def measure(method, path, repeat):
+    """返回每页耗时（毫秒）的列表，每轮都重新打开来源"""
+    timings = []
+    for _ in range(repeat):
+        pages = METHODS[method](path)
+        while True:
+            start = time.perf_counter()
+            try:
+                image = next(pages)
+            except StopIteration:
+                break
+            if image.isNull():
+                raise RuntimeError(f'{method}解码失败: {path}')
+            to_screen(image)
+            timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def run(pages, size, repeat, cache_dir):
+    os.environ['VEXEL_CACHE_DIR'] = cache_dir
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for scenario, path in build_fixtures(directory, pages, size).items():
+            for method in METHODS:
+                if method == 'legacy' and scenario == 'pdf':
+                    continue
+                # PDF首轮渲染写入缓存，预热一轮后测量缓存命中的显示耗时
+                if scenario == 'pdf':
+                    measure(method, path, 1)
+                timings = measure(method, path, repeat)
+                results.append({
+                    'scenario': scenario,
+                    'method': method,
+                    'pages': len(timings),
+                    'median_ms': round(statistics.median(timings), 3),
+                    'p95_ms': round(sorted(timings)[int(len(timings) * 0.95) - 1], 3),
+                    'pages_per_sec': round(1000 / statistics.mean(timings), 1)
+                })
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='压缩包到屏幕的页面显示耗时基准')
+    parser.add_argument('--pages', type=int, default=40, help='每个样本的页数')
+    parser.add_argument('--size', type=int, nargs=2, default=(1600, 2400), metavar=('W', 'H'),
+                        help='页面像素尺寸')
+    parser.add_argument('--repeat', type=int, default=3, help='每个场景重复轮数')
+    parser.add_argument('--json', action='store_true', help='以JSON输出结果')
+    args = parser.parse_args(argv)
+
+    # QPixmap需要GUI应用实例
+    app = QGuiApplication.instance() or QGuiApplication(sys.argv[:1])
+    with tempfile.TemporaryDirectory() as cache_dir:
+        results = run(args.pages, tuple(args.size), args.repeat, cache_dir)
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+    else:
+        print(f'{"场景":<14}{"方式":<8}{"中位数ms":>10}{"p95 ms":>10}{"页/秒":>10}')
+        for row in results:
+            print(f'{row["scenario"]:<14}{row["method"]:<8}{row["median_ms"]:>10}'
+                  f'{row["p95_ms"]:>10}{row["pages_per_sec"]:>10}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,75 @@
+'''
+@version 1.0
+@brief 目录快照基准：比较从record.json（json.load+ComicRecord转换）与从二进制快照加载全部记录的耗时
+@author 炎刃
+@date 2026-10-19
+'''
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from benchmarks.bench_record_memory import make_json
+from resource.comic_record import records_from_json
+from resource.catalog_snapshot import save_catalog_snapshot, load_catalog_snapshot
+
+
+def timed(func, repeat):
+    """返回(最后一次结果, 中位耗时毫秒)"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return result, round(statistics.median(timings), 1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='目录快照加载耗时基准')
+    parser.add_argument('--count', type=int, default=100_000, help='记录数')
+    parser.add_argument('--libraries', type=int, default=4, help='库数量')
+    parser.add_argument('--repeat', type=int, default=3, help='重复次数')
+    parser.add_argument('--json', action='store_true', help='以JSON输出结果')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        json_path = os.path.join(directory, 'record.json')
+        snapshot_path = os.path.join(directory, 'catalog.snapshot')
+        with open(json_path, 'w', encoding='utf-8') as f:
+            f.write(make_json(args.count, args.libraries))
+
+        def load_json():
+            with open(json_path, 'r', encoding='utf-8') as f:
+                return records_from_json(json.load(f))
+
+        records, json_ms = timed(load_json, args.repeat)
+        _, save_ms = timed(lambda: save_catalog_snapshot({}, records, snapshot_path), args.repeat)
+        loaded, snapshot_ms = timed(lambda: load_catalog_snapshot({}, snapshot_path), args.repeat)
+        assert len(loaded) == args.count
+        result = {
+            'count': args.count,
+            'json_ms': json_ms,
+            'snapshot_save_ms': save_ms,
+            'snapshot_load_ms': snapshot_ms,
+            'json_bytes': os.path.getsize(json_path),
+            'snapshot_bytes': os.path.getsize(snapshot_path),
+            'speedup': round(json_ms / snapshot_ms, 1)
+        }
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"{args.count}条记录: record.json {json_ms} ms ({result['json_bytes'] / 2**20:.1f} MB), "
+              f"快照 {snapshot_ms} ms ({result['snapshot_bytes'] / 2**20:.1f} MB)，"
+              f"快{result['speedup']}倍；写快照 {save_ms} ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
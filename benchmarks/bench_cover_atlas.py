@@ -0,0 +1,109 @@
+'''
+@version 1.0
+@brief 封面图集基准：比较逐个打开封面缩略图文件与从单个mmap图集按连续区间读取一整屏封面的耗时，
+       每轮前用posix_fadvise丢弃页缓存以模拟冷缓存（平台不支持时为热缓存结果）
+@author 炎刃
+@date 2026-10-19
+'''
+import os
+import io
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from PIL import Image
+from resource.cover_atlas import CoverAtlas, build_atlas
+from resource.thumbnail_cache import THUMBNAIL_SIZE
+
+
+def drop_cache(paths):
+    """丢弃文件的页缓存，返回是否支持"""
+    if not hasattr(os, 'posix_fadvise'):
+        return False
+    for path in paths:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+    return True
+
+
+def make_covers(directory, count):
+    paths = []
+    for i in range(count):
+        buf = io.BytesIO()
+        Image.new('RGB', THUMBNAIL_SIZE, (i % 256, i // 256 % 256, 128)).save(buf, format='JPEG', quality=80)
+        path = os.path.join(directory, f'{i:06d}.jpg')
+        with open(path, 'wb') as f:
+            f.write(buf.getvalue())
+        paths.append(path)
+    return paths
+
+
+def timed(func, prepare, repeat):
+    timings = []
+    for _ in range(repeat):
+        prepare()
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return round(statistics.median(timings), 1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='封面图集读取耗时基准')
+    parser.add_argument('--count', type=int, default=5000, help='封面数')
+    parser.add_argument('--repeat', type=int, default=3, help='重复次数')
+    parser.add_argument('--json', action='store_true', help='以JSON输出结果')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = make_covers(directory, args.count)
+        atlas_path = os.path.join(directory, 'covers.atlas')
+        # 封面已是缩略图尺寸，重建图集时缩小只是重新编码
+        records = [{'full_path': path, 'cover_path': path} for path in paths]
+        build_atlas(records, atlas_path)
+        cold = drop_cache(paths[:1])
+
+        def read_files():
+            for path in paths:
+                with open(path, 'rb') as f:
+                    f.read()
+
+        def read_atlas():
+            with CoverAtlas(atlas_path) as atlas:
+                pages = atlas.read_range(0, len(atlas))
+                for page in pages:
+                    bytes(page)
+                del pages
+
+        files_ms = timed(read_files, lambda: drop_cache(paths), args.repeat)
+        atlas_ms = timed(read_atlas, lambda: drop_cache([atlas_path]), args.repeat)
+        result = {
+            'count': args.count,
+            'cold_cache': cold,
+            'files_ms': files_ms,
+            'atlas_ms': atlas_ms,
+            'atlas_bytes': os.path.getsize(atlas_path),
+            'speedup': round(files_ms / atlas_ms, 1) if atlas_ms else None
+        }
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        state = '冷缓存' if cold else '热缓存'
+        print(f"{args.count}个封面（{state}）: 逐个打开文件 {files_ms} ms，图集 {atlas_ms} ms "
+              f"({result['atlas_bytes'] / 2**20:.1f} MB)，快{result['speedup']}倍")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,70 @@
+'''
+@version 1.0
+@brief 网络库扫描基准：在注入延迟的文件系统层上比较顺序遍历与并发遍历（含文件stat）的耗时与往返次数
+@author 炎刃
+@date 2026-10-19
+'''
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from resource.scan_filter import ScanFilter
+from resource.scan_fs import ConcurrentWalker, LatencyFS
+
+
+def build_tree(root, dirs, files):
+    for d in range(dirs):
+        directory = os.path.join(root, f'series_{d:04d}')
+        os.makedirs(directory)
+        for f in range(files):
+            with open(os.path.join(directory, f'v{f:03d}.cbz'), 'wb') as fp:
+                fp.write(b'x')
+
+
+def sequential(scan_filter, root, fs):
+    return sum(1 for entry in scan_filter.iter_files(root, fs) if entry.stat())
+
+
+def concurrent(scan_filter, root, fs, workers):
+    return sum(1 for entry in ConcurrentWalker(scan_filter, fs, max_workers=workers).iter_files(root)
+               if entry.stat())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='高延迟文件系统扫描基准')
+    parser.add_argument('--dirs', type=int, default=40, help='目录数')
+    parser.add_argument('--files', type=int, default=10, help='每个目录的文件数')
+    parser.add_argument('--latency', type=float, default=0.005, help='每次往返延迟（秒）')
+    parser.add_argument('--workers', type=int, default=16, help='并发上限')
+    parser.add_argument('--json', action='store_true', help='以JSON输出结果')
+    args = parser.parse_args(argv)
+
+    scan_filter = ScanFilter.from_config(None, ('.cbz',))
+    results = []
+    with tempfile.TemporaryDirectory() as root:
+        build_tree(root, args.dirs, args.files)
+        for name, run in (('sequential', lambda fs: sequential(scan_filter, root, fs)),
+                          ('concurrent', lambda fs: concurrent(scan_filter, root, fs, args.workers))):
+            fs = LatencyFS(args.latency)
+            start = time.perf_counter()
+            count = run(fs)
+            results.append({'mode': name, 'files': count, 'seconds': round(time.perf_counter() - start, 3),
+                            'round_trips': fs.round_trips, 'max_in_flight': fs.max_active})
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f'{args.dirs}个目录×{args.files}个文件，每次往返{args.latency * 1000:.0f} ms')
+        for row in results:
+            print(f"{row['mode']:<12}{row['seconds']:>8} s  往返{row['round_trips']}次  最大并发{row['max_in_flight']}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
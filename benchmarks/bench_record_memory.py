@@ -0,0 +1,85 @@
+'''
+@version 1.0
+@brief 记录内存基准：比较json.load得到的dict记录与ComicRecord在大量记录下的内存占用
+@author 炎刃
+@date 2026-10-19
+'''
+import os
+import sys
+import gc
+import json
+import argparse
+import tracemalloc
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from resource.comic_record import records_from_json
+
+TAGS = ['完结', '连载', '彩色', '黑白', '短篇', '长篇', '汉化', '生肉']
+
+
+def make_json(count, libraries):
+    """生成与LibraryCore写出的record.json相同结构的文本（含校验结果与标签）"""
+    records = []
+    for i in range(count):
+        library_path = f'/mnt/comics/library_{i % libraries:02d}'
+        full_path = f'{library_path}/series_{i // 50:05d}/volume_{i:06d}.cbz'
+        records.append({
+            'comic_id': f'comic_{i + 1:06d}',
+            'full_path': full_path,
+            'name': os.path.basename(full_path),
+            'size': 50_000_000 + i,
+            'modified_time': 1_700_000_000.0 + i,
+            'cover_path': f'{library_path}/cover/comic_{i + 1:06d}.jpg',
+            'library_path': library_path,
+            'tags': [TAGS[i % len(TAGS)], TAGS[(i * 7) % len(TAGS)]],
+            'verify': {'level': 'quick', 'ok': True, 'error': None, 'mtime': 1_700_000_000.0 + i,
+                       'size': 50_000_000 + i, 'checked_at': 1_700_000_100.0 + i}
+        })
+    return json.dumps(records, ensure_ascii=False)
+
+
+def measure(func):
+    """返回(结果, 结果占用的字节数)"""
+    gc.collect()
+    tracemalloc.start()
+    result = func()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='记录内存占用基准')
+    parser.add_argument('--count', type=int, default=100_000, help='记录数')
+    parser.add_argument('--libraries', type=int, default=4, help='库数量')
+    parser.add_argument('--json', action='store_true', help='以JSON输出结果')
+    args = parser.parse_args(argv)
+
+    text = make_json(args.count, args.libraries)
+    dicts, dict_bytes = measure(lambda: json.loads(text))
+    del dicts
+    records, record_bytes = measure(lambda: records_from_json(json.loads(text)))
+    del records
+    result = {
+        'count': args.count,
+        'dict_bytes': dict_bytes,
+        'record_bytes': record_bytes,
+        'dict_bytes_per_record': round(dict_bytes / args.count),
+        'record_bytes_per_record': round(record_bytes / args.count),
+        'saving': round(1 - record_bytes / dict_bytes, 3)
+    }
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"{args.count}条记录: dict {dict_bytes / 2**20:.1f} MB ({result['dict_bytes_per_record']} B/条), "
+              f"ComicRecord {record_bytes / 2**20:.1f} MB ({result['record_bytes_per_record']} B/条), "
+              f"节省 {result['saving']:.0%}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
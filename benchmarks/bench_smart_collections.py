@@ -0,0 +1,140 @@
+'''
+@version 1.0
+@brief 智能合集基准：比较每次点击合集都在记录列表上逐条判断条件、在列式索引上整体重新求值，
+       与成员索引直接取出缓存行号及翻页后单行增量更新的耗时
+@author 炎刃
+@date 2026-10-19
+'''
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from resource.comic_record import ComicRecord
+from resource.reading_state import normalize_path
+from resource.record_store import RecordStore
+from resource.smart_collection import CollectionIndex, compile_query
+from resource.tag_store import TagStore
+
+QUERY = {
+    'tags_any': ['tag_03', 'tag_07'],
+    'tags_none': ['tag_11'],
+    'library': '/mnt/comics/library_01',
+    'min_rating': 3,
+    'min_size': 50_000_000,
+    'read': True,
+    'finished': False
+}
+
+
+def make_records(count, libraries):
+    records = []
+    for i in range(count):
+        library_path = f'/mnt/comics/library_{i % libraries:02d}'
+        records.append(ComicRecord(
+            full_path=f'{library_path}/series_{i // 50:05d}/volume_{i:06d}.cbz',
+            name=f'volume_{i:06d}.cbz',
+            size=(i * 2654435761) % 500_000_000,
+            modified_time=1_700_000_000.0 + i,
+            library_path=library_path,
+            rating=i % 6
+        ))
+    return records
+
+
+def list_filter(records, tags_by_path, state):
+    # 不建索引时的做法：逐条检查全部条件
+    rows = []
+    for row, record in enumerate(records):
+        if record['library_path'] != QUERY['library'] or record['rating'] < QUERY['min_rating']:
+            continue
+        if record['size'] < QUERY['min_size']:
+            continue
+        key = normalize_path(record['full_path'])
+        tags = tags_by_path.get(key, ())
+        if not any(tag in tags for tag in QUERY['tags_any']) or any(tag in tags for tag in QUERY['tags_none']):
+            continue
+        entry = state.get(key)
+        if entry is None or entry['page'] + 1 >= entry['page_count']:
+            continue
+        rows.append(row)
+    return rows
+
+
+def timed(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return round(statistics.median(timings), 3)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='智能合集求值耗时基准')
+    parser.add_argument('--count', type=int, default=100_000, help='记录数')
+    parser.add_argument('--libraries', type=int, default=4, help='库数量')
+    parser.add_argument('--repeat', type=int, default=5, help='每项重复次数')
+    parser.add_argument('--json', action='store_true', help='以JSON输出结果')
+    args = parser.parse_args(argv)
+
+    records = make_records(args.count, args.libraries)
+    store = RecordStore(records)
+    with tempfile.TemporaryDirectory() as directory:
+        tag_store = TagStore(os.path.join(directory, 'tags.json'), flush_delay=3600)
+        paths = [record['full_path'] for record in records]
+        for tag in range(16):
+            tag_store.apply(paths[tag::7 + tag], [f'tag_{tag:02d}'])
+        state = {}
+        for row in range(0, args.count, 3):
+            state[normalize_path(paths[row])] = {'page': row % 20, 'page_count': 20, 'last_read': 1_700_000_000.0 + row}
+        for row, key in enumerate(map(normalize_path, paths)):
+            if key in state:
+                store.set_reading_state(row, state[key])
+
+        tags_by_path = tag_store.entries()
+        query = compile_query(QUERY)
+        start = time.perf_counter()
+        index = CollectionIndex({'bench': QUERY}, store, tag_store)
+        build_ms = round((time.perf_counter() - start) * 1000, 2)
+        members = index.members('bench')
+        assert members.tolist() == list_filter(records, tags_by_path, state)
+
+        row = int(members[0])
+
+        def page_turn():
+            # 翻页：更新一行阅读状态并增量更新成员
+            entry = state[normalize_path(paths[row])]
+            entry['page'] = (entry['page'] + 1) % (entry['page_count'] - 1)
+            store.set_reading_state(row, entry)
+            index.update_rows([row])
+            index.members('bench')
+
+        result = {
+            'count': args.count,
+            'members': int(members.size),
+            'build_ms': build_ms,
+            'list_filter_ms': timed(lambda: list_filter(records, tags_by_path, state), args.repeat),
+            'store_evaluate_ms': timed(lambda: query.column_mask(store) & query.tag_mask(store, tag_store),
+                                       args.repeat),
+            'cached_members_ms': timed(lambda: index.members('bench'), args.repeat),
+            'incremental_update_ms': timed(page_turn, args.repeat)
+        }
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"{args.count}条记录，合集成员{result['members']}个，建立成员索引 {build_ms} ms")
+        print(f"逐条判断 {result['list_filter_ms']} ms，列式整体求值 {result['store_evaluate_ms']} ms，"
+              f"点击合集 {result['cached_members_ms']} ms，翻页后增量更新 {result['incremental_update_ms']} ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
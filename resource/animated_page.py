@@ -0,0 +1,146 @@
+'''
+@version 1.0
+@brief 动画页面（GIF/WebP）播放：QImageReader逐帧按需解码，只缓冲少量后续帧，页面不可见时暂停
+@author 炎刃
+@date 2026-10-19
+'''
+import os
+from collections import deque
+
+from PyQt5.QtGui import QImage, QImageReader
+from PyQt5.QtCore import QObject, QTimer, QBuffer, QByteArray, QIODevice, pyqtSignal
+
+# 可能包含动画的页面格式
+ANIMATED_EXTENSIONS = ('.gif', '.webp')
+# 预先解码的帧数上限，长动画的内存占用与总帧数无关
+FRAME_BUFFER_SIZE = 4
+# 帧间隔缺失或过小（常见于旧GIF）时使用的间隔，毫秒，与主流浏览器一致
+DEFAULT_FRAME_DELAY = 100
+MIN_FRAME_DELAY = 20
+
+_FORMATS = {'.gif': b'gif', '.webp': b'webp'}
+
+
+class AnimatedPage(QObject):
+    """单个动画页面的播放器
+
+    通过QImageReader的顺序读帧接口每次只解码下一帧，缓冲区保持至多buffer_size帧；
+    播放到结尾时重新打开读取器循环播放。每切换一帧发出frame_changed。
+    """
+    frame_changed = pyqtSignal(QImage)
+
+    def __init__(self, data, name='', buffer_size=FRAME_BUFFER_SIZE, parent=None):
+        super().__init__(parent)
+        # 压缩数据复制一份保存：页面来源关闭后原缓冲区（如内存映射切片）即失效
+        self._data = QByteArray(bytes(data))
+        self._format = _FORMATS.get(os.path.splitext(name)[1].lower())
+        self.buffer_size = max(1, buffer_size)
+        self._frames = deque()
+        self._delay = DEFAULT_FRAME_DELAY
+        self._plays = 0
+        self._finished = False
+        self._paused = False
+        self.current_frame = None
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._advance)
+        self._open_reader()
+        self.frame_count = self._reader.imageCount()
+        self.loop_count = self._reader.loopCount()
+
+    def _open_reader(self):
+        self._pass_frames = 0
+        self._buffer = QBuffer(self._data)
+        self._buffer.open(QIODevice.ReadOnly)
+        self._reader = QImageReader(self._buffer, self._format) if self._format else QImageReader(self._buffer)
+
+    @property
+    def is_animated(self):
+        # 部分插件在读取前无法给出帧数（返回0），此时以是否支持动画为准
+        return self._reader.supportsAnimation() and self.frame_count != 1
+
+    @property
+    def is_playing(self):
+        return self._timer.isActive()
+
+    @property
+    def buffered_frames(self):
+        return len(self._frames)
+
+    def _loops_remaining(self):
+        # loopCount为-1表示无限循环，否则为首次播放后的重复次数
+        return self.loop_count < 0 or self._plays < self.loop_count
+
+    def _fill(self):
+        """解码后续帧直到缓冲区满或动画结束"""
+        while len(self._frames) < self.buffer_size and not self._finished:
+            if not self._reader.canRead():
+                # 本轮一帧也没读出时不再循环，避免损坏的数据反复重开
+                if not self._loops_remaining() or not self._pass_frames:
+                    self._finished = True
+                    break
+                self._plays += 1
+                self._open_reader()
+                continue
+            image = self._reader.read()
+            if image.isNull():
+                self._finished = True
+                break
+            self._pass_frames += 1
+            delay = self._reader.nextImageDelay()
+            self._frames.append((image, delay if delay >= MIN_FRAME_DELAY else DEFAULT_FRAME_DELAY))
+
+    def _advance(self):
+        self._timer.stop()
+        if not self._frames:
+            self._fill()
+        if not self._frames:
+            return
+        self.current_frame, self._delay = self._frames.popleft()
+        self.frame_changed.emit(self.current_frame)
+        # 补满缓冲区：首帧之后每次切换只需解码一帧
+        self._fill()
+        if not self._paused and self._frames:
+            self._timer.start(self._delay)
+
+    def start(self):
+        """开始播放，同步解码并发出第一帧
+
+        Returns:
+            QImage: 第一帧，解码失败时为None
+        """
+        self._paused = False
+        if self.current_frame is None:
+            self._advance()
+        elif not self.is_playing:
+            self._timer.start(self._delay)
+        return self.current_frame
+
+    def pause(self):
+        """暂停播放与解码，保留当前帧和已缓冲的帧"""
+        self._paused = True
+        self._timer.stop()
+
+    def resume(self):
+        if self._paused:
+            self.start()
+
+    def stop(self):
+        """停止播放并释放读取器与缓冲帧"""
+        self._timer.stop()
+        self._paused = True
+        self._frames.clear()
+        self._finished = True
+        self._buffer.close()
+
+
+def open_animated_page(data, name, parent=None):
+    """页面为多帧动画时返回AnimatedPage，静态图片或非动画格式返回None"""
+    if os.path.splitext(name)[1].lower() not in ANIMATED_EXTENSIONS:
+        return None
+    page = AnimatedPage(data, name, parent=parent)
+    if page.is_animated:
+        return page
+    page.stop()
+    page.deleteLater()
+    return None
@@ -0,0 +1,37 @@
+'''
+@version 1.0
+@brief 应用本地缓存目录管理
+@author 炎刃
+@date 2026-10-19
+'''
+import os
+
+# 缓存根目录，默认位于resource/cache，可通过环境变量VEXEL_CACHE_DIR覆盖（测试与打包场景使用）
+DEFAULT_CACHE_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache')
+
+
+def get_cache_root():
+    """返回缓存根目录路径"""
+    return os.environ.get('VEXEL_CACHE_DIR') or DEFAULT_CACHE_ROOT
+
+
+def get_cache_dir(*parts):
+    """返回缓存子目录路径，不存在时自动创建
+
+    Args:
+        *parts: 相对缓存根目录的子目录名
+
+    Returns:
+        str: 子目录绝对路径
+    """
+    path = os.path.join(get_cache_root(), *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def atomic_write_bytes(path, data):
+    """先写入临时文件再替换，避免写入中途崩溃留下损坏的缓存文件"""
+    tmp_path = f'{path}.tmp{os.getpid()}'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
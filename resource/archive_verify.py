@@ -0,0 +1,215 @@
+'''
+@version 1.0
+@brief 漫画文件完整性校验：快速级只检查文件头与目录结构，完整级逐成员校验CRC；
+       结果连同mtime与大小保存在记录中，文件未变化时不再重复校验
+@author 炎刃
+@date 2026-10-19
+'''
+import os
+import time
+import struct
+
+from .lazy_import import load_pil, load_archive_backend
+from .page_manifest import get_source_kind
+
+LEVEL_QUICK = 'quick'
+LEVEL_FULL = 'full'
+_LEVEL_RANK = {LEVEL_QUICK: 1, LEVEL_FULL: 2}
+
+# 完整校验的任务批次大小
+VERIFY_CHUNK_SIZE = 8
+
+_ZIP_LOCAL_HEADER = struct.Struct('<4s26x')
+_ZIP_LOCAL_SIGNATURE = b'PK\x03\x04'
+
+
+def _archive_kind(path):
+    """返回校验使用的格式：zip/7z/rar/pdf/image"""
+    kind = get_source_kind(path)
+    if kind in ('zip', '7z', 'rar'):
+        return kind
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.epub':
+        return 'zip'
+    if ext == '.pdf':
+        return 'pdf'
+    return 'image'
+
+
+def _quick_zip(path, file_size):
+    # 打开ZipFile即解析了中央目录结尾和中央目录，这里再核对每个成员的本地文件头位置
+    with load_archive_backend('zip').ZipFile(path, 'r') as archive, open(path, 'rb') as f:
+        for info in archive.infolist():
+            if info.header_offset + _ZIP_LOCAL_HEADER.size + info.compress_size > file_size:
+                return f'成员超出文件范围: {info.filename}'
+            f.seek(info.header_offset)
+            header = f.read(_ZIP_LOCAL_HEADER.size)
+            if len(header) < _ZIP_LOCAL_HEADER.size or _ZIP_LOCAL_HEADER.unpack(header)[0] != _ZIP_LOCAL_SIGNATURE:
+                return f'本地文件头损坏: {info.filename}'
+    return None
+
+
+def _quick_7z(path, file_size):
+    # py7zr打开时读取并校验签名头与尾部的头部数据库
+    with load_archive_backend('7z').SevenZipFile(path, 'r') as archive:
+        archive.archiveinfo()
+        archive.list()
+    return None
+
+
+def _quick_rar(path, file_size):
+    with load_archive_backend('rar').RarFile(path, 'r') as archive:
+        for info in archive.infolist():
+            offset = getattr(info, 'header_offset', None)
+            if offset is not None and offset + info.compress_size > file_size:
+                return f'成员超出文件范围: {info.filename}'
+    return None
+
+
+def _quick_pdf(path, file_size):
+    with open(path, 'rb') as f:
+        if f.read(5) != b'%PDF-':
+            return '不是有效的PDF文件'
+        f.seek(max(0, file_size - 1024))
+        if b'%%EOF' not in f.read():
+            return 'PDF文件不完整（缺少%%EOF）'
+    return None
+
+
+def _quick_image(path, file_size):
+    # 打开时只解析图片头，不解码像素
+    with load_pil().open(path):
+        pass
+    return None
+
+
+def _full_archive(path, kind):
+    if kind == 'rar':
+        with load_archive_backend('rar').RarFile(path, 'r') as archive:
+            archive.testrar()
+        return None
+    backend = load_archive_backend(kind)
+    opener = backend.SevenZipFile if kind == '7z' else backend.ZipFile
+    with opener(path, 'r') as archive:
+        bad_member = archive.testzip()
+    return f'CRC校验失败: {bad_member}' if bad_member else None
+
+
+def _full_image(path):
+    with load_pil().open(path) as img:
+        img.load()
+    return None
+
+
+_QUICK_CHECKS = {
+    'zip': _quick_zip,
+    '7z': _quick_7z,
+    'rar': _quick_rar,
+    'pdf': _quick_pdf,
+    'image': _quick_image
+}
+
+
+def check_file(path, level=LEVEL_QUICK):
+    """校验单个文件
+
+    Args:
+        path: 漫画文件路径
+        level: LEVEL_QUICK只检查文件头与目录；LEVEL_FULL在快速检查通过后解压全部成员校验CRC
+
+    Returns:
+        str: 错误说明，文件完好时返回None
+    """
+    try:
+        kind = _archive_kind(path)
+        error = _QUICK_CHECKS[kind](path, os.path.getsize(path))
+        if error or level != LEVEL_FULL:
+            return error
+        if kind in ('zip', '7z', 'rar'):
+            return _full_archive(path, kind)
+        if kind == 'image':
+            return _full_image(path)
+        return None
+    except Exception as e:
+        return str(e) or type(e).__name__
+
+
+def make_result(path, level, error):
+    """构造保存到记录中的校验结果"""
+    stat = os.stat(path)
+    return {
+        'level': level,
+        'ok': error is None,
+        'error': error,
+        'mtime': stat.st_mtime,
+        'size': stat.st_size,
+        'checked_at': time.time()
+    }
+
+
+def current_result(path, result):
+    """校验结果仍对应当前文件（mtime与大小未变）时返回该结果，否则返回None"""
+    if not result:
+        return None
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    if result.get('mtime') != stat.st_mtime or result.get('size') != stat.st_size:
+        return None
+    return result
+
+
+def needs_verify(path, result, level=LEVEL_QUICK):
+    """文件变化过、从未校验或已有结果的级别低于要求时需要重新校验
+
+    已判定损坏的文件在未变化时无需用更高级别重验。
+    """
+    result = current_result(path, result)
+    if result is None:
+        return True
+    if not result['ok']:
+        return False
+    return _LEVEL_RANK.get(result.get('level'), 0) < _LEVEL_RANK[level]
+
+
+def is_corrupt(path, result):
+    result = current_result(path, result)
+    return result is not None and not result['ok']
+
+
+def _verify_batch(paths, level):
+    """工作进程：校验一批文件，返回[(路径, 校验结果)]"""
+    results = []
+    for path in paths:
+        try:
+            results.append((path, make_result(path, level, check_file(path, level))))
+        except OSError as e:
+            print(f'校验失败 {path}: {e}')
+            results.append((path, None))
+    return results
+
+
+def verify_paths(paths, level=LEVEL_QUICK, pool=None, on_result=None):
+    """批量校验文件
+
+    Args:
+        paths: 文件路径列表
+        level: 校验级别
+        pool: 可选的image_jobs.ImageJobPool，完整校验是CPU密集型的解压，交给工作进程并行执行
+        on_result: 可选回调(路径, 校验结果)
+
+    Returns:
+        dict: 路径 -> 校验结果（文件无法访问时为None）
+    """
+    paths = list(paths)
+    batches = [(paths[i:i + VERIFY_CHUNK_SIZE], level) for i in range(0, len(paths), VERIFY_CHUNK_SIZE)]
+    if pool is not None:
+        return pool.run_batches(_verify_batch, batches, on_result)
+    results = {}
+    for batch in batches:
+        for path, result in _verify_batch(*batch):
+            results[path] = result
+            if on_result is not None:
+                on_result(path, result)
+    return results
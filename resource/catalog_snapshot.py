@@ -0,0 +1,239 @@
+'''
+@version 1.0
+@brief 目录快照：把全部库的记录按列编码为二进制文件，启动时目录未变化则直接加载，跳过扫描与JSON解析
+@author 炎刃
+@date 2026-10-19
+'''
+import os
+import gc
+import sys
+import pickle
+from array import array
+from collections import deque
+from itertools import repeat
+
+from .app_cache import get_cache_dir, atomic_write_bytes
+from .comic_record import ComicRecord, VerifyResult, FIELDS
+
+# 快照格式版本，编码方式变化时递增；记录字段变化时FIELDS不同，旧快照同样失效
+# 2: 版本1的快照可能带有最近阅读列表写入记录的last_read/current_page，作废后重新扫描
+SNAPSHOT_VERSION = 2
+_MAGIC = b'VXCS'
+# 不同取值少于记录数的这一比例时按取值表+编号存储
+_TABLE_RATIO = 0.25
+# 文本列用于拼接的分隔符，文件路径与名称中不会出现
+_SEPARATOR = '\0'
+
+
+def default_snapshot_path():
+    return os.path.join(get_cache_dir('catalog'), 'catalog.snapshot')
+
+
+def library_signature(library_path, scan_filter=None):
+    """库目录的变化签名
+
+    遍历库内所有子目录（不stat文件），取目录数与最大修改时间：任一目录中增删、重命名文件
+    都会改变该目录的mtime；再加上record.json的修改时间与大小，覆盖校验结果等记录内容的更新。
+    文件被原地改写而目录项不变时签名不变，这种情况由下次完整扫描发现。
+    给出扫描规则时只遍历扫描会进入的目录（.git等频繁变化的排除目录不影响签名），
+    规则本身也计入签名。
+
+    Returns:
+        tuple: 签名；库目录不存在时为None
+    """
+    if not os.path.isdir(library_path):
+        return None
+    dir_count = 0
+    max_mtime = 0
+    if scan_filter is not None:
+        paths = (path for path, _, _ in scan_filter.walk(library_path))
+    else:
+        paths = _iter_dirs(library_path)
+    for path in paths:
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            continue
+        dir_count += 1
+        max_mtime = max(max_mtime, mtime)
+    try:
+        stat = os.stat(os.path.join(library_path, 'record.json'))
+        record_state = (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        record_state = None
+    return (dir_count, max_mtime, record_state, scan_filter.key if scan_filter is not None else None)
+
+
+def _iter_dirs(root):
+    pending = [root]
+    while pending:
+        path = pending.pop()
+        try:
+            with os.scandir(path) as entries:
+                pending.extend(entry.path for entry in entries if entry.is_dir(follow_symlinks=False))
+        except OSError:
+            continue
+        yield path
+
+
+def library_signatures(library_paths, scan_filters=None):
+    """{库路径: 签名}
+
+    Args:
+        library_paths: 库目录列表
+        scan_filters: 可选的{库路径: 扫描器}（ScanFilter或ConcurrentWalker）
+    """
+    scan_filters = scan_filters or {}
+    return {path: library_signature(path, scan_filters.get(path)) for path in library_paths}
+
+
+def _encode_column(values):
+    """把一列值编码为紧凑形式，返回(类型, 数据, 为None的行号)"""
+    count = len(values)
+    none_rows = array('i', (row for row, value in enumerate(values) if value is None))
+    if len(none_rows) == count:
+        return ('none', None, None)
+    present = [value for value in values if value is not None]
+    kinds = {type(value) for value in present}
+    if kinds == {VerifyResult}:
+        filled = [value if value is not None else _EMPTY_VERIFY for value in values]
+        columns = {key: _encode_column([getattr(value, key) for value in filled]) for key in VerifyResult.__slots__}
+        return ('verify', columns, none_rows)
+    if kinds <= {str, tuple, bool} and len(set(present)) <= max(1, count * _TABLE_RATIO):
+        table = list(dict.fromkeys(values))
+        index = {value: code for code, value in enumerate(table)}
+        return ('table', (table, array('i', map(index.__getitem__, values))), None)
+    if kinds == {str} and not any(_SEPARATOR in value for value in present):
+        return ('text', _SEPARATOR.join(value if value is not None else '' for value in values), none_rows)
+    if kinds == {float}:
+        return ('float', array('d', (value if value is not None else 0.0 for value in values)), none_rows)
+    if kinds == {int} and all(-2 ** 63 <= value < 2 ** 63 for value in present):
+        return ('int', array('q', (value if value is not None else 0 for value in values)), none_rows)
+    return ('list', list(values), None)
+
+
+def _decode_column(column, count):
+    kind, data, none_rows = column
+    if kind == 'none':
+        return repeat(None, count)
+    if kind == 'table':
+        table, codes = data
+        # pickle不保留驻留，重新驻留后所有记录仍共享同一字符串
+        table = [_intern_value(value) for value in table]
+        return list(map(table.__getitem__, codes))
+    if kind == 'verify':
+        values = _build_slotted(VerifyResult, count, VerifyResult.__slots__,
+                                [_decode_column(data[key], count) for key in VerifyResult.__slots__])
+    elif kind == 'text':
+        values = data.split(_SEPARATOR)
+    elif kind in ('float', 'int'):
+        values = data.tolist()
+    else:
+        return data
+    for row in none_rows:
+        values[row] = None
+    return values
+
+
+def _intern_value(value):
+    if isinstance(value, str):
+        return sys.intern(value)
+    if isinstance(value, tuple):
+        return tuple(sys.intern(item) if isinstance(item, str) else item for item in value)
+    return value
+
+
+def _build_slotted(cls, count, slots, columns):
+    """批量创建对象并逐列写入槽位
+
+    写入已规范化的值，绕过ComicRecord.__setattr__的逐字段规范化；
+    以map驱动槽描述符，循环在C层完成。
+    """
+    objects = list(map(cls.__new__, repeat(cls, count)))
+    for slot, values in zip(slots, columns):
+        deque(map(getattr(cls, slot).__set__, objects, values), maxlen=0)
+    return objects
+
+
+_EMPTY_VERIFY = VerifyResult()
+_RECORD_SLOTS = FIELDS + ('extra',)
+
+
+def encode_records(records):
+    """把记录列表编码为按列存储的dict（dict记录先转换为ComicRecord）"""
+    records = [ComicRecord.from_dict(record) for record in records]
+    return {
+        'count': len(records),
+        'columns': [_encode_column([getattr(record, slot) for record in records]) for slot in _RECORD_SLOTS]
+    }
+
+
+def decode_records(data):
+    count = data['count']
+    # 一次性创建大量对象时分代回收会反复触发，期间暂停循环垃圾回收
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return _build_slotted(ComicRecord, count, _RECORD_SLOTS,
+                              [_decode_column(column, count) for column in data['columns']])
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def save_catalog_snapshot(signatures, records, path=None):
+    """写入快照
+
+    Args:
+        signatures: {库路径: 签名}，应在扫描开始前取得，扫描期间的变化会使快照在下次启动时失效
+        records: 全部库的记录
+        path: 快照文件路径，默认位于缓存目录
+
+    Returns:
+        bool: 是否写入成功
+    """
+    path = path or default_snapshot_path()
+    payload = {
+        'version': SNAPSHOT_VERSION,
+        'fields': FIELDS,
+        'libraries': signatures,
+        'records': encode_records(records)
+    }
+    try:
+        atomic_write_bytes(path, _MAGIC + pickle.dumps(payload, protocol=5))
+        return True
+    except (OSError, pickle.PicklingError) as e:
+        print(f'保存目录快照失败: {e}')
+        return False
+
+
+def load_catalog_snapshot(signatures, path=None):
+    """读取快照
+
+    快照的格式版本、记录字段、库集合与各库签名都与当前一致时才使用。
+
+    Args:
+        signatures: 当前的{库路径: 签名}（library_signatures的结果）
+        path: 快照文件路径，默认位于缓存目录
+
+    Returns:
+        list: ComicRecord列表；快照不存在、已失效或损坏时返回None，由调用方重新扫描
+    """
+    path = path or default_snapshot_path()
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return None
+    if not data.startswith(_MAGIC):
+        return None
+    try:
+        payload = pickle.loads(memoryview(data)[len(_MAGIC):])
+        if payload.get('version') != SNAPSHOT_VERSION or tuple(payload.get('fields', ())) != FIELDS:
+            return None
+        if payload['libraries'] != signatures:
+            return None
+        return decode_records(payload['records'])
+    except Exception as e:
+        print(f'读取目录快照失败: {e}')
+        return None
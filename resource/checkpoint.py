@@ -0,0 +1,109 @@
+'''
+@version 1.0
+@brief 批处理进度检查点：记录已完成的条目，中断后可从断点继续
+@author 炎刃
+@date 2026-10-19
+'''
+import os
+import json
+import time
+import threading
+
+from .app_cache import get_cache_dir, atomic_write_bytes
+
+CHECKPOINT_VERSION = 1
+# 累计多少条或多少秒写一次磁盘
+FLUSH_EVERY = 50
+FLUSH_INTERVAL = 5.0
+
+
+def get_checkpoint_path(name, directory=None):
+    """任务的检查点路径，默认位于缓存目录/checkpoints/<name>.json"""
+    return os.path.join(directory or get_cache_dir('checkpoints'), f'{name}.json')
+
+
+class Checkpoint:
+    """已完成条目的集合，定期原子写入磁盘
+
+    task用于区分不同任务，读取到的检查点task不一致时视为无效，避免误跳过条目。
+    条目完成后的结果一并保存，恢复时可以直接汇总而无需重新计算。
+    """
+
+    def __init__(self, path, task, flush_every=FLUSH_EVERY, flush_interval=FLUSH_INTERVAL):
+        self.path = path
+        self.task = task
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()  # 串行化写盘，保证较新的快照不会被旧快照覆盖
+        self._done = {}
+        self._dirty = 0
+        self._last_flush = time.monotonic()
+
+    def load(self):
+        """读取已有检查点
+
+        Returns:
+            int: 恢复的已完成条目数
+        """
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return 0
+        except (OSError, ValueError) as e:
+            print(f'读取检查点失败，将从头开始: {e}')
+            return 0
+        if data.get('version') != CHECKPOINT_VERSION or data.get('task') != self.task:
+            return 0
+        with self._lock:
+            self._done = data.get('done', {})
+            return len(self._done)
+
+    def is_done(self, key):
+        with self._lock:
+            return key in self._done
+
+    def result(self, key):
+        with self._lock:
+            return self._done.get(key)
+
+    def results(self):
+        with self._lock:
+            return dict(self._done)
+
+    def mark(self, key, result=None):
+        """标记条目完成，达到条数或时间阈值时写盘"""
+        with self._lock:
+            self._done[key] = result
+            self._dirty += 1
+            due = (self._dirty >= self.flush_every
+                   or time.monotonic() - self._last_flush >= self.flush_interval)
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self._write_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                data = json.dumps({'version': CHECKPOINT_VERSION, 'task': self.task, 'done': self._done},
+                                  ensure_ascii=False)
+                self._dirty = 0
+                self._last_flush = time.monotonic()
+            try:
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                atomic_write_bytes(self.path, data.encode('utf-8'))
+            except OSError as e:
+                print(f'保存检查点失败: {e}')
+
+    def clear(self):
+        """任务完成后删除检查点"""
+        with self._write_lock:
+            with self._lock:
+                self._done = {}
+                self._dirty = 0
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,179 @@
+'''
+@version 1.0
+@brief 智能合集编辑对话框：把表单条件转换为smart_collection的查询
+@author 炎刃
+@date 2026-10-19
+'''
+from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QFormLayout, QLineEdit, QComboBox, QSpinBox,
+                             QDoubleSpinBox, QCheckBox, QDateEdit, QPushButton, QMessageBox)
+from PyQt5.QtCore import QDate, QDateTime, QTime
+
+from resource.smart_collection import compile_query
+
+# 阅读状态选项（collections.dialog.read下的文本键，None为不限） -> 查询条件
+READ_STATES = (
+    (None, {}),
+    ('unread', {'read': False}),
+    ('read', {'read': True}),
+    ('reading', {'read': True, 'finished': False}),
+    ('finished', {'finished': True})
+)
+FAVORITE_STATES = ((None, None), ('yes', True), ('no', False))
+MB = 1024 * 1024
+
+
+def split_tags(text):
+    return [tag.strip() for tag in text.replace('，', ',').split(',') if tag.strip()]
+
+
+class SmartCollectionDialog(QDialog):
+    """新建或编辑智能合集
+
+    Args:
+        i18n: 国际化管理器
+        libraries: 库配置列表（含name/path）
+        name: 合集名称，编辑时传入
+        query: 合集查询，编辑时传入
+    """
+
+    def __init__(self, i18n, libraries, name='', query=None, parent=None):
+        super().__init__(parent)
+        self.i18n = i18n
+        self.libraries = libraries
+        self.query = None
+        self.initUI()
+        self.load(name, query or {})
+
+    def initUI(self):
+        tr = self.tr_text
+        self.setWindowTitle(tr('title'))
+        self.setMinimumWidth(380)
+        main_layout = QVBoxLayout()
+        form = QFormLayout()
+
+        self.name_edit = QLineEdit()
+        form.addRow(tr('name'), self.name_edit)
+        # 标签条件，多个标签用逗号分隔
+        self.tags_all_edit = QLineEdit()
+        form.addRow(tr('tags_all'), self.tags_all_edit)
+        self.tags_any_edit = QLineEdit()
+        form.addRow(tr('tags_any'), self.tags_any_edit)
+        self.tags_none_edit = QLineEdit()
+        form.addRow(tr('tags_none'), self.tags_none_edit)
+
+        self.library_combo = QComboBox()
+        self.library_combo.addItem(tr('all_libraries'), None)
+        for lib in self.libraries:
+            self.library_combo.addItem(lib.get('name') or lib.get('path'), lib.get('path'))
+        form.addRow(tr('library'), self.library_combo)
+
+        # 评分0与大小0表示不限
+        self.min_rating_spin = QSpinBox()
+        self.min_rating_spin.setRange(0, 5)
+        self.max_rating_spin = QSpinBox()
+        self.max_rating_spin.setRange(0, 5)
+        for spin in (self.min_rating_spin, self.max_rating_spin):
+            spin.setSpecialValueText(tr('any'))
+        form.addRow(tr('rating'), self._pair(self.min_rating_spin, self.max_rating_spin))
+        self.min_size_spin = QDoubleSpinBox()
+        self.max_size_spin = QDoubleSpinBox()
+        for spin in (self.min_size_spin, self.max_size_spin):
+            spin.setRange(0, 1024 * 1024)
+            spin.setSuffix(' MB')
+            spin.setSpecialValueText(tr('any'))
+        form.addRow(tr('size'), self._pair(self.min_size_spin, self.max_size_spin))
+
+        self.after_check, self.after_date = QCheckBox(tr('after')), QDateEdit(QDate.currentDate())
+        self.before_check, self.before_date = QCheckBox(tr('before')), QDateEdit(QDate.currentDate())
+        for date_edit in (self.after_date, self.before_date):
+            date_edit.setCalendarPopup(True)
+        form.addRow(tr('modified'), self._pair(self.after_check, self.after_date))
+        form.addRow('', self._pair(self.before_check, self.before_date))
+
+        self.read_combo = QComboBox()
+        for key, _ in READ_STATES:
+            self.read_combo.addItem(tr(f'read.{key}') if key else tr('any'))
+        form.addRow(tr('read_state'), self.read_combo)
+        self.favorite_combo = QComboBox()
+        for key, _ in FAVORITE_STATES:
+            self.favorite_combo.addItem(tr(f'favorite_state.{key}') if key else tr('any'))
+        form.addRow(tr('favorite'), self.favorite_combo)
+        main_layout.addLayout(form)
+
+        btn_layout = QHBoxLayout()
+        btn_layout.addStretch()
+        cancel_btn = QPushButton(tr('cancel'))
+        cancel_btn.clicked.connect(self.reject)
+        save_btn = QPushButton(tr('save'))
+        save_btn.clicked.connect(self.save)
+        btn_layout.addWidget(cancel_btn)
+        btn_layout.addWidget(save_btn)
+        main_layout.addLayout(btn_layout)
+        self.setLayout(main_layout)
+
+    def tr_text(self, key):
+        return self.i18n.get_text(f'collections.dialog.{key}')
+
+    @staticmethod
+    def _pair(first, second):
+        layout = QHBoxLayout()
+        layout.addWidget(first)
+        layout.addWidget(second)
+        return layout
+
+    def load(self, name, query):
+        self.name_edit.setText(name)
+        self.tags_all_edit.setText(', '.join(query.get('tags_all', [])))
+        self.tags_any_edit.setText(', '.join(query.get('tags_any', [])))
+        self.tags_none_edit.setText(', '.join(query.get('tags_none', [])))
+        index = self.library_combo.findData(query.get('library'))
+        self.library_combo.setCurrentIndex(max(index, 0))
+        self.min_rating_spin.setValue(query.get('min_rating') or 0)
+        self.max_rating_spin.setValue(query.get('max_rating') or 0)
+        self.min_size_spin.setValue((query.get('min_size') or 0) / MB)
+        self.max_size_spin.setValue((query.get('max_size') or 0) / MB)
+        for check, date_edit, key in ((self.after_check, self.after_date, 'modified_after'),
+                                      (self.before_check, self.before_date, 'modified_before')):
+            check.setChecked(query.get(key) is not None)
+            if query.get(key) is not None:
+                date_edit.setDate(QDateTime.fromSecsSinceEpoch(int(query[key])).date())
+        read = {key: query[key] for key in ('read', 'finished') if key in query}
+        self.read_combo.setCurrentIndex(next((i for i, (_, terms) in enumerate(READ_STATES) if terms == read), 0))
+        self.favorite_combo.setCurrentIndex(
+            next((i for i, (_, value) in enumerate(FAVORITE_STATES) if value == query.get('favorite')), 0))
+
+    def build_query(self):
+        query = {
+            'tags_all': split_tags(self.tags_all_edit.text()),
+            'tags_any': split_tags(self.tags_any_edit.text()),
+            'tags_none': split_tags(self.tags_none_edit.text()),
+            'library': self.library_combo.currentData(),
+            'min_rating': self.min_rating_spin.value() or None,
+            'max_rating': self.max_rating_spin.value() or None,
+            'min_size': int(self.min_size_spin.value() * MB) or None,
+            'max_size': int(self.max_size_spin.value() * MB) or None,
+            # 日期按当天0点计：晚于包含当天，早于不含当天
+            'modified_after': (QDateTime(self.after_date.date(), QTime(0, 0)).toSecsSinceEpoch()
+                               if self.after_check.isChecked() else None),
+            'modified_before': (QDateTime(self.before_date.date(), QTime(0, 0)).toSecsSinceEpoch()
+                                if self.before_check.isChecked() else None),
+            'favorite': FAVORITE_STATES[self.favorite_combo.currentIndex()][1]
+        }
+        query.update(READ_STATES[self.read_combo.currentIndex()][1])
+        return {key: value for key, value in query.items() if value is not None and value != []}
+
+    def save(self):
+        if not self.name_edit.text().strip():
+            QMessageBox.warning(self, self.tr_text('title'), self.tr_text('name_required'))
+            return
+        query = self.build_query()
+        try:
+            compile_query(query)
+        except ValueError as e:
+            QMessageBox.warning(self, self.tr_text('title'), self.tr_text('invalid').format(error=e))
+            return
+        self.query = query
+        self.accept()
+
+    def name(self):
+        return self.name_edit.text().strip()
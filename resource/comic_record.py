@@ -0,0 +1,279 @@
+'''
+@version 1.0
+@brief 紧凑的漫画记录类型：__slots__存储、库标识与标签驻留、时间统一为数值时间戳，
+       并可从各代码路径写出的record.json格式转换
+@author 炎刃
+@date 2026-10-19
+'''
+import os
+import sys
+import datetime
+from collections.abc import Mapping, MutableMapping
+
+# 记录字段，顺序即to_dict输出顺序
+FIELDS = ('comic_id', 'full_path', 'name', 'size', 'modified_time', 'cover_path', 'library_path',
+          'library_id', 'library_name', 'kind', 'tags', 'favorite', 'rating',
+          'created_time', 'import_time', 'verify')
+# to_dict中始终输出的字段（与LibraryCore写出的record.json一致），其余字段为空时省略
+_CORE_FIELDS = ('comic_id', 'full_path', 'name', 'size', 'modified_time', 'cover_path', 'library_path')
+# 旧格式中的键名 -> 统一字段名
+FIELD_ALIASES = {
+    'id': 'comic_id',
+    'cover': 'cover_path',
+    'lib_id': 'library_id',
+    'lib_name': 'library_name',
+    'type': 'kind'
+}
+_FIELD_SET = frozenset(FIELDS)
+# 取值高度重复的字符串字段，驻留后所有记录共享同一对象
+_INTERNED_FIELDS = frozenset(('library_path', 'library_id', 'library_name', 'kind'))
+_TIME_FIELDS = frozenset(('modified_time', 'created_time', 'import_time'))
+
+
+def parse_timestamp(value):
+    """把各种时间表示统一为Unix时间戳（float）
+
+    支持数值、数值字符串、'YYYY-MM-DD HH:MM:SS'（本地时间）以及ISO 8601
+    （结尾的Z按UTC处理，兼容'+00:00Z'这类重复时区后缀）。无法解析时返回None。
+    """
+    if value is None or value == '':
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value).strip()
+    try:
+        return float(text)
+    except ValueError:
+        pass
+    utc = text.endswith('Z')
+    if utc:
+        text = text[:-1]
+    try:
+        moment = datetime.datetime.fromisoformat(text)
+    except ValueError:
+        return None
+    if moment.tzinfo is None and utc:
+        moment = moment.replace(tzinfo=datetime.timezone.utc)
+    return moment.timestamp()
+
+
+class VerifyResult(Mapping):
+    """完整性校验结果（archive_verify.make_result的紧凑形式），以只读映射方式访问"""
+
+    __slots__ = ('level', 'ok', 'error', 'mtime', 'size', 'checked_at')
+
+    def __init__(self, level=None, ok=None, error=None, mtime=None, size=None, checked_at=None):
+        self.level = _intern(level)
+        self.ok = ok
+        self.error = error
+        self.mtime = mtime
+        self.size = size
+        self.checked_at = checked_at
+
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(self.__slots__)
+
+    def __len__(self):
+        return len(self.__slots__)
+
+    def __repr__(self):
+        return f'VerifyResult({self.to_dict()!r})'
+
+    def to_dict(self):
+        return {key: getattr(self, key) for key in self.__slots__}
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _normalize(field, value):
+    if value is None:
+        return None
+    if field in _TIME_FIELDS:
+        return parse_timestamp(value)
+    if field in _INTERNED_FIELDS:
+        return _intern(str(value))
+    if field == 'tags':
+        if isinstance(value, str):
+            value = [value]
+        return tuple(_intern(str(tag)) for tag in value) or None
+    if field == 'size':
+        return int(value)
+    if field == 'cover_path':
+        return value or None
+    if field == 'verify' and isinstance(value, Mapping) and not isinstance(value, VerifyResult) \
+            and set(value) <= set(VerifyResult.__slots__):
+        return VerifyResult(**value)
+    return value
+
+
+class ComicRecord(MutableMapping):
+    """单本漫画的记录
+
+    字段保存在__slots__中，没有每条记录一个dict的开销；库路径/ID/名称、类型与标签驻留，
+    十万条记录只保存一份相同的字符串；时间统一为数值时间戳；校验结果保存为VerifyResult。
+    同时实现映射接口，record['cover_path']、record.get('verify')等原有写法不变（未设置的字段下标访问得到None，
+    get返回默认值），旧键名（id、cover、lib_id等）自动映射到统一字段，未知键保存在extra中。
+    """
+
+    __slots__ = FIELDS + ('extra',)
+
+    def __init__(self, **fields):
+        for field in FIELDS:
+            object.__setattr__(self, field, None)
+        self.extra = None
+        for key, value in fields.items():
+            self[key] = value
+
+    def __setattr__(self, name, value):
+        if name in _FIELD_SET:
+            value = _normalize(name, value)
+        object.__setattr__(self, name, value)
+
+    def __getitem__(self, key):
+        field = FIELD_ALIASES.get(key, key)
+        if field in _FIELD_SET:
+            return getattr(self, field)
+        if self.extra is not None and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        # 未设置的字段视为不存在（与__contains__一致），返回default而不是None
+        field = FIELD_ALIASES.get(key, key)
+        if field in _FIELD_SET:
+            value = getattr(self, field)
+            return default if value is None else value
+        if self.extra is not None and key in self.extra:
+            return self.extra[key]
+        return default
+
+    def __setitem__(self, key, value):
+        field = FIELD_ALIASES.get(key, key)
+        if field in _FIELD_SET:
+            setattr(self, field, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __delitem__(self, key):
+        field = FIELD_ALIASES.get(key, key)
+        if field in _FIELD_SET:
+            setattr(self, field, None)
+        elif self.extra is not None and key in self.extra:
+            del self.extra[key]
+        else:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        field = FIELD_ALIASES.get(key, key)
+        if field in _FIELD_SET:
+            return getattr(self, field) is not None
+        return self.extra is not None and key in self.extra
+
+    def __iter__(self):
+        for field in FIELDS:
+            if getattr(self, field) is not None:
+                yield field
+        if self.extra:
+            yield from self.extra
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f'ComicRecord({self.comic_id!r}, {self.full_path!r})'
+
+    def to_dict(self):
+        """转换为LibraryCore使用的record.json格式"""
+        data = {}
+        for field in FIELDS:
+            value = getattr(self, field)
+            if field in _CORE_FIELDS or value not in (None, False, 0):
+                if field == 'tags':
+                    value = list(value)
+                elif isinstance(value, VerifyResult):
+                    value = value.to_dict()
+                data[field] = value
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    @classmethod
+    def from_dict(cls, data, library_path=None, library_id=None, library_name=None):
+        """从任意已有的记录格式转换
+
+        支持：LibraryCore格式（comic_id/cover_path/library_path）、ComicLibraryUtils扫描格式
+        （id/cover/lib_id/lib_name，path为库内相对路径，modified_time为时间字符串）、
+        导入格式（basic_info与metadata嵌套，时间为ISO字符串）。
+
+        Args:
+            data: 记录dict
+            library_path: 记录所在库目录，用于补全相对路径与缺失的库路径
+            library_id: 缺失时补全的库ID
+            library_name: 缺失时补全的库名称
+        """
+        if isinstance(data, ComicRecord):
+            return data
+        merged = {key: value for key, value in data.items() if key not in ('basic_info', 'metadata')}
+        for nested in ('basic_info', 'metadata'):
+            if isinstance(data.get(nested), Mapping):
+                merged.update(data[nested])
+
+        full_path = merged.pop('full_path', None)
+        path = merged.pop('path', None)
+        if not full_path and path:
+            full_path = path if os.path.isabs(path) or not library_path else os.path.join(library_path, path)
+        record = cls()
+        record.full_path = full_path
+        name = merged.pop('name', None)
+        record.name = name or (os.path.basename(full_path) if full_path else None)
+        for key, value in merged.items():
+            field = FIELD_ALIASES.get(key, key)
+            # 新旧键名同时存在时以统一字段名为准
+            if field != key and field in merged:
+                continue
+            record[key] = value
+        if record.library_path is None:
+            record.library_path = library_path
+        if record.library_id is None:
+            record.library_id = library_id
+        if record.library_name is None:
+            record.library_name = library_name
+        return record
+
+
+def records_from_json(data, library_path=None):
+    """把record.json的内容转换为ComicRecord列表
+
+    支持三种顶层结构：记录列表；{"files": [...]}（导入记录）；
+    {"libraries": [{"id", "name", "path", "comics": [...]}]}（按库分组）。
+    非dict的条目被忽略。
+    """
+    if isinstance(data, list):
+        return [ComicRecord.from_dict(item, library_path) for item in data if isinstance(item, Mapping)]
+    if not isinstance(data, Mapping):
+        return []
+    if isinstance(data.get('files'), list):
+        return records_from_json(data['files'], library_path)
+    records = []
+    for lib in data.get('libraries') or []:
+        if not isinstance(lib, Mapping):
+            continue
+        for item in lib.get('comics') or []:
+            if isinstance(item, Mapping):
+                records.append(ComicRecord.from_dict(item, lib.get('path') or library_path,
+                                                     lib.get('id'), lib.get('name')))
+    return records
+
+
+def records_to_json(records):
+    """把记录列表转换为可写入record.json的dict列表"""
+    return [record.to_dict() if isinstance(record, ComicRecord) else record for record in records]
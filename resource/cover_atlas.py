@@ -0,0 +1,226 @@
+'''
+@version 1.0
+@brief 封面图集：把一个库的全部封面缩成统一尺寸的缩略图，按记录顺序连续打包进单个文件并附偏移索引；
+       读取时整个文件mmap，一屏封面对应一段连续字节，冷缓存下不必逐个打开成千上万个小文件
+@author 炎刃
+@date 2026-10-19
+'''
+import os
+import json
+import mmap
+import struct
+import hashlib
+
+from .app_cache import get_cache_dir, atomic_write_bytes
+from .thumbnail_cache import THUMBNAIL_SIZE, encode_thumbnail
+
+ATLAS_VERSION = 1
+_MAGIC = b'VXCA'
+# 魔数, 版本, 缩略图宽, 高, 条目数, 索引偏移, 索引长度
+_HEADER = struct.Struct('<4sHHHIQI')
+
+
+class BadAtlasError(ValueError):
+    """图集文件损坏或版本不符"""
+
+
+def default_atlas_path(library_path):
+    """库的图集位于缓存目录/atlas，按库路径的哈希命名（不写入库目录，网络库也不受影响）"""
+    digest = hashlib.sha1(os.path.abspath(library_path).encode('utf-8')).hexdigest()[:16]
+    return os.path.join(get_cache_dir('atlas'), f'{digest}.atlas')
+
+
+def _cover_id(cover_path):
+    # 封面按内容哈希命名（cover_store），文件名相同即内容相同，可直接复用旧图集中的缩略图
+    return os.path.basename(cover_path)
+
+
+class CoverAtlas:
+    """只读的封面图集
+
+    缩略图以mmap上的零拷贝memoryview切片返回，切片在关闭后失效，调用方需在close前用完
+    （如交给QPixmap.loadFromData）。切片读取不依赖文件位置，可被多个线程同时读取。
+
+    Raises:
+        OSError: 文件无法打开
+        BadAtlasError: 文件损坏或版本不符
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size < _HEADER.size:
+                raise BadAtlasError('文件过短')
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+        try:
+            self._parse()
+        except Exception:
+            self.close()
+            raise
+
+    def _parse(self):
+        magic, version, width, height, count, index_offset, index_length = _HEADER.unpack_from(self._mmap, 0)
+        if magic != _MAGIC or version != ATLAS_VERSION:
+            raise BadAtlasError(f'不支持的图集格式: {magic!r} v{version}')
+        if index_offset + index_length > len(self._mmap):
+            raise BadAtlasError('索引超出文件范围')
+        try:
+            index = json.loads(bytes(self._view[index_offset:index_offset + index_length]).decode('utf-8'))
+        except ValueError as e:
+            raise BadAtlasError(f'索引损坏: {e}')
+        self.size = (width, height)
+        self.paths = index['paths']
+        self.covers = index['covers']
+        self.offsets = index['offsets']
+        self.lengths = index['lengths']
+        if not len(self.paths) == len(self.covers) == len(self.offsets) == len(self.lengths) == count:
+            raise BadAtlasError('索引条目数不一致')
+        if any(offset + length > index_offset for offset, length in zip(self.offsets, self.lengths)):
+            raise BadAtlasError('条目超出数据区')
+        self._row_by_path = {path: row for row, path in enumerate(self.paths)}
+        self._row_by_cover = {cover: row for row, cover in enumerate(self.covers)}
+
+    @classmethod
+    def open(cls, path):
+        """打开图集，文件不存在或损坏时返回None（由调用方重建）"""
+        try:
+            return cls(path)
+        except FileNotFoundError:
+            return None
+        except (OSError, BadAtlasError) as e:
+            print(f'读取封面图集失败 {path}: {e}')
+            return None
+
+    def __len__(self):
+        return len(self.paths)
+
+    def row_of(self, full_path):
+        """记录在图集中的行号，不存在时返回-1"""
+        return self._row_by_path.get(full_path, -1)
+
+    def _slice(self, row):
+        offset = self.offsets[row]
+        return self._view[offset:offset + self.lengths[row]]
+
+    def get(self, full_path):
+        """记录封面的JPEG缩略图，不在图集中时返回None"""
+        row = self._row_by_path.get(full_path)
+        return self._slice(row) if row is not None else None
+
+    def get_cover(self, cover_id):
+        """按封面文件名取缩略图（重建图集时复用）"""
+        row = self._row_by_cover.get(cover_id)
+        return self._slice(row) if row is not None else None
+
+    def read_range(self, start, stop):
+        """读取连续的一段行，返回各行缩略图的切片列表
+
+        同一段行在文件中是连续字节，先提示内核整段预读，冷缓存时一次顺序读入而不是逐页缺页。
+        """
+        start, stop, _ = slice(start, stop).indices(len(self.paths))
+        if start >= stop:
+            return []
+        self._prefetch(min(self.offsets[start:stop]),
+                       max(offset + length for offset, length in
+                           zip(self.offsets[start:stop], self.lengths[start:stop])))
+        return [self._slice(row) for row in range(start, stop)]
+
+    def _prefetch(self, begin, end):
+        if not hasattr(self._mmap, 'madvise') or not hasattr(mmap, 'MADV_WILLNEED'):
+            return
+        begin -= begin % mmap.PAGESIZE
+        try:
+            self._mmap.madvise(mmap.MADV_WILLNEED, begin, end - begin)
+        except (OSError, ValueError):
+            pass
+
+    def is_current(self, records):
+        """图集是否与记录一致：顺序相同且每条记录的封面都已收录"""
+        rows = [record for record in records if record.get('cover_path')]
+        if len(rows) != len(self.paths):
+            return False
+        return all(record['full_path'] == path and _cover_id(record['cover_path']) == cover
+                   for record, path, cover in zip(rows, self.paths, self.covers))
+
+    def close(self):
+        if self._mmap is None:
+            return
+        self._view.release()
+        try:
+            self._mmap.close()
+        except BufferError:
+            # 调用方仍持有切片，映射在最后一个切片释放后由垃圾回收关闭
+            pass
+        self._mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def build_atlas(records, path, size=THUMBNAIL_SIZE):
+    """按记录顺序重建图集
+
+    旧图集中已有的封面（按内容哈希命名的文件名相同）直接拷贝缩略图，只为新封面解码缩小；
+    多条记录共用同一封面时只存一份。缩略图整体在内存中拼好后原子替换旧文件。
+
+    Args:
+        records: 库的记录，没有cover_path的记录不收录
+        path: 图集文件路径
+        size: 缩略图尺寸（宽, 高），与旧图集不同时全部重新生成
+
+    Returns:
+        dict: {'count': 条目数, 'reused': 复用数, 'encoded': 新生成数, 'failed': 失败数, 'bytes': 文件大小}
+    """
+    stats = {'count': 0, 'reused': 0, 'encoded': 0, 'failed': 0, 'bytes': 0}
+    paths, covers, offsets, lengths = [], [], [], []
+    placed = {}  # 封面文件名 -> (偏移, 长度)
+    data = bytearray(_HEADER.size)
+    previous = CoverAtlas.open(path)
+    if previous is not None and previous.size != tuple(size):
+        previous.close()
+        previous = None
+    try:
+        for record in records:
+            cover_path = record.get('cover_path')
+            if not cover_path:
+                continue
+            cover_id = _cover_id(cover_path)
+            if cover_id not in placed:
+                blob = previous.get_cover(cover_id) if previous is not None else None
+                if blob is not None:
+                    stats['reused'] += 1
+                else:
+                    try:
+                        with open(cover_path, 'rb') as f:
+                            blob = encode_thumbnail(f.read(), size)
+                    except Exception as e:
+                        print(f'生成封面缩略图失败 {cover_path}: {e}')
+                        stats['failed'] += 1
+                        continue
+                    stats['encoded'] += 1
+                placed[cover_id] = (len(data), len(blob))
+                data += blob
+                del blob
+            offset, length = placed[cover_id]
+            paths.append(record['full_path'])
+            covers.append(cover_id)
+            offsets.append(offset)
+            lengths.append(length)
+    finally:
+        # 先关闭旧图集的映射，Windows下映射中的文件不能被替换
+        if previous is not None:
+            previous.close()
+
+    index = json.dumps({'paths': paths, 'covers': covers, 'offsets': offsets, 'lengths': lengths},
+                       ensure_ascii=False).encode('utf-8')
+    index_offset = len(data)
+    data += index
+    _HEADER.pack_into(data, 0, _MAGIC, ATLAS_VERSION, size[0], size[1], len(paths), index_offset, len(index))
+    atomic_write_bytes(path, data)
+    stats['count'] = len(paths)
+    stats['bytes'] = len(data)
+    return stats
@@ -0,0 +1,170 @@
+'''
+@version 1.0
+@brief 库封面存储：封面按内容哈希命名，相同封面只存一份，不会因comic_id复用而互相覆盖；
+       按目录中记录的引用回收孤立封面，并可按容量上限淘汰最早生成的封面
+@author 炎刃
+@date 2026-10-19
+'''
+import os
+import time
+import hashlib
+
+from .app_cache import atomic_write_bytes
+
+COVER_DIR = 'cover'
+# 刚写入不久的未引用文件不回收：可能是正在生成、尚未写入record.json的封面，或另一进程的临时文件
+GC_GRACE_SECONDS = 600
+
+
+def cover_key(data):
+    """封面内容的哈希，作为文件名"""
+    return hashlib.sha1(data).hexdigest()
+
+
+def _normalize(path):
+    return os.path.normcase(os.path.abspath(path))
+
+
+class CoverStore:
+    """单个库的封面目录
+
+    Args:
+        cover_dir: 封面目录（库目录下的cover）
+    """
+
+    def __init__(self, cover_dir):
+        self.cover_dir = cover_dir
+
+    @classmethod
+    def for_library(cls, library_path):
+        return cls(os.path.join(library_path, COVER_DIR))
+
+    def path_for(self, key, ext):
+        return os.path.join(self.cover_dir, f'{key}{ext.lower()}')
+
+    def put(self, data, ext):
+        """保存封面图像，已有相同内容时直接复用
+
+        Args:
+            data: 图像字节
+            ext: 扩展名（含点）
+
+        Returns:
+            str: 封面路径
+        """
+        path = self.path_for(cover_key(data), ext)
+        if os.path.exists(path):
+            # 复用的封面刷新修改时间，按容量淘汰时视为新近使用
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            return path
+        os.makedirs(self.cover_dir, exist_ok=True)
+        atomic_write_bytes(path, data)
+        return path
+
+    def files(self):
+        """目录中的文件：[(路径, 大小, 修改时间)]，包括旧版本按comic_id或uuid命名的封面"""
+        result = []
+        try:
+            with os.scandir(self.cover_dir) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_file(follow_symlinks=False):
+                            stat = entry.stat(follow_symlinks=False)
+                            result.append((entry.path, stat.st_size, stat.st_mtime))
+                    except OSError:
+                        continue
+        except FileNotFoundError:
+            pass
+        return result
+
+    def usage(self):
+        """(文件数, 总字节数)"""
+        files = self.files()
+        return len(files), sum(size for _, size, _ in files)
+
+    def references(self, records):
+        """{封面路径(规范化): 引用它的记录列表}，只统计位于本目录中的封面"""
+        cover_dir = _normalize(self.cover_dir)
+        refs = {}
+        for record in records:
+            cover_path = record.get('cover_path')
+            if not cover_path:
+                continue
+            path = _normalize(cover_path)
+            if os.path.dirname(path) == cover_dir:
+                refs.setdefault(path, []).append(record)
+        return refs
+
+    def collect(self, records, quota_bytes=None, grace_seconds=GC_GRACE_SECONDS, dry_run=False, candidates=None):
+        """回收封面
+
+        先删除没有记录引用的文件（已删除或改名的漫画的封面、旧命名方式留下的重复封面、
+        崩溃残留的临时文件）；之后总占用仍超过quota_bytes时，按修改时间从旧到新淘汰被引用的封面，
+        并清空引用它的记录的cover_path（由调用方保存记录，之后可重新生成）。
+
+        Args:
+            records: 库的全部记录（引用来源）
+            quota_bytes: 容量上限，None为不限
+            grace_seconds: 修改时间在这之内的未引用文件暂不回收
+            dry_run: 只统计不删除
+            candidates: 可选的封面路径集合，只把其中未被引用的文件当作孤立文件回收（如扫描后不再被引用的旧封面），
+                None时回收目录中全部未引用的文件
+
+        Returns:
+            dict: {'scanned', 'orphans', 'evicted', 'reclaimed_bytes', 'kept', 'kept_bytes', 'cleared'}，
+                cleared为被清空cover_path的记录列表
+        """
+        refs = self.references(records)
+        if candidates is not None:
+            candidates = {_normalize(path) for path in candidates}
+        now = time.time()
+        stats = {'scanned': 0, 'orphans': 0, 'evicted': 0, 'reclaimed_bytes': 0,
+                 'kept': 0, 'kept_bytes': 0, 'cleared': []}
+        kept = []
+        for path, size, mtime in self.files():
+            stats['scanned'] += 1
+            key = _normalize(path)
+            if key in refs or now - mtime < grace_seconds or (candidates is not None and key not in candidates):
+                kept.append((path, size, mtime))
+            elif self._remove(path, dry_run):
+                stats['orphans'] += 1
+                stats['reclaimed_bytes'] += size
+            else:
+                kept.append((path, size, mtime))
+
+        total = sum(size for _, size, _ in kept)
+        if quota_bytes is not None and total > quota_bytes:
+            remaining = []
+            for path, size, mtime in sorted(kept, key=lambda item: item[2]):
+                key = _normalize(path)
+                if total <= quota_bytes or key not in refs or not self._remove(path, dry_run):
+                    remaining.append((path, size, mtime))
+                    continue
+                total -= size
+                stats['evicted'] += 1
+                stats['reclaimed_bytes'] += size
+                for record in refs[key]:
+                    if not dry_run:
+                        record['cover_path'] = None
+                    stats['cleared'].append(record)
+            kept = remaining
+
+        stats['kept'] = len(kept)
+        stats['kept_bytes'] = total
+        return stats
+
+    @staticmethod
+    def _remove(path, dry_run):
+        if dry_run:
+            return True
+        try:
+            os.remove(path)
+            return True
+        except FileNotFoundError:
+            return True
+        except OSError as e:
+            print(f'删除封面失败 {path}: {e}')
+            return False
@@ -0,0 +1,259 @@
+'''
+@version 1.0
+@brief 压缩包解压缓存：按(路径, 大小, mtime)复用已解压页面，限制总容量并按LRU淘汰
+@author 炎刃
+@date 2026-10-19
+'''
+import os
+import json
+import time
+import shutil
+import hashlib
+import threading
+
+from .app_cache import get_cache_dir, atomic_write_bytes
+
+# 默认容量上限：2GB
+DEFAULT_QUOTA_BYTES = 2 * 1024 * 1024 * 1024
+PARTIAL_SUFFIX = '.partial'  # 旧版本整体解压时使用的临时目录后缀
+# 未完成条目与索引外的目录在这段时间（秒）内没有写入才视为崩溃残留：
+# 同一缓存目录可能正被另一个进程（如单独运行的阅读器）流式写入
+ORPHAN_GRACE_SECONDS = 3600
+
+
+def make_archive_key(archive_path):
+    """由绝对路径、文件大小和mtime生成缓存键，压缩包被替换后自动对应新键"""
+    abs_path = os.path.abspath(archive_path)
+    stat = os.stat(abs_path)
+    identity = f'{abs_path}|{stat.st_size}|{stat.st_mtime_ns}'
+    return hashlib.sha1(identity.encode('utf-8')).hexdigest()
+
+
+def _dir_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+class ExtractionCache:
+    """磁盘解压缓存
+
+    每个压缩包解压到cache_dir/<key>，索引index.json记录来源、占用大小和最近访问时间，
+    程序重启后继续有效。命中时只在内存中刷新最近访问时间，索引随登记、淘汰或flush()一并写盘。
+    流式解压（begin/finish）直接写入条目目录，条目在finish前标记为未完成，
+    未完成条目不会被get命中；启动时清理其中长时间没有写入的（崩溃残留）。同一条目同时只能有一个流式解压；
+    被移除的条目若仍被锁定（有来源在读取），目录保留到最后一次unpin后再删除。
+    """
+
+    def __init__(self, cache_dir=None, quota_bytes=DEFAULT_QUOTA_BYTES):
+        self.cache_dir = cache_dir or get_cache_dir('extracted')
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.quota_bytes = quota_bytes
+        self.index_path = os.path.join(self.cache_dir, 'index.json')
+        self._lock = threading.RLock()
+        self._entries = {}
+        self._pins = {}  # key -> 引用计数，正在阅读的条目不会被淘汰
+        self._streaming = set()  # 正在流式解压的条目
+        self._doomed = set()  # 已移出索引、等待最后一次unpin后删除目录的条目
+        self._dirty = False  # 内存中的最近访问时间尚未写入索引
+        self._load_index()
+        self._cleanup_orphans()
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                self._entries = json.load(f).get('entries', {})
+        except FileNotFoundError:
+            self._entries = {}
+        except (OSError, ValueError) as e:
+            print(f'读取解压缓存索引失败，将重建: {e}')
+            self._entries = {}
+
+    def _save_index(self):
+        data = json.dumps({'version': 1, 'entries': self._entries}, ensure_ascii=False)
+        try:
+            atomic_write_bytes(self.index_path, data.encode('utf-8'))
+        except OSError as e:
+            print(f'保存解压缓存索引失败: {e}')
+            return
+        self._dirty = False
+
+    def flush(self):
+        """把内存中刷新过的最近访问时间写入索引（没有变化时直接返回）"""
+        with self._lock:
+            if self._dirty:
+                self._save_index()
+
+    def _cleanup_orphans(self):
+        """清理崩溃残留的.partial目录、未完成条目、索引外的目录以及目录已丢失的索引项
+
+        未完成条目与索引外的目录只在超过ORPHAN_GRACE_SECONDS没有写入时清理，
+        避免删除另一个进程正在流式解压的目录。
+        """
+        now = time.time()
+
+        def stale(path, last_access=0.0):
+            try:
+                return now - max(os.path.getmtime(path), last_access) > ORPHAN_GRACE_SECONDS
+            except OSError:
+                return True
+
+        with self._lock:
+            changed = False
+            for key in [k for k, e in self._entries.items() if not e.get('complete', True)]:
+                if stale(self.entry_dir(key), self._entries[key].get('last_access', 0.0)):
+                    del self._entries[key]
+                    changed = True
+            for name in os.listdir(self.cache_dir):
+                path = os.path.join(self.cache_dir, name)
+                if os.path.isdir(path) and (name.endswith(PARTIAL_SUFFIX) or name not in self._entries) \
+                        and stale(path):
+                    shutil.rmtree(path, ignore_errors=True)
+            missing = [key for key in self._entries if not os.path.isdir(self.entry_dir(key))]
+            for key in missing:
+                del self._entries[key]
+            if missing or changed:
+                self._save_index()
+
+    def entry_dir(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    def total_size(self):
+        with self._lock:
+            return sum(entry['size'] for entry in self._entries.values())
+
+    def get(self, archive_path):
+        """返回已解压目录，未命中返回None；命中时刷新最近访问时间"""
+        key = make_archive_key(archive_path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or not entry.get('complete', True):
+                return None
+            entry['last_access'] = time.time()
+            self._dirty = True
+            return self.entry_dir(key)
+
+    def _register(self, archive_path, key):
+        abs_path = os.path.abspath(archive_path)
+        with self._lock:
+            final_dir = self.entry_dir(key)
+            # 同一压缩包的旧版本解压结果已无用，直接移除；仍在阅读中的旧版本保留到关闭后由LRU淘汰
+            for old_key in [k for k, e in self._entries.items()
+                            if e['source_path'] == abs_path and k != key and k not in self._pins]:
+                self._remove_entry(old_key)
+            stat = os.stat(abs_path)
+            self._entries[key] = {
+                'source_path': abs_path,
+                'source_size': stat.st_size,
+                'source_mtime': stat.st_mtime,
+                'size': _dir_size(final_dir),
+                'last_access': time.time()
+            }
+            self.evict(keep=(key,))
+            self._save_index()
+            return final_dir
+
+    def begin(self, archive_path):
+        """开始流式解压：登记未完成条目并返回(key, 条目目录)，调用方边解压边读取目录中的文件
+
+        Raises:
+            RuntimeError: 该条目正在流式解压，或上一次解压的目录仍被读取
+        """
+        key = make_archive_key(archive_path)
+        with self._lock:
+            if key in self._streaming or key in self._doomed:
+                raise RuntimeError(f'压缩包正在解压或仍被读取: {archive_path}')
+            self._streaming.add(key)
+            final_dir = self.entry_dir(key)
+            # 完整条目会被get命中而不会走到这里，残留的只是未完成的旧目录
+            shutil.rmtree(final_dir, ignore_errors=True)
+            os.makedirs(final_dir)
+            self._entries[key] = {
+                'source_path': os.path.abspath(archive_path),
+                'size': 0,
+                'last_access': time.time(),
+                'complete': False
+            }
+            self._save_index()
+        return key, final_dir
+
+    def finish(self, archive_path, key):
+        """流式解压完成，条目原地转为可复用的完整条目（目录不移动，读取中的页面路径保持有效）"""
+        with self._lock:
+            self._streaming.discard(key)
+            if key in self._entries:
+                self._register(archive_path, key)
+
+    def discard(self, key):
+        """放弃未完成的流式解压条目（仍被锁定时目录保留到最后一次unpin）"""
+        with self._lock:
+            self._streaming.discard(key)
+            self._remove_entry(key)
+            self._save_index()
+
+    def pin(self, key):
+        with self._lock:
+            self._pins[key] = self._pins.get(key, 0) + 1
+
+    def unpin(self, key):
+        with self._lock:
+            count = self._pins.get(key, 0) - 1
+            if count > 0:
+                self._pins[key] = count
+                return
+            self._pins.pop(key, None)
+            if key in self._doomed:
+                self._doomed.discard(key)
+                shutil.rmtree(self.entry_dir(key), ignore_errors=True)
+
+    def _remove_entry(self, key):
+        self._entries.pop(key, None)
+        if key in self._pins:
+            self._doomed.add(key)
+        else:
+            shutil.rmtree(self.entry_dir(key), ignore_errors=True)
+
+    def evict(self, keep=()):
+        """按最近访问时间从旧到新淘汰，直到总占用不超过容量上限
+
+        Returns:
+            int: 释放的字节数
+        """
+        freed = 0
+        with self._lock:
+            total = self.total_size()
+            for key, entry in sorted(self._entries.items(), key=lambda item: item[1]['last_access']):
+                if total <= self.quota_bytes:
+                    break
+                if key in keep or key in self._pins:
+                    continue
+                total -= entry['size']
+                freed += entry['size']
+                self._remove_entry(key)
+            if freed:
+                self._save_index()
+        return freed
+
+    def clear(self):
+        with self._lock:
+            for key in [k for k in self._entries if k not in self._pins]:
+                self._remove_entry(key)
+            self._save_index()
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_extraction_cache():
+    """返回进程内共享的解压缓存"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ExtractionCache()
+        return _default_cache
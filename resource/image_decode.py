@@ -0,0 +1,70 @@
+'''
+@version 1.0
+@brief 从内存缓冲区解码页面图片为QImage：优先使用Qt图片插件，Qt无法解码时退回PIL
+@author 炎刃
+@date 2026-10-19
+'''
+import io
+import os
+
+from PyQt5.QtGui import QImage
+
+from .lazy_import import load_pil
+
+# 扩展名 -> Qt图片格式名，未列出的由Qt根据数据内容自动识别
+_QT_FORMATS = {
+    '.jpg': 'JPEG',
+    '.jpeg': 'JPEG',
+    '.png': 'PNG',
+    '.gif': 'GIF',
+    '.bmp': 'BMP',
+    '.webp': 'WEBP',
+    '.tif': 'TIFF',
+    '.tiff': 'TIFF'
+}
+
+
+def _decode_qt(data, ext):
+    # loadFromData直接读取缓冲区（bytes或memoryview），不经过QByteArray拷贝
+    image = QImage()
+    if image.loadFromData(data, _QT_FORMATS.get(ext)):
+        return image
+    # 扩展名与实际格式不符时再让Qt自动识别
+    if ext in _QT_FORMATS and image.loadFromData(data):
+        return image
+    return QImage()
+
+
+def _decode_pil(data):
+    """PIL解码后转为RGBA像素，包装成QImage再复制一份脱离Python缓冲区"""
+    with load_pil().open(io.BytesIO(data)) as img:
+        img = img.convert('RGBA')
+        width, height = img.size
+        pixels = img.tobytes('raw', 'RGBA')
+    return QImage(pixels, width, height, width * 4, QImage.Format_RGBA8888).copy()
+
+
+def decode_image(data, name=''):
+    """把页面数据解码为QImage
+
+    Args:
+        data: 页面原始字节，bytes或memoryview（如内存映射zip中的零拷贝切片）
+        name: 页面名称，用于根据扩展名提示格式
+
+    Returns:
+        QImage: 解码后的图片
+
+    Raises:
+        ValueError: Qt与PIL均无法解码
+    """
+    ext = os.path.splitext(name)[1].lower()
+    image = _decode_qt(data, ext)
+    if not image.isNull():
+        return image
+    try:
+        image = _decode_pil(data)
+    except Exception as e:
+        raise ValueError(f'图片数据解码失败: {e}') from e
+    if image.isNull():
+        raise ValueError('图片数据解码失败')
+    return image
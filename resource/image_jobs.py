@@ -0,0 +1,161 @@
+'''
+@version 1.0
+@brief 封面、缩略图等CPU密集型任务的多进程执行：按批提交任务，工作进程直接写出图片文件，只回传文件路径
+@author 炎刃
+@date 2026-10-19
+'''
+import os
+import sys
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .library_core import make_cover
+from .page_source import open_page_source
+from .thumbnail_cache import ThumbnailCache
+
+# 每个任务批次包含的条目数：批次越大进程间通信越少，批次越小负载越均衡
+COVER_CHUNK_SIZE = 16
+THUMBNAIL_CHUNK_SIZE = 32
+
+
+def _init_worker():
+    """工作进程的print输出转到stderr，保证主进程stdout只有结果（命令行JSON输出）"""
+    sys.stdout = sys.stderr
+
+
+def _cover_batch(tasks):
+    """工作进程：为一批(漫画路径, 封面目录)生成封面，返回[(漫画路径, 封面路径)]"""
+    return [(full_path, make_cover(full_path, cover_dir)) for full_path, cover_dir in tasks]
+
+
+def _thumbnail_batch(source_path, indices):
+    """工作进程：为同一来源的一批页面生成缩略图，返回[((来源路径, 页码), 缩略图路径)]"""
+    cache = ThumbnailCache(source_path)
+    results = [((source_path, index), cache.get_path(index)) for index in indices if cache.has(index)]
+    missing = [index for index in indices if not cache.has(index)]
+    if not missing:
+        return results
+    source = open_page_source(source_path)
+    # PDF按缩略图尺寸渲染，无需生成全分辨率页面
+    source.set_target_size(*cache.size)
+    try:
+        for index, data in source.read_pages(missing):
+            results.append(((source_path, index), cache.generate(index, data)))
+    except Exception as e:
+        print(f'读取页面失败 {source_path}: {e}')
+    finally:
+        source.close()
+    return results
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class ImageJobPool:
+    """封面/缩略图生成进程池
+
+    PIL解码与缩放是CPU密集型任务，在线程中受GIL限制无法利用多核。
+    这里把任务按批交给工作进程，工作进程把结果写成磁盘文件并只回传路径，
+    避免像素数据在进程间序列化。jobs为1时在当前进程内直接执行。
+    工作进程使用spawn方式启动，避免在持有Qt线程的进程中fork。
+    """
+
+    def __init__(self, jobs=None, cover_chunk_size=COVER_CHUNK_SIZE,
+                 thumbnail_chunk_size=THUMBNAIL_CHUNK_SIZE):
+        self.jobs = max(1, jobs or os.cpu_count() or 1)
+        self.cover_chunk_size = cover_chunk_size
+        self.thumbnail_chunk_size = thumbnail_chunk_size
+        self._executor = None
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.jobs,
+                                                 mp_context=multiprocessing.get_context('spawn'),
+                                                 initializer=_init_worker)
+        return self._executor
+
+    def run_batches(self, func, batches, on_result=None):
+        """执行批次任务，每得到一条结果回调on_result(键, 结果)
+
+        Args:
+            func: 模块级函数func(*batch) -> [(键, 结果)]，需可被工作进程导入
+            batches: 参数元组列表
+
+        Returns:
+            dict: 键 -> 结果
+        """
+        results = {}
+
+        def collect(batch_result):
+            for key, path in batch_result:
+                results[key] = path
+                if on_result is not None:
+                    on_result(key, path)
+
+        if self.jobs <= 1:
+            for args in batches:
+                collect(func(*args))
+            return results
+
+        executor = self._get_executor()
+        futures = [executor.submit(func, *args) for args in batches]
+        try:
+            for future in as_completed(futures):
+                collect(future.result())
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+        return results
+
+    def make_covers(self, tasks, on_result=None):
+        """批量生成封面
+
+        Args:
+            tasks: [(漫画路径, 封面目录)]
+            on_result: 可选回调(漫画路径, 封面路径或None)，用于记录进度
+
+        Returns:
+            dict: 漫画路径 -> 封面路径（失败为None）
+        """
+        tasks = list(tasks)
+        batches = [(batch,) for batch in _chunks(tasks, self.cover_chunk_size)]
+        return self.run_batches(_cover_batch, batches, on_result)
+
+    def make_thumbnails(self, source_paths, on_result=None):
+        """批量生成多本漫画全部页面的缩略图（写入ThumbnailCache，阅读器打开时直接命中）
+
+        所有漫画的批次一起提交，小册子很多时也能占满全部工作进程。
+
+        Args:
+            source_paths: 漫画目录或压缩包路径列表
+            on_result: 可选回调((漫画路径, 页码), 缩略图路径或None)
+
+        Returns:
+            dict: (漫画路径, 页码) -> 缩略图路径
+        """
+        batches = []
+        for source_path in source_paths:
+            try:
+                source = open_page_source(source_path)
+            except Exception as e:
+                print(f'打开漫画失败 {source_path}: {e}')
+                continue
+            page_count = source.page_count
+            source.close()
+            for batch in _chunks(list(range(page_count)), self.thumbnail_chunk_size):
+                batches.append((source_path, batch))
+        return self.run_batches(_thumbnail_batch, batches, on_result)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
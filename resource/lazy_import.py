@@ -0,0 +1,90 @@
+'''
+@version 1.0
+@brief 可选依赖的延迟加载：PIL与各压缩包后端只在首次使用时导入，缩短界面启动时间
+@author 炎刃
+@date 2026-10-19
+'''
+import importlib
+import threading
+
+
+class BackendUnavailableError(ImportError):
+    """所需的可选依赖未安装"""
+
+
+# 压缩格式 -> 所需的第三方模块（zip由标准库处理）
+ARCHIVE_BACKENDS = {
+    'zip': 'zipfile',
+    'rar': 'rarfile',
+    '7z': 'py7zr'
+}
+
+_modules = {}
+_lock = threading.Lock()
+
+
+def lazy_module(name):
+    """导入并缓存模块，未安装时抛出BackendUnavailableError
+
+    Args:
+        name: 模块名，如'py7zr'、'PIL.Image'
+
+    Returns:
+        module: 已导入的模块
+    """
+    module = _modules.get(name)
+    if module is not None:
+        return module
+    with _lock:
+        if name not in _modules:
+            try:
+                _modules[name] = importlib.import_module(name)
+            except ImportError as e:
+                raise BackendUnavailableError(f'缺少依赖库 {name.split(".")[0]}: {e}') from e
+        return _modules[name]
+
+
+def load_pil():
+    """返回PIL.Image模块"""
+    return lazy_module('PIL.Image')
+
+
+def load_py7zr():
+    return lazy_module('py7zr')
+
+
+def load_rarfile():
+    return lazy_module('rarfile')
+
+
+def load_fitz():
+    """返回PyMuPDF模块（PDF渲染），旧版本只提供fitz包名"""
+    try:
+        return lazy_module('pymupdf')
+    except BackendUnavailableError:
+        return lazy_module('fitz')
+
+
+def load_numpy():
+    return lazy_module('numpy')
+
+
+def load_archive_backend(kind):
+    """返回处理该压缩格式的模块
+
+    Raises:
+        ValueError: 不支持的压缩格式
+        BackendUnavailableError: 对应后端未安装
+    """
+    if kind not in ARCHIVE_BACKENDS:
+        raise ValueError(f'不支持的压缩格式: {kind}')
+    return lazy_module(ARCHIVE_BACKENDS[kind])
+
+
+def is_available(name):
+    """判断可选依赖是否可用，不可用时不抛异常"""
+    try:
+        lazy_module(name)
+        return True
+    except BackendUnavailableError:
+        return False
@@ -5,19 +5,19 @@
 @date 2025-07-24
 '''
 import os
-
+import time
 import json
 import uuid
-import zipfile
-from PIL import Image
-import shutil
-from PyQt5.QtWidgets import QMessageBox
-from PyQt5.QtCore import QFileInfo
+from collections.abc import Mapping
+
+# 支持的漫画文件扩展名
+COMIC_EXTENSIONS = ('.cbz', '.cbr', '.pdf', '.epub', '.jpg', '.jpeg', '.png')
 
 class I18nManager:
     def __init__(self):
         self.language = "zh_CN"
         self.translations = {}
+        self.load_error = None  # 语言文件加载失败的说明，由界面层决定如何提示
         self.load_settings()
         self.load_translations()
 
@@ -38,7 +38,8 @@ class I18nManager:
             with open(lang_file, "r", encoding="utf-8") as f:
                 self.translations = json.load(f)
         except Exception as e:
-            QMessageBox.critical(None, "语言文件加载失败", f"无法加载语言文件 {lang_file}: {str(e)} 将使用默认中文界面。")
+            self.load_error = f"无法加载语言文件 {lang_file}: {str(e)} 将使用默认中文界面。"
+            print(f"语言文件加载失败: {self.load_error}")
             default_file = os.path.join(base_dir, "i18n", "zh_CN.json")
             with open(default_file, "r", encoding="utf-8") as f:
                 self.translations = json.load(f)
@@ -88,29 +89,51 @@ class ComicLibraryUtils:
             json.dump({'libraries': libraries}, f, ensure_ascii=False, indent=2)
 
     @staticmethod
-    def scan_library(lib_path):
+    def scan_library(lib_path, scan_filter=None, job=None):
+        """扫描库目录中的漫画文件
+
+        Args:
+            lib_path: 库目录
+            scan_filter: 可选的scan_filter.ScanFilter或scan_fs.ConcurrentWalker，
+                按库的包含/排除规则、深度与符号链接策略遍历
+            job: 可选的scan_job.ScanJob，报告进度并在每个文件前检查是否已取消
+
+        Returns:
+            list: 文件记录
+
+        Raises:
+            ScanCancelled: job被取消
+        """
         records = []
         if not os.path.isdir(lib_path):
             return records
         
-        # 支持的漫画文件扩展名
-        comic_extensions = ['.cbz', '.cbr', '.pdf', '.epub', '.jpg', '.jpeg', '.png']
-        
-        for root, _, files in os.walk(lib_path):
-            for file in files:
-                ext = os.path.splitext(file)[1].lower()
-                if ext in comic_extensions:
-                    full_path = os.path.join(root, file)
-                    file_info = QFileInfo(full_path)
-                    
-                    # 收集文件基本信息
-                    record = {
-                        'full_path': full_path,
-                        'name': file_info.fileName(),
-                        'modified_time': file_info.lastModified().toString('yyyy-MM-dd HH:mm:ss'),
-                        'size': file_info.size()
-                    }
-                    records.append(record)
+        if job is not None:
+            job.start()
+        if scan_filter is not None:
+            # 元数据取自目录项的stat，网络库的并发扫描器已在遍历线程中预取
+            files = ((entry.path, entry.name, entry.stat) for entry in scan_filter.iter_files(lib_path))
+        else:
+            files = ((os.path.join(root, file), file, None) for root, _, names in os.walk(lib_path) for file in names)
+        for full_path, file, get_stat in files:
+            if job is not None:
+                job.check_cancelled()
+            ext = os.path.splitext(file)[1].lower()
+            if ext in COMIC_EXTENSIONS:
+                stat = get_stat() if get_stat else os.stat(full_path)
+                
+                # 收集文件基本信息
+                record = {
+                    'full_path': full_path,
+                    'name': file,
+                    'modified_time': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(stat.st_mtime)),
+                    'size': stat.st_size
+                }
+                records.append(record)
+                if job is not None:
+                    job.advance(current=full_path)
+        if job is not None:
+            job.finish()
         return records
 
     @staticmethod
@@ -186,7 +209,7 @@ class ComicLibraryUtils:
         """从记录中提取并返回排序后的标签列表"""
         tags = set()
         for record in records:
-            if isinstance(record, dict) and 'tags' in record and isinstance(record['tags'], list):
+            if isinstance(record, Mapping) and 'tags' in record and isinstance(record['tags'], (list, tuple)):
                 tags.update(record['tags'])
         return sorted(tags)
 
@@ -201,7 +224,7 @@ class ComicLibraryUtils:
         if library_id:
             return [r for r in records if r.get('lib_id') == library_id]
         elif category and category != '全部':
-            return [r for r in records if isinstance(r, dict) and r.get('category') == category]
+            return [r for r in records if isinstance(r, Mapping) and r.get('category') == category]
         return records
 
     @staticmethod
@@ -209,7 +232,7 @@ class ComicLibraryUtils:
         """根据标签和当前库路径筛选记录"""
         filtered = []
         for record in records:
-            record_path = record.get("basic_info", {}).get("path", "")
+            record_path = record.get("full_path") or record.get("basic_info", {}).get("path", "")
             if (tag_name in record.get("tags", []) and 
                 (current_lib_path is None or record_path.startswith(current_lib_path))):
                 filtered.append(record)
@@ -218,6 +241,7 @@ class ComicLibraryUtils:
     @staticmethod
     def scan_all_libraries(libraries):
         """扫描所有库，验证漫画文件并提取封面"""
+        import zipfile  # 只在扫描时使用，延迟导入以缩短界面启动时间
         all_records = []
         for lib in libraries:
             lib_path = lib['path']
@@ -241,7 +265,7 @@ class ComicLibraryUtils:
                     if not isinstance(records, list):
                         records = []
             except json.JSONDecodeError:
-                QMessageBox.warning(None, '错误', f'无法解析{lib_name}的record.json，已重置为空白记录')
+                print(f'无法解析{lib_name}的record.json，已重置为空白记录')
                 records = []
             
             # 扫描压缩文件
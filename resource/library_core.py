@@ -0,0 +1,774 @@
+'''
+@version 1.0
+@brief 无界面的漫画库核心：库配置、扫描、目录记录、封面与搜索，不依赖Qt，
+       错误通过返回值和事件上报，可在工作进程、服务器或命令行中使用
+@author 炎刃
+@date 2026-10-19
+'''
+import io
+import os
+import json
+import uuid
+import datetime
+import threading
+
+from .lazy_import import load_pil, load_archive_backend
+from .archive_verify import verify_paths, needs_verify, LEVEL_QUICK
+from .page_source import open_page_source
+from .comic_record import ComicRecord, records_from_json, records_to_json
+from .record_shards import RECORD_FILE, SHARD_DIR, SHARD_THRESHOLD, read_record_data, write_record_data
+from .scan_filter import ScanFilter
+from .scan_fs import make_scanner
+from .scan_job import ScanJob, ScanCancelled, scan_checkpoint_path
+from .checkpoint import Checkpoint
+from .cover_store import CoverStore, COVER_DIR
+from .cover_atlas import CoverAtlas, build_atlas, default_atlas_path
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CONFIG_PATH = os.path.join(PROJECT_ROOT, 'settings.json')
+
+# 支持的漫画文件扩展名
+COMIC_EXTENSIONS = ('.cbz', '.cbr', '.pdf', '.epub')
+COVER_IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif')
+# 库内由程序维护的目录，扫描时始终排除
+LIBRARY_INTERNAL_DIRS = ('/' + COVER_DIR, '/' + SHARD_DIR)
+# PDF封面的渲染尺寸（宽, 高）
+COVER_RENDER_SIZE = (300, 420)
+# 扫描时每积累这么多新增或变化的文件就生成封面、校验并记入检查点
+SCAN_BATCH_SIZE = 100
+# 扫描检查点每记入这么多文件（或每隔checkpoint.FLUSH_INTERVAL秒）写一次盘；检查点每次整体重写，间隔不宜过小
+SCAN_CHECKPOINT_EVERY = 1000
+# 用户维护的记录字段，全量重建记录时按路径从旧记录继承
+USER_FIELDS = ('comic_id', 'tags', 'favorite', 'rating')
+
+# 事件名
+EVENT_ERROR = 'error'
+EVENT_LIBRARY_ADDED = 'library_added'
+EVENT_LIBRARY_REMOVED = 'library_removed'
+EVENT_SCAN_STARTED = 'scan_started'
+EVENT_SCAN_FINISHED = 'scan_finished'
+EVENT_SCAN_PROGRESS = 'scan_progress'
+EVENT_SCAN_CANCELLED = 'scan_cancelled'
+
+
+class LibraryEvents:
+    """事件分发器，监听回调签名为callback(event, payload)"""
+
+    def __init__(self):
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, callback):
+        with self._lock:
+            self._listeners.append(callback)
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def emit(self, event, **payload):
+        with self._lock:
+            listeners = list(self._listeners)
+        for callback in listeners:
+            try:
+                callback(event, payload)
+            except Exception as e:
+                print(f'事件回调失败 {event}: {e}')
+
+
+def extract_cover(archive_path, cover_dir):
+    """从压缩包中提取第一个图像文件作为封面，按内容哈希保存到封面目录
+
+    Returns:
+        str: 封面路径，无法提取时返回None
+    """
+    try:
+        if archive_path.lower().endswith('.cbz'):
+            with load_archive_backend('zip').ZipFile(archive_path, 'r') as zip_ref:
+                # 获取所有文件并按名称排序
+                for file in sorted(zip_ref.namelist()):
+                    file_lower = file.lower()
+                    if file_lower.endswith(COVER_IMAGE_EXTENSIONS):
+                        # 确定图像扩展名
+                        ext = os.path.splitext(file_lower)[1]
+                        return CoverStore(cover_dir).put(zip_ref.read(file), ext)
+        if archive_path.lower().endswith(('.pdf', '.epub')):
+            return _extract_document_cover(archive_path, cover_dir)
+        # 可以在这里添加其他压缩格式的支持（如.cbr）
+        return None
+    except Exception as e:
+        print(f'Error extracting cover from {archive_path}: {e}')
+        return None
+
+
+def _extract_document_cover(doc_path, cover_dir):
+    """PDF渲染第一页、EPUB取书脊中的第一张图片作为封面"""
+    source = open_page_source(doc_path)
+    try:
+        if not source.page_count:
+            return None
+        source.set_target_size(*COVER_RENDER_SIZE)
+        ext = os.path.splitext(source.page_name(0))[1].lower()
+        return CoverStore(cover_dir).put(source.read_page(0), ext)
+    finally:
+        source.close()
+
+
+def save_image_cover(image_path, cover_dir):
+    """以单张图片（经PIL重新保存）作为封面，失败返回None"""
+    try:
+        with load_pil().open(image_path) as img:
+            buf = io.BytesIO()
+            img.save(buf, format=img.format)
+        return CoverStore(cover_dir).put(buf.getvalue(), os.path.splitext(image_path)[1])
+    except Exception as e:
+        print(f'Error saving cover for {image_path}: {e}')
+        return None
+
+
+def make_cover(full_path, cover_dir):
+    """为漫画文件生成封面：压缩包提取第一张图像，单张图片直接复制"""
+    ext = os.path.splitext(full_path.lower())[1]
+    if ext in COMIC_EXTENSIONS:
+        return extract_cover(full_path, cover_dir)
+    return save_image_cover(full_path, cover_dir)
+
+
+def search_records(records, query, fields=('name',)):
+    """按关键字搜索记录，多个关键字以空白分隔，全部命中才返回（不区分大小写）
+
+    Args:
+        records: 记录列表
+        query: 搜索字符串
+        fields: 参与匹配的字段，值为列表时（如tags）逐项匹配
+
+    Returns:
+        list: 命中的记录，保持原顺序
+    """
+    terms = [term.casefold() for term in query.split()]
+    if not terms:
+        return list(records)
+    results = []
+    for record in records:
+        haystack = []
+        for field in fields:
+            value = record.get(field)
+            if isinstance(value, (list, tuple)):
+                haystack.extend(str(v).casefold() for v in value)
+            elif value is not None:
+                haystack.append(str(value).casefold())
+        text = '\n'.join(haystack)
+        if all(term in text for term in terms):
+            results.append(record)
+    return results
+
+
+def load_verify_results(library_path):
+    """读取库记录中保存的校验结果，返回{文件路径: 校验结果}（无记录或读取失败时为空）"""
+    try:
+        records = read_record_data(library_path)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(records, list):
+        return {}
+    return {record['full_path']: record['verify'] for record in records
+            if isinstance(record, dict) and record.get('full_path') and record.get('verify')}
+
+
+class LibraryCore:
+    """漫画库核心服务
+
+    所有方法不弹窗、不依赖Qt：失败时返回(False, 错误码)并发出EVENT_ERROR事件，
+    payload包含code、message、error及相关路径，由界面层或命令行决定如何展示。
+    """
+
+    def __init__(self, config_path=None, events=None, image_pool=None):
+        self.config_path = os.path.abspath(config_path or DEFAULT_CONFIG_PATH)
+        self.events = events or LibraryEvents()
+        # 可选的image_jobs.ImageJobPool，扫描时的封面生成交给多进程执行
+        self.image_pool = image_pool
+        # 记录数达到该值的库改为分片保存record.json
+        self.shard_threshold = SHARD_THRESHOLD
+        # 扫描检查点目录，None为缓存目录/checkpoints
+        self.checkpoint_dir = None
+        self._scanners = {}  # 库路径 -> (配置, 扫描器)
+        self.libraries = []
+        self.load_libraries_config()
+
+    def _error(self, code, error=None, **payload):
+        message = f'{code}: {error}' if error is not None else code
+        self.events.emit(EVENT_ERROR, code=code, message=message,
+                         error=str(error) if error is not None else '', **payload)
+        return message
+
+    def load_libraries_config(self):
+        """读取库配置；读取失败时库列表置空并发出load_config_failed错误"""
+        try:
+            if os.path.exists(self.config_path):
+                with open(self.config_path, 'r', encoding='utf-8') as f:
+                    config = json.load(f)
+                    self.libraries = config.get('libraries', [])
+        except Exception as e:
+            self._error('load_config_failed', e, path=self.config_path)
+            self.libraries = []
+        return self.libraries
+
+    def save_libraries_config(self):
+        try:
+            # 确保配置文件目录存在
+            os.makedirs(os.path.dirname(self.config_path), exist_ok=True)
+            with open(self.config_path, 'w', encoding='utf-8') as f:
+                json.dump({'libraries': self.libraries}, f, ensure_ascii=False, indent=2)
+            return True
+        except Exception as e:
+            self._error('save_config_failed', e, path=self.config_path)
+            return False
+
+    def add_library(self, dir_path, scan=True, job=None):
+        """登记新库并创建record.json与cover目录
+
+        Args:
+            dir_path: 库目录
+            scan: 登记后立即扫描（命令行会在之后自行并行扫描；界面可传False后用start_scan在后台扫描）
+            job: 可选ScanJob，用于接收扫描进度或取消扫描
+
+        Returns:
+            tuple: (是否成功, 错误码)
+        """
+        try:
+            if not dir_path or not os.path.isdir(dir_path):
+                return False, 'invalid_directory'
+
+            # 检查库是否已存在
+            for lib in self.libraries:
+                if lib['path'] == dir_path:
+                    return False, 'library_exists'
+
+            # 检查并创建record.json和cover文件夹
+            record_path = os.path.join(dir_path, RECORD_FILE)
+            cover_dir = os.path.join(dir_path, COVER_DIR)
+
+            if not os.path.exists(record_path):
+                with open(record_path, 'w', encoding='utf-8') as f:
+                    json.dump([], f, ensure_ascii=False, indent=2)
+
+            if not os.path.exists(cover_dir):
+                os.makedirs(cover_dir, exist_ok=True)
+
+            # 创建新库记录
+            new_lib = {
+                'id': str(uuid.uuid4()),
+                'name': os.path.basename(dir_path),
+                'path': dir_path,
+                'last_scan': datetime.datetime.now().isoformat()
+            }
+
+            self.libraries.append(new_lib)
+            if not self.save_libraries_config():
+                return False, 'save_config_failed'
+            self.events.emit(EVENT_LIBRARY_ADDED, library=new_lib)
+
+            if not scan:
+                return True, None
+
+            # 调用扫描库方法
+            scan_result, scan_error = self.scan_library(dir_path, job=job)
+            if not scan_result and scan_error:
+                return False, scan_error
+
+            return True, None
+        except Exception as e:
+            return False, self._error('unknown_error', e, path=dir_path)
+
+    def remove_library(self, library_id):
+        original_count = len(self.libraries)
+        self.libraries = [lib for lib in self.libraries if lib.get('id') != library_id]
+
+        if len(self.libraries) < original_count:
+            self.events.emit(EVENT_LIBRARY_REMOVED, library_id=library_id)
+            return self.save_libraries_config()
+        return False
+
+    def get_scanner(self, library_path):
+        """库的扫描器：由库配置的scan项编译的ScanFilter，网络库为并发遍历的ConcurrentWalker；
+        规则不变时复用已编译的结果
+
+        Raises:
+            ValueError: 库配置的扫描规则无效
+        """
+        config = next((lib.get('scan') for lib in self.libraries if lib.get('path') == library_path), None)
+        key = json.dumps(config, sort_keys=True)
+        cached = self._scanners.get(library_path)
+        if cached is None or cached[0] != key:
+            scan_filter = ScanFilter.from_config(config, COMIC_EXTENSIONS + COVER_IMAGE_EXTENSIONS,
+                                                 LIBRARY_INTERNAL_DIRS)
+            cached = self._scanners[library_path] = (key, make_scanner(scan_filter, config))
+        return cached[1]
+
+    def load_records(self, library_path):
+        """读取库的record.json（分片库读取清单中的全部分片）
+
+        旧版本写出的各种记录格式统一转换为ComicRecord。
+
+        Returns:
+            tuple: (ComicRecord列表, 错误码)，成功时错误码为None
+        """
+        record_path = os.path.join(library_path, RECORD_FILE)
+        if not os.path.exists(record_path):
+            return [], 'record_file_not_found'
+        try:
+            return records_from_json(read_record_data(library_path), library_path), None
+        except Exception as e:
+            return [], self._error('error_reading_record', e, path=record_path)
+
+    def save_records(self, library_path, records):
+        """写回库的记录
+
+        记录数达到shard_threshold后按一级子目录分片保存，只重写内容有变化的分片。
+
+        Returns:
+            tuple: (是否成功, 错误码)
+        """
+        try:
+            write_record_data(library_path, records_to_json(records), self.shard_threshold)
+            return True, None
+        except Exception as e:
+            return False, self._error('error_saving_record', e, path=library_path)
+
+    def scan_library(self, library_path, incremental=True, extract_covers=True, job=None, resume=True):
+        """扫描库目录，新文件生成记录和封面，已变化的文件更新大小与修改时间
+
+        新增和变化的文件每SCAN_BATCH_SIZE个生成封面、校验后记入该库的扫描检查点；
+        扫描被取消或中途崩溃时，下次扫描从检查点取回已处理文件的记录，只处理剩余的文件。
+        扫描完成并写入record.json后删除检查点。
+
+        Args:
+            library_path: 库目录
+            incremental: False时按当前文件重建record.json，已删除的文件随之移除；仍存在的文件按路径保留
+                comic_id、标签、收藏与评分，文件未变时还保留封面与校验结果
+            extract_covers: False时跳过封面提取，由调用方之后批量生成（如命令行并行生成）
+            job: 可选ScanJob，报告进度并可从其他线程取消
+            resume: False时丢弃已有检查点从头扫描
+
+        Returns:
+            tuple: (是否有记录更新, 错误码)；被取消时错误码为scan_cancelled
+        """
+        if not os.path.isdir(library_path):
+            return False, 'invalid_library_path'
+
+        # 检查record.json文件是否存在
+        if not os.path.exists(os.path.join(library_path, RECORD_FILE)):
+            return False, 'record_file_not_found'
+
+        existing_records = []
+        previous_records = []
+        if incremental:
+            existing_records, error = self.load_records(library_path)
+            if error:
+                return False, error
+        else:
+            # 重建用于从损坏或过期的记录恢复，旧记录读取失败时直接按文件重建
+            previous_records, error = self.load_records(library_path)
+            if error:
+                previous_records = []
+
+        try:
+            scanner = self.get_scanner(library_path)
+        except (ValueError, TypeError) as e:
+            # 手工编辑的配置可能含无效规则（如负的max_depth），按错误码返回而不是抛出
+            return False, self._error('invalid_scan_rules', e, path=library_path)
+
+        job = job or ScanJob(library_path)
+        job.add_listener(lambda progress: self.events.emit(EVENT_SCAN_PROGRESS, library_path=library_path,
+                                                           progress=progress))
+        # 扫描方式或规则不同的检查点不能沿用
+        task = '|'.join(['scan', library_path, str(incremental), str(extract_covers),
+                         str(scanner.key)])
+        checkpoint = Checkpoint(scan_checkpoint_path(library_path, self.checkpoint_dir), task,
+                                flush_every=SCAN_CHECKPOINT_EVERY)
+        if resume:
+            checkpoint.load()
+        else:
+            checkpoint.clear()
+
+        # 扫描会就地更新记录，扫描前先取得旧记录引用的封面
+        old_covers = set(CoverStore.for_library(library_path).references(existing_records or previous_records))
+        self.events.emit(EVENT_SCAN_STARTED, library_path=library_path)
+        try:
+            new_records, has_new_files = self._scan_files(library_path, existing_records, extract_covers,
+                                                          job, checkpoint, previous_records)
+        except ScanCancelled:
+            checkpoint.flush()
+            self.events.emit(EVENT_SCAN_CANCELLED, library_path=library_path, progress=job.progress)
+            return False, 'scan_cancelled'
+        except Exception as e:
+            # 已处理的部分保留在检查点中，下次扫描从这里继续
+            checkpoint.flush()
+            return False, self._error('error_scanning', e, path=library_path)
+        except BaseException:
+            checkpoint.flush()
+            raise
+
+        # 如果有新文件（或全量重建），更新record.json
+        if has_new_files or not incremental:
+            success, error = self.save_records(library_path, new_records)
+            if not success:
+                checkpoint.flush()
+                return False, error
+            if extract_covers:
+                # 只回收本次扫描前被引用、扫描后不再被引用的封面（变化或已删除的文件的旧封面）；
+                # 不提取封面的扫描由调用方之后生成封面，此时不回收
+                store = CoverStore.for_library(library_path)
+                store.collect(new_records, candidates=old_covers - set(store.references(new_records)))
+                self.update_cover_atlas(library_path, new_records)
+        checkpoint.clear()
+        job.finish()
+        self.events.emit(EVENT_SCAN_FINISHED, library_path=library_path,
+                         record_count=len(new_records), changed=has_new_files)
+        return has_new_files, None
+
+    def start_scan(self, library_path, incremental=True, extract_covers=True, on_progress=None, on_finished=None):
+        """在后台线程中扫描库，立即返回ScanJob
+
+        Args:
+            on_progress: 可选进度回调on_progress(ScanProgress)，在扫描线程中调用
+            on_finished: 可选回调on_finished((是否有记录更新, 错误码))，在扫描线程中调用
+
+        Returns:
+            ScanJob: 可cancel()取消、wait()等待结果
+        """
+        job = ScanJob(library_path, on_progress)
+
+        def run():
+            try:
+                result = self.scan_library(library_path, incremental, extract_covers, job)
+            except Exception as e:
+                result = (False, self._error('error_scanning', e, path=library_path))
+            job.set_result(result)
+            if on_finished is not None:
+                on_finished(result)
+
+        threading.Thread(target=run, name='library-scan', daemon=True).start()
+        return job
+
+    def _estimate_file_count(self, library_path, scanner, existing_records, restored):
+        """估计扫描的文件总数，用于计算剩余时间
+
+        已有记录或检查点时按其数量估计；首次扫描且为本地库时先只列目录计数（不stat文件，
+        相比封面提取与校验开销很小），网络库为了不多一轮往返返回None。
+        """
+        estimate = max(len(existing_records), restored)
+        if estimate:
+            return estimate
+        if not isinstance(scanner, ScanFilter):
+            return None
+        return sum(len(files) for _, _, files in scanner.walk(library_path))
+
+    def _scan_files(self, library_path, existing_records, extract_covers=True, job=None, checkpoint=None,
+                    previous_records=()):
+        # 提取现有记录中的文件路径，用于检查新文件
+        existing_files = {rec['full_path']: rec for rec in existing_records}
+        # 重建时的旧记录：不沿用记录本身，只按路径继承用户数据
+        previous = {rec['full_path']: rec for rec in previous_records if rec.get('full_path')}
+        new_records = existing_records.copy()
+        index_by_path = {rec['full_path']: i for i, rec in enumerate(new_records)}
+        has_new_files = False
+        batch = []  # 新增或变化、尚未生成封面与校验的记录
+        cover_batch = []  # batch中需要生成封面的记录
+
+        # 上次中断的扫描已处理完的文件：{路径: 记录dict}
+        saved = checkpoint.results() if checkpoint is not None else {}
+        used_ids = {rec['comic_id'] for rec in existing_records if rec.get('comic_id')}
+        used_ids.update(rec['comic_id'] for rec in previous.values() if rec.get('comic_id'))
+        used_ids.update(data.get('comic_id') for data in saved.values() if isinstance(data, dict))
+
+        cover_dir = os.path.join(library_path, COVER_DIR)
+        os.makedirs(cover_dir, exist_ok=True)
+
+        job = job or ScanJob(library_path)
+        scanner = self.get_scanner(library_path)
+        job.start(self._estimate_file_count(library_path, scanner, existing_records or previous_records,
+                                            len(saved)))
+
+        def finish_batch():
+            # 生成封面并做快速校验（只读文件头与目录，扫描时即可发现损坏的文件），然后记入检查点
+            if extract_covers:
+                self.build_covers(cover_batch, cover_dir)
+            self.verify_records(batch, LEVEL_QUICK)
+            if checkpoint is not None:
+                for record in batch:
+                    checkpoint.mark(record['full_path'], record.to_dict())
+            job.advance(len(batch), batch[-1]['full_path'])
+            batch.clear()
+            cover_batch.clear()
+
+        # 按库的扫描规则遍历，被排除的目录（含封面目录）不进入；
+        # 大小与修改时间取自目录项的stat（网络库在遍历线程中已预取）
+        for entry in scanner.iter_files(library_path):
+            job.check_cancelled()
+            full_path = entry.path
+            ext = os.path.splitext(entry.name.lower())[1]
+            stat = entry.stat()
+
+            # 检查点中已处理过且之后未再变化的文件直接取回记录
+            data = saved.get(full_path)
+            if isinstance(data, dict) and data.get('modified_time') == stat.st_mtime \
+                    and data.get('size', 0) == stat.st_size:
+                has_new_files = True
+                record = ComicRecord.from_dict(data, library_path)
+                if full_path in index_by_path:
+                    new_records[index_by_path[full_path]] = record
+                else:
+                    index_by_path[full_path] = len(new_records)
+                    new_records.append(record)
+                job.advance(1, full_path, restored=True)
+                continue
+
+            # 新文件：生成记录并提取封面
+            if full_path not in existing_files:
+                has_new_files = True
+                old = previous.get(full_path)
+                comic_id = old.get('comic_id') if old is not None else None
+                index_by_path[full_path] = len(new_records)
+                record = ComicRecord(
+                    comic_id=comic_id or self._next_comic_id(used_ids, len(new_records) + 1),
+                    full_path=full_path,
+                    name=os.path.basename(full_path),
+                    size=stat.st_size,
+                    modified_time=stat.st_mtime,
+                    library_path=library_path
+                )
+                if old is not None:
+                    self._carry_over(old, record)
+                new_records.append(record)
+                if not record.get('cover_path'):
+                    cover_batch.append(record)
+                batch.append(record)
+
+            # 更新现有文件信息
+            elif existing_files[full_path]['modified_time'] != stat.st_mtime:
+                has_new_files = True
+                record = new_records[index_by_path[full_path]]
+                record['size'] = stat.st_size
+                record['modified_time'] = stat.st_mtime
+                batch.append(record)
+                if ext in COMIC_EXTENSIONS:
+                    # 更新封面（如果需要）
+                    cover_batch.append(record)
+            else:
+                job.advance(1, full_path)
+                continue
+
+            if len(batch) >= SCAN_BATCH_SIZE:
+                finish_batch()
+        if batch:
+            finish_batch()
+        return new_records, has_new_files
+
+    @staticmethod
+    def _carry_over(old, record):
+        """重建记录时从同一路径的旧记录继承用户数据；文件大小与修改时间未变时封面和校验结果仍然有效"""
+        for field in USER_FIELDS:
+            if old.get(field) is not None:
+                record[field] = old[field]
+        if old.get('modified_time') == record['modified_time'] and old.get('size') == record['size']:
+            cover_path = old.get('cover_path')
+            if cover_path and os.path.exists(cover_path):
+                record['cover_path'] = cover_path
+            if old.get('verify') is not None:
+                record['verify'] = old['verify']
+
+    @staticmethod
+    def _next_comic_id(used_ids, number):
+        """从number开始取第一个未被使用的comic_id（恢复的记录可能已占用按数量生成的编号）"""
+        comic_id = f'comic_{number:03d}'
+        while comic_id in used_ids:
+            number += 1
+            comic_id = f'comic_{number:03d}'
+        used_ids.add(comic_id)
+        return comic_id
+
+    def verify_records(self, records, level=LEVEL_QUICK, force=False, on_result=None):
+        """校验记录对应的文件，结果写入record['verify']
+
+        已有结果且文件mtime与大小未变（并且级别足够）的记录会跳过。
+
+        Args:
+            records: 记录列表
+            level: archive_verify.LEVEL_QUICK或LEVEL_FULL
+            force: 忽略已有结果强制重新校验
+            on_result: 可选回调(路径, 校验结果)
+
+        Returns:
+            int: 实际校验的文件数
+        """
+        todo = {record['full_path']: record for record in records
+                if force or needs_verify(record['full_path'], record.get('verify'), level)}
+        results = verify_paths(list(todo), level, self.image_pool, on_result)
+        for path, result in results.items():
+            if result is not None:
+                todo[path]['verify'] = result
+        return len(todo)
+
+    def verify_library(self, library_path, level=LEVEL_QUICK, force=False):
+        """校验库中的全部文件并保存结果
+
+        Returns:
+            tuple: ({'checked': 校验数, 'skipped': 跳过数, 'corrupt': {路径: 错误}}, 错误码)
+        """
+        records, error = self.load_records(library_path)
+        if error:
+            return None, error
+        checked = self.verify_records(records, level, force)
+        if checked:
+            success, error = self.save_records(library_path, records)
+            if not success:
+                return None, error
+        corrupt = {record['full_path']: record['verify']['error'] for record in records
+                   if record.get('verify') and not record['verify']['ok']}
+        return {'checked': checked, 'skipped': len(records) - checked, 'corrupt': corrupt}, None
+
+    def sync_tags(self, library_path, tag_store):
+        """把标签存储（tag_store.TagStore）中修改过的标签写回库的record.json，有变化时只写一次
+
+        Returns:
+            tuple: (更新的记录数, 错误码)
+        """
+        records, error = self.load_records(library_path)
+        if error:
+            return 0, error
+        changed = tag_store.apply_to_records(records)
+        if changed:
+            success, error = self.save_records(library_path, records)
+            if not success:
+                return 0, error
+        return len(changed), None
+
+    def build_covers(self, records, cover_dir):
+        """为记录生成封面并写入cover_path；设置了image_pool时交给进程池并行生成
+
+        Returns:
+            int: 生成失败的数量
+        """
+        tasks = [(record['full_path'], cover_dir) for record in records]
+        if self.image_pool is not None:
+            results = self.image_pool.make_covers(tasks)
+        else:
+            results = {task[0]: make_cover(*task) for task in tasks}
+        for record in records:
+            record['cover_path'] = results.get(record['full_path'])
+        return sum(1 for record in records if not record['cover_path'])
+
+    def collect_covers(self, library_path, quota_bytes=None, dry_run=False):
+        """回收库的封面：删除没有记录引用的封面，超过容量上限时淘汰最早生成的封面
+
+        被淘汰封面的记录清空cover_path并写回record.json，之后可由covers命令重新生成。
+
+        Returns:
+            tuple: (cover_store.CoverStore.collect的统计, 错误码)
+        """
+        records, error = self.load_records(library_path)
+        if error:
+            return None, error
+        stats = CoverStore.for_library(library_path).collect(records, quota_bytes, dry_run=dry_run)
+        if stats['cleared'] and not dry_run:
+            success, error = self.save_records(library_path, records)
+            if not success:
+                return None, error
+            self.update_cover_atlas(library_path, records)
+        return stats, None
+
+    def update_cover_atlas(self, library_path, records=None):
+        """按库的记录更新封面图集（cover_atlas），只为新封面生成缩略图；图集已与记录一致时跳过
+
+        Args:
+            records: 库的记录，None时读取record.json
+
+        Returns:
+            tuple: (cover_atlas.build_atlas的统计，无需更新时为None, 错误码)
+        """
+        if records is None:
+            records, error = self.load_records(library_path)
+            if error:
+                return None, error
+        path = default_atlas_path(library_path)
+        atlas = CoverAtlas.open(path)
+        if atlas is not None:
+            with atlas:
+                if atlas.is_current(records):
+                    return None, None
+        try:
+            return build_atlas(records, path), None
+        except Exception as e:
+            return None, self._error('error_building_atlas', e, path=library_path)
+
+    def scan_all_libraries(self):
+        all_records = []
+        for lib in self.libraries:
+            lib_path = lib.get('path')
+            if lib_path and os.path.exists(lib_path):
+                success, error = self.scan_library(lib_path)
+                if success:
+                    # 读取更新后的record.json文件
+                    records, error = self.load_records(lib_path)
+                    all_records.extend(records)
+                if error:
+                    print(f'Error scanning library {lib_path}: {error}')
+                # 更新最后扫描时间
+                lib['last_scan'] = datetime.datetime.now().isoformat()
+
+        self.save_libraries_config()  # 保存最后扫描时间
+        return all_records
+
+    def search(self, query, library_id=None, fields=('name',)):
+        """在库的记录中搜索
+
+        Args:
+            query: 搜索字符串
+            library_id: 只搜索指定库，None表示所有库
+            fields: 参与匹配的字段
+
+        Returns:
+            list: 命中的记录
+        """
+        records = []
+        for lib in self.libraries:
+            if library_id is None or lib.get('id') == library_id:
+                lib_records, _ = self.load_records(lib['path'])
+                records.extend(lib_records)
+        return search_records(records, query, fields)
+
+    def get_library_by_id(self, library_id):
+        for lib in self.libraries:
+            if lib.get('id') == library_id:
+                return lib
+        return None
+
+    def update_library_name(self, library_id, new_name):
+        for lib in self.libraries:
+            if lib.get('id') == library_id:
+                lib['name'] = new_name
+                return self.save_libraries_config()
+        return False
+
+    def update_scan_rules(self, library_id, rules):
+        """设置库的扫描规则（include/exclude/max_depth/symlinks/network/concurrency），None清除自定义规则
+
+        Returns:
+            tuple: (是否成功, 错误码)
+        """
+        lib = self.get_library_by_id(library_id)
+        if lib is None:
+            return False, 'library_not_found'
+        try:
+            make_scanner(ScanFilter.from_config(rules), rules)
+        except (ValueError, TypeError) as e:
+            return False, self._error('invalid_scan_rules', e, library_id=library_id)
+        if rules:
+            lib['scan'] = rules
+        else:
+            lib.pop('scan', None)
+        if not self.save_libraries_config():
+            return False, 'save_config_failed'
+        return True, None
@@ -0,0 +1,220 @@
+'''
+@version 1.0
+@brief 基于mmap的zip只读访问：中央目录只解析一次，存储方式的成员以零拷贝memoryview切片返回，
+       压缩成员只做一次inflate
+@author 炎刃
+@date 2026-10-19
+'''
+import os
+import mmap
+import zlib
+import struct
+import threading
+
+# zip压缩方式
+ZIP_STORED = 0
+ZIP_DEFLATED = 8
+
+_EOCD = struct.Struct('<4s4H2LH')
+_EOCD_SIGNATURE = b'PK\x05\x06'
+_ZIP64_LOCATOR = struct.Struct('<4sLQL')
+_ZIP64_LOCATOR_SIGNATURE = b'PK\x06\x07'
+_ZIP64_EOCD = struct.Struct('<4sQ2H2L4Q')
+_ZIP64_EOCD_SIGNATURE = b'PK\x06\x06'
+_CENTRAL = struct.Struct('<4s4B4HL2L5H2L')
+_CENTRAL_SIGNATURE = b'PK\x01\x02'
+_LOCAL = struct.Struct('<4s2B4HL2L2H')
+_LOCAL_SIGNATURE = b'PK\x03\x04'
+_ZIP64_EXTRA_ID = 0x0001
+_MAX_COMMENT = 0xFFFF
+
+_FLAG_ENCRYPTED = 0x1
+_FLAG_UTF8 = 0x800
+
+
+class BadZipError(ValueError):
+    """zip结构损坏或无法识别"""
+
+
+class UnsupportedMemberError(ValueError):
+    """成员使用了不支持的压缩方式或已加密，调用方应改用zipfile读取"""
+
+
+class ZipMember:
+    """中央目录中的一项"""
+
+    __slots__ = ('name', 'method', 'flags', 'crc', 'compress_size', 'file_size', 'header_offset')
+
+    def __init__(self, name, method, flags, crc, compress_size, file_size, header_offset):
+        self.name = name
+        self.method = method
+        self.flags = flags
+        self.crc = crc
+        self.compress_size = compress_size
+        self.file_size = file_size
+        self.header_offset = header_offset
+
+    def is_dir(self):
+        return self.name.endswith('/')
+
+
+def _find_end_record(data):
+    """返回(中央目录条目数, 中央目录大小, 中央目录偏移, 结尾记录位置)"""
+    size = len(data)
+    search_start = max(0, size - _EOCD.size - _MAX_COMMENT)
+    pos = data.rfind(_EOCD_SIGNATURE, search_start)
+    if pos < 0 or pos + _EOCD.size > size:
+        raise BadZipError('找不到中央目录结尾记录')
+    _, _, _, _, count, cd_size, cd_offset, _ = _EOCD.unpack_from(data, pos)
+    end_pos = pos
+
+    locator_pos = pos - _ZIP64_LOCATOR.size
+    if locator_pos >= 0 and data[locator_pos:locator_pos + 4] == _ZIP64_LOCATOR_SIGNATURE:
+        # zip64：实际的条目数、大小与偏移保存在zip64结尾记录中
+        record_pos = locator_pos - _ZIP64_EOCD.size
+        if record_pos < 0 or data[record_pos:record_pos + 4] != _ZIP64_EOCD_SIGNATURE:
+            raise BadZipError('zip64中央目录结尾记录损坏')
+        fields = _ZIP64_EOCD.unpack_from(data, record_pos)
+        count, cd_size, cd_offset = fields[6], fields[8], fields[9]
+        end_pos = record_pos
+    return count, cd_size, cd_offset, end_pos
+
+
+def _apply_zip64_extra(extra, file_size, compress_size, header_offset):
+    """大小或偏移为0xFFFFFFFF时从zip64扩展字段读取真实值"""
+    pos = 0
+    while pos + 4 <= len(extra):
+        field_id, field_size = struct.unpack_from('<2H', extra, pos)
+        pos += 4
+        if field_id == _ZIP64_EXTRA_ID:
+            values = list(struct.unpack_from(f'<{field_size // 8}Q', extra, pos))
+            if file_size == 0xFFFFFFFF:
+                file_size = values.pop(0)
+            if compress_size == 0xFFFFFFFF:
+                compress_size = values.pop(0)
+            if header_offset == 0xFFFFFFFF:
+                header_offset = values.pop(0)
+            break
+        pos += field_size
+    return file_size, compress_size, header_offset
+
+
+def parse_central_directory(data):
+    """解析中央目录
+
+    Args:
+        data: 整个zip文件的字节视图（mmap或bytes）
+
+    Returns:
+        dict: 成员名 -> ZipMember，保持中央目录中的顺序
+
+    Raises:
+        BadZipError: 结构损坏
+    """
+    count, cd_size, cd_offset, end_pos = _find_end_record(data)
+    # zip数据前可能拼接了其他内容（如自解压程序），偏移需整体平移
+    concat = end_pos - cd_size - cd_offset
+    if concat < 0:
+        raise BadZipError('中央目录偏移超出文件范围')
+    pos = cd_offset + concat
+    members = {}
+    for _ in range(count):
+        if pos + _CENTRAL.size > end_pos or data[pos:pos + 4] != _CENTRAL_SIGNATURE:
+            raise BadZipError('中央目录条目损坏')
+        fields = _CENTRAL.unpack_from(data, pos)
+        flags, method = fields[5], fields[6]
+        crc, compress_size, file_size = fields[9], fields[10], fields[11]
+        name_len, extra_len, comment_len = fields[12], fields[13], fields[14]
+        header_offset = fields[18]
+        pos += _CENTRAL.size
+        raw_name = bytes(data[pos:pos + name_len])
+        name = raw_name.decode('utf-8' if flags & _FLAG_UTF8 else 'cp437')
+        extra = bytes(data[pos + name_len:pos + name_len + extra_len])
+        file_size, compress_size, header_offset = _apply_zip64_extra(
+            extra, file_size, compress_size, header_offset)
+        members[name] = ZipMember(name, method, flags, crc, compress_size, file_size,
+                                  header_offset + concat)
+        pos += name_len + extra_len + comment_len
+    return members
+
+
+class MmapZipReader:
+    """只读zip访问，整个文件映射到内存
+
+    存储方式（未压缩）的成员以memoryview切片返回，不经过文件读取与额外拷贝；
+    deflate成员一次性解压。切片在关闭后失效，调用方需在close前用完。
+    中央目录可通过members参数在多个实例间共享，避免重复解析。
+    mmap切片读取不依赖文件位置，同一实例可被多个线程同时读取。
+    """
+
+    def __init__(self, path, members=None):
+        self.path = path
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                raise BadZipError('空文件')
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+        try:
+            self.members = members if members is not None else parse_central_directory(self._mmap)
+        except Exception:
+            self.close()
+            raise
+        self._data_offsets = {}
+        self._offset_lock = threading.Lock()
+
+    def namelist(self):
+        return list(self.members)
+
+    def _data_offset(self, member):
+        # 本地文件头的扩展字段长度可能与中央目录不同，首次访问时读取并缓存
+        offset = self._data_offsets.get(member.name)
+        if offset is not None:
+            return offset
+        pos = member.header_offset
+        if pos + _LOCAL.size > len(self._mmap) or self._mmap[pos:pos + 4] != _LOCAL_SIGNATURE:
+            raise BadZipError(f'本地文件头损坏: {member.name}')
+        fields = _LOCAL.unpack_from(self._mmap, pos)
+        offset = pos + _LOCAL.size + fields[10] + fields[11]
+        if offset + member.compress_size > len(self._mmap):
+            raise BadZipError(f'成员超出文件范围: {member.name}')
+        with self._offset_lock:
+            self._data_offsets[member.name] = offset
+        return offset
+
+    def read(self, name):
+        """读取成员数据
+
+        Returns:
+            memoryview | bytes: 存储成员为mmap上的零拷贝切片，deflate成员为解压后的bytes
+
+        Raises:
+            KeyError: 成员不存在
+            UnsupportedMemberError: 加密或其他压缩方式
+        """
+        member = self.members[name]
+        if member.flags & _FLAG_ENCRYPTED:
+            raise UnsupportedMemberError(f'成员已加密: {name}')
+        if member.method not in (ZIP_STORED, ZIP_DEFLATED):
+            raise UnsupportedMemberError(f'不支持的压缩方式{member.method}: {name}')
+        offset = self._data_offset(member)
+        data = self._view[offset:offset + member.compress_size]
+        if member.method == ZIP_STORED:
+            return data
+        return zlib.decompress(data, -zlib.MAX_WBITS, member.file_size or zlib.DEF_BUF_SIZE)
+
+    def close(self):
+        if self._mmap is None:
+            return
+        self._view.release()
+        try:
+            self._mmap.close()
+        except BufferError:
+            # 调用方仍持有切片，映射在最后一个切片释放后由垃圾回收关闭
+            pass
+        self._mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
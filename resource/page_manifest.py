@@ -0,0 +1,369 @@
+'''
+@version 1.0
+@brief 漫画页面清单：自然排序的页面列表及其磁盘缓存
+@author 炎刃
+@date 2026-10-19
+'''
+import os
+import re
+import json
+import hashlib
+import posixpath
+import xml.etree.ElementTree as ET
+from html.parser import HTMLParser
+from urllib.parse import unquote
+
+from .app_cache import get_cache_dir, atomic_write_bytes
+from .lazy_import import load_pil, load_py7zr, load_rarfile, load_archive_backend, load_fitz
+
+# 清单格式版本，结构变化时递增以使旧缓存失效
+MANIFEST_VERSION = 1
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp')
+ARCHIVE_EXTENSIONS = ('.zip', '.cbz', '.rar', '.cbr', '.7z')
+# 电子书格式：PDF按页渲染，EPUB按书脊顺序提取图片
+DOCUMENT_EXTENSIONS = ('.pdf', '.epub')
+# 可作为页面来源打开的全部文件类型
+PAGE_SOURCE_EXTENSIONS = ARCHIVE_EXTENSIONS + DOCUMENT_EXTENSIONS
+# 页面顺序由文档本身决定、不做自然排序的来源类型
+_ORDERED_KINDS = ('pdf', 'epub')
+
+_DIGITS_RE = re.compile(r'(\d+)')
+
+
+def natural_sort_key(name):
+    """自然排序键：按路径分段比较，数字段按数值比较，使2.jpg排在10.jpg之前"""
+    key = []
+    for part in name.replace('\\', '/').split('/'):
+        chunks = []
+        for chunk in _DIGITS_RE.split(part):
+            if not chunk:
+                continue
+            if chunk.isdigit():
+                chunks.append((0, int(chunk), chunk))
+            else:
+                chunks.append((1, chunk.casefold()))
+        key.append(tuple(chunks))
+    return tuple(key)
+
+
+def natural_sorted(names):
+    """返回按自然顺序排序的新列表"""
+    return sorted(names, key=natural_sort_key)
+
+
+def is_image_name(name):
+    return os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS
+
+
+def get_source_kind(path):
+    """根据路径判断页面来源类型：dir/zip/rar/7z/pdf/epub，不支持时返回None"""
+    if os.path.isdir(path):
+        return 'dir'
+    ext = os.path.splitext(path)[1].lower()
+    if ext in ('.zip', '.cbz'):
+        return 'zip'
+    if ext in ('.rar', '.cbr'):
+        return 'rar'
+    if ext == '.7z':
+        return '7z'
+    if ext == '.pdf':
+        return 'pdf'
+    if ext == '.epub':
+        return 'epub'
+    return None
+
+
+class PageManifest:
+    """单本漫画的页面清单
+
+    pages中每一项为dict：name（成员名或文件名）、size（解压后大小）、
+    offset（zip本地文件头偏移，其他格式为None）、width/height（未知时为None）。
+    PDF页面的size为None，width/height为页面尺寸（点）。
+    """
+
+    def __init__(self, source_path, kind, mtime, size, pages, solid=False):
+        self.source_path = source_path
+        self.kind = kind
+        self.mtime = mtime
+        self.size = size
+        self.pages = pages
+        self.solid = solid
+
+    def __len__(self):
+        return len(self.pages)
+
+    def page_names(self):
+        return [page['name'] for page in self.pages]
+
+    def is_valid_for(self, mtime, size):
+        return self.mtime == mtime and self.size == size
+
+    def to_dict(self):
+        return {
+            'version': MANIFEST_VERSION,
+            'source_path': self.source_path,
+            'kind': self.kind,
+            'mtime': self.mtime,
+            'size': self.size,
+            'solid': self.solid,
+            'pages': self.pages
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['source_path'], data['kind'], data['mtime'], data['size'],
+                   data['pages'], data.get('solid', False))
+
+
+def _source_signature(path):
+    """返回用于校验缓存的(mtime, size)；目录只校验mtime（增删文件会改变目录mtime）"""
+    stat = os.stat(path)
+    if os.path.isdir(path):
+        return stat.st_mtime, 0
+    return stat.st_mtime, stat.st_size
+
+
+def _probe_dimensions(fp):
+    """只解析图片头获取宽高，不解码像素"""
+    try:
+        with load_pil().open(fp) as img:
+            return img.size
+    except Exception:
+        return None, None
+
+
+def _scan_dir_pages(dir_path, probe_dimensions):
+    pages = []
+    with os.scandir(dir_path) as it:
+        for entry in it:
+            if entry.is_file() and is_image_name(entry.name):
+                page = {'name': entry.name, 'size': entry.stat().st_size, 'offset': None,
+                        'width': None, 'height': None}
+                if probe_dimensions:
+                    page['width'], page['height'] = _probe_dimensions(entry.path)
+                pages.append(page)
+    return pages, False
+
+
+def _scan_zip_pages(archive_path, probe_dimensions):
+    pages = []
+    with load_archive_backend('zip').ZipFile(archive_path, 'r') as zf:
+        for info in zf.infolist():
+            if info.is_dir() or not is_image_name(info.filename):
+                continue
+            page = {'name': info.filename, 'size': info.file_size, 'offset': info.header_offset,
+                    'width': None, 'height': None}
+            if probe_dimensions:
+                with zf.open(info) as member:
+                    page['width'], page['height'] = _probe_dimensions(member)
+            pages.append(page)
+    return pages, False
+
+
+def _scan_7z_pages(archive_path, probe_dimensions):
+    # 7z成员读取需要解压，此处不探测尺寸
+    py7zr = load_py7zr()
+    pages = []
+    with py7zr.SevenZipFile(archive_path, 'r') as archive:
+        solid = bool(archive.archiveinfo().solid)
+        for info in archive.list():
+            if info.is_directory or not is_image_name(info.filename):
+                continue
+            pages.append({'name': info.filename, 'size': info.uncompressed, 'offset': None,
+                          'width': None, 'height': None})
+    return pages, solid
+
+
+def _scan_rar_pages(archive_path, probe_dimensions):
+    rarfile = load_rarfile()
+    pages = []
+    solid = False
+    with rarfile.RarFile(archive_path, 'r') as archive:
+        for info in archive.infolist():
+            # rarfile已将RAR3/RAR5的固实标记统一到RAR_FILE_SOLID
+            solid = solid or bool(info.flags & rarfile.RAR_FILE_SOLID)
+            if info.is_dir() or not is_image_name(info.filename):
+                continue
+            pages.append({'name': info.filename, 'size': info.file_size, 'offset': None,
+                          'width': None, 'height': None})
+    return pages, solid
+
+
+def _scan_pdf_pages(pdf_path, probe_dimensions):
+    # 只读取页面尺寸（单位为点，1/72英寸），不渲染任何页面；大文档也能立即打开
+    pages = []
+    with load_fitz().open(pdf_path) as doc:
+        for i, page in enumerate(doc):
+            rect = page.rect
+            pages.append({'name': f'{i + 1:04d}.png', 'size': None, 'offset': None,
+                          'width': round(rect.width), 'height': round(rect.height)})
+    return pages, False
+
+
+_EPUB_CONTAINER = 'META-INF/container.xml'
+
+
+class _EpubImageParser(HTMLParser):
+    """收集XHTML中<img src>与SVG <image xlink:href>引用的图片"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.sources = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'img':
+            src = attrs.get('src')
+        elif tag == 'image':
+            src = attrs.get('xlink:href') or attrs.get('href')
+        else:
+            return
+        if src:
+            self.sources.append(src)
+
+    handle_startendtag = handle_starttag
+
+
+def _xml_local_name(tag):
+    return tag.rsplit('}', 1)[-1]
+
+
+def _resolve_href(base_dir, href):
+    """把文档内的相对引用解析为zip成员名"""
+    href = unquote(href.split('#', 1)[0])
+    return posixpath.normpath(posixpath.join(base_dir, href)).lstrip('/')
+
+
+def _epub_spine_images(zf):
+    """按OPF书脊顺序返回各章节引用的图片成员名（去重）"""
+    container = ET.fromstring(zf.read(_EPUB_CONTAINER))
+    opf_path = next(el.get('full-path') for el in container.iter()
+                    if _xml_local_name(el.tag) == 'rootfile')
+    opf_dir = posixpath.dirname(opf_path)
+    opf = ET.fromstring(zf.read(opf_path))
+
+    items = {}
+    spine = []
+    for el in opf.iter():
+        name = _xml_local_name(el.tag)
+        if name == 'item':
+            items[el.get('id')] = (el.get('href'), el.get('media-type', ''))
+        elif name == 'itemref':
+            spine.append(el.get('idref'))
+
+    members = set(zf.namelist())
+    images = []
+    seen = set()
+
+    def add(member):
+        if member in members and member not in seen and is_image_name(member):
+            seen.add(member)
+            images.append(member)
+
+    for idref in spine:
+        href, media_type = items.get(idref, (None, ''))
+        if not href:
+            continue
+        doc_path = _resolve_href(opf_dir, href)
+        if media_type.startswith('image/'):
+            # 书脊直接引用图片（固定版式漫画常见）
+            add(doc_path)
+            continue
+        if doc_path not in members:
+            continue
+        parser = _EpubImageParser()
+        parser.feed(zf.read(doc_path).decode('utf-8', errors='replace'))
+        doc_dir = posixpath.dirname(doc_path)
+        for src in parser.sources:
+            add(_resolve_href(doc_dir, src))
+    return images
+
+
+def _scan_epub_pages(epub_path, probe_dimensions):
+    with load_archive_backend('zip').ZipFile(epub_path, 'r') as zf:
+        try:
+            names = _epub_spine_images(zf)
+        except (KeyError, StopIteration, ET.ParseError) as e:
+            print(f'解析EPUB书脊失败 {epub_path}: {e}')
+            names = []
+        if not names:
+            # 书脊缺失或未引用图片时退回到压缩包内图片的自然顺序
+            names = natural_sorted(name for name in zf.namelist() if is_image_name(name))
+        pages = []
+        for name in names:
+            info = zf.getinfo(name)
+            page = {'name': name, 'size': info.file_size, 'offset': info.header_offset,
+                    'width': None, 'height': None}
+            if probe_dimensions:
+                with zf.open(info) as member:
+                    page['width'], page['height'] = _probe_dimensions(member)
+            pages.append(page)
+    return pages, False
+
+
+_SCANNERS = {
+    'dir': _scan_dir_pages,
+    'zip': _scan_zip_pages,
+    '7z': _scan_7z_pages,
+    'rar': _scan_rar_pages,
+    'pdf': _scan_pdf_pages,
+    'epub': _scan_epub_pages
+}
+
+
+def build_manifest(source_path, probe_dimensions=True):
+    """扫描目录或压缩包，生成自然排序的页面清单；PDF与EPUB保持文档自身的页序
+
+    Raises:
+        ValueError: 不支持的来源类型
+    """
+    kind = get_source_kind(source_path)
+    if kind is None:
+        raise ValueError(f'不支持的页面来源: {source_path}')
+    mtime, size = _source_signature(source_path)
+    pages, solid = _SCANNERS[kind](source_path, probe_dimensions)
+    if kind not in _ORDERED_KINDS:
+        pages.sort(key=lambda page: natural_sort_key(page['name']))
+    return PageManifest(os.path.abspath(source_path), kind, mtime, size, pages, solid)
+
+
+def get_manifest_path(source_path):
+    """清单缓存文件路径，以来源绝对路径的哈希命名"""
+    digest = hashlib.sha1(os.path.abspath(source_path).encode('utf-8')).hexdigest()
+    return os.path.join(get_cache_dir('manifests'), f'{digest}.json')
+
+
+def save_manifest(manifest):
+    data = json.dumps(manifest.to_dict(), ensure_ascii=False).encode('utf-8')
+    atomic_write_bytes(get_manifest_path(manifest.source_path), data)
+
+
+def load_manifest(source_path, probe_dimensions=True):
+    """读取页面清单，缓存缺失或来源的mtime/大小变化时重新生成并写回
+
+    Args:
+        source_path: 图片目录或压缩包路径
+        probe_dimensions: 生成清单时是否读取图片头记录宽高
+
+    Returns:
+        PageManifest: 页面清单
+    """
+    mtime, size = _source_signature(source_path)
+    manifest_path = get_manifest_path(source_path)
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') == MANIFEST_VERSION:
+            manifest = PageManifest.from_dict(data)
+            if manifest.is_valid_for(mtime, size):
+                return manifest
+    except (OSError, ValueError, KeyError):
+        pass
+
+    manifest = build_manifest(source_path, probe_dimensions)
+    try:
+        save_manifest(manifest)
+    except OSError as e:
+        print(f'保存页面清单失败 {source_path}: {e}')
+    return manifest
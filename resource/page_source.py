@@ -0,0 +1,353 @@
+'''
+@version 1.0
+@brief 页面来源：按页随机读取目录或压缩包中的图片，单页只解压对应成员
+@author 炎刃
+@date 2026-10-19
+'''
+import os
+import math
+import hashlib
+import threading
+
+from .app_cache import get_cache_dir, atomic_write_bytes
+from .page_manifest import load_manifest, natural_sorted, get_source_kind, PAGE_SOURCE_EXTENSIONS
+from .lazy_import import load_py7zr, load_rarfile, load_archive_backend, load_fitz
+from .mmap_zip import MmapZipReader, UnsupportedMemberError
+
+# PDF渲染分辨率：未指定显示尺寸时的默认值、上下限与量化步长。
+# 目标尺寸在同一档位内变化（如微调窗口大小）时复用已渲染的页面缓存
+PDF_DEFAULT_DPI = 144
+PDF_MIN_DPI = 48
+PDF_MAX_DPI = 300
+PDF_DPI_STEP = 24
+
+
+class PageSource:
+    """页面来源基类，子类实现按索引读取单页数据"""
+
+    def __init__(self, names):
+        self.names = names
+
+    @property
+    def page_count(self):
+        return len(self.names)
+
+    def page_name(self, index):
+        return self.names[index]
+
+    def page_path(self, index):
+        """页面对应的磁盘文件路径；压缩包成员返回None"""
+        return None
+
+    def is_page_ready(self, index):
+        """页面是否可立即读取而不阻塞（流式解压来源中尚未解出的页面返回False）"""
+        return True
+
+    def read_page(self, index):
+        """读取单页的原始字节"""
+        raise NotImplementedError
+
+    def read_page_buffer(self, index):
+        """读取单页数据，返回bytes或memoryview，供直接从内存解码
+
+        memoryview可能是来源内部映射的零拷贝切片，只在来源关闭前有效，调用方不应长期持有。
+        """
+        return self.read_page(index)
+
+    def set_target_size(self, width, height):
+        """设置页面的显示尺寸（像素），按需渲染的来源据此选择分辨率
+
+        Returns:
+            bool: 已读取的页面是否需要按新尺寸重新读取
+        """
+        return False
+
+    def read_pages(self, indices):
+        """批量读取多页，逐个产出(index, 原始字节)；支持一次解压多个成员的来源可重写以减少解压次数"""
+        for index in indices:
+            yield index, self.read_page(index)
+
+    def clone(self):
+        """返回可在其他线程独立使用的新实例（后台缩略图生成使用）"""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class FileListPageSource(PageSource):
+    """由磁盘图片文件组成的页面来源"""
+
+    def __init__(self, paths):
+        super().__init__([os.path.basename(path) for path in paths])
+        self.paths = paths
+
+    def page_path(self, index):
+        return self.paths[index]
+
+    def read_page(self, index):
+        with open(self.paths[index], 'rb') as f:
+            return f.read()
+
+    def clone(self):
+        return FileListPageSource(self.paths)
+
+
+class ZipPageSource(PageSource):
+    """zip/cbz来源：文件映射到内存，中央目录只解析一次，按成员名直接定位读取
+
+    存储方式的成员以零拷贝切片交给解码器，deflate成员只解压一次；
+    无法映射的文件以及加密或其他压缩方式的成员退回zipfile读取。
+    """
+
+    def __init__(self, archive_path, manifest, members=None):
+        super().__init__(manifest.page_names())
+        self.archive_path = archive_path
+        self.manifest = manifest
+        self._lock = threading.Lock()
+        self._zip = None
+        try:
+            self._reader = MmapZipReader(archive_path, members)
+        except (OSError, ValueError) as e:
+            print(f'内存映射读取失败，改用zipfile {archive_path}: {e}')
+            self._reader = None
+            self._zip = load_archive_backend('zip').ZipFile(archive_path, 'r')
+
+    def read_page_buffer(self, index):
+        name = self.names[index]
+        if self._reader is not None:
+            try:
+                return self._reader.read(name)
+            except UnsupportedMemberError:
+                pass
+        with self._lock:
+            if self._zip is None:
+                self._zip = load_archive_backend('zip').ZipFile(self.archive_path, 'r')
+            return self._zip.read(name)
+
+    def read_page(self, index):
+        data = self.read_page_buffer(index)
+        return data.tobytes() if isinstance(data, memoryview) else data
+
+    def clone(self):
+        # 新实例各自映射文件，共享已解析的中央目录
+        members = self._reader.members if self._reader is not None else None
+        return ZipPageSource(self.archive_path, self.manifest, members)
+
+    def close(self):
+        if self._reader is not None:
+            self._reader.close()
+        with self._lock:
+            if self._zip is not None:
+                self._zip.close()
+                self._zip = None
+
+
+class SevenZipPageSource(PageSource):
+    """7z来源，每次只解压目标成员（非固实压缩包的单页代价为一次成员解码）"""
+
+    def __init__(self, archive_path, manifest):
+        super().__init__(manifest.page_names())
+        self.archive_path = archive_path
+        self.manifest = manifest
+        self._lock = threading.Lock()
+
+    def read_page(self, index):
+        name = self.names[index]
+        with self._lock, load_py7zr().SevenZipFile(self.archive_path, 'r') as archive:
+            data = archive.read(targets=[name])
+        return data[name].read()
+
+    def read_pages(self, indices):
+        # 一次调用解压全部目标成员，固实压缩包只需顺序解码一遍
+        indices = list(indices)
+        names = [self.names[index] for index in indices]
+        with self._lock, load_py7zr().SevenZipFile(self.archive_path, 'r') as archive:
+            data = archive.read(targets=names)
+        for index, name in zip(indices, names):
+            if name in data:
+                yield index, data[name].read()
+
+    def clone(self):
+        return SevenZipPageSource(self.archive_path, self.manifest)
+
+
+class RarPageSource(PageSource):
+    """rar/cbr来源，按成员名读取"""
+
+    def __init__(self, archive_path, manifest):
+        super().__init__(manifest.page_names())
+        self.archive_path = archive_path
+        self.manifest = manifest
+        self._lock = threading.Lock()
+        self._rar = load_rarfile().RarFile(archive_path, 'r')
+
+    def read_page(self, index):
+        with self._lock:
+            return self._rar.read(self.names[index])
+
+    def clone(self):
+        return RarPageSource(self.archive_path, self.manifest)
+
+    def close(self):
+        self._rar.close()
+
+
+class PdfPageSource(PageSource):
+    """PDF来源，按显示尺寸逐页渲染为PNG并缓存到磁盘，打开文档时不渲染任何页面"""
+
+    def __init__(self, pdf_path, manifest, dpi=PDF_DEFAULT_DPI):
+        super().__init__(manifest.page_names())
+        self.pdf_path = pdf_path
+        self.manifest = manifest
+        self.dpi = dpi
+        self.target_size = None
+        self._lock = threading.Lock()
+        self._doc = None
+        identity = f'{os.path.abspath(pdf_path)}|{manifest.mtime}|{manifest.size}'
+        self.cache_dir = get_cache_dir('pdf_pages', hashlib.sha1(identity.encode('utf-8')).hexdigest())
+
+    def page_dpi(self, index):
+        """页面适应显示尺寸所需的分辨率，向上取整到量化档位"""
+        page = self.manifest.pages[index]
+        if self.target_size is None or not page['width'] or not page['height']:
+            return self.dpi
+        scale = min(self.target_size[0] / page['width'], self.target_size[1] / page['height'])
+        dpi = math.ceil(72 * scale / PDF_DPI_STEP) * PDF_DPI_STEP
+        return max(PDF_MIN_DPI, min(PDF_MAX_DPI, dpi))
+
+    def set_target_size(self, width, height):
+        old_dpis = [self.page_dpi(i) for i in range(self.page_count)]
+        self.target_size = (width, height) if width > 0 and height > 0 else None
+        return old_dpis != [self.page_dpi(i) for i in range(self.page_count)]
+
+    def _cache_path(self, index):
+        return os.path.join(self.cache_dir, f'{index:05d}@{self.page_dpi(index)}.png')
+
+    def _render(self, index, path):
+        """渲染单页并写入渲染缓存，返回PNG数据"""
+        with self._lock:
+            if self._doc is None:
+                self._doc = load_fitz().open(self.pdf_path)
+            data = self._doc[index].get_pixmap(dpi=self.page_dpi(index)).tobytes('png')
+        atomic_write_bytes(path, data)
+        return data
+
+    def page_path(self, index):
+        """渲染缓存中的页面图片路径，未渲染时先渲染该页"""
+        path = self._cache_path(index)
+        if not os.path.exists(path):
+            self._render(index, path)
+        return path
+
+    def read_page(self, index):
+        # 刚渲染的页面直接返回内存中的数据，不再从缓存文件读回
+        path = self._cache_path(index)
+        try:
+            with open(path, 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return self._render(index, path)
+
+    def clone(self):
+        source = PdfPageSource(self.pdf_path, self.manifest, self.dpi)
+        source.target_size = self.target_size
+        return source
+
+    def close(self):
+        with self._lock:
+            if self._doc is not None:
+                self._doc.close()
+                self._doc = None
+
+
+class CompositePageSource(PageSource):
+    """把多个来源依次拼接为一个来源（目录中混合图片与压缩包时使用）"""
+
+    def __init__(self, sources):
+        names = []
+        self._locations = []
+        for source_index, source in enumerate(sources):
+            names.extend(source.names)
+            self._locations.extend((source_index, i) for i in range(source.page_count))
+        super().__init__(names)
+        self.sources = sources
+
+    def page_path(self, index):
+        source_index, page_index = self._locations[index]
+        return self.sources[source_index].page_path(page_index)
+
+    def is_page_ready(self, index):
+        source_index, page_index = self._locations[index]
+        return self.sources[source_index].is_page_ready(page_index)
+
+    def read_page(self, index):
+        source_index, page_index = self._locations[index]
+        return self.sources[source_index].read_page(page_index)
+
+    def read_page_buffer(self, index):
+        source_index, page_index = self._locations[index]
+        return self.sources[source_index].read_page_buffer(page_index)
+
+    def set_target_size(self, width, height):
+        changed = [source.set_target_size(width, height) for source in self.sources]
+        return any(changed)
+
+    def clone(self):
+        return CompositePageSource([source.clone() for source in self.sources])
+
+    def close(self):
+        for source in self.sources:
+            source.close()
+
+
+_ARCHIVE_SOURCES = {
+    'zip': ZipPageSource,
+    '7z': SevenZipPageSource,
+    'rar': RarPageSource,
+    'pdf': PdfPageSource,
+    # EPUB本身是zip容器，页面清单已按书脊顺序列出图片成员
+    'epub': ZipPageSource
+}
+
+
+def open_archive_source(archive_path, solid_handler=None):
+    """打开单个压缩包（或PDF/EPUB文档）的页面来源
+
+    Args:
+        archive_path: 压缩包路径
+        solid_handler: 可选回调(archive_path, manifest) -> PageSource，
+            固实压缩包逐成员读取需要从头解压，由调用方决定替代方案（如整体解压）
+
+    Returns:
+        PageSource: 页面来源
+    """
+    manifest = load_manifest(archive_path)
+    if manifest.solid and solid_handler is not None:
+        return solid_handler(archive_path, manifest)
+    return _ARCHIVE_SOURCES[manifest.kind](archive_path, manifest)
+
+
+def open_page_source(path, solid_handler=None):
+    """根据路径打开页面来源：目录（含其中的压缩包与文档）、单个压缩包或PDF/EPUB文档
+
+    Raises:
+        ValueError: 不支持的路径类型
+    """
+    kind = get_source_kind(path)
+    if kind is None:
+        raise ValueError(f'不支持的页面来源: {path}')
+    if kind != 'dir':
+        return open_archive_source(path, solid_handler)
+
+    manifest = load_manifest(path)
+    sources = [FileListPageSource([os.path.join(path, name) for name in manifest.page_names()])]
+    archive_names = [name for name in os.listdir(path)
+                     if os.path.splitext(name)[1].lower() in PAGE_SOURCE_EXTENSIONS]
+    for archive_name in natural_sorted(archive_names):
+        archive_path = os.path.join(path, archive_name)
+        try:
+            sources.append(open_archive_source(archive_path, solid_handler))
+        except Exception as e:
+            print(f'打开压缩包失败 {archive_path}: {e}')
+    return CompositePageSource(sources)
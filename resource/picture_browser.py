@@ -7,22 +7,89 @@
 import sys
 import os
 import argparse
+import threading
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
-                            QHBoxLayout, QPushButton, QLabel, QScrollArea, QSizePolicy)
-from PyQt5.QtGui import QPixmap, QImage, QImageReader, QIcon
-from PyQt5.QtCore import Qt, QByteArray, QTimer
-from PIL import Image, ImageQt, UnidentifiedImageError
-import tempfile
-import shutil
-import zipfile
+                            QHBoxLayout, QPushButton, QLabel, QScrollArea, QSizePolicy,
+                            QSlider, QSpinBox, QListWidget, QListWidgetItem, QListView)
+from PyQt5.QtGui import QPixmap, QIcon
+from PyQt5.QtCore import Qt, QTimer, QThread, QSize, QPoint, pyqtSignal
+
+# 以脚本方式运行时确保项目根目录在搜索路径中，以便导入resource包内的核心模块
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+from resource.page_manifest import PAGE_SOURCE_EXTENSIONS
+from resource.page_source import open_page_source
+from resource.image_decode import decode_image
+from resource.animated_page import open_animated_page
+from resource.thumbnail_cache import ThumbnailCache, THUMBNAIL_SIZE
+from resource.reading_state import get_reading_state_store
+from resource.extraction_cache import get_extraction_cache
+from resource.solid_archive import StreamingPageSource
+
+
+class ThumbnailWorker(QThread):
+    """后台缩略图生成线程，只处理最近一次请求的页面（通常是胶片条的可见范围）"""
+    thumbnail_ready = pyqtSignal(int, str)
+
+    def __init__(self, page_source, thumbnail_cache, parent=None):
+        super().__init__(parent)
+        # page_source须为独立实例，避免与界面线程争用同一个文件句柄
+        self.page_source = page_source
+        self.thumbnail_cache = thumbnail_cache
+        self._pending = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = False
+
+    def request(self, indices):
+        """替换待生成队列"""
+        with self._lock:
+            self._pending = list(indices)
+        self._wakeup.set()
+
+    def stop(self):
+        """请求线程退出，调用方随后wait()等待结束"""
+        self._stopped = True
+        self._wakeup.set()
+
+    def run(self):
+        while not self._stopped:
+            with self._lock:
+                index = self._pending.pop(0) if self._pending else None
+            if index is None:
+                self._wakeup.wait()
+                self._wakeup.clear()
+                continue
+            try:
+                thumb_path = self.thumbnail_cache.get_or_generate(index, self.page_source)
+            except Exception as e:
+                print(f"生成缩略图失败：第{index + 1}页, 错误：{str(e)}")
+                thumb_path = None
+            if thumb_path:
+                self.thumbnail_ready.emit(index, thumb_path)
+        self.page_source.close()
+
 
 class PictureBrowser(QMainWindow):
+    # 流式解压来源每解出一页时发出（-1表示整体解压完成），跨线程排队到界面线程处理
+    page_ready = pyqtSignal(int)
+
     def __init__(self, folder_path=None):
         super().__init__()
         self.current_dir = folder_path
         self.image_files = []
         self.current_index = 0
-        self.temp_dirs = []  # 存储临时目录路径，用于清理
+        self.extraction_cache = get_extraction_cache()
+        self.page_ready.connect(self._on_page_ready)
+        self.page_source = None  # 当前漫画的页面来源，支持按页随机读取
+        self.thumbnail_cache = None
+        self.thumbnail_worker = None
+        self._loaded_thumbnails = set()
+        self._current_image = None  # 当前页解码结果，窗口缩放时复用
+        self._current_image_index = None
+        self._animation = None  # 当前动画页面的播放器
+        self.reading_state = get_reading_state_store()
         
         self.initUI()
         if folder_path:
@@ -50,6 +117,20 @@ class PictureBrowser(QMainWindow):
         self.scroll_area.setWidget(self.image_label)
         main_layout.addWidget(self.scroll_area)
         
+        # 缩略图胶片条，缩略图在滚动到可见范围时才在后台生成
+        self.filmstrip = QListWidget()
+        self.filmstrip.setViewMode(QListView.IconMode)
+        self.filmstrip.setFlow(QListView.LeftToRight)
+        self.filmstrip.setWrapping(False)
+        self.filmstrip.setMovement(QListView.Static)
+        self.filmstrip.setUniformItemSizes(True)
+        self.filmstrip.setIconSize(QSize(*THUMBNAIL_SIZE))
+        self.filmstrip.setFixedHeight(THUMBNAIL_SIZE[1] + 50)
+        self.filmstrip.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOn)
+        self.filmstrip.itemClicked.connect(lambda item: self.go_to_page(self.filmstrip.row(item)))
+        self.filmstrip.horizontalScrollBar().valueChanged.connect(self._request_visible_thumbnails)
+        main_layout.addWidget(self.filmstrip)
+        
         # 控制区域布局（垂直）
         control_layout = QVBoxLayout()
         
@@ -80,6 +161,23 @@ class PictureBrowser(QMainWindow):
         button_row_layout.addWidget(self.next_btn)
         button_row_layout.setStretchFactor(self.next_btn, 4)
         
+        # 页码拖动条与跳页输入
+        seek_row_layout = QHBoxLayout()
+        self.page_slider = QSlider(Qt.Horizontal)
+        self.page_slider.setEnabled(False)
+        self.page_slider.valueChanged.connect(self._on_slider_value_changed)
+        self.page_slider.sliderReleased.connect(lambda: self.go_to_page(self.page_slider.value()))
+        seek_row_layout.addWidget(self.page_slider)
+        self.page_spin = QSpinBox()
+        self.page_spin.setEnabled(False)
+        self.page_spin.setMinimum(1)
+        seek_row_layout.addWidget(self.page_spin)
+        self.jump_btn = QPushButton('跳转')
+        self.jump_btn.setEnabled(False)
+        self.jump_btn.clicked.connect(lambda: self.go_to_page(self.page_spin.value() - 1))
+        self.page_spin.editingFinished.connect(lambda: self.go_to_page(self.page_spin.value() - 1))
+        seek_row_layout.addWidget(self.jump_btn)
+        
         # 状态行布局（水平）
         status_row_layout = QHBoxLayout()
         self.status_label = QLabel('未选择图片文件夹')
@@ -87,6 +185,7 @@ class PictureBrowser(QMainWindow):
         
         # 将按钮行和状态行添加到控制区域布局
         control_layout.addLayout(button_row_layout)
+        control_layout.addLayout(seek_row_layout)
         control_layout.addLayout(status_row_layout)
         
         main_layout.addLayout(control_layout)
@@ -96,61 +195,137 @@ class PictureBrowser(QMainWindow):
         pass
         
     def load_image_files(self):
-        # 支持的图片格式
-        image_extensions = ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp']
-        # 支持的压缩包格式
-        archive_extensions = ['.zip', '.rar', '.7z']
-        self.image_files = []
+        self._open_page_source(self.current_dir)
         
-        for filename in os.listdir(self.current_dir):
-            file_path = os.path.join(self.current_dir, filename)
-            ext = os.path.splitext(filename)[1].lower()
-            
-            if ext in image_extensions:
-                self.image_files.append(file_path)
-            elif ext in archive_extensions:
-                # 处理压缩包，提取图片
-                archive_images = self._extract_archive_images(file_path)
-                self.image_files.extend(archive_images)
+    def _open_page_source(self, path):
+        """打开页面来源并重建胶片条；固实压缩包仍整体解压，其余按页随机读取"""
+        self._close_page_source()
+        try:
+            self.page_source = open_page_source(path, solid_handler=self._open_solid_archive)
+        except Exception as e:
+            print(f"打开页面来源失败：{path}, 错误：{str(e)}")
+            self.page_source = None
+            self.image_files = []
+            return
+        # image_files保存页面名称，页面数据通过page_source按索引读取
+        self.image_files = list(self.page_source.names)
+        self._update_target_size()
+        
+        self.page_slider.setRange(0, max(len(self.image_files) - 1, 0))
+        self.page_spin.setRange(1, max(len(self.image_files), 1))
+        self.page_slider.setEnabled(len(self.image_files) > 1)
+        self.page_spin.setEnabled(len(self.image_files) > 1)
+        self.jump_btn.setEnabled(len(self.image_files) > 1)
+        
+        self.filmstrip.clear()
+        self._loaded_thumbnails = set()
+        for i in range(len(self.image_files)):
+            item = QListWidgetItem(str(i + 1))
+            item.setSizeHint(QSize(THUMBNAIL_SIZE[0] + 10, THUMBNAIL_SIZE[1] + 30))
+            self.filmstrip.addItem(item)
         
-        # 按文件名排序
-        self.image_files.sort()
+        if self.image_files:
+            try:
+                self.thumbnail_cache = ThumbnailCache(path)
+                # 缩略图线程使用独立实例，PDF按缩略图尺寸渲染
+                thumbnail_source = self.page_source.clone()
+                thumbnail_source.set_target_size(*THUMBNAIL_SIZE)
+                self.thumbnail_worker = ThumbnailWorker(thumbnail_source, self.thumbnail_cache)
+                self.thumbnail_worker.thumbnail_ready.connect(self._on_thumbnail_ready)
+                self.thumbnail_worker.start()
+            except Exception as e:
+                print(f"启动缩略图线程失败：{str(e)}")
+                self.thumbnail_worker = None
         
+    def _close_page_source(self):
+        # 先关闭来源再等待缩略图线程，唤醒可能在等待流式解压的线程
+        worker = self.thumbnail_worker
+        self.thumbnail_worker = None
+        if worker:
+            worker.stop()
+        if self.page_source:
+            self.page_source.close()
+            self.page_source = None
+        if worker:
+            worker.wait()
+        self._current_image = None
+        self._current_image_index = None
+        self._stop_animation()
+        
+    def _stop_animation(self):
+        if self._animation is not None:
+            self._animation.stop()
+            self._animation.deleteLater()
+            self._animation = None
+
+    def _on_animation_frame(self, frame):
+        self._set_page_pixmap(frame)
+
+    def _update_target_size(self):
+        """把显示区域的物理像素尺寸告知页面来源，PDF据此选择渲染分辨率
+
+        Returns:
+            bool: 需要按新分辨率重新读取页面时返回True
+        """
+        if self.page_source is None:
+            return False
+        ratio = self.devicePixelRatioF()
+        width = max(self.scroll_area.viewport().width(), 400) - 20
+        height = max(self.scroll_area.viewport().height(), 300) - 20
+        return self.page_source.set_target_size(int(width * ratio), int(height * ratio))
+
+    def _read_current_image(self):
+        """解码当前页：页面数据读入内存后直接解码，压缩包成员只解压这一项，不落地临时文件
+
+        动画GIF/WebP页面启动逐帧播放，返回第一帧。
+        """
+        if self._current_image_index == self.current_index and self._current_image is not None:
+            return self._current_image
+        self._stop_animation()
+        # 存储方式的zip成员是内存映射上的零拷贝切片，Qt无法解码的格式由PIL兜底
+        page_name = self.image_files[self.current_index]
+        data = self.page_source.read_page_buffer(self.current_index)
+        image = None
+        animation = open_animated_page(data, page_name, self)
+        if animation is not None:
+            animation.frame_changed.connect(self._on_animation_frame)
+            self._animation = animation
+            image = animation.start()
+            if not self.isVisible():
+                animation.pause()
+        if image is None:
+            image = decode_image(data, page_name)
+        self._current_image = image
+        self._current_image_index = self.current_index
+        return image
+
     def display_image(self):
         if 0 <= self.current_index < len(self.image_files):
             image_path = self.image_files[self.current_index]
             
-            # 使用QImageReader打开图片以支持WebP格式
+            # 固实压缩包流式解压中，目标页尚未解出时先提示，解出后由page_ready触发显示
+            if not self.page_source.is_page_ready(self.current_index):
+                self.status_label.setText(f"正在解压 {self.current_index + 1}/{len(self.image_files)}: {image_path}")
+                return
+            
+            # 从内存解码页面，支持WebP等Qt插件格式
             try:
-                # 获取文件扩展名
-                ext = os.path.splitext(image_path)[1].lower()
-                reader = QImageReader(image_path)
-                
-                # 对WebP格式显式设置格式
-                if ext == '.webp':
-                    reader.setFormat(QByteArray(b"webp"))
-                
-                image = reader.read()
-                if image.isNull():
-                    raise ValueError(f"无法读取图片: {reader.errorString()}")
+                image = self._read_current_image()
                 
                 # 调整图片大小以适应窗口
                 # 获取视口实际显示尺寸
                 def adjust_initial_image():
-                    window_width = self.scroll_area.viewport().width()
-                    window_height = self.scroll_area.viewport().height()
-                    
-                    # 确保至少有最小尺寸，避免初始化为0
-                    window_width = max(window_width, 400)
-                    window_height = max(window_height, 300)
-                    
-                    # 保持宽高比缩放
-                    # 长边优先填满显示区域
-                    scaled_image = image.scaled(window_width - 20, window_height - 20, 
-                                               Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                    pixmap = QPixmap.fromImage(scaled_image)
-                    
-                    self.image_label.setPixmap(pixmap)
+                    # 视口尺寸此时才确定；PDF跨越分辨率档位时丢弃已解码的当前页，按新尺寸重新渲染
+                    if self._update_target_size():
+                        self._current_image = None
+                        self._current_image_index = None
+                        self.display_image()
+                        return
+                    # 动画页面显示正在播放的帧
+                    if self._animation is not None and self._animation.current_frame is not None:
+                        self._set_page_pixmap(self._animation.current_frame)
+                    else:
+                        self._set_page_pixmap(image)
                 
                 QTimer.singleShot(0, adjust_initial_image)
                 self.status_label.setText(f"{self.current_index + 1}/{len(self.image_files)}: {os.path.basename(image_path)}")
@@ -169,7 +344,7 @@ class PictureBrowser(QMainWindow):
 详情: {str(e)}"""
                 # 添加文件大小信息
                 try:
-                    file_size = os.path.getsize(image_path) / (1024 * 1024)
+                    file_size = os.path.getsize(self.page_source.page_path(self.current_index)) / (1024 * 1024)
                     error_msg += f"文件大小: {file_size:.2f} MB"
                 except:
                     pass
@@ -180,23 +355,101 @@ class PictureBrowser(QMainWindow):
                     error_msg += "提示: 请确保已正确安装TIFF支持"
                 self.status_label.setText(error_msg)
     
+    def _set_page_pixmap(self, image):
+        """按视口尺寸缩放图片并显示"""
+        window_width = self.scroll_area.viewport().width()
+        window_height = self.scroll_area.viewport().height()
+        
+        # 确保至少有最小尺寸，避免初始化为0
+        window_width = max(window_width, 400)
+        window_height = max(window_height, 300)
+        
+        # 保持宽高比缩放
+        # 长边优先填满显示区域
+        scaled_image = image.scaled(window_width - 20, window_height - 20, 
+                                   Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        pixmap = QPixmap.fromImage(scaled_image)
+        
+        self.image_label.setPixmap(pixmap)
+    
+    def go_to_page(self, index):
+        """跳转到指定页（从0开始），只解码目标页"""
+        if not self.image_files:
+            return
+        index = max(0, min(index, len(self.image_files) - 1))
+        if index == self.current_index and self._current_image_index == index:
+            self._sync_seek_controls()
+            return
+        self.current_index = index
+        self.display_image()
+        self.update_buttons()
+        self._sync_seek_controls()
+        self._save_reading_position()
+    
+    def _save_reading_position(self):
+        # 阅读状态存储会合并短时间内的多次翻页再写盘
+        if self.current_dir and self.image_files:
+            self.reading_state.update(self.current_dir, self.current_index, len(self.image_files))
+    
     def first_page(self):
         if self.image_files and self.current_index != 0:
-            self.current_index = 0
-            self.display_image()
-            self.update_buttons()
+            self.go_to_page(0)
     
     def prev_image(self):
         if self.image_files and self.current_index > 0:
-            self.current_index -= 1
-            self.display_image()
-            self.update_buttons()
+            self.go_to_page(self.current_index - 1)
     
     def next_image(self):
         if self.image_files and self.current_index < len(self.image_files) - 1:
-            self.current_index += 1
-            self.display_image()
-            self.update_buttons()
+            self.go_to_page(self.current_index + 1)
+    
+    def _sync_seek_controls(self):
+        # 同步拖动条、页码框与胶片条选中项，屏蔽信号避免重复跳转
+        for widget, value in ((self.page_slider, self.current_index),
+                              (self.page_spin, self.current_index + 1)):
+            widget.blockSignals(True)
+            widget.setValue(value)
+            widget.blockSignals(False)
+        item = self.filmstrip.item(self.current_index)
+        if item:
+            self.filmstrip.blockSignals(True)
+            self.filmstrip.setCurrentItem(item)
+            self.filmstrip.blockSignals(False)
+            self.filmstrip.scrollToItem(item, QListWidget.PositionAtCenter)
+        self._request_visible_thumbnails()
+    
+    def _on_slider_value_changed(self, value):
+        if self.page_slider.isSliderDown():
+            # 拖动过程中只滚动胶片条预览，松开后再解码目标页
+            item = self.filmstrip.item(value)
+            if item:
+                self.filmstrip.scrollToItem(item, QListWidget.PositionAtCenter)
+            self.status_label.setText(f"跳转到 {value + 1}/{len(self.image_files)}")
+        else:
+            self.go_to_page(value)
+    
+    def _request_visible_thumbnails(self, *args):
+        """请求生成胶片条可见范围内尚未加载的缩略图"""
+        if not self.thumbnail_worker or not self.image_files:
+            return
+        viewport = self.filmstrip.viewport()
+        first = self.filmstrip.indexAt(QPoint(5, 5)).row()
+        last = self.filmstrip.indexAt(QPoint(viewport.width() - 5, 5)).row()
+        if first < 0:
+            first = self.current_index
+        if last < 0:
+            last = len(self.image_files) - 1
+        # 额外预取可见范围两侧的少量页面
+        first = max(0, first - 3)
+        last = min(len(self.image_files) - 1, last + 3)
+        wanted = [i for i in range(first, last + 1) if i not in self._loaded_thumbnails]
+        self.thumbnail_worker.request(wanted)
+    
+    def _on_thumbnail_ready(self, index, thumb_path):
+        item = self.filmstrip.item(index)
+        if item:
+            item.setIcon(QIcon(thumb_path))
+            self._loaded_thumbnails.add(index)
     
     def update_buttons(self):
         # 更新按钮状态
@@ -209,13 +462,35 @@ class PictureBrowser(QMainWindow):
         if self.image_files:
             self.display_image()
         super().resizeEvent(event)
+        self._request_visible_thumbnails()
+    
+    def hideEvent(self, event):
+        # 窗口隐藏或最小化时暂停动画解码
+        if self._animation is not None:
+            self._animation.pause()
+        super().hideEvent(event)
+    
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self._animation is not None:
+            self._animation.resume()
+    
+    def closeEvent(self, event):
+        self._close_page_source()
+        self.reading_state.flush()
+        self.extraction_cache.flush()
+        super().closeEvent(event)
     
     def _initialize_browser(self):
         """初始化浏览器状态，私有方法"""
         if self.image_files:
-            self.current_index = 0
+            # 从上次阅读的位置继续
+            saved_page = self.reading_state.get_page(self.current_dir)
+            self.current_index = max(0, min(saved_page, len(self.image_files) - 1))
             self.display_image()
             self.update_buttons()
+            self._sync_seek_controls()
+            self._save_reading_position()
             self.status_label.setText(f"图片 {self.current_index + 1}/{len(self.image_files)}")
         else:
             self.status_label.setText("未找到图片文件或文件夹不存在")
@@ -230,11 +505,11 @@ class PictureBrowser(QMainWindow):
         """
         self.current_dir = folder_path
         self.image_files = []
-        # 检查是否为压缩包文件
+        # 检查是否为压缩包或PDF/EPUB文件
         if os.path.isfile(self.current_dir):
             ext = os.path.splitext(self.current_dir)[1].lower()
-            if ext in ['.zip', '.rar', '.7z']:
-                self.image_files = self._extract_archive_images(self.current_dir)
+            if ext in PAGE_SOURCE_EXTENSIONS:
+                self._open_page_source(self.current_dir)
             else:
                 return False
         elif os.path.isdir(self.current_dir):
@@ -244,96 +519,17 @@ class PictureBrowser(QMainWindow):
         self._initialize_browser()
         return len(self.image_files) > 0
 
-    def _extract_archive_images(self, archive_path):
-        import os
-        import shutil
-        import tempfile
-        from zipfile import ZipFile, BadZipFile
-
-        # 初始化变量防止UnboundLocalError
-        archive_images = []
-        temp_dir = None
-        rarfile = None
-        py7zr = None
-
-        try:
-            import rarfile
-        except ImportError:
-            error_msg = "错误：缺少rarfile库，请使用pip install rarfile==4.0安装"
-            self.status_label.setText(error_msg)
-            print(error_msg)
-            return []
-
-        try:
-            import py7zr
-        except ImportError:
-            error_msg = "错误：缺少py7zr库，请使用pip install py7zr==0.21.0安装"
-            self.status_label.setText(error_msg)
-            print(error_msg)
-            return []
-
-        try:
-            ext = os.path.splitext(archive_path)[1].lower()
-            temp_dir = tempfile.mkdtemp()
-            self.temp_dirs.append(temp_dir)
-
-            if ext == '.zip':
-                with ZipFile(archive_path, 'r') as zip_ref:
-                    zip_ref.extractall(temp_dir)
-            elif ext == '.rar':
-                if not rarfile:
-                    self.status_label.setText("错误：rarfile库未正确加载")
-                    return []
-                with rarfile.RarFile(archive_path, 'r') as rar_ref:
-                    rar_ref.extractall(temp_dir)
-            elif ext == '.7z':
-                if not py7zr:
-                    self.status_label.setText("错误：py7zr库未正确加载")
-                    return []
-                with py7zr.SevenZipFile(archive_path, 'r') as sevenz_ref:
-                    sevenz_ref.extractall(temp_dir)
-            else:
-                self.status_label.setText(f"不支持的压缩格式：{ext}")
-                return []
+    def _open_solid_archive(self, archive_path, manifest):
+        """固实压缩包由后台线程顺序解压一次，页面解出即可显示"""
+        return StreamingPageSource(archive_path, manifest, self.extraction_cache,
+                                   on_page_ready=self.page_ready.emit)
 
-            # 收集临时目录中的图片
-            image_extensions = ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp']
-
-            for root, dirs, files in os.walk(temp_dir):
-                for file in files:
-                    file_ext = os.path.splitext(file)[1].lower()
-                    if file_ext in image_extensions:
-                        archive_images.append(os.path.join(root, file))
-
-            # 按文件名排序
-            archive_images.sort()
-            return archive_images
-        except ZipFile.BadZipFile:
-            self.status_label.setText("错误：无效的ZIP文件")
-        except rarfile.RarCannotExec:
-            self.status_label.setText("错误：RAR文件处理失败，请确保已安装unrar工具")
-        except rarfile.BadRarFile:
-            self.status_label.setText("错误：无效的RAR文件")
-        except Exception as e:
-            self.status_label.setText(f"处理压缩包时出错：{str(e)}")
-        finally:
-            if temp_dir and not archive_images:
-                # 如果提取失败，清理临时目录
-                try:
-                    shutil.rmtree(temp_dir)
-                    self.temp_dirs.remove(temp_dir)
-                except:
-                    pass
-        return []
-
-    def __del__(self):
-        """清理临时目录"""
-        for temp_dir in self.temp_dirs:
-            if os.path.exists(temp_dir):
-                try:
-                    shutil.rmtree(temp_dir)
-                except Exception as e:
-                    print(f"清理临时目录失败：{temp_dir}, 错误：{str(e)}")
+    def _on_page_ready(self, index):
+        # 当前页刚解出（或整体解压结束）且尚未显示时立即显示
+        if self.page_source is None or not self.image_files or self._current_image_index == self.current_index:
+            return
+        if self.page_source.is_page_ready(self.current_index):
+            self.display_image()
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='图片浏览器')
@@ -12,34 +12,132 @@ import os
 import json
 import datetime
 import uuid
-import zipfile
-import shutil
 from datetime import datetime
-from settings_dialog import SettingsDialog
 import warnings
-import sip
 warnings.filterwarnings("ignore", category=DeprecationWarning, message="sipPyTypeDict() is deprecated")
-from lib_func import I18nManager, format_file_size, ComicLibraryUtils
+from lib_func import I18nManager, format_file_size, ComicLibraryUtils, COMIC_EXTENSIONS
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QListWidget, QListWidgetItem, QGroupBox, QPushButton, QFileDialog, QMessageBox, 
                             QHBoxLayout, QToolBar, QAction, QSplitter, QTableWidget,
-                            QTableWidgetItem, QLabel, QStatusBar, QDialog, QFileDialog, QMessageBox, QAbstractItemView, QHeaderView, QInputDialog, QLineEdit)
-from PyQt5.QtGui import QIcon
-from PyQt5.QtCore import Qt, QSize, QFileInfo, QDir
+                            QTableWidgetItem, QLabel, QStatusBar, QDialog, QFileDialog, QMessageBox, QAbstractItemView, QHeaderView, QInputDialog, QLineEdit, QMenu)
+from PyQt5.QtGui import QIcon, QColor
+from PyQt5.QtCore import Qt, QSize, QFileInfo, QDir, QThread, pyqtSignal
 
+# 以脚本方式运行时确保项目根目录在搜索路径中，以便导入resource包内的核心模块
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+from resource.reading_state import get_reading_state_store, normalize_path
+from resource.tag_store import get_tag_store
+from resource.smart_collection import CollectionIndex, load_collections, save_collections
+from resource.library_core import LibraryCore, load_verify_results, LIBRARY_INTERNAL_DIRS
+from resource.comic_record import ComicRecord
+from resource.record_store import RecordStore
+from resource.catalog_snapshot import load_catalog_snapshot, save_catalog_snapshot, library_signatures
+from resource.scan_filter import ScanFilter
+from resource.scan_fs import make_scanner
+from resource.scan_job import ScanJob, ScanCancelled
+from resource.archive_verify import check_file, is_corrupt, LEVEL_QUICK
+
+
+def load_library_records(library_paths, scanners, jobs=None):
+    """读取目录快照或扫描全部库
+
+    库目录自上次扫描后未变化时直接加载目录快照，否则逐个扫描并保存新的快照。
+
+    Args:
+        library_paths: 库目录列表
+        scanners: {库目录: 遍历器}
+        jobs: 可选的{库目录: ScanJob}，报告进度并可取消
+
+    Returns:
+        tuple: (库签名, ComicRecord列表)
+
+    Raises:
+        ScanCancelled: 扫描被取消（不保存快照）
+    """
+    # 签名在扫描前取得，扫描期间的改动会使快照在下次启动时失效
+    signatures = library_signatures(library_paths, scanners)
+    records = load_catalog_snapshot(signatures)
+    if records is not None:
+        return signatures, records
+    records = []
+    for lib_path in library_paths:
+        # 调用工具类扫描库内容，统一转换为紧凑的ComicRecord
+        library_records = [ComicRecord.from_dict(record, lib_path) for record in
+                           ComicLibraryUtils.scan_library(lib_path, scanners[lib_path], (jobs or {}).get(lib_path))]
+        # 附上库扫描/校验时保存的完整性结果，表格中标记损坏的文件
+        verify_results = load_verify_results(lib_path)
+        for record in library_records:
+            if record['full_path'] in verify_results:
+                record['verify'] = verify_results[record['full_path']]
+        records.extend(library_records)
+    save_catalog_snapshot(signatures, records)
+    return signatures, records
+
+
+class LibraryScanWorker(QThread):
+    """后台扫描全部库，进度与结果经信号排队到界面线程；cancel()后在处理下一个文件前停止"""
+    progress = pyqtSignal(object)  # ScanProgress
+    scanned = pyqtSignal(object)  # (库签名, 记录列表)，取消或失败时为None
+
+    def __init__(self, library_paths, scanners, parent=None):
+        super().__init__(parent)
+        self.library_paths = library_paths
+        self.scanners = scanners
+        self.jobs = {path: ScanJob(path, self.progress.emit) for path in library_paths}
+
+    def cancel(self):
+        for job in self.jobs.values():
+            job.cancel()
+
+    @property
+    def cancelled(self):
+        return any(job.cancelled for job in self.jobs.values())
+
+    def run(self):
+        try:
+            result = load_library_records(self.library_paths, self.scanners, self.jobs)
+        except ScanCancelled:
+            result = None
+        except Exception as e:
+            print(f"扫描库失败: {e}")
+            result = None
+        self.scanned.emit(result)
 
 
 class ComicLibraryWindow(QMainWindow):
+    # 表格列 -> RecordStore排序字段
+    SORT_COLUMNS = ('name', 'modified_time', 'size')
+
     def __init__(self):
         super().__init__()
         self.all_records = []
+        self.records_by_path = {}  # 规范化路径 -> 记录，供最近阅读等按路径查找
+        self.record_store = None  # 列式记录索引，排序/筛选/汇总在其上向量化完成
+        self._view_rows = None  # 当前表格显示的记录行号，点击表头时在此基础上重新排序
+        self._sort_column = None
+        self._sort_descending = False
+        self.reading_state = get_reading_state_store()
+        self.tag_store = get_tag_store()
+        self._tag_items = {}  # 标签 -> 侧边栏列表项
+        self._current_tag = None  # 当前显示的标签，该标签变化时刷新表格
+        self._tag_edited_libraries = set()  # 修改过标签的库，退出时把标签写回其record.json
+        # 智能合集的成员随记录、阅读状态与标签的变化增量维护
+        self.collections = CollectionIndex(load_collections(), tag_store=self.tag_store)
+        self._collection_items = {}  # 合集名称 -> 侧边栏列表项
+        self._current_collection = None
+        self.reading_state.subscribe(self.on_reading_state_changed)
+        self.scan_worker = None  # 后台扫描线程，添加库后启动
+        self._snapshot_signatures = None  # 当前记录对应的库签名，退出时随记录写入目录快照
         self.libraries = []
         try:
             self.libraries = ComicLibraryUtils.load_libraries_config() or []
         except Exception as e:
             print(f"加载库配置失败: {e}")
             self.libraries = []
-        self.scan_all_libraries()
         self.i18n = I18nManager()
+        if self.i18n.load_error:
+            QMessageBox.critical(None, "语言文件加载失败", self.i18n.load_error)
         self.load_theme_settings()
         self.initUI()
         
@@ -74,15 +172,79 @@ class ComicLibraryWindow(QMainWindow):
         else:
             self.setStyleSheet("")
         
-    def scan_all_libraries(self):
-        # 扫描所有库并收集记录
-        self.all_records = []
+    def _library_scanners(self):
+        """可访问的库路径及其遍历器"""
+        library_paths = [lib.get('path') for lib in self.libraries
+                         if lib.get('path') and os.path.exists(lib.get('path'))]
+        # 按库配置的扫描规则（包含/排除、深度、符号链接）遍历，网络库并发遍历；快照签名也只看扫描会进入的目录。
+        # 传入扩展名，遍历时只接受（并预取stat）漫画文件
+        scanners = {}
         for lib in self.libraries:
-            lib_path = lib.get('path')
-            if lib_path and os.path.exists(lib_path):
-                # 调用工具类扫描库内容
-                records = ComicLibraryUtils.scan_library(lib_path)
-                self.all_records.extend(records)
+            if lib.get('path') in library_paths:
+                try:
+                    scan_filter = ScanFilter.from_config(lib.get('scan'), COMIC_EXTENSIONS,
+                                                         exclude=LIBRARY_INTERNAL_DIRS)
+                    scanners[lib['path']] = make_scanner(scan_filter, lib.get('scan'))
+                except (ValueError, TypeError) as e:
+                    print(f"库扫描规则无效 {lib['path']}: {e}")
+                    scanners[lib['path']] = ScanFilter.from_config(None, COMIC_EXTENSIONS, exclude=LIBRARY_INTERNAL_DIRS)
+        return library_paths, scanners
+
+    def scan_all_libraries(self):
+        # 扫描所有库并收集记录；库目录自上次扫描后未变化时直接加载目录快照
+        self._snapshot_signatures, records = load_library_records(*self._library_scanners())
+        self.set_records(records)
+
+    def set_records(self, records):
+        """替换全部记录，并重建按路径查找的字典、列式索引与智能合集成员"""
+        self.all_records = records
+        self.records_by_path = {normalize_path(r['full_path']): r for r in self.all_records if r.get('full_path')}
+        self.record_store = RecordStore(self.all_records)
+        self.record_store.apply_reading_state(self.reading_state)
+        # 旧格式记录中已有的标签并入标签存储，标签存储中修改过的标签写回记录
+        self.tag_store.import_record_tags(self.all_records)
+        self.tag_store.apply_to_records(self.all_records)
+        self.collections.set_record_store(self.record_store)
+        if hasattr(self, 'collection_list'):
+            self.refresh_collection_items()
+
+    def start_library_scan(self):
+        """在后台扫描所有库，进度显示在状态栏，可用工具栏的取消扫描中止（已有记录保持不变）"""
+        self.cancel_library_scan(wait=True)
+        self.scan_worker = LibraryScanWorker(*self._library_scanners(), parent=self)
+        self.scan_worker.progress.connect(self.on_scan_progress)
+        self.scan_worker.scanned.connect(self.on_scan_finished)
+        self.cancel_scan_action.setEnabled(True)
+        self.scan_worker.start()
+
+    def cancel_library_scan(self, wait=False):
+        if self.scan_worker is not None:
+            self.scan_worker.cancel()
+            if wait:
+                self.scan_worker.wait()
+                self.scan_worker = None
+        self.cancel_scan_action.setEnabled(False)
+
+    def on_scan_progress(self, progress):
+        name = next((lib.get('name') for lib in self.libraries if lib.get('path') == progress.library_path),
+                    None) or os.path.basename(progress.library_path)
+        self.statusBar().showMessage(self.i18n.get_text('main_window.status_bar.scanning').format(
+            library=name, done=progress.done, rate=round(progress.rate)))
+
+    def on_scan_finished(self, result):
+        # 被新扫描取代的旧任务的结果直接丢弃
+        worker = self.sender()
+        if worker is not self.scan_worker:
+            return
+        self.scan_worker = None
+        self.cancel_scan_action.setEnabled(False)
+        if result is None:
+            if worker.cancelled:
+                self.statusBar().showMessage(self.i18n.get_text('main_window.status_bar.scan_cancelled'))
+            return
+        self._snapshot_signatures, records = result
+        self.set_records(records)
+        self.load_library_files()
 
     def open_comic_file(self, index):
         if index.isValid():
@@ -90,9 +252,10 @@ class ComicLibraryWindow(QMainWindow):
             if item:
                 file_path = item.data(Qt.UserRole)
                 if file_path and os.path.exists(file_path):
-                    from picture_browser import ComicBrowser
-                    self.browser = ComicBrowser(file_path)
-                    self.browser.show()
+                    from picture_browser import PictureBrowser
+                    self.browser = PictureBrowser()
+                    if self.browser.set_image_folder(file_path):
+                        self.browser.show()
     
     def initUI(self):
         self.setWindowTitle(self.i18n.get_text('main_window.title'))
@@ -133,6 +296,9 @@ class ComicLibraryWindow(QMainWindow):
         self.right_content.setEditTriggers(QAbstractItemView.NoEditTriggers)
         self.right_content.setSelectionBehavior(QAbstractItemView.SelectRows)
         self.right_content.doubleClicked.connect(self.open_comic_file)
+        self.right_content.horizontalHeader().sectionClicked.connect(self.sort_by_column)
+        self.right_content.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.right_content.customContextMenuRequested.connect(self.show_table_menu)
         
         # 初始化侧边栏
         self.init_sidebar()
@@ -174,6 +340,22 @@ class ComicLibraryWindow(QMainWindow):
             right_width = splitter_width - left_width
             self.splitter.setSizes([left_width, right_width])
 
+    def closeEvent(self, event):
+        # 退出前停止后台扫描，写入尚未落盘的阅读进度与标签
+        self.cancel_library_scan(wait=True)
+        self.reading_state.flush()
+        self.tag_store.flush()
+        # 修改过标签的库把标签写回record.json，每个库只写一次
+        core = LibraryCore()
+        for library_path in self._tag_edited_libraries:
+            _, error = core.sync_tags(library_path, self.tag_store)
+            # 没有record.json的库（只由界面扫描）无需写回
+            if error and error != 'record_file_not_found':
+                print(f'写回标签失败 {library_path}: {error}')
+        if self._snapshot_signatures is not None:
+            save_catalog_snapshot(self._snapshot_signatures, self.all_records)
+        super().closeEvent(event)
+
     def add_library(self):
         dir_path = QFileDialog.getExistingDirectory(self, self.i18n.get_text('settings.dialog.select_library'), QDir.homePath())
         if not dir_path:
@@ -217,42 +399,86 @@ class ComicLibraryWindow(QMainWindow):
             item = QListWidgetItem(lib['name'])
             item.setData(Qt.UserRole, lib['path'])
             self.library_list.addItem(item)
-        self.scan_all_libraries()
+        self.start_library_scan()
 
     def load_special_category(self, category):
         # 实现特殊分类加载逻辑
+        self.leave_dynamic_views()
         self.right_content.setRowCount(0)
+        self._view_rows = None
         if category == 'all_comics':
             # 加载所有漫画
             self.load_library_files()
         elif category == 'recently_read':
-            # 加载最近阅读
-            recent_records = [r for r in self.all_records if r.get('last_read')]
-            recent_records.sort(key=lambda x: x.get('last_read', 0), reverse=True)
+            # 加载最近阅读：阅读状态存储已按last_read维护有序索引，按路径取回记录即可
+            # 阅读进度只用于显示，不写入共享的记录（记录会随目录快照保存）
+            recent_records, states = [], []
+            for path in self.reading_state.recent():
+                record = self.records_by_path.get(path)
+                state = self.reading_state.get(path)
+                if record is not None and state is not None:
+                    recent_records.append(record)
+                    states.append(state)
             self.populate_table(recent_records)
+            for row, state in enumerate(states):
+                item = self.right_content.item(row, 0)
+                if item is not None and not item.toolTip():
+                    last_read = datetime.fromtimestamp(state['last_read']).strftime('%Y-%m-%d %H:%M')
+                    item.setToolTip(self.i18n.get_text('main_window.table.last_read').format(
+                        time=last_read, page=state.get('page', 0) + 1))
 
     def load_library_contents(self, lib_path):
         # 实现库内容加载逻辑
+        self.leave_dynamic_views()
+        rows = self.record_store.select(library=lib_path)
+        total_size = self.record_store.total_size_by_library(rows).get(lib_path, 0)
+        self.statusBar().showMessage(self.i18n.get_text('main_window.status_bar.library_summary').format(
+            count=len(rows), size=format_file_size(total_size)))
+        self.show_rows(rows)
+
+    def show_rows(self, rows):
+        # 按记录行号显示，保留当前排序方式
+        self._view_rows = rows
+        if self._sort_column is not None:
+            rows = self.record_store.sort(self.SORT_COLUMNS[self._sort_column], self._sort_descending, rows)
         self.right_content.setRowCount(0)
-        lib_records = [r for r in self.all_records if r.get('library_path') == lib_path]
-        self.populate_table(lib_records)
+        self.populate_table(self.record_store.records_at(rows))
+
+    def sort_by_column(self, column):
+        # 点击表头排序，再次点击同一列切换升序/降序
+        if self._view_rows is None or column >= len(self.SORT_COLUMNS):
+            return
+        if self._sort_column == column:
+            self._sort_descending = not self._sort_descending
+        else:
+            self._sort_column, self._sort_descending = column, False
+        self.right_content.horizontalHeader().setSortIndicator(
+            column, Qt.DescendingOrder if self._sort_descending else Qt.AscendingOrder)
+        self.show_rows(self._view_rows)
 
     def populate_table(self, records):
         # 通用表格填充方法
+        # 记录来自刚完成的扫描或已校验的快照，不再逐行检查文件是否存在：
+        # 网络库上每次exists/QFileInfo查询都是一次往返
         for record in records:
             file_path = record.get('full_path')
-            if not file_path or not os.path.exists(file_path):
+            if not file_path:
                 continue
-            file_info = QFileInfo(file_path)
-            file_name = record.get('name', file_info.fileName())
+            file_name = record.get('name') or os.path.basename(file_path)
             modified_time = record.get('modified_time', '未知时间')
             if isinstance(modified_time, (int, float)):
-                modified_time = datetime.datetime.fromtimestamp(modified_time).strftime('%Y-%m-%d %H:%M:%S')
+                modified_time = datetime.fromtimestamp(modified_time).strftime('%Y-%m-%d %H:%M:%S')
             file_size = format_file_size(record.get('size', 0))
             row = self.right_content.rowCount()
             self.right_content.insertRow(row)
             name_item = QTableWidgetItem(file_name)
             name_item.setData(Qt.UserRole, file_path)
+            if is_corrupt(file_path, record.get('verify')):
+                # 校验结果只在文件mtime与大小未变时有效，文件被替换后自动取消标记
+                name_item.setText(f'⚠ {file_name}')
+                name_item.setForeground(QColor('#d9534f'))
+                name_item.setToolTip(
+                    self.i18n.get_text('main_window.table.corrupt').format(error=record['verify'].get('error')))
             self.right_content.setItem(row, 0, name_item)
             date_item = QTableWidgetItem(modified_time)
             date_item.setTextAlignment(Qt.AlignCenter)
@@ -297,11 +523,218 @@ class ComicLibraryWindow(QMainWindow):
             ComicLibraryUtils.save_libraries_config(self.libraries)
 
     def on_collection_item_changed(self, current, previous):
-        if current:
-            # 处理标签项选择变化
-            tag_text = current.text()
-            # 可以在这里添加过滤或更新显示逻辑
-            pass
+        if not current:
+            return
+        # 处理标签项选择变化：收藏与各标签下的漫画都由列式索引取出行号显示
+        self.leave_dynamic_views(keep='tag')
+        self._current_tag = None
+        if current.data(Qt.UserRole) == 'favorites':
+            self.show_rows(self.record_store.select(favorite=True))
+        elif current.data(Qt.UserRole) == 'tag':
+            self._current_tag = current.data(Qt.UserRole + 1)
+            self.show_tag(self._current_tag)
+
+    def show_tag(self, tag):
+        rows = self.record_store.rows_of(self.tag_store.paths_with(tag), normalized=True)
+        self.statusBar().showMessage(self.i18n.get_text('tags.status').format(tag=tag, count=len(rows)))
+        self.show_rows(rows)
+
+    def refresh_tag_items(self, tags=None):
+        # 只更新计数变化的标签项，不遍历记录；tags为None时重建全部标签项
+        if tags is not None:
+            self.refresh_collection_items(self.collections.tags_changed(tags))
+        if tags is None:
+            for item in self._tag_items.values():
+                self.tag_list.takeItem(self.tag_list.row(item))
+            self._tag_items = {}
+            tags = self.tag_store.tag_names()
+        for tag in tags:
+            count = self.tag_store.count(tag)
+            item = self._tag_items.get(tag)
+            if count is None:
+                if item is not None:
+                    self.tag_list.takeItem(self.tag_list.row(self._tag_items.pop(tag)))
+                continue
+            if item is None:
+                item = QListWidgetItem()
+                item.setData(Qt.UserRole, 'tag')
+                item.setData(Qt.UserRole + 1, tag)
+                self._tag_items[tag] = item
+                # 收藏项固定在最前，标签按名称排列
+                self.tag_list.insertItem(1 + sorted(self._tag_items).index(tag), item)
+            item.setText(f'{tag} ({count})')
+        if self._current_tag in tags:
+            self.show_tag(self._current_tag)
+
+    def selected_paths(self):
+        rows = sorted({index.row() for index in self.right_content.selectedIndexes()})
+        items = (self.right_content.item(row, 0) for row in rows)
+        return [item.data(Qt.UserRole) for item in items if item is not None and item.data(Qt.UserRole)]
+
+    def show_table_menu(self, pos):
+        paths = self.selected_paths()
+        if not paths:
+            return
+        menu = QMenu(self)
+        menu.addAction(self.i18n.get_text('tags.menu.add'), lambda: self.add_tags_to(paths))
+        tags = sorted({tag for path in paths for tag in self.tag_store.tags_of(path)})
+        remove_action = menu.addAction(self.i18n.get_text('tags.menu.remove'),
+                                       lambda: self.remove_tags_from(paths, tags))
+        remove_action.setEnabled(bool(tags))
+        menu.exec_(self.right_content.viewport().mapToGlobal(pos))
+
+    def add_tags_to(self, paths):
+        text, ok = QInputDialog.getText(self, self.i18n.get_text('tags.add.title'),
+                                        self.i18n.get_text('tags.add.prompt').format(count=len(paths)))
+        tags = [tag for tag in text.replace('，', ',').split(',') if tag.strip()] if ok else []
+        if tags:
+            # 一次批量操作，延迟合并为一次写盘
+            self.tag_store.apply(paths, tags)
+            self.sync_record_tags(paths)
+
+    def remove_tags_from(self, paths, tags):
+        tag, ok = QInputDialog.getItem(self, self.i18n.get_text('tags.remove.title'),
+                                       self.i18n.get_text('tags.remove.prompt').format(count=len(paths)),
+                                       tags, 0, False)
+        if ok and tag:
+            self.tag_store.remove(paths, [tag])
+            self.sync_record_tags(paths)
+
+    def sync_record_tags(self, paths):
+        # 标签修改写回内存中的记录（搜索与目录快照使用这些记录），各库的record.json在退出时批量写回
+        records = [self.records_by_path[key] for key in map(normalize_path, paths) if key in self.records_by_path]
+        for record in self.tag_store.apply_to_records(records):
+            if record.get('library_path'):
+                self._tag_edited_libraries.add(record['library_path'])
+
+    def show_tag_menu(self, pos):
+        item = self.tag_list.itemAt(pos)
+        tag = item.data(Qt.UserRole + 1) if item is not None and item.data(Qt.UserRole) == 'tag' else None
+        menu = QMenu(self)
+        menu.addAction(self.i18n.get_text('tags.menu.create'), self.create_tag)
+        if tag is not None:
+            menu.addAction(self.i18n.get_text('tags.menu.rename'), lambda: self.rename_tag(tag))
+            menu.addAction(self.i18n.get_text('tags.menu.delete'), lambda: self.delete_tag(tag))
+        menu.exec_(self.tag_list.viewport().mapToGlobal(pos))
+
+    def create_tag(self):
+        name, ok = QInputDialog.getText(self, self.i18n.get_text('tags.create.title'),
+                                        self.i18n.get_text('tags.create.prompt'))
+        if ok and name.strip():
+            self.tag_store.create(name)
+
+    def rename_tag(self, tag):
+        name, ok = QInputDialog.getText(self, self.i18n.get_text('tags.rename.title'),
+                                        self.i18n.get_text('tags.rename.prompt'), QLineEdit.Normal, tag)
+        if ok and name.strip() and name != tag:
+            if self._current_tag == tag:
+                self._current_tag = ' '.join(name.split())
+            paths = self.tag_store.paths_with(tag)
+            self.tag_store.rename(tag, name)
+            self.sync_record_tags(paths)
+
+    def delete_tag(self, tag):
+        count = self.tag_store.count(tag) or 0
+        if QMessageBox.question(self, self.i18n.get_text('tags.delete.title'),
+                                self.i18n.get_text('tags.delete.confirm').format(tag=tag, count=count)) \
+                == QMessageBox.Yes:
+            paths = self.tag_store.paths_with(tag)
+            self.tag_store.delete(tag)
+            self.sync_record_tags(paths)
+
+    def on_reading_state_changed(self, key, entry):
+        # 阅读器翻页后只更新这一行的阅读状态列，并在这一行上重新判断合集成员
+        if self.record_store is None:
+            return
+        rows = self.record_store.rows_of([key], normalized=True)
+        if rows.size:
+            self.record_store.set_reading_state(rows[0], entry)
+            self.refresh_collection_items(self.collections.update_rows(rows))
+
+    def refresh_collection_items(self, names=None):
+        # 更新合集项的成员数；names为None时按合集列表重建全部项
+        if not hasattr(self, 'collection_list'):
+            return
+        if names is None:
+            self.collection_list.clear()
+            self._collection_items = {}
+            for name in self.collections.names():
+                item = QListWidgetItem()
+                item.setData(Qt.UserRole, name)
+                self.collection_list.addItem(item)
+                self._collection_items[name] = item
+            names = self.collections.names()
+        for name in names:
+            item = self._collection_items.get(name)
+            if item is not None:
+                item.setText(f'{name} ({self.collections.count(name)})')
+        if self._current_collection in names:
+            self.show_collection(self._current_collection)
+
+    def on_smart_collection_changed(self, current, previous):
+        if current is None:
+            return
+        self.leave_dynamic_views(keep='collection')
+        self._current_collection = current.data(Qt.UserRole)
+        self.show_collection(self._current_collection)
+
+    def leave_dynamic_views(self, keep=None):
+        # 切换到其他视图时取消标签与智能合集的选中：之后标签或成员变化不再把表格切回它们，
+        # 再次点击同一项也会重新触发currentItemChanged；keep为正在切换到的视图
+        if keep != 'tag':
+            self._current_tag = None
+            if hasattr(self, 'tag_list') and self.tag_list.currentItem() is not None:
+                self.tag_list.setCurrentItem(None)
+        if keep != 'collection':
+            self._current_collection = None
+            if hasattr(self, 'collection_list') and self.collection_list.currentItem() is not None:
+                self.collection_list.setCurrentItem(None)
+
+    def show_collection(self, name):
+        if name not in self.collections or self.record_store is None:
+            return
+        rows = self.collections.members(name)
+        self.statusBar().showMessage(
+            self.i18n.get_text('collections.status').format(name=name, count=len(rows)))
+        self.show_rows(rows)
+
+    def show_collection_menu(self, pos):
+        item = self.collection_list.itemAt(pos)
+        menu = QMenu(self)
+        menu.addAction(self.i18n.get_text('collections.menu.create'), self.edit_collection)
+        if item is not None:
+            name = item.data(Qt.UserRole)
+            menu.addAction(self.i18n.get_text('collections.menu.edit'), lambda: self.edit_collection(name))
+            menu.addAction(self.i18n.get_text('collections.menu.delete'), lambda: self.delete_collection(name))
+        menu.exec_(self.collection_list.viewport().mapToGlobal(pos))
+
+    def edit_collection(self, name=None):
+        from collection_dialog import SmartCollectionDialog
+        query = self.collections.query(name) if name is not None else None
+        dialog = SmartCollectionDialog(self.i18n, self.libraries, name or '', query, self)
+        if dialog.exec_() != QDialog.Accepted:
+            return
+        new_name = dialog.name()
+        if new_name != name and new_name in self.collections:
+            QMessageBox.warning(self, self.i18n.get_text('collections.dialog.title'),
+                                self.i18n.get_text('collections.duplicate').format(name=new_name))
+            return
+        if name is not None:
+            self.collections.rename(name, new_name)
+        self.collections.set(new_name, dialog.query)
+        save_collections(self.collections.collections())
+        self._current_collection = new_name if self._current_collection in (name, new_name) else self._current_collection
+        self.refresh_collection_items()
+
+    def delete_collection(self, name):
+        if QMessageBox.question(self, self.i18n.get_text('collections.delete.title'),
+                                self.i18n.get_text('collections.delete.confirm').format(name=name)) != QMessageBox.Yes:
+            return
+        self.collections.remove(name)
+        save_collections(self.collections.collections())
+        if self._current_collection == name:
+            self._current_collection = None
+        self.refresh_collection_items()
 
     def init_sidebar(self):
         # 创建侧边栏部件
@@ -322,6 +755,11 @@ class ComicLibraryWindow(QMainWindow):
         all_comics_btn.clicked.connect(lambda: self.load_special_category('all_comics'))
         buttons_layout.addWidget(all_comics_btn)
         
+        # 最近阅读按钮
+        recently_read_btn = QPushButton(self.i18n.get_text('main_window.sidebar.recently_read'))
+        recently_read_btn.clicked.connect(lambda: self.load_special_category('recently_read'))
+        buttons_layout.addWidget(recently_read_btn)
+        
         # 加载库配置并创建按钮
         self.libraries = ComicLibraryUtils.load_libraries_config()
         for lib in self.libraries:
@@ -348,12 +786,29 @@ class ComicLibraryWindow(QMainWindow):
         self.tag_list.addItem(self.favorite_item)
         # 连接标签列表点击事件
         self.tag_list.currentItemChanged.connect(self.on_collection_item_changed)
+        self.tag_list.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.tag_list.customContextMenuRequested.connect(self.show_tag_menu)
+        # 标签及其计数由标签存储增量维护，修改后只刷新变化的标签项
+        self.refresh_tag_items()
+        self.tag_store.subscribe(self.refresh_tag_items)
         tag_layout.addWidget(self.tag_list)
         self.tag_group.setLayout(tag_layout)
 
+        # 3. 智能合集部分
+        self.collection_group = QGroupBox(self.i18n.get_text('collections.group'))
+        collection_layout = QVBoxLayout()
+        self.collection_list = QListWidget()
+        self.collection_list.currentItemChanged.connect(self.on_smart_collection_changed)
+        self.collection_list.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.collection_list.customContextMenuRequested.connect(self.show_collection_menu)
+        self.refresh_collection_items()
+        collection_layout.addWidget(self.collection_list)
+        self.collection_group.setLayout(collection_layout)
+
         # 添加到主布局
         sidebar_layout.addWidget(self.library_group)
         sidebar_layout.addWidget(self.tag_group)
+        sidebar_layout.addWidget(self.collection_group)
 
         # 加载库配置
         self.libraries = ComicLibraryUtils.load_libraries_config()
@@ -375,9 +830,16 @@ class ComicLibraryWindow(QMainWindow):
         self.import_action.triggered.connect(self.import_comics)
         self.toolbar.addAction(self.import_action)
         
+        # 取消扫描按钮，只在后台扫描时可用
+        self.cancel_scan_action = QAction(self.i18n.get_text('main_window.toolbar.cancel_scan'), self)
+        self.cancel_scan_action.setEnabled(False)
+        self.cancel_scan_action.triggered.connect(lambda: self.cancel_library_scan())
+        self.toolbar.addAction(self.cancel_scan_action)
+        
         return self.toolbar
     
     def open_settings_dialog(self):
+        from settings_dialog import SettingsDialog
         dialog = SettingsDialog(self.i18n, self)
         if dialog.exec_() == QDialog.Accepted:
             # 重新加载语言设置
@@ -440,6 +902,8 @@ class ComicLibraryWindow(QMainWindow):
         # 更新设置对话框标题
         if hasattr(self, 'settings_action'):
             self.settings_action.setText(self.i18n.get_text('main_window.toolbar.settings'))
+        if hasattr(self, 'cancel_scan_action'):
+            self.cancel_scan_action.setText(self.i18n.get_text('main_window.toolbar.cancel_scan'))
 
     def load_library_files(self, category=None, library_id=None):
         self.right_content.clear()
@@ -456,8 +920,13 @@ class ComicLibraryWindow(QMainWindow):
             
         self.statusBar().showMessage(f'共找到 {len(records)} 个文件')
         
-        # 使用通用表格填充方法处理所有记录
-        self.populate_table(records)
+        if category is None and library_id is None and self.record_store is not None:
+            # 全部漫画由列式索引显示，支持点击表头排序
+            self.show_rows(self.record_store.all_rows())
+        else:
+            self._view_rows = None
+            # 使用通用表格填充方法处理所有记录
+            self.populate_table(records)
         
         # 调整列宽
         self.right_content.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
@@ -507,7 +976,7 @@ class ComicLibraryWindow(QMainWindow):
         except Exception as e:
             self.status_bar.showMessage(self.i18n.get_text("import.failed"))
             QMessageBox.critical(self, self.i18n.get_text("import.error.title"),
-                               f"{self.i18n.get_text("import.error.details")}: {str(e)}")
+                               f"{self.i18n.get_text('import.error.details')}: {str(e)}")
 
     def _import_folder(self, folder_path):
         # 获取文件夹信息
@@ -548,18 +1017,10 @@ class ComicLibraryWindow(QMainWindow):
         import_time = datetime.datetime.now(datetime.UTC).isoformat() + 'Z'
         archive_type = os.path.splitext(archive_path)[1][1:].lower()
 
-        # 检查是否安装了必要的压缩包处理库
-        try:
-            import patoolib
-            from patoolib.util import PatoolError
-        except ImportError:
-            raise Exception(self.i18n.get_text("import.error.missing_library").format(library="patoolib"))
-
-        # 检查压缩包是否有效
-        try:
-            patoolib.test_archive(archive_path)
-        except PatoolError as e:
-            raise Exception(self.i18n.get_text("import.error.invalid_archive").format(type=archive_type, error=str(e)))
+        # 快速校验压缩包：只检查文件头与目录结构，不解压全部内容
+        error = check_file(archive_path, LEVEL_QUICK)
+        if error:
+            raise Exception(self.i18n.get_text("import.error.invalid_archive").format(type=archive_type, error=error))
 
         # 创建文件记录
         file_record = {
@@ -610,6 +1071,7 @@ class ComicLibraryWindow(QMainWindow):
             json.dump(data, f, ensure_ascii=False, indent=2)
 
     def open_settings(self):
+        from settings_dialog import SettingsDialog
         dialog = SettingsDialog(self.i18n, self)
         if dialog.exec_() == QDialog.Accepted:
             # 重新加载语言
@@ -0,0 +1,163 @@
+'''
+@version 1.0
+@brief 阅读进度与历史记录存储，翻页更新延迟合并写盘
+@author 炎刃
+@date 2026-10-19
+'''
+import os
+import json
+import time
+import threading
+from collections import OrderedDict
+
+from .app_cache import atomic_write_bytes
+
+DEFAULT_STATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'reading_state.json')
+
+# 翻页后等待无新操作多久再写盘（秒）
+FLUSH_DELAY = 2.0
+# 连续翻页时距首次未保存修改的最长写盘间隔（秒）
+MAX_FLUSH_DELAY = 10.0
+
+
+def normalize_path(path):
+    """统一路径写法作为记录键，保证阅读器与库窗口使用相同的键"""
+    return os.path.normcase(os.path.abspath(path))
+
+
+class ReadingStateStore:
+    """阅读状态存储
+
+    每本漫画记录当前页（从0开始）、总页数和最后阅读时间last_read（时间戳）。
+    内存中按last_read维护有序索引，最近阅读列表直接由索引得到，无需遍历排序全部记录。
+    """
+
+    def __init__(self, state_path=DEFAULT_STATE_PATH, flush_delay=FLUSH_DELAY, max_flush_delay=MAX_FLUSH_DELAY):
+        self.state_path = state_path
+        self.flush_delay = flush_delay
+        self.max_flush_delay = max_flush_delay
+        self._entries = {}
+        self._recent = OrderedDict()  # 路径 -> last_read，末尾为最近阅读
+        self._lock = threading.RLock()
+        self._timer = None
+        self._dirty_since = None
+        self._listeners = []
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            entries = data.get('entries', {})
+        except FileNotFoundError:
+            entries = {}
+        except (OSError, ValueError) as e:
+            print(f'读取阅读记录失败: {e}')
+            entries = {}
+        with self._lock:
+            self._entries = entries
+            self._recent = OrderedDict(
+                (path, entry['last_read'])
+                for path, entry in sorted(entries.items(), key=lambda item: item[1].get('last_read', 0))
+            )
+
+    def subscribe(self, callback):
+        """监听阅读状态变化，callback(规范化路径, 状态dict或None)在修改的线程中调用"""
+        self._listeners.append(callback)
+
+    def _notify(self, key, entry):
+        for callback in list(self._listeners):
+            try:
+                callback(key, entry)
+            except Exception as e:
+                print(f'阅读状态回调失败: {e}')
+
+    def get(self, path):
+        """返回阅读状态dict（page/page_count/last_read），没有记录时返回None"""
+        with self._lock:
+            entry = self._entries.get(normalize_path(path))
+            return dict(entry) if entry else None
+
+    def entries(self):
+        """返回全部阅读状态的副本{规范化路径: 状态}"""
+        with self._lock:
+            return {path: dict(entry) for path, entry in self._entries.items()}
+
+    def get_page(self, path):
+        entry = self.get(path)
+        return entry['page'] if entry else 0
+
+    def update(self, path, page, page_count=None):
+        """记录翻页，写盘延迟到翻页停止后合并进行"""
+        key = normalize_path(path)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.setdefault(key, {})
+            entry['page'] = page
+            if page_count is not None:
+                entry['page_count'] = page_count
+            entry['last_read'] = now
+            self._recent[key] = now
+            self._recent.move_to_end(key)
+            if self._dirty_since is None:
+                self._dirty_since = now
+            self._schedule_flush(now)
+            entry = dict(entry)
+        self._notify(key, entry)
+
+    def remove(self, path):
+        key = normalize_path(path)
+        with self._lock:
+            if self._entries.pop(key, None) is None:
+                return
+            self._recent.pop(key, None)
+            if self._dirty_since is None:
+                self._dirty_since = time.time()
+            self._schedule_flush(time.time())
+        self._notify(key, None)
+
+    def recent(self, limit=None):
+        """按最后阅读时间倒序返回漫画路径列表"""
+        with self._lock:
+            paths = list(reversed(self._recent))
+        return paths[:limit] if limit else paths
+
+    def _schedule_flush(self, now):
+        if self._timer:
+            self._timer.cancel()
+        # 持续翻页时不无限推迟，超过最长间隔立即写盘
+        delay = min(self.flush_delay, max(0.0, self._dirty_since + self.max_flush_delay - now))
+        self._timer = threading.Timer(delay, self.flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def flush(self):
+        """立即写盘（没有未保存修改时直接返回）"""
+        with self._lock:
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+            if self._dirty_since is None:
+                return True
+            data = json.dumps({'version': 1, 'entries': self._entries}, ensure_ascii=False, indent=2)
+            try:
+                os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+                atomic_write_bytes(self.state_path, data.encode('utf-8'))
+            except OSError as e:
+                print(f'保存阅读记录失败: {e}')
+                return False
+            self._dirty_since = None
+            return True
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_reading_state_store():
+    """返回进程内共享的阅读状态存储，库窗口与阅读器使用同一实例"""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = ReadingStateStore()
+        return _default_store
@@ -0,0 +1,150 @@
+'''
+@version 1.0
+@brief 库记录文件的读写：小库为单个record.json，大库按一级子目录分片保存，
+       record.json只保存分片清单，改动一个目录只重写对应的分片
+@author 炎刃
+@date 2026-10-19
+'''
+import os
+import json
+import hashlib
+
+from .app_cache import atomic_write_bytes
+
+RECORD_FILE = 'record.json'
+# 分片所在的子目录（位于库目录下）
+SHARD_DIR = 'records'
+SHARD_FORMAT = 'sharded'
+SHARD_VERSION = 1
+# 记录数达到该值时改为分片保存；已分片的库不再合并回单文件
+SHARD_THRESHOLD = 5000
+
+
+def shard_key(full_path, library_path):
+    """记录所属分片：库内一级子目录名，库根目录下的文件为空字符串"""
+    rel_path = os.path.relpath(full_path, library_path) if full_path else ''
+    parts = rel_path.split(os.sep)
+    if len(parts) < 2 or parts[0] == os.pardir:
+        return ''
+    return parts[0]
+
+
+def shard_file_name(key, digest):
+    # 目录名可能含有文件系统不允许或大小写冲突的字符，分片文件名取其哈希；
+    # 文件名带内容摘要，内容变化时写入新文件而不覆盖旧清单仍引用的分片
+    return f"shard_{hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]}_{digest[:16]}.json"
+
+
+def _dumps(data):
+    return json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+
+
+def _read_manifest(record_path):
+    """record.json为分片清单时返回清单，否则（单文件或不存在）返回None
+
+    只先读开头判断：单文件格式以'['开头，不必为此解析整个大文件。
+    """
+    try:
+        with open(record_path, 'r', encoding='utf-8') as f:
+            if f.read(64).lstrip()[:1] != '{':
+                return None
+            f.seek(0)
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return data if is_manifest(data) else None
+
+
+def is_manifest(data):
+    return isinstance(data, dict) and data.get('format') == SHARD_FORMAT
+
+
+def read_record_data(library_path, keys=None):
+    """读取库的记录数据（JSON解析结果）
+
+    Args:
+        library_path: 库目录
+        keys: 分片库只读取这些一级子目录的分片（按需加载），None为全部；单文件库忽略此参数
+
+    Returns:
+        单文件库为record.json的原始内容；分片库为各分片记录拼接成的列表
+
+    Raises:
+        OSError/ValueError: 文件不存在、分片缺失或内容损坏
+    """
+    record_path = os.path.join(library_path, RECORD_FILE)
+    with open(record_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if not is_manifest(data):
+        return data
+    if data.get('version') != SHARD_VERSION:
+        raise ValueError(f"不支持的分片版本: {data.get('version')}")
+    records = []
+    for key, entry in data['shards'].items():
+        if keys is not None and key not in keys:
+            continue
+        with open(os.path.join(library_path, SHARD_DIR, entry['file']), 'r', encoding='utf-8') as f:
+            shard = json.load(f)
+        if not isinstance(shard, list):
+            raise ValueError(f"分片格式错误: {entry['file']}")
+        records.extend(shard)
+    return records
+
+
+def write_record_data(library_path, records, shard_threshold=SHARD_THRESHOLD):
+    """写入库的记录
+
+    记录数未达到阈值且尚未分片时写单个record.json（与旧版本兼容）；否则按一级子目录分组，
+    内容摘要与清单中一致的分片跳过不写。分片按内容命名，变化的分片写入新文件，
+    全部写好后再原子替换清单，最后删除新清单不再引用的分片文件。
+
+    Args:
+        library_path: 库目录
+        records: 可JSON序列化的记录dict列表（records_to_json的结果）
+        shard_threshold: 改为分片保存的记录数
+
+    Returns:
+        int: 实际写入的文件数
+
+    Raises:
+        OSError: 写入失败
+    """
+    record_path = os.path.join(library_path, RECORD_FILE)
+    manifest = _read_manifest(record_path)
+    if manifest is None and len(records) < shard_threshold:
+        atomic_write_bytes(record_path, _dumps(records))
+        return 1
+
+    groups = {}
+    for record in records:
+        groups.setdefault(shard_key(record.get('full_path'), library_path), []).append(record)
+    old_shards = manifest['shards'] if manifest else {}
+    shard_dir = os.path.join(library_path, SHARD_DIR)
+    os.makedirs(shard_dir, exist_ok=True)
+
+    written = 0
+    shards = {}
+    for key, group in groups.items():
+        data = _dumps(group)
+        digest = hashlib.sha1(data).hexdigest()
+        entry = {'file': shard_file_name(key, digest), 'count': len(group), 'digest': digest}
+        shard_path = os.path.join(shard_dir, entry['file'])
+        if old_shards.get(key) != entry or not os.path.exists(shard_path):
+            atomic_write_bytes(shard_path, data)
+            written += 1
+        shards[key] = entry
+    if shards == old_shards:
+        return written
+
+    # 新分片都写在新文件名下，替换清单前中途失败时旧清单仍指向未被改动的旧分片
+    atomic_write_bytes(record_path, _dumps({'format': SHARD_FORMAT, 'version': SHARD_VERSION, 'shards': shards}))
+    written += 1
+    # 清单替换后删除不再引用的分片：旧版本的分片，以及此前中途失败留下的未引用新分片
+    referenced = {entry['file'] for entry in shards.values()}
+    for name in os.listdir(shard_dir):
+        if name.startswith('shard_') and name.endswith('.json') and name not in referenced:
+            try:
+                os.remove(os.path.join(shard_dir, name))
+            except OSError:
+                pass
+    return written
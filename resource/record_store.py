@@ -0,0 +1,223 @@
+'''
+@version 1.0
+@brief 列式记录存储：排序与筛选用到的字段保存为NumPy数组，排序、筛选、按库汇总均为向量化运算
+@author 炎刃
+@date 2026-10-19
+'''
+from .lazy_import import load_numpy
+from .comic_record import ComicRecord
+from .page_manifest import natural_sort_key
+from .reading_state import normalize_path
+
+# 可用于sort()的键
+SORT_KEYS = ('name', 'size', 'modified_time', 'last_read', 'progress', 'rating')
+
+
+class StringTable:
+    """字符串驻留表：相同字符串只保存一份，列中只存整数编号"""
+
+    def __init__(self):
+        self.values = []
+        self._index = {}
+
+    def __len__(self):
+        return len(self.values)
+
+    def intern(self, value):
+        """返回字符串的编号，不存在时追加"""
+        index = self._index.get(value)
+        if index is None:
+            index = len(self.values)
+            self._index[value] = index
+            self.values.append(value)
+        return index
+
+    def find(self, value):
+        """返回已有字符串的编号，不存在时返回-1"""
+        return self._index.get(value, -1)
+
+
+class RecordStore:
+    """漫画记录的列式索引
+
+    原始记录（ComicRecord或dict）仍保存在records中，按行号对应；
+    大小、修改时间、最后阅读时间、阅读进度、评分、收藏标记与库编号各为一列NumPy数组，
+    库路径保存在字符串表中。sort/select返回行号数组，用records_at取回记录。
+    名称排序使用预先计算的自然顺序名次，首次按名称排序时计算一次。
+    """
+
+    def __init__(self, records=()):
+        self.load(records)
+
+    def load(self, records):
+        """由记录列表重建全部列"""
+        np = load_numpy()
+        self.records = list(records)
+        self.libraries = StringTable()
+        intern = self.libraries.intern
+        size, modified_time, rating, favorite, library = [], [], [], [], []
+        # 单次遍历收集各列：ComicRecord直接读取槽位，避免每个字段都走映射接口
+        for record in self.records:
+            if isinstance(record, ComicRecord):
+                values = (record.size, record.modified_time, record.rating, record.favorite, record.library_path)
+            else:
+                values = (record.get('size'), record.get('modified_time'), record.get('rating'),
+                          record.get('favorite'), record.get('library_path'))
+            size.append(values[0] or 0)
+            modified_time.append(_float(values[1]))
+            rating.append(values[2] or 0)
+            favorite.append(bool(values[3]))
+            library.append(intern(values[4] or ''))
+        count = len(self.records)
+        self.size = np.array(size, dtype=np.int64)
+        self.modified_time = np.array(modified_time, dtype=np.float64)
+        self.rating = np.array(rating, dtype=np.int8)
+        self.favorite = np.array(favorite, dtype=np.bool_)
+        self.library = np.array(library, dtype=np.int32)
+        self.last_read = np.full(count, np.nan)
+        self.progress = np.full(count, np.nan, dtype=np.float32)
+        self._name_rank = None
+        self._row_by_path = None
+
+    def __len__(self):
+        return len(self.records)
+
+    def _get_row_by_path(self):
+        # 规范化路径开销较大，首次按路径查找时才建立索引
+        if self._row_by_path is None:
+            self._row_by_path = {normalize_path(record['full_path']): row
+                                 for row, record in enumerate(self.records) if record.get('full_path')}
+        return self._row_by_path
+
+    def row_of(self, path):
+        """文件路径对应的行号，不存在时返回None"""
+        return self._get_row_by_path().get(normalize_path(path))
+
+    def rows_of(self, paths, normalized=False):
+        """一组文件路径对应的行号数组（按行号排序），不在索引中的路径忽略
+
+        Args:
+            normalized: 路径已经过normalize_path（如来自阅读状态或标签存储的键）
+        """
+        np = load_numpy()
+        row_by_path = self._get_row_by_path()
+        if not normalized:
+            paths = map(normalize_path, paths)
+        rows = [row for row in map(row_by_path.get, paths) if row is not None]
+        return np.sort(np.array(rows, dtype=np.int64))
+
+    def records_at(self, rows):
+        return [self.records[row] for row in rows]
+
+    def all_rows(self):
+        return load_numpy().arange(len(self.records))
+
+    def apply_reading_state(self, reading_state):
+        """从阅读状态存储刷新最后阅读时间与阅读进度列
+
+        查找只遍历有阅读记录的漫画，不逐条检查全部记录。
+        """
+        np = load_numpy()
+        self.last_read.fill(np.nan)
+        self.progress.fill(np.nan)
+        row_by_path = self._get_row_by_path()
+        for path, entry in reading_state.entries().items():
+            row = row_by_path.get(path)
+            if row is not None:
+                self.set_reading_state(row, entry)
+
+    def set_reading_state(self, row, entry):
+        """更新单行的阅读状态（阅读器翻页后增量更新），entry为None表示阅读记录已删除"""
+        entry = entry or {}
+        self.last_read[row] = _float(entry.get('last_read'))
+        page_count = entry.get('page_count')
+        self.progress[row] = min(1.0, (entry.get('page', 0) + 1) / page_count) if page_count else float('nan')
+
+    def _get_name_rank(self):
+        if self._name_rank is None:
+            np = load_numpy()
+            order = sorted(range(len(self.records)),
+                           key=lambda row: natural_sort_key(self.records[row].get('name') or ''))
+            rank = np.empty(len(self.records), np.int32)
+            rank[np.asarray(order, dtype=np.int64)] = np.arange(len(self.records), dtype=np.int32)
+            self._name_rank = rank
+        return self._name_rank
+
+    def _column(self, key):
+        if key == 'name':
+            return self._get_name_rank()
+        if key not in SORT_KEYS:
+            raise ValueError(f'不支持的排序字段: {key}')
+        return getattr(self, key)
+
+    def sort(self, key, descending=False, rows=None):
+        """按字段排序
+
+        Args:
+            key: SORT_KEYS之一
+            descending: 是否倒序
+            rows: 只对这些行排序，默认全部行
+
+        Returns:
+            ndarray: 排序后的行号；相同值保持原有顺序，缺失值（如未读的last_read）总在最后
+        """
+        np = load_numpy()
+        rows = self.all_rows() if rows is None else np.asarray(rows, dtype=np.int64)
+        values = self._column(key)[rows]
+        if descending:
+            # 取负后稳定排序，相同值仍保持原顺序；NaN取负仍为NaN，排在最后
+            values = -values.astype(np.float64 if values.dtype.kind == 'f' else np.int64)
+        return rows[np.argsort(values, kind='stable')]
+
+    def select(self, library=None, favorite=None, read=None, min_size=None, max_size=None,
+               modified_after=None, rows=None):
+        """按条件筛选，条件之间为与关系，None表示不限制
+
+        Args:
+            library: 库路径
+            favorite: 是否收藏
+            read: True只保留读过的，False只保留未读的
+            min_size/max_size: 文件大小范围（字节）
+            modified_after: 修改时间下限（时间戳）
+            rows: 在这些行中筛选，默认全部行
+
+        Returns:
+            ndarray: 满足条件的行号（保持原顺序）
+        """
+        np = load_numpy()
+        mask = np.ones(len(self.records), dtype=np.bool_)
+        if library is not None:
+            mask &= self.library == self.libraries.find(library)
+        if favorite is not None:
+            mask &= self.favorite == bool(favorite)
+        if read is not None:
+            mask &= ~np.isnan(self.last_read) if read else np.isnan(self.last_read)
+        if min_size is not None:
+            mask &= self.size >= min_size
+        if max_size is not None:
+            mask &= self.size <= max_size
+        if modified_after is not None:
+            mask &= self.modified_time >= modified_after
+        if rows is not None:
+            rows = np.asarray(rows, dtype=np.int64)
+            return rows[mask[rows]]
+        return np.flatnonzero(mask)
+
+    def total_size_by_library(self, rows=None):
+        """按库汇总文件大小，返回{库路径: 字节数}"""
+        np = load_numpy()
+        library, size = (self.library, self.size) if rows is None else (self.library[rows], self.size[rows])
+        totals = np.bincount(library, weights=size, minlength=len(self.libraries))
+        return {path: int(total) for path, total in zip(self.libraries.values, totals)}
+
+    def count_by_library(self, rows=None):
+        """按库统计记录数，返回{库路径: 数量}"""
+        np = load_numpy()
+        library = self.library if rows is None else self.library[rows]
+        counts = np.bincount(library, minlength=len(self.libraries))
+        return {path: int(count) for path, count in zip(self.libraries.values, counts)}
+
+
+def _float(value):
+    """数值时间戳，缺失或非数值时为NaN"""
+    return float(value) if isinstance(value, (int, float)) else float('nan')
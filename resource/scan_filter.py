@@ -0,0 +1,185 @@
+'''
+@version 1.0
+@brief 库扫描过滤：按库配置的包含/排除通配规则、最大深度与符号链接策略遍历目录，
+       规则预先编译为正则，被排除的目录在进入前剪枝
+@author 炎刃
+@date 2026-10-19
+'''
+import os
+import re
+import fnmatch
+import threading
+
+# 符号链接策略
+SYMLINKS_SKIP = 'skip'      # 忽略所有符号链接
+SYMLINKS_FILES = 'files'    # 收录指向文件的链接，不进入指向目录的链接（与os.walk默认行为一致）
+SYMLINKS_FOLLOW = 'follow'  # 进入指向目录的链接，已访问过的目录不重复进入，避免循环
+SYMLINK_POLICIES = (SYMLINKS_SKIP, SYMLINKS_FILES, SYMLINKS_FOLLOW)
+
+# 默认排除：版本库、系统与下载临时文件
+DEFAULT_EXCLUDE = ('.git', '.svn', '.hg', '__pycache__', '@eaDir', '$RECYCLE.BIN',
+                   'System Volume Information', '.DS_Store', '*.tmp', '*.part', '*.crdownload')
+
+# 文件系统不区分大小写时（Windows）规则也不区分大小写
+_FLAGS = re.IGNORECASE if os.path.normcase('A') == 'a' else 0
+
+
+def _compile(patterns):
+    """把一组通配规则编译为(名称正则, 路径正则)
+
+    不含'/'的规则匹配任意层级的文件或目录名；含'/'的规则匹配相对库根目录的路径，
+    开头的'/'只表示从库根目录开始。'*'可以跨越'/'。
+    """
+    names, paths = [], []
+    for pattern in patterns:
+        pattern = pattern.replace('\\', '/').rstrip('/')
+        if not pattern:
+            continue
+        if '/' in pattern:
+            paths.append(fnmatch.translate(pattern.lstrip('/')))
+        else:
+            names.append(fnmatch.translate(pattern))
+    return (re.compile('|'.join(names), _FLAGS).match if names else None,
+            re.compile('|'.join(paths), _FLAGS).match if paths else None)
+
+
+def _matches(matchers, name, rel_path):
+    name_match, path_match = matchers
+    return bool((name_match and name_match(name)) or (path_match and path_match(rel_path)))
+
+
+class ScanFilter:
+    """编译好的扫描规则
+
+    Args:
+        extensions: 接受的文件扩展名（小写，含点），None为不限
+        include: 文件必须匹配其中之一的通配规则，为空时不限制
+        exclude: 排除的文件或目录通配规则，目录被排除时整个子树都不进入
+        max_depth: 最大目录深度，库根目录为0，None为不限
+        symlinks: 符号链接策略，SYMLINK_POLICIES之一
+    """
+
+    def __init__(self, extensions=None, include=(), exclude=DEFAULT_EXCLUDE, max_depth=None,
+                 symlinks=SYMLINKS_FILES):
+        if symlinks not in SYMLINK_POLICIES:
+            raise ValueError(f'不支持的符号链接策略: {symlinks}')
+        if max_depth is not None and (not isinstance(max_depth, int) or max_depth < 0):
+            raise ValueError(f'无效的最大深度: {max_depth}')
+        self.extensions = frozenset(ext.lower() for ext in extensions) if extensions is not None else None
+        self.include = tuple(include)
+        self.exclude = tuple(exclude)
+        self.max_depth = max_depth
+        self.symlinks = symlinks
+        self._include = _compile(self.include)
+        self._exclude = _compile(self.exclude)
+        self._visited_lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config, extensions=None, exclude=()):
+        """由库配置中的scan项创建
+
+        配置格式：{"include": [...], "exclude": [...], "max_depth": 3, "symlinks": "files"}，
+        exclude在默认排除规则之外追加。遍历方式相关的项（network、concurrency）由scan_fs.make_scanner处理。
+
+        Args:
+            config: 库配置的scan项，可为None
+            extensions: 调用方支持的文件扩展名
+            exclude: 调用方固定追加的排除规则（如库内的封面目录）
+        """
+        config = config or {}
+        return cls(extensions=extensions,
+                   include=config.get('include') or (),
+                   exclude=DEFAULT_EXCLUDE + tuple(exclude) + tuple(config.get('exclude') or ()),
+                   max_depth=config.get('max_depth'),
+                   symlinks=config.get('symlinks') or SYMLINKS_FILES)
+
+    @property
+    def key(self):
+        """规则的可比较表示，规则变化时扫描结果可能不同（用于使缓存失效）"""
+        extensions = tuple(sorted(self.extensions)) if self.extensions is not None else None
+        return (extensions, self.include, self.exclude, self.max_depth, self.symlinks)
+
+    def accepts_file(self, name, rel_path):
+        if self.extensions is not None and os.path.splitext(name)[1].lower() not in self.extensions:
+            return False
+        if _matches(self._exclude, name, rel_path):
+            return False
+        return not self.include or _matches(self._include, name, rel_path)
+
+    def accepts_dir(self, name, rel_path):
+        return not _matches(self._exclude, name, rel_path)
+
+    def list_dir(self, path, rel_dir, depth, fs=os, visited=None):
+        """列出单个目录中被接受的文件与要进入的子目录
+
+        Args:
+            path: 目录路径
+            rel_dir: 相对库根目录的路径
+            depth: 目录深度
+            fs: 提供scandir/stat的文件系统层，默认为os（测试与网络扫描可替换）
+            visited: SYMLINKS_FOLLOW时已进入目录的(st_dev, st_ino)集合
+
+        Returns:
+            tuple: (文件DirEntry列表, 子目录(路径, 相对路径, 深度)列表)；目录已访问过时返回None
+
+        Raises:
+            OSError: 目录无法读取
+        """
+        key = None
+        if visited is not None and self.symlinks == SYMLINKS_FOLLOW:
+            stat = fs.stat(path)
+            key = (stat.st_dev, stat.st_ino)
+            with self._visited_lock:
+                if key in visited:
+                    return None
+        files, subdirs = [], []
+        with fs.scandir(path) as entries:
+            for entry in entries:
+                rel_path = f'{rel_dir}/{entry.name}' if rel_dir else entry.name
+                try:
+                    is_link = entry.is_symlink()
+                    if is_link and self.symlinks == SYMLINKS_SKIP:
+                        continue
+                    is_dir = entry.is_dir(follow_symlinks=self.symlinks == SYMLINKS_FOLLOW)
+                except OSError:
+                    continue
+                if is_dir:
+                    if (self.max_depth is None or depth < self.max_depth) \
+                            and self.accepts_dir(entry.name, rel_path):
+                        subdirs.append((entry.path, rel_path, depth + 1))
+                elif not (is_link and entry.is_dir()) and self.accepts_file(entry.name, rel_path):
+                    files.append(entry)
+        if key is not None:
+            # 列出成功后才记为已访问，读取失败的目录重试时不会被当作已访问跳过；
+            # 并发列出同一目录时只保留先完成的一份
+            with self._visited_lock:
+                if key in visited:
+                    return None
+                visited.add(key)
+        return files, subdirs
+
+    def walk(self, root, fs=os):
+        """自顶向下遍历未被排除的目录
+
+        Yields:
+            tuple: (目录路径, 相对库根目录的路径('/'分隔，根目录为''), 该目录下被接受的文件DirEntry列表)
+        """
+        visited = set()
+        pending = [(root, '', 0)]
+        while pending:
+            path, rel_dir, depth = pending.pop()
+            try:
+                listing = self.list_dir(path, rel_dir, depth, fs, visited)
+            except OSError:
+                continue
+            if listing is None:
+                continue
+            files, subdirs = listing
+            yield path, rel_dir, files
+            # 倒序入栈，子目录按目录项顺序处理
+            pending.extend(reversed(subdirs))
+
+    def iter_files(self, root, fs=os):
+        """遍历root下被接受的文件，返回DirEntry"""
+        for _, _, files in self.walk(root, fs):
+            yield from files
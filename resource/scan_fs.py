@@ -0,0 +1,263 @@
+'''
+@version 1.0
+@brief 高延迟文件系统（SMB/NFS）的扫描：多个目录并发列出，文件元数据取自目录项的一次stat并在工作线程中预取，
+       并发数按出错情况自适应调整，出错的目录退避重试；另提供注入延迟与故障的文件系统层用于测试
+@author 炎刃
+@date 2026-10-19
+'''
+import os
+import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# 并发列目录数：初始值、下限与上限
+INITIAL_CONCURRENCY = 4
+MIN_CONCURRENCY = 1
+MAX_CONCURRENCY = 32
+# 暂时性错误的重试次数与退避时间（秒）
+MAX_RETRIES = 3
+BACKOFF_BASE = 0.05
+BACKOFF_MAX = 2.0
+
+# 重试无意义的错误：目录已删除、不是目录或无权限，与顺序扫描一样直接跳过
+_PERMANENT_ERRORS = (FileNotFoundError, NotADirectoryError, PermissionError)
+
+
+class AdaptiveConcurrency:
+    """加性增、乘性减的并发窗口
+
+    每次成功窗口增加1/窗口（约每完成一整个窗口的请求加1），出错时减半；
+    服务器过载或网络抖动时迅速降低压力，恢复后逐步回升。
+    """
+
+    def __init__(self, initial=INITIAL_CONCURRENCY, minimum=MIN_CONCURRENCY, maximum=MAX_CONCURRENCY):
+        self.minimum = minimum
+        self.maximum = maximum
+        self._window = float(min(max(initial, minimum), maximum))
+        self._lock = threading.Lock()
+        self.errors = 0
+
+    @property
+    def limit(self):
+        return int(self._window)
+
+    def on_success(self):
+        with self._lock:
+            self._window = min(self.maximum, self._window + 1 / self._window)
+
+    def on_error(self):
+        with self._lock:
+            self.errors += 1
+            self._window = max(self.minimum, self._window / 2)
+
+
+class ConcurrentWalker:
+    """并发遍历库目录，接口与ScanFilter.walk/iter_files相同
+
+    每个目录在工作线程中列出，并对接受的文件调用一次entry.stat()，
+    调用方随后读取entry.stat()时直接使用缓存的结果，不再产生网络往返。
+    目录按完成顺序返回（不保证与顺序遍历相同）。
+
+    Args:
+        scan_filter: scan_filter.ScanFilter
+        fs: 文件系统层（提供scandir/stat），默认为os
+        max_workers: 并发上限
+        initial: 初始并发数
+    """
+
+    def __init__(self, scan_filter, fs=os, max_workers=MAX_CONCURRENCY, initial=INITIAL_CONCURRENCY):
+        self.scan_filter = scan_filter
+        self.fs = fs
+        self.max_workers = max_workers
+        self.initial = initial
+        self.concurrency = None  # 最近一次遍历的AdaptiveConcurrency，供统计
+        self.failed = []  # 重试后仍无法读取的目录或文件：(路径, 错误)
+
+    @property
+    def key(self):
+        return self.scan_filter.key
+
+    def _list(self, item, visited):
+        """列出目录并预取文件stat，暂时性错误时退避重试"""
+        path, rel_dir, depth = item
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                listing = self.scan_filter.list_dir(path, rel_dir, depth, self.fs, visited)
+                break
+            except _PERMANENT_ERRORS:
+                return None
+            except OSError as e:
+                self.concurrency.on_error()
+                if attempt == MAX_RETRIES:
+                    self.failed.append((path, e))
+                    return None
+                # 指数退避加随机抖动，避免多个线程同时重试
+                delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt)
+                time.sleep(delay * random.uniform(0.5, 1.0))
+        self.concurrency.on_success()
+        if listing is None:
+            return None
+        files, subdirs = listing
+        return [entry for entry in files if self._prefetch(entry)], subdirs
+
+    def _prefetch(self, entry):
+        """预取文件stat，暂时性错误时退避重试；仍失败（或文件已消失、悬空链接）时只跳过该文件"""
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                entry.stat()
+                return True
+            except _PERMANENT_ERRORS:
+                return False
+            except OSError as e:
+                self.concurrency.on_error()
+                if attempt == MAX_RETRIES:
+                    self.failed.append((entry.path, e))
+                    return False
+                delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt)
+                time.sleep(delay * random.uniform(0.5, 1.0))
+
+    def walk(self, root):
+        """并发遍历，产出(目录路径, 相对路径, 文件DirEntry列表)"""
+        self.concurrency = AdaptiveConcurrency(self.initial, maximum=self.max_workers)
+        self.failed = []
+        visited = set()
+        pending = [(root, '', 0)]
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='scan') as pool:
+            while pending or running:
+                while pending and len(running) < self.concurrency.limit:
+                    item = pending.pop()
+                    running[pool.submit(self._list, item, visited)] = item
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path, rel_dir, _ = running.pop(future)
+                    listing = future.result()
+                    if listing is None:
+                        continue
+                    files, subdirs = listing
+                    pending.extend(reversed(subdirs))
+                    yield path, rel_dir, files
+
+    def iter_files(self, root):
+        for _, _, files in self.walk(root):
+            yield from files
+
+
+class _LatencyEntry:
+    """为目录项的stat加上延迟，其余属性与os.DirEntry一致（stat结果同样缓存）"""
+
+    __slots__ = ('_entry', '_fs', '_stat')
+
+    def __init__(self, entry, fs):
+        self._entry = entry
+        self._fs = fs
+        self._stat = {}
+
+    @property
+    def name(self):
+        return self._entry.name
+
+    @property
+    def path(self):
+        return self._entry.path
+
+    def is_dir(self, follow_symlinks=True):
+        return self._entry.is_dir(follow_symlinks=follow_symlinks)
+
+    def is_file(self, follow_symlinks=True):
+        return self._entry.is_file(follow_symlinks=follow_symlinks)
+
+    def is_symlink(self):
+        return self._entry.is_symlink()
+
+    def stat(self, follow_symlinks=True):
+        if follow_symlinks not in self._stat:
+            self._fs._round_trip(self.path)
+            self._stat[follow_symlinks] = self._entry.stat(follow_symlinks=follow_symlinks)
+        return self._stat[follow_symlinks]
+
+
+class _LatencyScandir:
+    def __init__(self, entries):
+        self._entries = entries
+
+    def __enter__(self):
+        return iter(self._entries)
+
+    def __exit__(self, *exc):
+        return False
+
+    def __iter__(self):
+        return iter(self._entries)
+
+
+class LatencyFS:
+    """模拟网络文件系统的本地文件系统包装
+
+    每次scandir与stat都等待latency秒（各线程并行等待，与网络往返相同），
+    可按比例或按路径注入暂时性错误（TimeoutError），并统计往返次数。
+
+    Args:
+        latency: 每次往返的延迟（秒）
+        error_rate: 注入暂时性错误的概率
+        seed: 错误注入的随机种子
+        failures: {路径: 次数}，该路径的前几次往返失败
+    """
+
+    def __init__(self, latency=0.005, error_rate=0.0, seed=None, failures=None):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.failures = dict(failures or {})
+        self.round_trips = 0
+        self.injected_errors = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._active = 0
+        self.max_active = 0  # 观察到的最大并发请求数
+
+    def _round_trip(self, path):
+        with self._lock:
+            self.round_trips += 1
+            self._active += 1
+            self.max_active = max(self.max_active, self._active)
+            fail = self._random.random() < self.error_rate
+            if self.failures.get(path):
+                self.failures[path] -= 1
+                fail = True
+            if fail:
+                self.injected_errors += 1
+        try:
+            time.sleep(self.latency)
+            if fail:
+                raise TimeoutError(f'模拟的网络超时: {path}')
+        finally:
+            with self._lock:
+                self._active -= 1
+
+    def scandir(self, path):
+        self._round_trip(path)
+        with os.scandir(path) as entries:
+            return _LatencyScandir([_LatencyEntry(entry, self) for entry in entries])
+
+    def stat(self, path, follow_symlinks=True):
+        self._round_trip(path)
+        return os.stat(path, follow_symlinks=follow_symlinks)
+
+
+def make_scanner(scan_filter, config=None):
+    """按库配置选择遍历方式
+
+    配置的scan项中"network": true时使用ConcurrentWalker，"concurrency"为并发上限；
+    否则直接使用ScanFilter顺序遍历。两者都提供walk/iter_files。
+
+    Raises:
+        ValueError: concurrency不是正整数
+    """
+    config = config or {}
+    if not config.get('network'):
+        return scan_filter
+    concurrency = config.get('concurrency', MAX_CONCURRENCY)
+    if not isinstance(concurrency, int) or isinstance(concurrency, bool) or concurrency < 1:
+        raise ValueError(f'无效的并发数: {concurrency}')
+    return ConcurrentWalker(scan_filter, max_workers=concurrency, initial=min(INITIAL_CONCURRENCY, concurrency))
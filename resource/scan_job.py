@@ -0,0 +1,168 @@
+'''
+@version 1.0
+@brief 扫描任务：进度（文件数、速度、预计剩余时间）回调、取消，以及中断后从检查点继续所需的检查点位置
+@author 炎刃
+@date 2026-10-19
+'''
+import time
+import hashlib
+import threading
+
+from .checkpoint import get_checkpoint_path
+
+# 两次进度回调的最小间隔（秒），避免大量小文件时回调本身成为瓶颈
+PROGRESS_INTERVAL = 0.25
+
+
+class ScanCancelled(Exception):
+    """扫描被ScanJob.cancel()取消"""
+
+
+def scan_checkpoint_path(library_path, directory=None):
+    """库扫描检查点的路径，按库路径的哈希命名"""
+    digest = hashlib.sha1(library_path.encode('utf-8')).hexdigest()[:16]
+    return get_checkpoint_path(f'scan_{digest}', directory)
+
+
+class ScanProgress:
+    """某一时刻的扫描进度
+
+    Attributes:
+        library_path: 库目录
+        done: 已处理的文件数
+        total: 预计文件总数，未知时为None
+        restored: 其中从检查点恢复、未重新处理的文件数
+        elapsed: 已用时间（秒）
+        rate: 处理速度（文件/秒）
+        eta: 预计剩余时间（秒），总数未知时为None
+        current: 最近处理的文件
+        finished: 是否为扫描结束时的最后一次报告
+    """
+
+    __slots__ = ('library_path', 'done', 'total', 'restored', 'elapsed', 'rate', 'eta', 'current', 'finished')
+
+    def __init__(self, library_path, done=0, total=None, restored=0, elapsed=0.0, rate=0.0, eta=None,
+                 current=None, finished=False):
+        self.library_path = library_path
+        self.done = done
+        self.total = total
+        self.restored = restored
+        self.elapsed = elapsed
+        self.rate = rate
+        self.eta = eta
+        self.current = current
+        self.finished = finished
+
+    @property
+    def fraction(self):
+        """完成比例（0~1），总数未知时为None"""
+        if not self.total:
+            return None
+        return min(1.0, self.done / self.total)
+
+    def to_dict(self):
+        return {key: getattr(self, key) for key in self.__slots__}
+
+
+class ScanJob:
+    """一次库扫描的控制对象
+
+    由调用方创建并传给LibraryCore.scan_library；cancel()可在任意线程调用，扫描在处理下一个文件前
+    停止并保存检查点。进度回调在扫描线程中调用，界面层需要自行转到主线程（如通过Qt信号）。
+    速度只按本次实际处理的文件计算，从检查点恢复的文件不计入，避免恢复后速度与剩余时间虚高。
+
+    Args:
+        library_path: 库目录
+        on_progress: 可选回调on_progress(ScanProgress)
+        interval: 两次进度回调的最小间隔（秒）
+    """
+
+    def __init__(self, library_path, on_progress=None, interval=PROGRESS_INTERVAL):
+        self.library_path = library_path
+        self.interval = interval
+        self._listeners = [on_progress] if on_progress else []
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+        self._started = None
+        self._last_report = 0.0
+        self._progress = ScanProgress(library_path)
+        self._finished = threading.Event()
+        self.result = None  # 扫描结束后为scan_library的返回值(是否有记录更新, 错误码)
+
+    def add_listener(self, callback):
+        self._listeners.append(callback)
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def check_cancelled(self):
+        """已请求取消时抛出ScanCancelled"""
+        if self._cancel.is_set():
+            raise ScanCancelled(self.library_path)
+
+    def set_result(self, result):
+        self.result = result
+        self._finished.set()
+
+    def wait(self, timeout=None):
+        """等待后台扫描结束（LibraryCore.start_scan）
+
+        Returns:
+            tuple: scan_library的返回值；超时时为None
+        """
+        if not self._finished.wait(timeout):
+            return None
+        return self.result
+
+    @property
+    def progress(self):
+        with self._lock:
+            return self._progress
+
+    def start(self, total=None):
+        with self._lock:
+            self._started = time.monotonic()
+            self._last_report = 0.0
+            self._progress = ScanProgress(self.library_path, total=total)
+        self._report(force=True)
+
+    def advance(self, count=1, current=None, restored=False):
+        """记录处理完count个文件，距上次回调超过间隔时报告进度"""
+        with self._lock:
+            old = self._progress
+            done = old.done + count
+            total = old.total if old.total is None or old.total >= done else done
+            self._progress = self._measure(done, total, old.restored + (count if restored else 0), current)
+        self._report()
+
+    def finish(self):
+        with self._lock:
+            old = self._progress
+            self._progress = self._measure(old.done, old.done, old.restored, old.current, finished=True)
+        self._report(force=True)
+
+    def _measure(self, done, total, restored, current, finished=False):
+        elapsed = time.monotonic() - self._started if self._started is not None else 0.0
+        processed = done - restored
+        rate = processed / elapsed if elapsed > 0 else 0.0
+        eta = None
+        if total is not None:
+            eta = 0.0 if done >= total else ((total - done) / rate if rate > 0 else None)
+        return ScanProgress(self.library_path, done, total, restored, elapsed, rate, eta, current, finished)
+
+    def _report(self, force=False):
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._last_report < self.interval:
+                return
+            self._last_report = now
+            progress = self._progress
+        for callback in list(self._listeners):
+            try:
+                callback(progress)
+            except Exception as e:
+                print(f'扫描进度回调失败: {e}')
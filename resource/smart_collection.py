@@ -0,0 +1,327 @@
+'''
+@version 1.0
+@brief 智能合集：保存的查询（标签、库、评分、大小、修改时间、阅读状态、收藏）编译为列式索引上的向量化谓词，
+       成员以布尔掩码常驻内存，记录或标签变化时只重新计算受影响的行/合集，点击合集直接取出行号
+@author 炎刃
+@date 2026-10-19
+'''
+import os
+import json
+
+from .app_cache import atomic_write_bytes
+from .lazy_import import load_numpy
+from .tag_store import normalize_tag
+
+DEFAULT_COLLECTIONS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'collections.json')
+COLLECTIONS_VERSION = 1
+
+# 查询字段 -> 允许的值类型；值为None或缺省表示不限制
+QUERY_FIELDS = {
+    'tags_all': list,  # 同时带有这些标签
+    'tags_any': list,  # 带有其中任一标签
+    'tags_none': list,  # 不带这些标签
+    'library': str,  # 库路径
+    'min_rating': int,
+    'max_rating': int,
+    'min_size': int,  # 字节
+    'max_size': int,
+    'modified_after': (int, float),  # 时间戳
+    'modified_before': (int, float),
+    'read': bool,  # True读过，False未读
+    'finished': bool,  # True已读完，False未读完
+    'favorite': bool
+}
+
+
+class CompiledQuery:
+    """编译后的查询
+
+    列条件编译为一组作用于RecordStore列的向量化函数，可只在部分行上求值；
+    标签条件单独求值，开销只与相关标签下的漫画数有关。
+
+    Args:
+        query: {字段: 值}，字段见QUERY_FIELDS
+
+    Raises:
+        ValueError: 未知字段或值类型不符
+    """
+
+    def __init__(self, query):
+        self.query = {}
+        for field, value in (query or {}).items():
+            if field not in QUERY_FIELDS:
+                raise ValueError(f'未知的查询字段: {field}')
+            if value is None or value == []:
+                continue
+            expected = QUERY_FIELDS[field]
+            # bool是int的子类，数值字段不接受True/False
+            if not isinstance(value, expected) or (expected is not bool and isinstance(value, bool)):
+                raise ValueError(f'查询字段{field}的值无效: {value!r}')
+            if expected is list:
+                value = sorted({normalize_tag(tag) for tag in value})
+            self.query[field] = value
+        self.tags = frozenset(tag for field in ('tags_all', 'tags_any', 'tags_none')
+                              for tag in self.query.get(field, ()))
+        self._predicates = self._compile_columns()
+
+    def _compile_columns(self):
+        np = load_numpy()
+        q = self.query
+        predicates = []
+
+        def add(column, test):
+            predicates.append(lambda store, rows: test(_take(getattr(store, column), rows)))
+
+        if 'library' in q:
+            library = q['library']
+            predicates.append(lambda store, rows: _take(store.library, rows) == store.libraries.find(library))
+        if 'min_rating' in q:
+            add('rating', lambda values: values >= q['min_rating'])
+        if 'max_rating' in q:
+            add('rating', lambda values: values <= q['max_rating'])
+        if 'min_size' in q:
+            add('size', lambda values: values >= q['min_size'])
+        if 'max_size' in q:
+            add('size', lambda values: values <= q['max_size'])
+        # 缺失的修改时间为NaN，与任何时间比较都为False
+        if 'modified_after' in q:
+            add('modified_time', lambda values: values >= q['modified_after'])
+        if 'modified_before' in q:
+            add('modified_time', lambda values: values < q['modified_before'])
+        if 'read' in q:
+            add('last_read', (lambda values: ~np.isnan(values)) if q['read'] else np.isnan)
+        if 'finished' in q:
+            add('progress', (lambda values: values >= 1.0) if q['finished'] else (lambda values: ~(values >= 1.0)))
+        if 'favorite' in q:
+            add('favorite', lambda values: values == q['favorite'])
+        return predicates
+
+    @property
+    def has_tag_terms(self):
+        return bool(self.tags)
+
+    def column_mask(self, store, rows=None):
+        """列条件的掩码，rows为None时对全部行求值，否则与rows一一对应"""
+        np = load_numpy()
+        mask = np.ones(len(store) if rows is None else len(rows), dtype=np.bool_)
+        for predicate in self._predicates:
+            mask &= predicate(store, rows)
+        return mask
+
+    def tag_mask(self, store, tag_store):
+        """标签条件在全部行上的掩码"""
+        np = load_numpy()
+        q = self.query
+        mask = np.ones(len(store), dtype=np.bool_)
+        if 'tags_all' in q:
+            paths = set.intersection(*(tag_store.paths_with(tag) for tag in q['tags_all']))
+            selected = np.zeros(len(store), dtype=np.bool_)
+            selected[store.rows_of(paths, normalized=True)] = True
+            mask &= selected
+        if 'tags_any' in q:
+            selected = np.zeros(len(store), dtype=np.bool_)
+            selected[store.rows_of(set().union(*(tag_store.paths_with(tag) for tag in q['tags_any'])),
+                                   normalized=True)] = True
+            mask &= selected
+        if 'tags_none' in q:
+            mask[store.rows_of(set().union(*(tag_store.paths_with(tag) for tag in q['tags_none'])),
+                               normalized=True)] = False
+        return mask
+
+
+def _take(column, rows):
+    return column if rows is None else column[rows]
+
+
+def compile_query(query):
+    return CompiledQuery(query)
+
+
+class _Membership:
+    __slots__ = ('query', 'columns', 'tags', 'mask', '_rows')
+
+    def __init__(self, query):
+        self.query = query
+        self.columns = None  # 列条件掩码
+        self.tags = None  # 标签条件掩码，查询不含标签条件时为None
+        self.mask = None  # 成员掩码 = 列条件 & 标签条件
+        self._rows = None
+
+    def combine(self):
+        # 掩码总是独立的数组，按行更新列条件掩码时不会连带修改
+        mask = self.columns.copy() if self.tags is None else self.columns & self.tags
+        changed = self.mask is None or len(mask) != len(self.mask) or bool((mask != self.mask).any())
+        self.mask = mask
+        if changed:
+            self._rows = None
+        return changed
+
+    def update_rows(self, rows, columns):
+        self.columns[rows] = columns
+        mask = columns if self.tags is None else columns & self.tags[rows]
+        if (mask == self.mask[rows]).all():
+            return False
+        self.mask[rows] = mask
+        self._rows = None
+        return True
+
+    def rows(self):
+        if self._rows is None:
+            self._rows = load_numpy().flatnonzero(self.mask)
+        return self._rows
+
+
+class CollectionIndex:
+    """智能合集的成员索引
+
+    每个合集的成员保存为记录行上的布尔掩码，行号数组在首次读取时由掩码得到并缓存。
+    记录变化后用update_rows只在变化的行上重新求值，标签变化后用tags_changed只重算引用这些标签的合集；
+    记录整体重建（重新扫描）后用set_record_store全部重算。
+
+    Args:
+        collections: {名称: 查询}
+        record_store: RecordStore，可稍后设置
+        tag_store: TagStore，查询含标签条件时需要
+    """
+
+    def __init__(self, collections=None, record_store=None, tag_store=None):
+        self.record_store = record_store
+        self.tag_store = tag_store
+        self._members = {}
+        for name, query in (collections or {}).items():
+            try:
+                self.set(name, query)
+            except ValueError as e:
+                print(f'智能合集{name}无效: {e}')
+
+    def names(self):
+        return list(self._members)
+
+    def __contains__(self, name):
+        return name in self._members
+
+    def query(self, name):
+        return dict(self._members[name].query.query)
+
+    def collections(self):
+        """{名称: 查询}，可直接交给save_collections"""
+        return {name: dict(member.query.query) for name, member in self._members.items()}
+
+    def set(self, name, query):
+        """新增或替换合集并立即求值
+
+        Raises:
+            ValueError: 查询无效
+        """
+        member = _Membership(compile_query(query))
+        self._members[name] = member
+        self._evaluate(member)
+
+    def rename(self, old, new):
+        if new != old:
+            self._members = {new if name == old else name: member for name, member in self._members.items()}
+
+    def remove(self, name):
+        self._members.pop(name, None)
+
+    def set_record_store(self, record_store):
+        self.record_store = record_store
+        for member in self._members.values():
+            self._evaluate(member)
+
+    def _evaluate(self, member):
+        if self.record_store is None:
+            return
+        member.columns = member.query.column_mask(self.record_store)
+        member.tags = self._tag_mask(member.query)
+        member.combine()
+
+    def _tag_mask(self, query):
+        if not query.has_tag_terms:
+            return None
+        if self.tag_store is None:
+            np = load_numpy()
+            return np.zeros(len(self.record_store), dtype=np.bool_)
+        return query.tag_mask(self.record_store, self.tag_store)
+
+    def members(self, name):
+        """合集成员的行号数组（按行号排序）
+
+        Raises:
+            KeyError: 合集不存在
+        """
+        member = self._members[name]
+        if member.mask is None:
+            np = load_numpy()
+            return np.empty(0, dtype=np.int64)
+        return member.rows()
+
+    def count(self, name):
+        member = self._members[name]
+        return 0 if member.mask is None else int(member.rows().size)
+
+    def update_rows(self, rows):
+        """记录的列（阅读状态、评分、收藏等）变化后，只在这些行上重新求值
+
+        Returns:
+            set: 成员发生变化的合集名称
+        """
+        if self.record_store is None or not self._members:
+            return set()
+        np = load_numpy()
+        rows = np.unique(np.asarray(rows, dtype=np.int64))
+        if not rows.size:
+            return set()
+        changed = set()
+        for name, member in self._members.items():
+            if member.mask is None:
+                continue
+            if member.update_rows(rows, member.query.column_mask(self.record_store, rows)):
+                changed.add(name)
+        return changed
+
+    def tags_changed(self, tags):
+        """标签增删改后，重算引用了这些标签的合集（可直接订阅TagStore）
+
+        Returns:
+            set: 成员发生变化的合集名称
+        """
+        changed = set()
+        if self.record_store is None:
+            return changed
+        for name, member in self._members.items():
+            if member.mask is not None and member.query.tags & set(tags):
+                member.tags = self._tag_mask(member.query)
+                if member.combine():
+                    changed.add(name)
+        return changed
+
+
+def load_collections(path=DEFAULT_COLLECTIONS_PATH):
+    """读取保存的合集，返回{名称: 查询}（保持保存时的顺序）"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') != COLLECTIONS_VERSION:
+            raise ValueError(f"不支持的合集文件版本: {data.get('version')}")
+        return {entry['name']: entry.get('query', {}) for entry in data.get('collections', [])}
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+        print(f'读取智能合集失败: {e}')
+        return {}
+
+
+def save_collections(collections, path=DEFAULT_COLLECTIONS_PATH):
+    """保存{名称: 查询}，成功返回True"""
+    data = json.dumps({
+        'version': COLLECTIONS_VERSION,
+        'collections': [{'name': name, 'query': query} for name, query in collections.items()]
+    }, ensure_ascii=False, indent=2)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        atomic_write_bytes(path, data.encode('utf-8'))
+    except OSError as e:
+        print(f'保存智能合集失败: {e}')
+        return False
+    return True
@@ -0,0 +1,309 @@
+'''
+@version 1.0
+@brief 固实7z/RAR流式读取：后台线程单次顺序解压，页面解出后立即可读
+@author 炎刃
+@date 2026-10-19
+'''
+import os
+import threading
+import subprocess
+
+from .page_source import PageSource
+from .extraction_cache import get_extraction_cache, make_archive_key
+from .lazy_import import load_py7zr, load_rarfile, lazy_module
+
+
+def _member_key(name):
+    return name.replace('\\', '/').strip('/')
+
+
+def _make_7z_callback(streamer):
+    """创建py7zr解压回调，成员写入并校验CRC后触发report_end"""
+    ExtractCallback = lazy_module('py7zr.callbacks').ExtractCallback
+
+    class _SevenZipCallback(ExtractCallback):
+        def report_start_preparation(self):
+            pass
+
+        def report_start(self, processing_file_path, processing_bytes):
+            pass
+
+        def report_update(self, decompressed_bytes):
+            pass
+
+        def report_end(self, processing_file_path, wrote_bytes):
+            streamer._mark_ready(processing_file_path)
+
+        def report_warning(self, message):
+            print(f'7z解压警告: {message}')
+
+        def report_postprocess(self):
+            pass
+
+    return _SevenZipCallback()
+
+
+# (缓存目录, 条目键) -> 正在进行的后台解压，同一压缩包同时打开的多个来源共享一次解压
+_extractions = {}
+_extractions_lock = threading.Lock()
+
+
+class _Extraction:
+    """一次后台顺序解压
+
+    直接写入解压缓存的条目目录，每解出一个成员通知全部监听者；自身锁定条目直到解压结束，
+    因此打开它的来源可以随时关闭。结束后先更新缓存条目再从登记表移除，
+    之后打开同一压缩包的来源要么挂到本次解压上，要么直接命中完整缓存。
+    """
+
+    def __init__(self, archive_path, kind, cache, key, base_dir):
+        self.archive_path = archive_path
+        self.kind = kind
+        self.cache = cache
+        self.key = key
+        self.base_dir = base_dir
+        self.error = None
+        self._cond = threading.Condition()
+        self._ready = set()  # 已解出的成员
+        self._finished = False
+        self._listeners = []
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def attach(self, listener):
+        """登记监听listener(成员名或None表示结束)，返回(已解出成员集合, 是否已结束)"""
+        with self._cond:
+            self._listeners.append(listener)
+            return set(self._ready), self._finished
+
+    def detach(self, listener):
+        with self._cond:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def _notify(self, member):
+        with self._cond:
+            listeners = list(self._listeners)
+        for listener in listeners:
+            listener(member)
+
+    def _mark_ready(self, member_name):
+        member = _member_key(member_name)
+        with self._cond:
+            self._ready.add(member)
+        self._notify(member)
+
+    def _run(self):
+        try:
+            if self.kind == '7z':
+                self._stream_7z()
+            elif self.kind == 'rar':
+                self._stream_rar()
+            else:
+                raise ValueError(f'不支持流式解压的格式: {self.kind}')
+        except Exception as e:
+            self.error = e
+            print(f'流式解压失败 {self.archive_path}: {e}')
+        if self.error is None:
+            self.cache.finish(self.archive_path, self.key)
+        else:
+            # 仍被读取的来源锁定着条目，目录在它们关闭后才删除
+            self.cache.discard(self.key)
+        with _extractions_lock:
+            _extractions.pop((self.cache.cache_dir, self.key), None)
+        with self._cond:
+            self._finished = True
+        self._notify(None)
+        self.cache.unpin(self.key)
+
+    def _stream_7z(self):
+        with load_py7zr().SevenZipFile(self.archive_path, 'r') as archive:
+            archive.extractall(self.base_dir, callback=_make_7z_callback(self))
+
+    def _stream_rar(self):
+        rarfile = load_rarfile()
+        with rarfile.RarFile(self.archive_path, 'r') as archive:
+            infos = [info for info in archive.infolist() if info.is_file()]
+            try:
+                tool = rarfile.tool_setup()
+            except rarfile.RarCannotExec:
+                tool = None
+            if tool is not None and tool.setup is rarfile.UNRAR_CONFIG:
+                # unrar p不指定成员时按归档顺序把所有文件依次输出到stdout，单个进程顺序解压一遍
+                cmdline = tool.open_cmdline(None, self.archive_path)
+                proc = subprocess.Popen(cmdline, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+                try:
+                    for info in infos:
+                        self._write_member(info.filename, proc.stdout, info.file_size)
+                finally:
+                    proc.stdout.close()
+                    returncode = proc.wait()
+                if returncode not in (0, 1):  # 1为警告
+                    raise rarfile.RarExecError(f'unrar返回错误码{returncode}')
+            else:
+                # 其他后端逐个成员按归档顺序读取
+                for info in infos:
+                    with archive.open(info) as member:
+                        self._write_member(info.filename, member, info.file_size)
+
+    def _write_member(self, name, stream, size):
+        """从流中读取size字节写为成员文件；先写临时名再改名，保证读取方看到的是完整文件"""
+        target = os.path.join(self.base_dir, *_member_key(name).split('/'))
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        tmp_target = target + '.part'
+        remaining = size
+        with open(tmp_target, 'wb') as out:
+            while remaining > 0:
+                chunk = stream.read(min(remaining, 1024 * 1024))
+                if not chunk:
+                    raise EOFError(f'压缩包数据提前结束: {name}')
+                out.write(chunk)
+                remaining -= len(chunk)
+        os.replace(tmp_target, target)
+        self._mark_ready(name)
+
+
+class StreamingPageSource(PageSource):
+    """固实压缩包页面来源
+
+    固实压缩包中读取任意成员都要从数据块开头解压，逐页随机读取代价为O(n²)。
+    这里由后台线程顺序解压一遍，直接写入解压缓存的条目目录，每解出一页就标记可读并回调通知，
+    因此第一页解出即可显示，无需等待整个压缩包。已完整缓存时直接从缓存读取；
+    同一压缩包正在解压时（如关闭后立即重新打开）挂到进行中的解压上，不重复解压同一目录。
+    """
+
+    def __init__(self, archive_path, manifest, cache=None, on_page_ready=None):
+        super().__init__(manifest.page_names())
+        self.archive_path = archive_path
+        self.manifest = manifest
+        self.cache = cache or get_extraction_cache()
+        self.on_page_ready = on_page_ready
+        self._index_by_member = {_member_key(name): i for i, name in enumerate(self.names)}
+        self._cond = threading.Condition()
+        self._ready = [False] * len(self.names)
+        self._finished = False
+        self._closed = False
+        self._extraction = None
+        self._thread = None
+        self.error = None
+
+        self.key = make_archive_key(archive_path)
+        self.cache.pin(self.key)
+        cached_dir = None
+        with _extractions_lock:
+            extraction = _extractions.get((self.cache.cache_dir, self.key))
+            if extraction is None:
+                cached_dir = self.cache.get(archive_path)
+                if cached_dir is None:
+                    try:
+                        key, base_dir = self.cache.begin(archive_path)
+                    except (RuntimeError, OSError) as e:
+                        self.error = e
+                    else:
+                        self.cache.pin(key)
+                        extraction = _Extraction(archive_path, manifest.kind, self.cache, key, base_dir)
+                        _extractions[(self.cache.cache_dir, key)] = extraction
+                        extraction.thread.start()
+        if cached_dir:
+            self.base_dir = cached_dir
+            self._ready = [True] * len(self.names)
+            self._finished = True
+        elif extraction is None:
+            print(f'流式解压失败 {archive_path}: {self.error}')
+            self.base_dir = self.cache.entry_dir(self.key)
+            self._finished = True
+        else:
+            self.base_dir = extraction.base_dir
+            self._extraction = extraction
+            self._thread = extraction.thread
+            ready, finished = extraction.attach(self._on_member)
+            with self._cond:
+                for member in ready:
+                    index = self._index_by_member.get(member)
+                    if index is not None:
+                        self._ready[index] = True
+                if finished:
+                    self._finished = True
+                    self.error = extraction.error
+
+    def _on_member(self, member):
+        if member is None:
+            with self._cond:
+                self._finished = True
+                self.error = self._extraction.error
+                self._cond.notify_all()
+                callback = None if self._closed or self.error is not None else self.on_page_ready
+            # 解压完成后回调一次-1，通知调用方整体已就绪
+            if callback:
+                callback(-1)
+            return
+        index = self._index_by_member.get(member)
+        if index is None:
+            return
+        with self._cond:
+            self._ready[index] = True
+            self._cond.notify_all()
+            callback = None if self._closed else self.on_page_ready
+        if callback:
+            callback(index)
+
+    def is_page_ready(self, index):
+        with self._cond:
+            return self._ready[index]
+
+    def ready_count(self):
+        with self._cond:
+            return sum(self._ready)
+
+    def wait_for_page(self, index, timeout=None):
+        """阻塞直到该页解出
+
+        Raises:
+            IOError: 解压失败或来源已关闭导致该页不可用
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._ready[index] or self._finished or self._closed, timeout)
+            if not self._ready[index]:
+                raise IOError(f'页面尚未解压: {self.names[index]}' if self.error is None
+                              else f'解压失败: {self.error}')
+
+    def page_path(self, index):
+        self.wait_for_page(index)
+        return os.path.join(self.base_dir, *_member_key(self.names[index]).split('/'))
+
+    def read_page(self, index):
+        with open(self.page_path(index), 'rb') as f:
+            return f.read()
+
+    def clone(self):
+        return _StreamingView(self)
+
+    def close(self):
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        # 后台解压无法中途打断，由它自己的锁定保持条目直到结束；这里只释放本来源的锁定
+        if self._extraction is not None:
+            self._extraction.detach(self._on_member)
+        self.cache.unpin(self.key)
+
+
+class _StreamingView(PageSource):
+    """共享同一流式来源的只读视图，供其他线程使用，关闭视图不影响原来源"""
+
+    def __init__(self, source):
+        super().__init__(source.names)
+        self.source = source
+
+    def is_page_ready(self, index):
+        return self.source.is_page_ready(index)
+
+    def page_path(self, index):
+        return self.source.page_path(index)
+
+    def read_page(self, index):
+        return self.source.read_page(index)
+
+    def clone(self):
+        return _StreamingView(self.source)
@@ -0,0 +1,326 @@
+'''
+@version 1.0
+@brief 标签存储：标签的增删改、多选批量添加/移除，内存中维护标签->漫画与漫画->标签的双向索引，
+       修改延迟合并写盘（一次批量操作只写一次）
+@author 炎刃
+@date 2026-10-19
+'''
+import os
+import json
+import threading
+
+from .app_cache import atomic_write_bytes
+from .reading_state import normalize_path
+
+DEFAULT_TAGS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tags.json')
+TAGS_VERSION = 1
+
+# 最后一次修改后等待多久再写盘（秒），连续的批量操作合并为一次写入
+FLUSH_DELAY = 2.0
+
+
+def normalize_tag(tag):
+    """去掉首尾空白并合并连续空白
+
+    Raises:
+        ValueError: 标签为空
+    """
+    name = ' '.join(str(tag).split())
+    if not name:
+        raise ValueError('标签不能为空')
+    return name
+
+
+class TagStore:
+    """漫画标签
+
+    漫画以规范化路径标识（与阅读状态相同）。标签计数与各标签下的漫画集合随修改增量维护，
+    侧边栏只需按修改返回的标签刷新对应项，不必遍历全部记录。
+    显式创建的标签即使暂时没有漫画也保留，未创建而只经批量添加出现的标签在最后一本移除后消失。
+    在这里修改过标签的漫画会被记住（包括标签已全部移除的），之后不再从记录导入旧标签，
+    apply_to_records把这些漫画的标签写回记录。
+
+    Args:
+        tags_path: 存储文件路径
+        flush_delay: 修改后延迟写盘的秒数
+    """
+
+    def __init__(self, tags_path=DEFAULT_TAGS_PATH, flush_delay=FLUSH_DELAY):
+        self.tags_path = tags_path
+        self.flush_delay = flush_delay
+        self._tags_by_path = {}  # 路径 -> set(标签)
+        self._paths_by_tag = {}  # 标签 -> set(路径)
+        self._defined = set()  # 显式创建的标签
+        self._edited = set()  # 在标签存储中修改过标签的路径，标签以这里为准
+        self._listeners = []
+        self._lock = threading.RLock()
+        self._timer = None
+        self._dirty = False
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.tags_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != TAGS_VERSION:
+                raise ValueError(f"不支持的标签文件版本: {data.get('version')}")
+            entries = data.get('entries', {})
+            defined = data.get('defined', [])
+            edited = data.get('edited', [])
+        except FileNotFoundError:
+            entries, defined, edited = {}, [], []
+        except (OSError, ValueError) as e:
+            print(f'读取标签失败: {e}')
+            entries, defined, edited = {}, [], []
+        with self._lock:
+            self._tags_by_path = {}
+            self._paths_by_tag = {tag: set() for tag in defined}
+            self._defined = set(defined)
+            self._edited = set(edited)
+            for path, tags in entries.items():
+                for tag in tags:
+                    self._link(path, tag)
+
+    def subscribe(self, callback):
+        """监听修改，callback(变化的标签集合)在修改的线程中调用"""
+        self._listeners.append(callback)
+
+    def _link(self, path, tag):
+        tags = self._tags_by_path.setdefault(path, set())
+        if tag in tags:
+            return False
+        tags.add(tag)
+        self._paths_by_tag.setdefault(tag, set()).add(path)
+        return True
+
+    def _unlink(self, path, tag):
+        tags = self._tags_by_path.get(path)
+        if not tags or tag not in tags:
+            return False
+        tags.discard(tag)
+        if not tags:
+            del self._tags_by_path[path]
+        paths = self._paths_by_tag[tag]
+        paths.discard(path)
+        if not paths and tag not in self._defined:
+            del self._paths_by_tag[tag]
+        return True
+
+    # 查询
+
+    def counts(self):
+        """{标签: 漫画数}"""
+        with self._lock:
+            return {tag: len(paths) for tag, paths in self._paths_by_tag.items()}
+
+    def count(self, tag):
+        with self._lock:
+            paths = self._paths_by_tag.get(tag)
+            return len(paths) if paths is not None else None
+
+    def tag_names(self):
+        with self._lock:
+            return sorted(self._paths_by_tag)
+
+    def __contains__(self, tag):
+        with self._lock:
+            return tag in self._paths_by_tag
+
+    def paths_with(self, tag):
+        """带有标签的漫画（规范化路径）集合"""
+        with self._lock:
+            return set(self._paths_by_tag.get(tag, ()))
+
+    def tags_of(self, path):
+        with self._lock:
+            return tuple(sorted(self._tags_by_path.get(normalize_path(path), ())))
+
+    def entries(self):
+        """{规范化路径: 标签元组}"""
+        with self._lock:
+            return {path: tuple(sorted(tags)) for path, tags in self._tags_by_path.items()}
+
+    # 修改：均返回计数发生变化的标签集合
+
+    def create(self, tag):
+        tag = normalize_tag(tag)
+        with self._lock:
+            self._defined.add(tag)
+            if tag in self._paths_by_tag:
+                return set()
+            self._paths_by_tag[tag] = set()
+        return self._changed({tag})
+
+    def rename(self, old, new):
+        """重命名标签；新名称已存在时两个标签合并
+
+        Raises:
+            KeyError: 原标签不存在
+        """
+        new = normalize_tag(new)
+        with self._lock:
+            if old not in self._paths_by_tag:
+                raise KeyError(old)
+            if old == new:
+                return set()
+            defined = old in self._defined
+            for path in list(self._paths_by_tag[old]):
+                self._unlink(path, old)
+                self._link(path, new)
+                self._edited.add(path)
+            self._defined.discard(old)
+            self._paths_by_tag.pop(old, None)
+            if defined:
+                self._defined.add(new)
+            self._paths_by_tag.setdefault(new, set())
+        return self._changed({old, new})
+
+    def delete(self, tag):
+        """删除标签并从所有漫画上移除"""
+        with self._lock:
+            if tag not in self._paths_by_tag:
+                return set()
+            self._defined.discard(tag)
+            for path in list(self._paths_by_tag[tag]):
+                self._unlink(path, tag)
+                self._edited.add(path)
+            self._paths_by_tag.pop(tag, None)
+        return self._changed({tag})
+
+    def apply(self, paths, tags):
+        """给多本漫画批量添加标签"""
+        tags = {normalize_tag(tag) for tag in tags}
+        changed = set()
+        with self._lock:
+            for path in paths:
+                key = normalize_path(path)
+                for tag in tags:
+                    if self._link(key, tag):
+                        changed.add(tag)
+                        self._edited.add(key)
+        return self._changed(changed)
+
+    def remove(self, paths, tags):
+        """从多本漫画上批量移除标签"""
+        changed = set()
+        with self._lock:
+            for path in paths:
+                key = normalize_path(path)
+                for tag in tags:
+                    if self._unlink(key, tag):
+                        changed.add(tag)
+                        self._edited.add(key)
+        return self._changed(changed)
+
+    def set_tags(self, path, tags):
+        """把一本漫画的标签设置为tags"""
+        key = normalize_path(path)
+        tags = {normalize_tag(tag) for tag in tags}
+        changed = set()
+        with self._lock:
+            current = set(self._tags_by_path.get(key, ()))
+            for tag in current - tags:
+                self._unlink(key, tag)
+                changed.add(tag)
+            for tag in tags - current:
+                self._link(key, tag)
+                changed.add(tag)
+            if changed:
+                self._edited.add(key)
+        return self._changed(changed)
+
+    def import_record_tags(self, records):
+        """导入记录中已有的标签（旧格式的metadata.tags），只处理标签存储中还没有标签、也没有修改过标签的漫画"""
+        changed = set()
+        with self._lock:
+            for record in records:
+                tags = record.get('tags')
+                path = record.get('full_path')
+                if not tags or not path:
+                    continue
+                key = normalize_path(path)
+                if key in self._tags_by_path or key in self._edited:
+                    continue
+                for tag in tags:
+                    try:
+                        tag = normalize_tag(tag)
+                    except ValueError:
+                        continue
+                    if self._link(key, tag):
+                        changed.add(tag)
+        return self._changed(changed)
+
+    def apply_to_records(self, records):
+        """把修改过标签的漫画的当前标签写回记录的tags字段
+
+        Returns:
+            list: tags有变化的记录，由调用方保存
+        """
+        changed = []
+        with self._lock:
+            for record in records:
+                path = record.get('full_path')
+                key = normalize_path(path) if path else None
+                if key not in self._edited:
+                    continue
+                tags = sorted(self._tags_by_path.get(key, ()))
+                if list(record.get('tags') or ()) != tags:
+                    record['tags'] = tags
+                    changed.append(record)
+        return changed
+
+    def _changed(self, tags):
+        if not tags:
+            return tags
+        with self._lock:
+            self._dirty = True
+            self._schedule_flush()
+        for callback in list(self._listeners):
+            try:
+                callback(set(tags))
+            except Exception as e:
+                print(f'标签回调失败: {e}')
+        return tags
+
+    def _schedule_flush(self):
+        if self._timer:
+            self._timer.cancel()
+        self._timer = threading.Timer(self.flush_delay, self.flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def flush(self):
+        """立即写盘（没有未保存修改时直接返回）"""
+        with self._lock:
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty:
+                return True
+            data = json.dumps({
+                'version': TAGS_VERSION,
+                'defined': sorted(self._defined),
+                'edited': sorted(self._edited),
+                'entries': {path: sorted(tags) for path, tags in self._tags_by_path.items()}
+            }, ensure_ascii=False, indent=2)
+            try:
+                os.makedirs(os.path.dirname(self.tags_path), exist_ok=True)
+                atomic_write_bytes(self.tags_path, data.encode('utf-8'))
+            except OSError as e:
+                print(f'保存标签失败: {e}')
+                return False
+            self._dirty = False
+            return True
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_tag_store():
+    """返回进程内共享的标签存储"""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = TagStore()
+        return _default_store
@@ -0,0 +1,71 @@
+'''
+@version 1.0
+@brief 单本漫画的页面缩略图磁盘缓存
+@author 炎刃
+@date 2026-10-19
+'''
+import os
+import io
+import hashlib
+
+from .app_cache import get_cache_dir, atomic_write_bytes
+from .lazy_import import load_pil
+
+# 缩略图最大尺寸（宽, 高）
+THUMBNAIL_SIZE = (96, 136)
+
+
+def encode_thumbnail(data, size=THUMBNAIL_SIZE, quality=80):
+    """把图像字节（bytes或memoryview）缩小到size以内并编码为JPEG
+
+    Raises:
+        Exception: 图像无法解码
+    """
+    Image = load_pil()
+    with Image.open(io.BytesIO(data)) as img:
+        # draft让JPEG在解码阶段直接按比例缩小，避免解码整页像素
+        img.draft('RGB', size)
+        img = img.convert('RGB')
+        img.thumbnail(size)
+        buf = io.BytesIO()
+        img.save(buf, format='JPEG', quality=quality)
+    return buf.getvalue()
+
+
+class ThumbnailCache:
+    """按漫画划分的缩略图缓存，目录名由来源路径、mtime和大小共同决定，来源变化后自动换新目录"""
+
+    def __init__(self, source_path, size=THUMBNAIL_SIZE):
+        self.source_path = os.path.abspath(source_path)
+        self.size = size
+        stat = os.stat(self.source_path)
+        identity = f'{self.source_path}|{stat.st_mtime}|{stat.st_size}|{size[0]}x{size[1]}'
+        self.key = hashlib.sha1(identity.encode('utf-8')).hexdigest()
+        self.cache_dir = get_cache_dir('thumbnails', self.key)
+
+    def get_path(self, index):
+        return os.path.join(self.cache_dir, f'{index:05d}.jpg')
+
+    def has(self, index):
+        return os.path.exists(self.get_path(index))
+
+    def generate(self, index, data):
+        """由页面原始字节（bytes或memoryview）生成缩略图并写入缓存
+
+        Returns:
+            str: 缩略图路径，解码失败时返回None
+        """
+        thumb_path = self.get_path(index)
+        try:
+            thumbnail = encode_thumbnail(data, self.size)
+        except Exception as e:
+            print(f'生成缩略图失败 {self.source_path}#{index}: {e}')
+            return None
+        atomic_write_bytes(thumb_path, thumbnail)
+        return thumb_path
+
+    def get_or_generate(self, index, page_source):
+        """缓存命中直接返回路径，否则从页面来源读取单页生成"""
+        if self.has(index):
+            return self.get_path(index)
+        return self.generate(index, page_source.read_page_buffer(index))
@@ -0,0 +1,429 @@
+'''
+@version 1.0
+@brief vexel命令行批处理工具：无界面扫描、重建封面、查重、校验与统计，
+       支持--jobs并行、JSON输出以及中断后从检查点继续
+@author 炎刃
+@date 2026-10-19
+'''
+import os
+import sys
+import json
+import hashlib
+import datetime
+import argparse
+import contextlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .library_core import LibraryCore, EVENT_ERROR
+from .cover_store import COVER_DIR
+from .checkpoint import Checkpoint, get_checkpoint_path
+from .image_jobs import ImageJobPool
+from .archive_verify import LEVEL_QUICK, LEVEL_FULL, is_corrupt
+from .page_manifest import get_source_kind
+from .lib_func import format_file_size
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def run_tasks(items, func, jobs, checkpoint=None, key=lambda item: item):
+    """并行执行任务，已在检查点中完成的条目直接取用保存的结果
+
+    Args:
+        items: 任务条目
+        func: 处理函数func(item) -> 可JSON序列化的结果
+        jobs: 并行数，1表示在当前线程顺序执行
+        checkpoint: 可选检查点，每完成一条即标记
+        key: 条目在检查点中的键
+
+    Returns:
+        dict: 键 -> 结果
+    """
+    results = {}
+    pending = []
+    for item in items:
+        item_key = key(item)
+        if checkpoint is not None and checkpoint.is_done(item_key):
+            results[item_key] = checkpoint.result(item_key)
+        else:
+            pending.append(item)
+
+    def finish(item, result):
+        item_key = key(item)
+        results[item_key] = result
+        if checkpoint is not None:
+            checkpoint.mark(item_key, result)
+
+    try:
+        if jobs <= 1:
+            for item in pending:
+                finish(item, func(item))
+        else:
+            executor = ThreadPoolExecutor(max_workers=jobs)
+            try:
+                futures = {executor.submit(func, item): item for item in pending}
+                for future in as_completed(futures):
+                    finish(futures[future], future.result())
+            finally:
+                # 中断时取消尚未开始的任务，已完成的结果已记入检查点
+                executor.shutdown(wait=True, cancel_futures=True)
+    finally:
+        if checkpoint is not None:
+            checkpoint.flush()
+    return results
+
+
+def file_digest(path):
+    """计算文件sha1"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class VexelCLI:
+    """命令行各子命令的实现，基于无界面的LibraryCore"""
+
+    def __init__(self, args):
+        self.args = args
+        self.errors = []
+        self.core = LibraryCore(args.config)
+        # 各库扫描的检查点与子命令检查点放在同一目录
+        self.core.checkpoint_dir = args.checkpoint_dir
+        self.core.events.subscribe(self._on_core_event)
+        self._image_pool = None
+
+    @property
+    def image_pool(self):
+        """封面与缩略图生成的进程池，首次使用时创建"""
+        if self._image_pool is None:
+            self._image_pool = ImageJobPool(self.args.jobs)
+        return self._image_pool
+
+    def _on_core_event(self, event, payload):
+        if event == EVENT_ERROR:
+            self.add_error(payload.get('code'), payload.get('path'), payload.get('message'))
+
+    def add_error(self, code, path, message=None):
+        """记录错误；核心事件与返回值可能报告同一错误，按(错误码, 路径)去重"""
+        if any(error['code'] == code and error['path'] == path for error in self.errors):
+            return
+        self.errors.append({'code': code, 'message': message, 'path': path})
+
+    def selected_libraries(self):
+        """--library按ID、名称或路径筛选，未指定时返回全部库"""
+        wanted = self.args.library or []
+        if not wanted:
+            return list(self.core.libraries)
+        return [lib for lib in self.core.libraries
+                if lib.get('id') in wanted or lib.get('name') in wanted or lib.get('path') in wanted]
+
+    def selected_records(self):
+        """返回[(库, 记录列表)]"""
+        result = []
+        for lib in self.selected_libraries():
+            records, error = self.core.load_records(lib['path'])
+            if error:
+                self.add_error(error, lib['path'])
+            result.append((lib, records))
+        return result
+
+    def open_checkpoint(self, command, *task_parts):
+        """打开子命令的检查点，--resume时读取已有进度，否则从头开始"""
+        task = '|'.join([command] + [str(part) for part in task_parts])
+        checkpoint = Checkpoint(get_checkpoint_path(command, self.args.checkpoint_dir), task)
+        if self.args.resume:
+            checkpoint.load()
+        else:
+            checkpoint.clear()
+        return checkpoint
+
+    def _library_paths(self):
+        return sorted(lib['path'] for lib in self.selected_libraries())
+
+    def cmd_scan(self):
+        added = []
+        for path in self.args.paths:
+            path = os.path.abspath(path)
+            success, error = self.core.add_library(path, scan=False)
+            if success:
+                added.append(path)
+            elif error != 'library_exists':
+                self.add_error(error, path)
+        if self.args.paths:
+            self.args.library = (self.args.library or []) + [os.path.abspath(p) for p in self.args.paths]
+        result = self._scan(incremental=True)
+        result['added'] = added
+        return result
+
+    def cmd_rescan(self):
+        return self._scan(incremental=self.args.incremental)
+
+    def _scan(self, incremental):
+        libraries = self.selected_libraries()
+        checkpoint = self.open_checkpoint('scan', incremental, self._library_paths())
+
+        def scan_one(lib):
+            # --resume时库内已处理的文件也从该库的扫描检查点继续
+            changed, error = self.core.scan_library(lib['path'], incremental=incremental, extract_covers=False,
+                                                    resume=self.args.resume)
+            lib['last_scan'] = datetime.datetime.now().isoformat()
+            return {'changed': changed, 'error': error}
+
+        scanned = run_tasks(libraries, scan_one, self.args.jobs, checkpoint, key=lambda lib: lib['path'])
+        covers = self._generate_covers(rebuild=False)
+        self.core.save_libraries_config()
+        checkpoint.clear()
+        for path, outcome in scanned.items():
+            if outcome['error']:
+                self.add_error(outcome['error'], path)
+        return {'libraries': scanned, 'covers': covers}
+
+    def cmd_covers(self):
+        return self._generate_covers(rebuild=self.args.rebuild)
+
+    def _generate_covers(self, rebuild):
+        """为缺少封面（rebuild时为全部）的记录生成封面，按库写回record.json"""
+        checkpoint = self.open_checkpoint('covers', rebuild, self._library_paths())
+        generated = failed = 0
+        for lib, records in self.selected_records():
+            cover_dir = os.path.join(lib['path'], COVER_DIR)
+            os.makedirs(cover_dir, exist_ok=True)
+            todo = [r for r in records
+                    if rebuild or not r.get('cover_path') or not os.path.exists(r['cover_path'])]
+            if not todo:
+                continue
+            results = {r['full_path']: checkpoint.result(r['full_path'])
+                       for r in todo if checkpoint.is_done(r['full_path'])}
+            tasks = [(r['full_path'], cover_dir) for r in todo if r['full_path'] not in results]
+            try:
+                results.update(self.image_pool.make_covers(tasks, on_result=checkpoint.mark))
+            finally:
+                checkpoint.flush()
+            for record in todo:
+                record['cover_path'] = results.get(record['full_path'])
+                if record['cover_path']:
+                    generated += 1
+                else:
+                    failed += 1
+            self.core.save_records(lib['path'], records)
+            self.core.update_cover_atlas(lib['path'], records)
+        checkpoint.clear()
+        result = {'generated': generated, 'failed': failed}
+        if getattr(self.args, 'thumbnails', False):
+            result['thumbnails'] = self._generate_thumbnails()
+        return result
+
+    def _generate_thumbnails(self):
+        """预先生成全部页面缩略图；检查点按漫画记录，一本的全部页面处理完才算完成"""
+        checkpoint = self.open_checkpoint('thumbnails', self._library_paths())
+        paths = [record['full_path'] for _, records in self.selected_records() for record in records
+                 if get_source_kind(record['full_path']) is not None]
+        pending = [path for path in paths if not checkpoint.is_done(path)]
+        pages = {path: 0 for path in pending}
+        failed = {path: 0 for path in pending}
+
+        def on_result(key, thumb_path):
+            source_path, _ = key
+            pages[source_path] += 1
+            if thumb_path is None:
+                failed[source_path] += 1
+
+        completed = False
+        try:
+            self.image_pool.make_thumbnails(pending, on_result=on_result)
+            completed = True
+        finally:
+            # 中断时只有完整的漫画才记入检查点，未完成的下次重新提交（已生成的页面会直接命中缓存）
+            if completed:
+                for path in pending:
+                    checkpoint.mark(path, {'pages': pages[path], 'failed': failed[path]})
+            checkpoint.flush()
+        totals = checkpoint.results()
+        checkpoint.clear()
+        return {'comics': len(paths),
+                'pages': sum(result['pages'] for result in totals.values() if result),
+                'failed': sum(result['failed'] for result in totals.values() if result)}
+
+    def cmd_dedupe(self):
+        """先按大小分组，只对大小相同的文件计算sha1"""
+        by_size = {}
+        for _, records in self.selected_records():
+            for record in records:
+                if os.path.exists(record['full_path']):
+                    by_size.setdefault(os.path.getsize(record['full_path']), []).append(record['full_path'])
+        candidates = [path for paths in by_size.values() if len(paths) > 1 for path in paths]
+
+        checkpoint = self.open_checkpoint('dedupe', self._library_paths())
+        digests = run_tasks(candidates, file_digest, self.args.jobs, checkpoint)
+        checkpoint.clear()
+
+        groups = {}
+        for path in candidates:
+            groups.setdefault(digests[path], []).append(path)
+        duplicates = [sorted(paths) for paths in groups.values() if len(paths) > 1]
+        wasted = sum(os.path.getsize(paths[0]) * (len(paths) - 1) for paths in duplicates)
+        return {'groups': sorted(duplicates), 'wasted_bytes': wasted}
+
+    def cmd_verify(self):
+        """校验文件完整性，结果按记录保存；文件未变化且已校验过的记录直接跳过"""
+        level = LEVEL_FULL if self.args.full else LEVEL_QUICK
+        checkpoint = self.open_checkpoint('verify', level, self.args.force, self._library_paths())
+        # 完整校验需要解压全部成员，交给进程池并行
+        self.core.image_pool = self.image_pool
+        checked = 0
+        corrupt = {}
+        for lib, records in self.selected_records():
+            for record in records:
+                if checkpoint.is_done(record['full_path']):
+                    record['verify'] = checkpoint.result(record['full_path'])
+                    checked += 1
+            todo = [record for record in records if not checkpoint.is_done(record['full_path'])]
+            try:
+                checked += self.core.verify_records(todo, level, self.args.force, on_result=checkpoint.mark)
+            finally:
+                checkpoint.flush()
+            self.core.save_records(lib['path'], records)
+            for record in records:
+                if is_corrupt(record['full_path'], record.get('verify')):
+                    corrupt[record['full_path']] = record['verify']['error']
+        checkpoint.clear()
+        for path, error in corrupt.items():
+            self.add_error('corrupt_file', path, error)
+        return {'level': level, 'checked': checked, 'corrupt': corrupt}
+
+    def cmd_gc(self):
+        """回收各库中无引用的封面，指定--quota时把每个库的封面目录压到上限以内"""
+        quota = int(self.args.quota * 1024 * 1024) if self.args.quota is not None else None
+        libraries = {}
+        totals = {'orphans': 0, 'evicted': 0, 'reclaimed_bytes': 0}
+        for lib in self.selected_libraries():
+            stats, error = self.core.collect_covers(lib['path'], quota, dry_run=self.args.dry_run)
+            if error:
+                self.add_error(error, lib['path'])
+                continue
+            stats['cleared'] = len(stats['cleared'])
+            libraries[lib['path']] = stats
+            for key in totals:
+                totals[key] += stats[key]
+        return {'libraries': libraries, 'dry_run': self.args.dry_run, **totals}
+
+    def cmd_stats(self):
+        libraries = []
+        by_extension = {}
+        total_count = total_size = missing_covers = corrupt = 0
+        for lib, records in self.selected_records():
+            lib_size = sum(record.get('size', 0) for record in records)
+            libraries.append({'id': lib.get('id'), 'name': lib.get('name'), 'path': lib['path'],
+                              'count': len(records), 'size': lib_size, 'last_scan': lib.get('last_scan')})
+            total_count += len(records)
+            total_size += lib_size
+            for record in records:
+                ext = os.path.splitext(record.get('full_path', ''))[1].lower()
+                by_extension[ext] = by_extension.get(ext, 0) + 1
+                if not record.get('cover_path') or not os.path.exists(record['cover_path']):
+                    missing_covers += 1
+                if is_corrupt(record['full_path'], record.get('verify')):
+                    corrupt += 1
+        return {'libraries': libraries, 'count': total_count, 'size': total_size,
+                'by_extension': by_extension, 'missing_covers': missing_covers, 'corrupt': corrupt}
+
+    def run(self):
+        try:
+            result = getattr(self, f'cmd_{self.args.command}')()
+        finally:
+            if self._image_pool is not None:
+                self._image_pool.close()
+        result['errors'] = self.errors
+        return result
+
+
+def format_text(command, result):
+    """把子命令结果格式化为便于阅读的文本"""
+    lines = []
+    if command in ('scan', 'rescan'):
+        for path in result.get('added', []):
+            lines.append(f'已添加库: {path}')
+        for path, outcome in result['libraries'].items():
+            state = outcome['error'] or ('已更新' if outcome['changed'] else '无变化')
+            lines.append(f'{path}: {state}')
+        lines.append(f"封面: 生成{result['covers']['generated']}个，失败{result['covers']['failed']}个")
+    elif command == 'covers':
+        lines.append(f"封面: 生成{result['generated']}个，失败{result['failed']}个")
+        if 'thumbnails' in result:
+            thumbnails = result['thumbnails']
+            lines.append(f"缩略图: {thumbnails['comics']}本共{thumbnails['pages']}页，失败{thumbnails['failed']}页")
+    elif command == 'dedupe':
+        for group in result['groups']:
+            lines.append('重复: ' + ' = '.join(group))
+        lines.append(f"重复组{len(result['groups'])}个，可释放{format_file_size(result['wasted_bytes'])}")
+    elif command == 'verify':
+        for path, error in result['corrupt'].items():
+            lines.append(f'损坏: {path}: {error}')
+        lines.append(f"已校验{result['checked']}个文件（{result['level']}），损坏{len(result['corrupt'])}个")
+    elif command == 'gc':
+        for path, stats in result['libraries'].items():
+            lines.append(f"{path}: 孤立{stats['orphans']}个, 淘汰{stats['evicted']}个, "
+                         f"释放{format_file_size(stats['reclaimed_bytes'])}, "
+                         f"保留{stats['kept']}个({format_file_size(stats['kept_bytes'])})")
+        prefix = '可释放' if result['dry_run'] else '共释放'
+        lines.append(f"{prefix}{format_file_size(result['reclaimed_bytes'])}")
+    elif command == 'stats':
+        for lib in result['libraries']:
+            lines.append(f"{lib['name']} ({lib['path']}): {lib['count']}本, {format_file_size(lib['size'])}")
+        lines.append(f"合计{result['count']}本, {format_file_size(result['size'])}, 缺少封面{result['missing_covers']}本, 损坏{result['corrupt']}本")
+        for ext, count in sorted(result['by_extension'].items()):
+            lines.append(f'  {ext or "(无扩展名)"}: {count}')
+    for error in result.get('errors', []):
+        lines.append(f"错误 {error.get('code')}: {error.get('path') or ''} {error.get('message') or ''}".rstrip())
+    return '\n'.join(lines)
+
+
+def build_parser():
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--config', help='库配置文件路径（默认项目根目录settings.json）')
+    common.add_argument('--library', action='append', help='只处理指定库（ID、名称或路径），可重复')
+    common.add_argument('--jobs', '-j', type=int, default=os.cpu_count() or 1, help='并行任务数')
+    common.add_argument('--json', action='store_true', help='以JSON输出结果')
+    common.add_argument('--resume', action='store_true', help='从上次中断的检查点继续')
+    common.add_argument('--checkpoint-dir', help='检查点目录（默认位于缓存目录）')
+
+    parser = argparse.ArgumentParser(prog='vexel', description='Vexel漫画库命令行工具')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    scan = subparsers.add_parser('scan', parents=[common], help='扫描库（可同时添加新库）')
+    scan.add_argument('paths', nargs='*', help='要添加并扫描的库目录')
+    rescan = subparsers.add_parser('rescan', parents=[common], help='重新扫描已有库')
+    rescan.add_argument('--incremental', action='store_true', help='只处理新增和变化的文件')
+    covers = subparsers.add_parser('covers', parents=[common], help='生成封面')
+    covers.add_argument('--rebuild', action='store_true', help='重新生成全部封面')
+    covers.add_argument('--thumbnails', action='store_true', help='同时预先生成全部页面缩略图')
+    subparsers.add_parser('dedupe', parents=[common], help='查找内容重复的漫画文件')
+    verify = subparsers.add_parser('verify', parents=[common], help='校验漫画文件是否损坏')
+    verify.add_argument('--full', action='store_true', help='完整校验：解压全部成员检查CRC（默认只检查文件头与目录）')
+    verify.add_argument('--force', action='store_true', help='忽略已保存的结果重新校验')
+    gc = subparsers.add_parser('gc', parents=[common], help='回收无引用的封面')
+    gc.add_argument('--quota', type=float, help='每个库封面目录的容量上限（MB），超出时淘汰最早生成的封面')
+    gc.add_argument('--dry-run', action='store_true', help='只统计可释放的空间，不删除')
+    subparsers.add_parser('stats', parents=[common], help='统计库信息')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.jobs = max(1, args.jobs)
+    try:
+        # 核心模块用print报告的警告转到stderr，保证stdout只有结果（JSON输出可直接被解析）
+        with contextlib.redirect_stdout(sys.stderr):
+            result = VexelCLI(args).run()
+    except KeyboardInterrupt:
+        print('已中断，可使用--resume从检查点继续', file=sys.stderr)
+        return 130
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    else:
+        print(format_text(args.command, result))
+    return 1 if result['errors'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,63 @@
+import unittest
+import io
+from PIL import Image
+from PyQt5.QtCore import QCoreApplication
+from resource.animated_page import AnimatedPage, open_animated_page
+
+COLORS = [(255, 0, 0), (0, 255, 0), (0, 0, 255), (255, 255, 0), (0, 255, 255)]
+
+
+def make_gif(colors, **params):
+    frames = [Image.new('RGB', (16, 16), color) for color in colors]
+    buf = io.BytesIO()
+    frames[0].save(buf, format='GIF', save_all=True, append_images=frames[1:], duration=40, **params)
+    return buf.getvalue()
+
+
+class TestAnimatedPage(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QCoreApplication.instance() or QCoreApplication([])
+
+    def frame_color(self, image):
+        color = image.pixelColor(8, 8)
+        return color.red(), color.green(), color.blue()
+
+    def test_frames_are_decoded_on_demand_and_loop(self):
+        page = open_animated_page(memoryview(make_gif(COLORS, loop=0)), '001.gif')
+        self.assertIsInstance(page, AnimatedPage)
+        page.buffer_size = 2
+        shown = []
+        page.frame_changed.connect(lambda image: shown.append(self.frame_color(image)))
+        self.assertEqual(self.frame_color(page.start()), COLORS[0])
+        self.assertTrue(page.is_playing)
+        # 只预解码缓冲区大小的帧数
+        self.assertEqual(page.buffered_frames, 2)
+
+        for _ in range(len(COLORS) + 1):
+            page._advance()
+        self.assertEqual(shown, COLORS + COLORS[:2])
+        self.assertLessEqual(page.buffered_frames, 2)
+
+        page.pause()
+        self.assertFalse(page.is_playing)
+        page.resume()
+        self.assertTrue(page.is_playing)
+        page.stop()
+        self.assertFalse(page.is_playing)
+
+    def test_play_once_and_static_images(self):
+        page = open_animated_page(make_gif(COLORS[:3]), '002.gif')
+        page.start()
+        page._advance()
+        page._advance()
+        self.assertEqual(self.frame_color(page.current_frame), COLORS[2])
+        self.assertFalse(page.is_playing)
+        page.stop()
+
+        self.assertIsNone(open_animated_page(make_gif(COLORS[:1]), 'static.gif'))
+        self.assertIsNone(open_animated_page(make_gif(COLORS), 'not_animated.png'))
+
+
+if __name__ == '__main__':
+    unittest.main()
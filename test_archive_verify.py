@@ -0,0 +1,82 @@
+import unittest
+import os
+import json
+import zipfile
+import tempfile
+from pathlib import Path
+from unittest import mock
+from resource.archive_verify import check_file, needs_verify, make_result, LEVEL_QUICK, LEVEL_FULL
+from resource.library_core import LibraryCore
+
+
+class TestArchiveVerify(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_path = Path(self.temp_dir.name)
+        self.env_patch = mock.patch.dict(os.environ, {'VEXEL_CACHE_DIR': str(self.temp_path / 'cache')})
+        self.env_patch.start()
+
+    def tearDown(self):
+        self.env_patch.stop()
+        self.temp_dir.cleanup()
+
+    def _make_zip(self, path, payload=b'page-data' * 100):
+        with zipfile.ZipFile(path, 'w', zipfile.ZIP_STORED) as zf:
+            zf.writestr('001.jpg', payload)
+            zf.writestr('002.jpg', payload)
+        return str(path)
+
+    def test_quick_and_full_levels(self):
+        good = self._make_zip(self.temp_path / 'good.cbz')
+        self.assertIsNone(check_file(good, LEVEL_QUICK))
+        self.assertIsNone(check_file(good, LEVEL_FULL))
+
+        # 成员数据损坏：文件头与目录完好，只有CRC校验能发现
+        bad_crc = self._make_zip(self.temp_path / 'crc.cbz')
+        data = bytearray(Path(bad_crc).read_bytes())
+        data[100] ^= 0xFF
+        Path(bad_crc).write_bytes(bytes(data))
+        self.assertIsNone(check_file(bad_crc, LEVEL_QUICK))
+        self.assertIn('001.jpg', check_file(bad_crc, LEVEL_FULL))
+
+        # 截断的压缩包在快速级别即可发现
+        truncated = self.temp_path / 'truncated.cbz'
+        truncated.write_bytes(Path(good).read_bytes()[:-40])
+        self.assertIsNotNone(check_file(str(truncated), LEVEL_QUICK))
+
+    def test_results_are_reused_until_file_changes(self):
+        path = self._make_zip(self.temp_path / 'a.cbz')
+        result = make_result(path, LEVEL_QUICK, None)
+        self.assertFalse(needs_verify(path, result, LEVEL_QUICK))
+        self.assertTrue(needs_verify(path, result, LEVEL_FULL))
+        self.assertFalse(needs_verify(path, make_result(path, LEVEL_FULL, None), LEVEL_QUICK))
+        os.utime(path, (1, 1))
+        self.assertTrue(needs_verify(path, result, LEVEL_QUICK))
+
+    def test_library_scan_flags_corrupt_files_and_verify_is_incremental(self):
+        lib_path = self.temp_path / 'lib'
+        lib_path.mkdir()
+        self._make_zip(lib_path / 'a.cbz')
+        (lib_path / 'broken.cbz').write_bytes(b'PK\x03\x04 truncated')
+        core = LibraryCore(str(self.temp_path / 'settings.json'))
+        self.assertEqual(core.add_library(str(lib_path)), (True, None))
+
+        with open(lib_path / 'record.json', 'r', encoding='utf-8') as f:
+            verify = {Path(r['full_path']).name: r['verify'] for r in json.load(f)}
+        self.assertTrue(verify['a.cbz']['ok'])
+        self.assertFalse(verify['broken.cbz']['ok'])
+
+        summary, error = core.verify_library(str(lib_path), LEVEL_FULL)
+        self.assertIsNone(error)
+        # 已判定损坏的文件不再重验，完好的文件升级为完整校验
+        self.assertEqual(summary['checked'], 1)
+        self.assertEqual(list(summary['corrupt']), [str(lib_path / 'broken.cbz')])
+
+        with mock.patch('resource.archive_verify.check_file') as check:
+            summary, _ = core.verify_library(str(lib_path), LEVEL_FULL)
+            check.assert_not_called()
+        self.assertEqual(summary['checked'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+import os
+import time
+import tempfile
+from pathlib import Path
+from resource.comic_record import ComicRecord, VerifyResult
+from resource import catalog_snapshot
+from resource.catalog_snapshot import (save_catalog_snapshot, load_catalog_snapshot, library_signatures,
+                                       encode_records, decode_records)
+
+
+class TestCatalogSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        self.library = self.root / 'library'
+        (self.library / 'series').mkdir(parents=True)
+        (self.library / 'series' / 'vol1.cbz').write_bytes(b'x')
+        self.snapshot_path = str(self.root / 'catalog.snapshot')
+        self.records = [
+            ComicRecord(full_path=str(self.library / 'series' / f'vol{i}.cbz'), name=f'vol{i}.cbz', size=i,
+                        modified_time=1_700_000_000.5 + i, library_path=str(self.library),
+                        tags=['完结'] if i % 2 else None, favorite=i == 3,
+                        verify=VerifyResult('quick', i != 2, 'bad' if i == 2 else None, 1.0, i, 2.0) if i else None)
+            for i in range(10)
+        ]
+        self.records[4]['custom'] = {'note': 'x'}
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_round_trip_preserves_records(self):
+        decoded = decode_records(encode_records(self.records))
+        self.assertEqual([r.to_dict() for r in decoded], [r.to_dict() for r in self.records])
+        self.assertIsInstance(decoded[1].verify, VerifyResult)
+        self.assertIsNone(decoded[0].verify)
+        self.assertEqual(decoded[1].tags, ('完结',))
+        self.assertIs(decoded[0].library_path, decoded[5].library_path)
+        # 恢复的记录仍按规范化规则接受修改
+        decoded[0]['cover'] = ''
+        self.assertIsNone(decoded[0].cover_path)
+
+    def test_dict_records_are_converted(self):
+        decoded = decode_records(encode_records([{'full_path': '/a/b.cbz', 'size': 3, 'modified_time': '10'}]))
+        self.assertEqual(decoded[0].modified_time, 10.0)
+        self.assertEqual(decoded[0].name, 'b.cbz')
+
+    def test_valid_snapshot_is_loaded(self):
+        signatures = library_signatures([str(self.library)])
+        self.assertTrue(save_catalog_snapshot(signatures, self.records, self.snapshot_path))
+        loaded = load_catalog_snapshot(library_signatures([str(self.library)]), self.snapshot_path)
+        self.assertEqual(len(loaded), len(self.records))
+
+    def test_snapshot_invalidated_by_library_changes(self):
+        signatures = library_signatures([str(self.library)])
+        save_catalog_snapshot(signatures, self.records, self.snapshot_path)
+        self.assertIsNone(load_catalog_snapshot(library_signatures([str(self.library), str(self.root)]),
+                                                self.snapshot_path))
+        # 子目录中新增文件改变该目录的mtime
+        time.sleep(0.01)
+        (self.library / 'series' / 'vol2.cbz').write_bytes(b'y')
+        os.utime(self.library / 'series', ns=(time.time_ns(), time.time_ns()))
+        self.assertIsNone(load_catalog_snapshot(library_signatures([str(self.library)]), self.snapshot_path))
+
+    def test_version_mismatch_and_corrupt_file(self):
+        signatures = library_signatures([str(self.library)])
+        save_catalog_snapshot(signatures, self.records, self.snapshot_path)
+        original = catalog_snapshot.SNAPSHOT_VERSION
+        catalog_snapshot.SNAPSHOT_VERSION = original + 1
+        try:
+            self.assertIsNone(load_catalog_snapshot(signatures, self.snapshot_path))
+        finally:
+            catalog_snapshot.SNAPSHOT_VERSION = original
+        Path(self.snapshot_path).write_bytes(b'VXCS' + b'garbage')
+        self.assertIsNone(load_catalog_snapshot(signatures, self.snapshot_path))
+        self.assertIsNone(load_catalog_snapshot(signatures, str(self.root / 'missing')))
+
+
+if __name__ == '__main__':
+    unittest.main()
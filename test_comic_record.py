@@ -0,0 +1,88 @@
+import unittest
+import os
+import sys
+import json
+import tempfile
+import datetime
+from pathlib import Path
+from resource.comic_record import ComicRecord, VerifyResult, records_from_json, parse_timestamp
+from resource.library_core import LibraryCore
+
+
+class TestComicRecord(unittest.TestCase):
+    def test_converts_every_record_layout(self):
+        core_layout = [{'comic_id': 'comic_001', 'full_path': '/lib/a.cbz', 'name': 'a.cbz', 'size': 10,
+                        'modified_time': 1700000000.5, 'cover_path': None, 'library_path': '/lib',
+                        'verify': {'level': 'quick', 'ok': True, 'error': None, 'mtime': 1.0,
+                                   'size': 10, 'checked_at': 2.0}}]
+        utils_layout = [{'id': 'u1', 'name': 'b', 'path': 'b.cbz', 'full_path': '/lib/b.cbz',
+                         'cover': '', 'size': 20, 'modified_time': '2024-01-02 03:04:05',
+                         'lib_id': 'L1', 'lib_name': '主库'}]
+        import_layout = {'version': '1.0', 'files': [{
+            'id': 'i1',
+            'basic_info': {'name': 'c.zip', 'path': '/other/c.zip', 'type': 'archive', 'size': 30,
+                           'modified_time': '2024-01-02T03:04:05Z',
+                           'import_time': '2024-01-02T03:04:05+00:00Z', 'archive_type': 'zip'},
+            'metadata': {'tags': ['完结', '彩色'], 'favorite': True, 'rating': 4, 'custom_fields': {}}}]}
+        grouped_layout = {'libraries': [{'id': 'L2', 'name': '副库', 'path': '/lib2',
+                                         'comics': [{'id': 'g1', 'name': 'd', 'path': 'd.cbz', 'cover': 'x.jpg'}]}]}
+
+        a, = records_from_json(core_layout, '/lib')
+        self.assertEqual(a.to_dict(), core_layout[0])
+        self.assertIsInstance(a.verify, VerifyResult)
+        self.assertTrue(a['verify']['ok'])
+
+        b, = records_from_json(utils_layout, '/lib')
+        self.assertEqual((b.comic_id, b.cover_path, b.library_id, b['lib_name']), ('u1', None, 'L1', '主库'))
+        self.assertEqual(b.modified_time, datetime.datetime(2024, 1, 2, 3, 4, 5).timestamp())
+
+        c, = records_from_json(import_layout)
+        utc = datetime.datetime(2024, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc).timestamp()
+        self.assertEqual((c.full_path, c.kind, c.tags, c.favorite), ('/other/c.zip', 'archive', ('完结', '彩色'), True))
+        self.assertEqual((c.modified_time, c.import_time), (utc, utc))
+        self.assertEqual(c['archive_type'], 'zip')
+
+        d, = records_from_json(grouped_layout)
+        self.assertEqual((d.full_path, d.library_path, d.library_id, d.cover_path),
+                         ('/lib2/d.cbz', '/lib2', 'L2', 'x.jpg'))
+
+    def test_mapping_interface_and_interning(self):
+        path = ''.join(['/mnt/', 'library'])
+        first = ComicRecord(full_path='/mnt/library/a.cbz', library_path=path, tags=['彩色'])
+        second = ComicRecord(full_path='/mnt/library/b.cbz', library_path='/mnt/library')
+        self.assertIs(first.library_path, second.library_path)
+        self.assertIs(first.tags[0], sys.intern('彩色'))
+        self.assertFalse(hasattr(first, '__dict__'))
+
+        first['last_read'] = 5.0
+        first['cover'] = '/mnt/library/cover/a.jpg'
+        self.assertEqual(first.get('cover_path'), '/mnt/library/cover/a.jpg')
+        self.assertNotIn('verify', first)
+        self.assertEqual(first.get('missing', 'x'), 'x')
+        # 未设置的已知字段按不存在处理，get返回默认值
+        self.assertEqual((second.get('size', 0), second.get('tags', ())), (0, ()))
+        self.assertIsNone(second['size'])
+        self.assertEqual(sum(record.get('size', 0) for record in (first, second)), 0)
+        self.assertEqual(first.to_dict()['last_read'], 5.0)
+        self.assertIsNone(parse_timestamp('not a time'))
+
+    def test_library_core_migrates_old_record_files(self):
+        with tempfile.TemporaryDirectory() as temp:
+            lib_path = Path(temp)
+            (lib_path / 'a.cbz').write_bytes(b'')
+            with open(lib_path / 'record.json', 'w', encoding='utf-8') as f:
+                json.dump([{'id': 'old', 'name': 'a', 'path': 'a.cbz', 'cover': '',
+                            'modified_time': '2024-01-02 03:04:05', 'size': 0}], f)
+            core = LibraryCore(str(lib_path / 'settings.json'))
+            records, error = core.load_records(str(lib_path))
+            self.assertIsNone(error)
+            self.assertEqual(records[0]['full_path'], os.path.join(str(lib_path), 'a.cbz'))
+            self.assertEqual(core.save_records(str(lib_path), records), (True, None))
+            with open(lib_path / 'record.json', 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+            self.assertEqual(saved[0]['comic_id'], 'old')
+            self.assertIsInstance(saved[0]['modified_time'], float)
+
+
+if __name__ == '__main__':
+    unittest.main()
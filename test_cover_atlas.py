@@ -0,0 +1,90 @@
+import unittest
+import io
+import os
+import zipfile
+import tempfile
+from pathlib import Path
+from unittest import mock
+from PIL import Image
+from resource.cover_atlas import CoverAtlas, build_atlas, default_atlas_path
+from resource.cover_store import CoverStore
+from resource.library_core import LibraryCore
+from resource.thumbnail_cache import THUMBNAIL_SIZE
+
+
+def make_jpeg(color, size=(300, 420)):
+    buf = io.BytesIO()
+    Image.new('RGB', size, color).save(buf, format='JPEG')
+    return buf.getvalue()
+
+
+class TestCoverAtlas(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_path = Path(self.temp_dir.name)
+        self.env_patch = mock.patch.dict(os.environ, {'VEXEL_CACHE_DIR': str(self.temp_path / 'cache')})
+        self.env_patch.start()
+        self.store = CoverStore(str(self.temp_path / 'cover'))
+        self.records = [{'full_path': f'/lib/{color}.cbz', 'cover_path': self.store.put(make_jpeg(color), '.jpg')}
+                        for color in ('red', 'green', 'blue')]
+        # 同一封面的另一本与没有封面的记录
+        self.records.append({'full_path': '/lib/red copy.cbz', 'cover_path': self.records[0]['cover_path']})
+        self.records.append({'full_path': '/lib/none.cbz', 'cover_path': None})
+        self.path = str(self.temp_path / 'lib.atlas')
+
+    def tearDown(self):
+        self.env_patch.stop()
+        self.temp_dir.cleanup()
+
+    def test_build_and_read(self):
+        stats = build_atlas(self.records, self.path)
+        self.assertEqual((stats['count'], stats['encoded'], stats['reused'], stats['failed']), (4, 3, 0, 0))
+        with CoverAtlas(self.path) as atlas:
+            self.assertEqual(len(atlas), 4)
+            self.assertEqual(atlas.size, THUMBNAIL_SIZE)
+            self.assertIsNone(atlas.get('/lib/none.cbz'))
+            self.assertEqual(atlas.row_of('/lib/blue.cbz'), 2)
+            self.assertEqual(bytes(atlas.get('/lib/red copy.cbz')), bytes(atlas.get('/lib/red.cbz')))
+            pages = atlas.read_range(0, 3)
+            self.assertEqual(len(pages), 3)
+            with Image.open(io.BytesIO(bytes(pages[1]))) as img:
+                self.assertLessEqual(img.size[0], THUMBNAIL_SIZE[0])
+                self.assertLessEqual(img.size[1], THUMBNAIL_SIZE[1])
+                self.assertGreater(img.getpixel((10, 10))[1], 100)
+            self.assertEqual(atlas.read_range(3, 10)[0].nbytes, atlas.lengths[3])
+            self.assertTrue(atlas.is_current(self.records))
+            self.assertFalse(atlas.is_current(self.records[1:]))
+            del pages
+
+    def test_rebuild_reuses_existing_thumbnails(self):
+        build_atlas(self.records, self.path)
+        records = self.records[1:] + [{'full_path': '/lib/black.cbz',
+                                       'cover_path': self.store.put(make_jpeg('black'), '.jpg')}]
+        stats = build_atlas(records, self.path)
+        self.assertEqual((stats['count'], stats['reused'], stats['encoded']), (4, 3, 1))
+        with CoverAtlas(self.path) as atlas:
+            self.assertEqual(atlas.row_of('/lib/red.cbz'), -1)
+            self.assertEqual(atlas.row_of('/lib/black.cbz'), 3)
+
+    def test_missing_cover_and_corrupt_atlas(self):
+        records = [{'full_path': '/lib/gone.cbz', 'cover_path': str(self.temp_path / 'cover' / 'gone.jpg')}]
+        self.assertEqual(build_atlas(records, self.path)['failed'], 1)
+        Path(self.path).write_bytes(b'VXCA' + b'\0' * 40)
+        self.assertIsNone(CoverAtlas.open(self.path))
+        self.assertIsNone(CoverAtlas.open(str(self.temp_path / 'missing.atlas')))
+
+    def test_scan_builds_library_atlas(self):
+        core = LibraryCore(str(self.temp_path / 'settings.json'))
+        lib_path = self.temp_path / 'lib'
+        lib_path.mkdir()
+        for color in ('red', 'green'):
+            with zipfile.ZipFile(lib_path / f'{color}.cbz', 'w') as zf:
+                zf.writestr('001.jpg', make_jpeg(color))
+        self.assertEqual(core.add_library(str(lib_path)), (True, None))
+        with CoverAtlas(default_atlas_path(str(lib_path))) as atlas:
+            self.assertEqual(sorted(atlas.paths), [str(lib_path / 'green.cbz'), str(lib_path / 'red.cbz')])
+        self.assertEqual(core.update_cover_atlas(str(lib_path)), (None, None))
+
+
+if __name__ == '__main__':
+    unittest.main()
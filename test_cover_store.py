@@ -0,0 +1,128 @@
+import unittest
+import os
+import time
+import zipfile
+import tempfile
+from pathlib import Path
+from unittest import mock
+from resource.cover_store import CoverStore
+from resource.library_core import LibraryCore
+
+
+def age(path, seconds):
+    mtime = time.time() - seconds
+    os.utime(path, (mtime, mtime))
+
+
+class TestCoverStore(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_path = Path(self.temp_dir.name)
+        self.env_patch = mock.patch.dict(os.environ, {'VEXEL_CACHE_DIR': str(self.temp_path / 'cache')})
+        self.env_patch.start()
+        self.store = CoverStore(str(self.temp_path / 'cover'))
+
+    def tearDown(self):
+        self.env_patch.stop()
+        self.temp_dir.cleanup()
+
+    def test_same_content_shares_one_file(self):
+        first = self.store.put(b'cover', '.JPG')
+        self.assertEqual(self.store.put(b'cover', '.jpg'), first)
+        self.assertNotEqual(self.store.put(b'other', '.jpg'), first)
+        self.assertTrue(first.endswith('.jpg'))
+        self.assertEqual(self.store.usage(), (2, 10))
+
+    def test_collect_removes_unreferenced_files(self):
+        kept = self.store.put(b'kept', '.jpg')
+        orphan = self.store.put(b'orphan', '.jpg')
+        legacy = os.path.join(self.store.cover_dir, 'comic_001.jpg')
+        Path(legacy).write_bytes(b'legacy cover')
+        recent = self.store.put(b'just generated', '.jpg')
+        for path in (kept, orphan, legacy):
+            age(path, 3600)
+        records = [{'full_path': '/lib/a.cbz', 'cover_path': kept}, {'full_path': '/lib/b.cbz', 'cover_path': None}]
+
+        stats = self.store.collect(records, dry_run=True)
+        self.assertEqual((stats['orphans'], stats['reclaimed_bytes']), (2, 18))
+        self.assertTrue(os.path.exists(orphan))
+
+        stats = self.store.collect(records)
+        self.assertEqual((stats['scanned'], stats['orphans'], stats['kept']), (4, 2, 2))
+        self.assertEqual(stats['reclaimed_bytes'], len(b'orphan') + len(b'legacy cover'))
+        self.assertFalse(os.path.exists(orphan) or os.path.exists(legacy))
+        # 刚生成、尚未被记录引用的封面在宽限期内保留
+        self.assertTrue(os.path.exists(kept) and os.path.exists(recent))
+
+    def test_quota_evicts_oldest_referenced_covers(self):
+        records = []
+        for index in range(3):
+            path = self.store.put(b'x' * 100 + bytes([index]), '.jpg')
+            age(path, 3000 - index * 1000)
+            records.append({'full_path': f'/lib/{index}.cbz', 'cover_path': path})
+        oldest = records[0]['cover_path']
+        stats = self.store.collect(records, quota_bytes=250, grace_seconds=0)
+        self.assertEqual((stats['evicted'], stats['kept'], stats['kept_bytes']), (1, 2, 202))
+        self.assertEqual(stats['cleared'], [records[0]])
+        self.assertIsNone(records[0]['cover_path'])
+        self.assertFalse(os.path.exists(oldest))
+
+    def test_core_collects_covers_replaced_by_rescan(self):
+        core = LibraryCore(str(self.temp_path / 'settings.json'))
+        core.checkpoint_dir = str(self.temp_path / 'checkpoints')
+        lib_path = self.temp_path / 'lib'
+        lib_path.mkdir()
+        comic = lib_path / 'a.cbz'
+        with zipfile.ZipFile(comic, 'w') as zf:
+            zf.writestr('001.jpg', b'first cover')
+        self.assertEqual(core.add_library(str(lib_path)), (True, None))
+        old_cover = core.load_records(str(lib_path))[0][0]['cover_path']
+        age(old_cover, 3600)
+
+        with zipfile.ZipFile(comic, 'w') as zf:
+            zf.writestr('001.jpg', b'second cover')
+        age(comic, -10)
+        self.assertEqual(core.scan_library(str(lib_path)), (True, None))
+        records, _ = core.load_records(str(lib_path))
+        self.assertNotEqual(records[0]['cover_path'], old_cover)
+        self.assertFalse(os.path.exists(old_cover))
+
+        stats, error = core.collect_covers(str(lib_path), quota_bytes=0)
+        self.assertIsNone(error)
+        self.assertEqual(stats['evicted'], 1)
+        self.assertIsNone(core.load_records(str(lib_path))[0][0]['cover_path'])
+
+    def test_scan_only_collects_covers_it_dereferenced(self):
+        core = LibraryCore(str(self.temp_path / 'settings.json'))
+        core.checkpoint_dir = str(self.temp_path / 'checkpoints')
+        lib_path = self.temp_path / 'lib'
+        lib_path.mkdir()
+        for name in ('a', 'b'):
+            with zipfile.ZipFile(lib_path / f'{name}.cbz', 'w') as zf:
+                zf.writestr('001.jpg', f'{name} cover'.encode())
+        self.assertEqual(core.add_library(str(lib_path)), (True, None))
+        covers = {r['name']: r['cover_path'] for r in core.load_records(str(lib_path))[0]}
+        stray = CoverStore.for_library(str(lib_path)).put(b'not referenced by any scan', '.jpg')
+        for path in (*covers.values(), stray):
+            age(path, 3600)
+
+        # 不提取封面的重建既不删除也不重新生成封面
+        with mock.patch.object(core, 'build_covers') as build_covers:
+            self.assertEqual(core.scan_library(str(lib_path), incremental=False, extract_covers=False),
+                             (True, None))
+        self.assertFalse(build_covers.called)
+        self.assertEqual({r['name']: r['cover_path'] for r in core.load_records(str(lib_path))[0]}, covers)
+        self.assertTrue(all(os.path.getmtime(path) < time.time() - 3000 for path in (*covers.values(), stray)))
+
+        # 删除漫画后只回收它的封面，其他未引用的文件留给显式的回收
+        os.remove(lib_path / 'b.cbz')
+        self.assertEqual(core.scan_library(str(lib_path), incremental=False), (True, None))
+        self.assertFalse(os.path.exists(covers['b.cbz']))
+        self.assertTrue(os.path.exists(covers['a.cbz']))
+        self.assertTrue(os.path.exists(stray))
+        stats, _ = core.collect_covers(str(lib_path))
+        self.assertEqual(stats['orphans'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
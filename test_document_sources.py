@@ -0,0 +1,104 @@
+import unittest
+import io
+import os
+import zipfile
+import tempfile
+from pathlib import Path
+from unittest import mock
+from PIL import Image
+import pymupdf as fitz
+from resource.page_source import open_page_source, PdfPageSource, PDF_MIN_DPI
+from resource.library_core import make_cover
+
+
+def _png_bytes(width, height, color='white'):
+    buf = io.BytesIO()
+    Image.new('RGB', (width, height), color).save(buf, format='PNG')
+    return buf.getvalue()
+
+
+class TestDocumentSources(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_path = Path(self.temp_dir.name)
+        self.env_patch = mock.patch.dict(os.environ, {'VEXEL_CACHE_DIR': str(self.temp_path / 'cache')})
+        self.env_patch.start()
+
+    def tearDown(self):
+        self.env_patch.stop()
+        self.temp_dir.cleanup()
+
+    def _create_pdf(self, page_count):
+        pdf_path = self.temp_path / 'book.pdf'
+        doc = fitz.open()
+        for i in range(page_count):
+            page = doc.new_page(width=360, height=540)
+            page.insert_text((72, 72), f'page {i + 1}')
+        doc.save(str(pdf_path))
+        doc.close()
+        return str(pdf_path)
+
+    def test_pdf_pages_render_on_demand_at_target_size(self):
+        source = open_page_source(self._create_pdf(3))
+        self.assertIsInstance(source, PdfPageSource)
+        self.assertEqual(source.names, ['0001.png', '0002.png', '0003.png'])
+        # 打开文档不渲染任何页面
+        self.assertEqual(os.listdir(source.cache_dir), [])
+
+        source.set_target_size(720, 1080)
+        path = source.page_path(1)
+        self.assertEqual(os.listdir(source.cache_dir), [os.path.basename(path)])
+        with Image.open(path) as img:
+            self.assertEqual(img.size, (720, 1080))
+
+        # 同一分辨率档位内调整尺寸复用缓存，缩小到缩略图时使用最低分辨率
+        self.assertFalse(source.set_target_size(715, 1075))
+        self.assertEqual(source.page_path(1), path)
+        self.assertTrue(source.set_target_size(96, 136))
+        self.assertEqual(source.page_dpi(1), PDF_MIN_DPI)
+        with Image.open(io.BytesIO(source.clone().read_page(1))) as img:
+            self.assertLess(img.size[0], 720)
+        source.close()
+
+    def test_epub_pages_follow_spine_order(self):
+        epub_path = self.temp_path / 'book.epub'
+        with zipfile.ZipFile(epub_path, 'w') as zf:
+            zf.writestr('mimetype', 'application/epub+zip')
+            zf.writestr('META-INF/container.xml', '''<?xml version="1.0"?>
+<container version="1.0" xmlns="urn:oasis:names:tc:opendocument:xmlns:container">
+  <rootfiles><rootfile full-path="OEBPS/content.opf" media-type="application/oebps-package+xml"/></rootfiles>
+</container>''')
+            zf.writestr('OEBPS/content.opf', '''<?xml version="1.0"?>
+<package xmlns="http://www.idpf.org/2007/opf" version="3.0">
+  <manifest>
+    <item id="c1" href="text/a.xhtml" media-type="application/xhtml+xml"/>
+    <item id="c2" href="text/b.xhtml" media-type="application/xhtml+xml"/>
+  </manifest>
+  <spine><itemref idref="c2"/><itemref idref="c1"/></spine>
+</package>''')
+            zf.writestr('OEBPS/text/a.xhtml', '<html><body><img src="../images/1.png"/></body></html>')
+            zf.writestr('OEBPS/text/b.xhtml',
+                        '<html><body><svg><image xlink:href="../images/2%20b.png"/></svg>'
+                        '<img src="../images/1.png"/></body></html>')
+            zf.writestr('OEBPS/images/1.png', _png_bytes(10, 20, 'red'))
+            zf.writestr('OEBPS/images/2 b.png', _png_bytes(30, 40, 'blue'))
+
+        source = open_page_source(str(epub_path))
+        self.assertEqual(source.names, ['OEBPS/images/2 b.png', 'OEBPS/images/1.png'])
+        with Image.open(io.BytesIO(source.read_page(0))) as img:
+            self.assertEqual(img.size, (30, 40))
+        source.close()
+
+        cover = make_cover(str(epub_path), str(self.temp_path))
+        self.assertTrue(cover.endswith('.png'))
+
+    def test_pdf_cover(self):
+        cover = make_cover(self._create_pdf(2), str(self.temp_path))
+        # 按封面尺寸向上取整到分辨率档位渲染，而不是默认分辨率
+        with Image.open(cover) as img:
+            self.assertGreaterEqual(img.size[1], 420)
+            self.assertLess(img.size[1], 1080)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+import unittest
+import os
+import time
+import zipfile
+import tempfile
+from pathlib import Path
+from unittest import mock
+from resource.extraction_cache import ExtractionCache, make_archive_key, PARTIAL_SUFFIX, ORPHAN_GRACE_SECONDS
+
+
+def age(path, seconds):
+    mtime = time.time() - seconds
+    os.utime(path, (mtime, mtime))
+
+
+class TestExtractionCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_path = Path(self.temp_dir.name)
+        self.cache_dir = str(self.temp_path / 'extracted')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _create_zip(self, name, payload_size=1000):
+        archive_path = self.temp_path / name
+        with zipfile.ZipFile(archive_path, 'w') as zf:
+            zf.writestr('1.jpg', b'x' * payload_size)
+            zf.writestr('sub/2.jpg', b'y' * payload_size)
+        return str(archive_path)
+
+    @staticmethod
+    def _store(cache, archive_path):
+        # 与流式解压相同的流程：begin写入条目目录，finish登记为完整条目
+        key, base_dir = cache.begin(archive_path)
+        with zipfile.ZipFile(archive_path) as zf:
+            zf.extractall(base_dir)
+        cache.finish(archive_path, key)
+        return base_dir
+
+    def _touch_archive(self, archive_path):
+        self._create_zip(os.path.basename(archive_path), payload_size=2000)
+        stat = os.stat(archive_path)
+        os.utime(archive_path, (stat.st_atime, stat.st_mtime + 10))
+
+    def test_reopen_reuses_extraction_across_instances(self):
+        archive_path = self._create_zip('a.cbz')
+        cache = ExtractionCache(self.cache_dir)
+        self.assertIsNone(cache.get(archive_path))
+        extract_dir = self._store(cache, archive_path)
+        self.assertTrue(os.path.isfile(os.path.join(extract_dir, 'sub', '2.jpg')))
+
+        # 模拟重启：新实例从索引恢复
+        restarted = ExtractionCache(self.cache_dir)
+        self.assertEqual(restarted.get(archive_path), extract_dir)
+
+    def test_changed_archive_gets_new_entry(self):
+        archive_path = self._create_zip('a.cbz')
+        cache = ExtractionCache(self.cache_dir)
+        old_dir = self._store(cache, archive_path)
+        old_key = make_archive_key(archive_path)
+
+        self._touch_archive(archive_path)
+        self.assertNotEqual(make_archive_key(archive_path), old_key)
+        self.assertIsNone(cache.get(archive_path))
+        new_dir = self._store(cache, archive_path)
+        self.assertNotEqual(new_dir, old_dir)
+        self.assertFalse(os.path.exists(old_dir))
+
+    def test_lru_eviction_respects_quota_and_pins(self):
+        paths = [self._create_zip(f'{i}.cbz') for i in range(3)]
+        cache = ExtractionCache(self.cache_dir, quota_bytes=4500)
+        first_dir = self._store(cache, paths[0])
+        cache.pin(make_archive_key(paths[0]))
+        second_dir = self._store(cache, paths[1])
+        third_dir = self._store(cache, paths[2])
+
+        # 第一个被锁定，淘汰最久未使用的第二个
+        self.assertTrue(os.path.isdir(first_dir))
+        self.assertFalse(os.path.isdir(second_dir))
+        self.assertTrue(os.path.isdir(third_dir))
+        self.assertLessEqual(cache.total_size(), 4500)
+
+    def test_hits_update_index_in_batches(self):
+        archive_path = self._create_zip('a.cbz')
+        cache = ExtractionCache(self.cache_dir)
+        self._store(cache, archive_path)
+        with mock.patch('resource.extraction_cache.atomic_write_bytes') as write:
+            for _ in range(5):
+                self.assertIsNotNone(cache.get(archive_path))
+            self.assertFalse(write.called)
+            cache.flush()
+            cache.flush()
+        self.assertEqual(write.call_count, 1)
+
+    def test_pinned_old_version_is_kept(self):
+        archive_path = self._create_zip('a.cbz')
+        cache = ExtractionCache(self.cache_dir)
+        old_dir = self._store(cache, archive_path)
+        cache.pin(make_archive_key(archive_path))
+        # 旧版本仍在阅读中，解压新版本时不删除
+        self._touch_archive(archive_path)
+        self._store(cache, archive_path)
+        self.assertTrue(os.path.isfile(os.path.join(old_dir, '1.jpg')))
+
+    def test_crash_leftovers_are_cleaned_on_startup(self):
+        archive_path = self._create_zip('a.cbz')
+        cache = ExtractionCache(self.cache_dir)
+        key, base_dir = cache.begin(archive_path)
+        leftovers = [os.path.join(self.cache_dir, 'deadbeef' + PARTIAL_SUFFIX),
+                     os.path.join(self.cache_dir, 'orphan')]
+        for path in leftovers:
+            os.makedirs(path)
+        for path in leftovers + [base_dir]:
+            age(path, ORPHAN_GRACE_SECONDS + 60)
+        with mock.patch('resource.extraction_cache.time.time', return_value=time.time() + ORPHAN_GRACE_SECONDS + 60):
+            restarted = ExtractionCache(self.cache_dir)
+        self.assertEqual([n for n in os.listdir(self.cache_dir) if n != 'index.json'], [])
+        self.assertEqual(restarted.total_size(), 0)
+
+    def test_recent_extraction_of_another_process_is_kept(self):
+        # 另一个进程刚开始流式解压：条目未完成但仍在写入，启动时不能删除
+        archive_path = self._create_zip('a.cbz')
+        writer = ExtractionCache(self.cache_dir)
+        key, base_dir = writer.begin(archive_path)
+        unindexed = os.path.join(self.cache_dir, 'started_after_index_load')
+        os.makedirs(unindexed)
+        ExtractionCache(self.cache_dir)
+        self.assertTrue(os.path.isdir(base_dir))
+        self.assertTrue(os.path.isdir(unindexed))
+
+        with zipfile.ZipFile(archive_path) as zf:
+            zf.extractall(base_dir)
+        writer.finish(archive_path, key)
+        self.assertEqual(ExtractionCache(self.cache_dir).get(archive_path), base_dir)
+
+    def test_discarded_extraction_leaves_nothing(self):
+        archive_path = self._create_zip('a.cbz')
+        cache = ExtractionCache(self.cache_dir)
+        key, _ = cache.begin(archive_path)
+        cache.discard(key)
+        self.assertIsNone(cache.get(archive_path))
+        self.assertEqual([n for n in os.listdir(self.cache_dir) if n != 'index.json'], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
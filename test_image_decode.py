@@ -0,0 +1,34 @@
+import unittest
+import io
+from unittest import mock
+from PIL import Image
+from resource.image_decode import decode_image
+
+
+def _image_bytes(fmt, size=(20, 30), color='red'):
+    buf = io.BytesIO()
+    Image.new('RGB', size, color).save(buf, format=fmt)
+    return buf.getvalue()
+
+
+class TestImageDecode(unittest.TestCase):
+    def test_decodes_from_memoryview_and_mismatched_extension(self):
+        data = memoryview(b'padding' + _image_bytes('PNG'))[7:]
+        image = decode_image(data, '001.png')
+        self.assertEqual((image.width(), image.height()), (20, 30))
+        # 扩展名与实际格式不符时由Qt自动识别
+        self.assertFalse(decode_image(_image_bytes('JPEG'), '002.png').isNull())
+
+    def test_falls_back_to_pil_when_qt_cannot_decode(self):
+        data = _image_bytes('PNG', color=(0, 0, 255))
+        with mock.patch('resource.image_decode.QImage.loadFromData', return_value=False):
+            image = decode_image(data, '001.png')
+        self.assertEqual((image.width(), image.height()), (20, 30))
+        self.assertEqual(image.pixelColor(5, 5).blue(), 255)
+
+        with self.assertRaises(ValueError):
+            decode_image(b'not an image', '003.jpg')
+
+
+if __name__ == '__main__':
+    unittest.main()
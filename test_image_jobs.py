@@ -0,0 +1,63 @@
+import unittest
+import io
+import os
+import zipfile
+import tempfile
+from pathlib import Path
+from unittest import mock
+from PIL import Image
+from resource.image_jobs import ImageJobPool
+
+
+def make_jpeg(color, size=(60, 90)):
+    buf = io.BytesIO()
+    Image.new('RGB', size, color).save(buf, format='JPEG')
+    return buf.getvalue()
+
+
+class TestImageJobPool(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_path = Path(self.temp_dir.name)
+        self.env_patch = mock.patch.dict(os.environ, {'VEXEL_CACHE_DIR': str(self.temp_path / 'cache')})
+        self.env_patch.start()
+        self.cover_dir = self.temp_path / 'cover'
+        self.cover_dir.mkdir()
+        self.comics = []
+        for i, color in enumerate(['red', 'green', 'blue']):
+            path = self.temp_path / f'comic{i}.cbz'
+            with zipfile.ZipFile(path, 'w') as zf:
+                for page in range(3):
+                    zf.writestr(f'{page:02d}.jpg', make_jpeg(color))
+            self.comics.append(str(path))
+
+    def tearDown(self):
+        self.env_patch.stop()
+        self.temp_dir.cleanup()
+
+    def test_covers_are_built_in_worker_processes(self):
+        tasks = [(path, str(self.cover_dir)) for path in self.comics]
+        progress = []
+        with ImageJobPool(jobs=2, cover_chunk_size=1) as pool:
+            results = pool.make_covers(tasks, on_result=lambda key, path: progress.append(key))
+        self.assertEqual(sorted(progress), sorted(self.comics))
+        for path in self.comics:
+            self.assertIsInstance(results[path], str)
+            self.assertTrue(os.path.exists(results[path]))
+
+    def test_thumbnails_return_paths_in_batches(self):
+        with ImageJobPool(jobs=2, thumbnail_chunk_size=2) as pool:
+            results = pool.make_thumbnails(self.comics)
+        self.assertEqual(len(results), 9)
+        with Image.open(results[(self.comics[0], 2)]) as img:
+            self.assertLessEqual(img.size[0], 96)
+
+        # 再次生成全部命中缓存（在当前进程内执行）
+        with mock.patch('resource.thumbnail_cache.ThumbnailCache.generate') as generate:
+            self.assertEqual(ImageJobPool(jobs=1).make_thumbnails(self.comics[:1]),
+                             {key: path for key, path in results.items() if key[0] == self.comics[0]})
+            generate.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+import unittest
+import os
+import sys
+import json
+import zipfile
+import tempfile
+import subprocess
+from pathlib import Path
+from unittest import mock
+from resource.library_core import LibraryCore, search_records, EVENT_ERROR, EVENT_SCAN_FINISHED
+from resource.tag_store import TagStore
+
+
+class TestLibraryCore(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_path = Path(self.temp_dir.name)
+        self.env_patch = mock.patch.dict(os.environ, {'VEXEL_CACHE_DIR': str(self.temp_path / 'cache')})
+        self.env_patch.start()
+        self.config_path = str(self.temp_path / 'settings.json')
+        self.events = []
+        self.core = LibraryCore(self.config_path)
+        self.core.events.subscribe(lambda event, payload: self.events.append((event, payload)))
+
+    def tearDown(self):
+        self.env_patch.stop()
+        self.temp_dir.cleanup()
+
+    def _create_library(self):
+        lib_path = self.temp_path / 'lib'
+        lib_path.mkdir()
+        with zipfile.ZipFile(lib_path / 'comic1.cbz', 'w') as zf:
+            zf.writestr('002.jpg', b'second')
+            zf.writestr('001.jpg', b'first')
+        (lib_path / 'notes.txt').write_text('x')
+        return str(lib_path)
+
+    def test_core_does_not_import_qt(self):
+        code = ('import sys; import resource.library_core, resource.lib_func; '
+                'sys.exit(1 if "PyQt5" in sys.modules else 0)')
+        result = subprocess.run([sys.executable, '-c', code], cwd=os.path.dirname(os.path.abspath(__file__)))
+        self.assertEqual(result.returncode, 0)
+
+    def test_add_library_scans_and_extracts_cover(self):
+        lib_path = self._create_library()
+        self.assertEqual(self.core.add_library(lib_path), (True, None))
+        self.assertEqual(self.core.add_library(lib_path), (False, 'library_exists'))
+
+        records, error = self.core.load_records(lib_path)
+        self.assertIsNone(error)
+        self.assertEqual([r['name'] for r in records], ['comic1.cbz'])
+        with open(records[0]['cover_path'], 'rb') as f:
+            self.assertEqual(f.read(), b'first')
+        self.assertIn(EVENT_SCAN_FINISHED, [event for event, _ in self.events])
+
+        with open(self.config_path, 'r', encoding='utf-8') as f:
+            self.assertEqual(json.load(f)['libraries'][0]['path'], lib_path)
+
+    def test_rebuild_keeps_user_metadata(self):
+        lib_path = self._create_library()
+        with zipfile.ZipFile(Path(lib_path) / 'comic2.cbz', 'w') as zf:
+            zf.writestr('001.jpg', b'two')
+        self.assertEqual(self.core.add_library(lib_path), (True, None))
+        records, _ = self.core.load_records(lib_path)
+        kept = next(r for r in records if r['name'] == 'comic1.cbz')
+        kept.update(tags=['keep'], favorite=True, rating=4)
+        self.assertEqual(self.core.save_records(lib_path, records), (True, None))
+        os.remove(Path(lib_path) / 'comic2.cbz')
+        with zipfile.ZipFile(Path(lib_path) / 'comic3.cbz', 'w') as zf:
+            zf.writestr('001.jpg', b'three')
+
+        with mock.patch('resource.library_core.verify_paths', return_value={}) as verify:
+            self.assertEqual(self.core.scan_library(lib_path, incremental=False), (True, None))
+        # 未变化的文件不重新校验，只有新文件被校验
+        self.assertEqual([os.path.basename(p) for p in verify.call_args[0][0]], ['comic3.cbz'])
+        rebuilt = {r['name']: r for r in self.core.load_records(lib_path)[0]}
+        self.assertEqual(sorted(rebuilt), ['comic1.cbz', 'comic3.cbz'])
+        comic1 = rebuilt['comic1.cbz']
+        self.assertEqual((comic1['comic_id'], comic1['tags'], comic1['favorite'], comic1['rating']),
+                         (kept['comic_id'], ('keep',), True, 4))
+        self.assertEqual(comic1['cover_path'], kept['cover_path'])
+        self.assertEqual(comic1['verify'], kept['verify'])
+        self.assertNotIn(rebuilt['comic3.cbz']['comic_id'], {r['comic_id'] for r in records})
+
+    def test_sync_tags_writes_edited_tags_once(self):
+        lib_path = self._create_library()
+        self.assertEqual(self.core.add_library(lib_path), (True, None))
+        path = self.core.load_records(lib_path)[0][0]['full_path']
+        tags = TagStore(str(self.temp_path / 'tags.json'), flush_delay=60)
+        tags.apply([path], ['x', 'y'])
+        with mock.patch.object(self.core, 'save_records', wraps=self.core.save_records) as save:
+            self.assertEqual(self.core.sync_tags(lib_path, tags), (1, None))
+            self.assertEqual(self.core.sync_tags(lib_path, tags), (0, None))
+        self.assertEqual(save.call_count, 1)
+        self.assertEqual(self.core.load_records(lib_path)[0][0]['tags'], ('x', 'y'))
+        tags.flush()
+
+    def test_invalid_scan_rules_are_reported_not_raised(self):
+        lib_path = self._create_library()
+        self.assertEqual(self.core.add_library(lib_path, scan=False), (True, None))
+        for rules in ({'max_depth': -1}, {'network': True, 'concurrency': 0}):
+            self.core.libraries[0]['scan'] = rules
+            success, error = self.core.scan_library(lib_path)
+            self.assertFalse(success)
+            self.assertTrue(error.startswith('invalid_scan_rules'))
+            event, payload = self.events[-1]
+            self.assertEqual((event, payload['code'], payload['path']), (EVENT_ERROR, 'invalid_scan_rules', lib_path))
+
+    def test_errors_are_reported_by_return_value_and_event(self):
+        with open(self.config_path, 'w', encoding='utf-8') as f:
+            f.write('{broken')
+        self.assertEqual(self.core.load_libraries_config(), [])
+        event, payload = self.events[-1]
+        self.assertEqual((event, payload['code']), (EVENT_ERROR, 'load_config_failed'))
+
+        self.assertEqual(self.core.scan_library(str(self.temp_path / 'missing')), (False, 'invalid_library_path'))
+
+    def test_search(self):
+        records = [{'name': 'One Piece 01.cbz', 'tags': ['adventure']},
+                   {'name': 'Berserk 01.cbz', 'tags': ['dark fantasy']}]
+        self.assertEqual(search_records(records, 'piece'), records[:1])
+        self.assertEqual(search_records(records, '01 FANTASY', fields=('name', 'tags')), records[1:])
+        self.assertEqual(search_records(records, '  '), records)
+
+
+if __name__ == '__main__':
+    unittest.main()
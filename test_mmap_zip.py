@@ -0,0 +1,63 @@
+import unittest
+import os
+import zipfile
+import tempfile
+from pathlib import Path
+from unittest import mock
+from resource.mmap_zip import MmapZipReader, BadZipError
+from resource.page_manifest import load_manifest
+from resource.page_source import ZipPageSource
+
+
+class TestMmapZip(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_path = Path(self.temp_dir.name)
+        self.env_patch = mock.patch.dict(os.environ, {'VEXEL_CACHE_DIR': str(self.temp_path / 'cache')})
+        self.env_patch.start()
+        self.archive_path = self.temp_path / 'comic.cbz'
+        with zipfile.ZipFile(self.archive_path, 'w') as zf:
+            zf.writestr('01.jpg', b'stored-page' * 50, compress_type=zipfile.ZIP_STORED)
+            zf.writestr('02.jpg', b'deflated-page' * 50, compress_type=zipfile.ZIP_DEFLATED)
+            zf.writestr('03.jpg', b'bzip2-page' * 50, compress_type=zipfile.ZIP_BZIP2)
+            with zf.open('04.jpg', 'w', force_zip64=True) as member:
+                member.write(b'zip64-page')
+
+    def tearDown(self):
+        self.env_patch.stop()
+        self.temp_dir.cleanup()
+
+    def test_stored_members_are_zero_copy_slices(self):
+        with MmapZipReader(str(self.archive_path)) as reader:
+            self.assertEqual(reader.namelist(), ['01.jpg', '02.jpg', '03.jpg', '04.jpg'])
+            stored = reader.read('01.jpg')
+            self.assertIsInstance(stored, memoryview)
+            self.assertEqual(stored, b'stored-page' * 50)
+            self.assertEqual(reader.read('02.jpg'), b'deflated-page' * 50)
+            self.assertEqual(reader.read('04.jpg'), b'zip64-page')
+
+    def test_prepended_data_and_corrupt_files(self):
+        shifted = self.temp_path / 'shifted.cbz'
+        shifted.write_bytes(b'\0' * 100 + self.archive_path.read_bytes())
+        with MmapZipReader(str(shifted)) as reader:
+            self.assertEqual(reader.read('02.jpg'), b'deflated-page' * 50)
+
+        broken = self.temp_path / 'broken.cbz'
+        broken.write_bytes(b'PK\x03\x04 truncated')
+        with self.assertRaises(BadZipError):
+            MmapZipReader(str(broken))
+
+    def test_page_source_falls_back_for_unsupported_members(self):
+        source = ZipPageSource(str(self.archive_path), load_manifest(str(self.archive_path)))
+        self.assertIsInstance(source.read_page_buffer(0), memoryview)
+        self.assertEqual(source.read_page(2), b'bzip2-page' * 50)
+        clone = source.clone()
+        # 克隆共享已解析的中央目录
+        self.assertIs(clone._reader.members, source._reader.members)
+        self.assertEqual(clone.read_page(1), b'deflated-page' * 50)
+        clone.close()
+        source.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+import os
+import io
+import zipfile
+import tempfile
+from pathlib import Path
+from unittest import mock
+from PIL import Image
+from resource import page_manifest
+from resource.page_manifest import natural_sorted, load_manifest
+
+
+def _png_bytes(width, height):
+    buf = io.BytesIO()
+    Image.new('RGB', (width, height), 'white').save(buf, format='PNG')
+    return buf.getvalue()
+
+
+class TestPageManifest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_path = Path(self.temp_dir.name)
+        # 缓存目录指向临时目录，避免污染resource/cache
+        self.env_patch = mock.patch.dict(os.environ, {'VEXEL_CACHE_DIR': str(self.temp_path / 'cache')})
+        self.env_patch.start()
+
+    def tearDown(self):
+        self.env_patch.stop()
+        self.temp_dir.cleanup()
+
+    def _create_zip(self, names):
+        archive_path = self.temp_path / 'comic.cbz'
+        with zipfile.ZipFile(archive_path, 'w') as zf:
+            for i, name in enumerate(names):
+                zf.writestr(name, _png_bytes(10 + i, 20))
+        return archive_path
+
+    def test_natural_sort(self):
+        names = ['10.jpg', '2.jpg', '1.jpg', 'Page_11.png', 'page_3.png', 'a/9.jpg', 'a/10.jpg']
+        self.assertEqual(natural_sorted(names),
+                         ['1.jpg', '2.jpg', '10.jpg', 'a/9.jpg', 'a/10.jpg', 'page_3.png', 'Page_11.png'])
+
+    def test_zip_manifest_order_and_metadata(self):
+        archive_path = self._create_zip(['10.png', '2.png', 'notes.txt', '1.png'])
+        manifest = load_manifest(str(archive_path))
+
+        self.assertEqual(manifest.kind, 'zip')
+        self.assertEqual(manifest.page_names(), ['1.png', '2.png', '10.png'])
+        first = manifest.pages[0]
+        self.assertEqual((first['width'], first['height']), (13, 20))
+        self.assertIsNotNone(first['offset'])
+        self.assertGreater(first['size'], 0)
+
+    def test_directory_manifest(self):
+        comic_dir = self.temp_path / 'comic'
+        comic_dir.mkdir()
+        for name in ['3.png', '20.png', '100.png']:
+            (comic_dir / name).write_bytes(_png_bytes(5, 5))
+        (comic_dir / 'readme.txt').write_text('not a page')
+
+        manifest = load_manifest(str(comic_dir))
+        self.assertEqual(manifest.page_names(), ['3.png', '20.png', '100.png'])
+
+    def test_cached_manifest_is_reused(self):
+        archive_path = self._create_zip(['1.png', '2.png'])
+        load_manifest(str(archive_path))
+
+        with mock.patch.object(page_manifest, 'build_manifest') as build:
+            manifest = load_manifest(str(archive_path))
+            build.assert_not_called()
+        self.assertEqual(manifest.page_names(), ['1.png', '2.png'])
+
+    def test_manifest_rebuilt_when_archive_changes(self):
+        archive_path = self._create_zip(['1.png', '2.png'])
+        load_manifest(str(archive_path))
+
+        archive_path = self._create_zip(['1.png', '2.png', '3.png'])
+        stat = os.stat(archive_path)
+        os.utime(archive_path, (stat.st_atime, stat.st_mtime + 10))
+        manifest = load_manifest(str(archive_path))
+        self.assertEqual(manifest.page_names(), ['1.png', '2.png', '3.png'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import unittest
+import os
+import io
+import zipfile
+import tempfile
+from pathlib import Path
+from unittest import mock
+from PIL import Image
+import py7zr
+from resource.page_source import open_page_source, open_archive_source, SevenZipPageSource
+from resource.thumbnail_cache import ThumbnailCache, THUMBNAIL_SIZE
+
+
+def _png_bytes(width, height, color='white'):
+    buf = io.BytesIO()
+    Image.new('RGB', (width, height), color).save(buf, format='PNG')
+    return buf.getvalue()
+
+
+class TestPageSource(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_path = Path(self.temp_dir.name)
+        self.env_patch = mock.patch.dict(os.environ, {'VEXEL_CACHE_DIR': str(self.temp_path / 'cache')})
+        self.env_patch.start()
+
+    def tearDown(self):
+        self.env_patch.stop()
+        self.temp_dir.cleanup()
+
+    def _create_zip(self, name, page_count):
+        archive_path = self.temp_path / name
+        with zipfile.ZipFile(archive_path, 'w') as zf:
+            for i in range(page_count, 0, -1):
+                zf.writestr(f'{i}.png', _png_bytes(i, 10))
+        return archive_path
+
+    def test_zip_random_access_reads_single_member(self):
+        archive_path = self._create_zip('comic.cbz', 12)
+        source = open_page_source(str(archive_path))
+        try:
+            self.assertEqual(source.page_count, 12)
+            with mock.patch.object(zipfile.ZipFile, 'extractall') as extractall:
+                data = source.read_page(9)
+                extractall.assert_not_called()
+            with Image.open(io.BytesIO(data)) as img:
+                self.assertEqual(img.size, (10, 10))
+        finally:
+            source.close()
+
+    def test_sevenzip_reads_target_member(self):
+        pages_dir = self.temp_path / 'pages'
+        pages_dir.mkdir()
+        for i in (1, 2, 3):
+            (pages_dir / f'{i}.png').write_bytes(_png_bytes(i, 5))
+        archive_path = self.temp_path / 'comic.7z'
+        with py7zr.SevenZipFile(archive_path, 'w') as archive:
+            archive.writeall(pages_dir, 'pages')
+
+        source = open_archive_source(str(archive_path))
+        self.assertIsInstance(source, SevenZipPageSource)
+        with Image.open(io.BytesIO(source.read_page(1))) as img:
+            self.assertEqual(img.size, (2, 5))
+
+    def test_solid_handler_is_used_for_solid_archives(self):
+        pages_dir = self.temp_path / 'pages'
+        pages_dir.mkdir()
+        for i in (1, 2):
+            (pages_dir / f'{i}.png').write_bytes(_png_bytes(i, 1))
+        archive_path = self.temp_path / 'comic.7z'
+        with py7zr.SevenZipFile(archive_path, 'w') as archive:
+            archive.writeall(pages_dir, 'pages')
+
+        handler = mock.Mock(return_value='handled')
+        self.assertEqual(open_archive_source(str(archive_path), solid_handler=handler), 'handled')
+        handler.assert_called_once()
+
+    def test_directory_source_includes_archives(self):
+        comic_dir = self.temp_path / 'comic'
+        comic_dir.mkdir()
+        (comic_dir / 'cover.png').write_bytes(_png_bytes(3, 3))
+        with zipfile.ZipFile(comic_dir / 'vol1.zip', 'w') as zf:
+            zf.writestr('1.png', _png_bytes(4, 4))
+            zf.writestr('2.png', _png_bytes(5, 5))
+
+        source = open_page_source(str(comic_dir))
+        try:
+            self.assertEqual(source.names, ['cover.png', '1.png', '2.png'])
+            self.assertEqual(source.page_path(0), str(comic_dir / 'cover.png'))
+            self.assertIsNone(source.page_path(2))
+            with Image.open(io.BytesIO(source.read_page(2))) as img:
+                self.assertEqual(img.size, (5, 5))
+        finally:
+            source.close()
+
+    def test_thumbnail_cache(self):
+        archive_path = self._create_zip('comic.cbz', 2)
+        source = open_page_source(str(archive_path))
+        try:
+            cache = ThumbnailCache(str(archive_path))
+            self.assertFalse(cache.has(0))
+            thumb_path = cache.get_or_generate(0, source)
+            self.assertTrue(cache.has(0))
+            with Image.open(thumb_path) as img:
+                self.assertLessEqual(img.size[0], THUMBNAIL_SIZE[0])
+                self.assertLessEqual(img.size[1], THUMBNAIL_SIZE[1])
+        finally:
+            source.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
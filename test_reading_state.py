@@ -0,0 +1,57 @@
+import unittest
+import os
+import json
+import time
+import tempfile
+from pathlib import Path
+from unittest import mock
+from resource.reading_state import ReadingStateStore, normalize_path
+
+
+class TestReadingStateStore(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.state_path = str(Path(self.temp_dir.name) / 'reading_state.json')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_page_turns_are_batched_into_one_write(self):
+        store = ReadingStateStore(self.state_path, flush_delay=0.2)
+        with mock.patch('resource.reading_state.atomic_write_bytes') as write:
+            for page in range(50):
+                store.update('/comics/a.cbz', page, 100)
+            write.assert_not_called()
+            time.sleep(0.5)
+            self.assertEqual(write.call_count, 1)
+
+    def test_continuous_reading_is_flushed_within_max_delay(self):
+        store = ReadingStateStore(self.state_path, flush_delay=0.3, max_flush_delay=0.3)
+        store.update('/comics/a.cbz', 0)
+        time.sleep(0.15)
+        store.update('/comics/a.cbz', 1)
+        time.sleep(0.3)
+        self.assertTrue(os.path.exists(self.state_path))
+
+    def test_resume_page_and_recent_order(self):
+        store = ReadingStateStore(self.state_path, flush_delay=60)
+        store.update('/comics/a.cbz', 5, 20)
+        store.update('/comics/b.cbz', 1, 10)
+        store.update('/comics/a.cbz', 6, 20)
+        store.flush()
+
+        reloaded = ReadingStateStore(self.state_path)
+        self.assertEqual(reloaded.get_page('/comics/a.cbz'), 6)
+        self.assertEqual(reloaded.get_page('/comics/unknown.cbz'), 0)
+        self.assertEqual(reloaded.recent(),
+                         [normalize_path('/comics/a.cbz'), normalize_path('/comics/b.cbz')])
+        self.assertEqual(reloaded.recent(limit=1), [normalize_path('/comics/a.cbz')])
+
+        with open(self.state_path, 'r', encoding='utf-8') as f:
+            entry = json.load(f)['entries'][normalize_path('/comics/b.cbz')]
+        self.assertEqual(entry['page_count'], 10)
+        self.assertIn('last_read', entry)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import unittest
+import os
+import json
+import tempfile
+from pathlib import Path
+from unittest import mock
+from resource.record_shards import read_record_data, write_record_data, shard_key, SHARD_DIR, RECORD_FILE
+from resource.library_core import LibraryCore, load_verify_results
+from resource.app_cache import atomic_write_bytes
+
+
+class TestRecordShards(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.library = self.temp_dir.name
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.env_patch = mock.patch.dict(os.environ, {'VEXEL_CACHE_DIR': self.cache_dir.name})
+        self.env_patch.start()
+        self.records = [self.make(folder, i) for folder in ('a', 'b', 'c') for i in range(3)]
+        self.records.append(self.make(None, 0))
+
+    def tearDown(self):
+        self.env_patch.stop()
+        self.cache_dir.cleanup()
+        self.temp_dir.cleanup()
+
+    def make(self, folder, i):
+        parts = [self.library] + ([folder, 'sub'] if folder else []) + [f'{i}.cbz']
+        return {'full_path': os.path.join(*parts), 'name': f'{i}.cbz', 'size': i}
+
+    def shard_path(self, key):
+        with open(os.path.join(self.library, RECORD_FILE), encoding='utf-8') as f:
+            return os.path.join(self.library, SHARD_DIR, json.load(f)['shards'][key]['file'])
+
+    def test_shard_key_is_first_level_directory(self):
+        self.assertEqual(shard_key(os.path.join(self.library, 'a', 'x', '1.cbz'), self.library), 'a')
+        self.assertEqual(shard_key(os.path.join(self.library, '1.cbz'), self.library), '')
+        self.assertEqual(shard_key('/elsewhere/1.cbz', self.library), '')
+
+    def test_small_library_stays_single_file(self):
+        self.assertEqual(write_record_data(self.library, self.records, shard_threshold=100), 1)
+        with open(os.path.join(self.library, RECORD_FILE), encoding='utf-8') as f:
+            self.assertEqual(json.load(f), self.records)
+        self.assertFalse(os.path.exists(os.path.join(self.library, SHARD_DIR)))
+
+    def test_only_changed_shard_is_rewritten(self):
+        self.assertEqual(write_record_data(self.library, self.records, shard_threshold=5), 5)
+        self.assertEqual(sorted(read_record_data(self.library), key=str), sorted(self.records, key=str))
+        self.assertEqual(write_record_data(self.library, self.records, shard_threshold=5), 0)
+
+        mtimes = {key: os.stat(self.shard_path(key)).st_mtime_ns for key in ('a', 'c', '')}
+        self.records[3]['size'] = 99  # 目录b中的记录
+        self.assertEqual(write_record_data(self.library, self.records, shard_threshold=5), 2)
+        self.assertEqual({key: os.stat(self.shard_path(key)).st_mtime_ns for key in ('a', 'c', '')}, mtimes)
+        self.assertIn(99, [record['size'] for record in read_record_data(self.library)])
+
+    def test_removed_directory_drops_its_shard_and_lazy_load(self):
+        write_record_data(self.library, self.records, shard_threshold=5)
+        removed_shard = self.shard_path('a')
+        # 分片后记录减少到阈值以下仍保持分片
+        remaining = [record for record in self.records if shard_key(record['full_path'], self.library) != 'a']
+        write_record_data(self.library, remaining, shard_threshold=5)
+        self.assertFalse(os.path.exists(removed_shard))
+        self.assertEqual(len(read_record_data(self.library)), len(remaining))
+        self.assertEqual([record['full_path'] for record in read_record_data(self.library, keys={'c'})],
+                         [record['full_path'] for record in self.records[6:9]])
+
+    def test_failed_manifest_write_keeps_old_records(self):
+        write_record_data(self.library, self.records, shard_threshold=5)
+        old_shard = self.shard_path('b')
+
+        def crash_on_manifest(path, data):
+            if os.path.basename(path) == RECORD_FILE:
+                raise OSError('disk full')
+            atomic_write_bytes(path, data)
+
+        self.records[3]['size'] = 99  # 目录b中的记录
+        with mock.patch('resource.record_shards.atomic_write_bytes', side_effect=crash_on_manifest):
+            with self.assertRaises(OSError):
+                write_record_data(self.library, self.records, shard_threshold=5)
+        # 旧清单引用的分片没有被覆盖
+        self.assertNotIn(99, [record['size'] for record in read_record_data(self.library)])
+
+        # 再次保存成功后，旧分片与上次留下的未引用分片都被删除
+        write_record_data(self.library, self.records, shard_threshold=5)
+        self.assertIn(99, [record['size'] for record in read_record_data(self.library)])
+        self.assertFalse(os.path.exists(old_shard))
+        self.assertEqual(len(os.listdir(os.path.join(self.library, SHARD_DIR))), 4)
+
+    def test_missing_shard_is_an_error(self):
+        write_record_data(self.library, self.records, shard_threshold=5)
+        os.remove(self.shard_path('b'))
+        with self.assertRaises(OSError):
+            read_record_data(self.library)
+
+    def test_library_core_reads_sharded_records(self):
+        core = LibraryCore(str(Path(self.library) / 'settings.json'))
+        core.shard_threshold = 5
+        self.records[0]['verify'] = {'level': 'quick', 'ok': False, 'error': 'bad', 'mtime': 1.0, 'size': 0,
+                                     'checked_at': 2.0}
+        self.assertEqual(core.save_records(self.library, self.records), (True, None))
+        records, error = core.load_records(self.library)
+        self.assertIsNone(error)
+        self.assertEqual(len(records), len(self.records))
+        self.assertEqual(load_verify_results(self.library)[self.records[0]['full_path']]['error'], 'bad')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+import math
+import tempfile
+from pathlib import Path
+from resource.comic_record import ComicRecord
+from resource.reading_state import ReadingStateStore
+from resource.record_store import RecordStore, StringTable
+
+
+def make_record(name, size, mtime, library, **fields):
+    return ComicRecord(full_path=f'{library}/{name}', name=name, size=size, modified_time=mtime,
+                       library_path=library, **fields)
+
+
+class TestRecordStore(unittest.TestCase):
+    def setUp(self):
+        self.records = [
+            make_record('vol10.cbz', 300, 30.0, '/lib/a'),
+            make_record('vol2.cbz', 100, 10.0, '/lib/a', favorite=True, rating=5),
+            make_record('vol1.cbz', 200, 20.0, '/lib/b'),
+            {'full_path': '/lib/b/x.zip', 'name': 'x.zip', 'size': 50, 'modified_time': None,
+             'library_path': '/lib/b'}
+        ]
+        self.store = RecordStore(self.records)
+
+    def names(self, rows):
+        return [record['name'] for record in self.store.records_at(rows)]
+
+    def test_sort_by_numeric_columns(self):
+        self.assertEqual(self.names(self.store.sort('size')), ['x.zip', 'vol2.cbz', 'vol1.cbz', 'vol10.cbz'])
+        self.assertEqual(self.names(self.store.sort('size', descending=True)),
+                         ['vol10.cbz', 'vol1.cbz', 'vol2.cbz', 'x.zip'])
+
+    def test_missing_values_sort_last_in_both_directions(self):
+        self.assertEqual(self.names(self.store.sort('modified_time'))[-1], 'x.zip')
+        self.assertEqual(self.names(self.store.sort('modified_time', descending=True))[-1], 'x.zip')
+
+    def test_name_sort_is_natural_order(self):
+        self.assertEqual(self.names(self.store.sort('name')), ['vol1.cbz', 'vol2.cbz', 'vol10.cbz', 'x.zip'])
+
+    def test_sort_is_stable_and_restricted_to_rows(self):
+        rows = self.store.select(library='/lib/a')
+        self.assertEqual(self.names(self.store.sort('rating', rows=rows)), ['vol10.cbz', 'vol2.cbz'])
+        self.assertEqual(self.names(self.store.sort('rating', descending=True, rows=rows)),
+                         ['vol2.cbz', 'vol10.cbz'])
+        with self.assertRaises(ValueError):
+            self.store.sort('path')
+
+    def test_select_combines_conditions(self):
+        self.assertEqual(self.names(self.store.select(library='/lib/b')), ['vol1.cbz', 'x.zip'])
+        self.assertEqual(self.names(self.store.select(favorite=True)), ['vol2.cbz'])
+        self.assertEqual(self.names(self.store.select(min_size=100, max_size=200)), ['vol2.cbz', 'vol1.cbz'])
+        self.assertEqual(len(self.store.select(library='/lib/missing')), 0)
+        rows = self.store.select(library='/lib/a')
+        self.assertEqual(self.names(self.store.select(min_size=200, rows=rows)), ['vol10.cbz'])
+
+    def test_aggregates_by_library(self):
+        self.assertEqual(self.store.total_size_by_library(), {'/lib/a': 400, '/lib/b': 250})
+        self.assertEqual(self.store.count_by_library(), {'/lib/a': 2, '/lib/b': 2})
+        rows = self.store.select(min_size=150)
+        self.assertEqual(self.store.count_by_library(rows), {'/lib/a': 1, '/lib/b': 1})
+
+    def test_reading_state_columns(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            state = ReadingStateStore(str(Path(temp_dir) / 'state.json'), flush_delay=60)
+            state.update('/lib/a/vol2.cbz', 4, 10)
+            state.update('/lib/b/vol1.cbz', 0)
+            state.update('/elsewhere/y.cbz', 1, 2)
+            self.store.apply_reading_state(state)
+        self.assertEqual(self.names(self.store.select(read=True)), ['vol2.cbz', 'vol1.cbz'])
+        self.assertEqual(self.names(self.store.sort('last_read', descending=True))[:2], ['vol1.cbz', 'vol2.cbz'])
+        row = self.store.row_of('/lib/a/vol2.cbz')
+        self.assertAlmostEqual(float(self.store.progress[row]), 0.5)
+        self.assertTrue(math.isnan(self.store.progress[self.store.row_of('/lib/b/vol1.cbz')]))
+
+    def test_string_table(self):
+        table = StringTable()
+        self.assertEqual(table.intern('a'), 0)
+        self.assertEqual(table.intern('b'), 1)
+        self.assertEqual(table.intern('a'), 0)
+        self.assertEqual(table.find('c'), -1)
+        self.assertEqual(len(table), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+import os
+import tempfile
+from pathlib import Path
+from unittest import mock
+from resource.scan_filter import ScanFilter, SYMLINKS_SKIP, SYMLINKS_FOLLOW
+from resource.library_core import LibraryCore
+
+
+class TestScanFilter(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name) / 'lib'
+        for rel_path in ('a.cbz', 'notes.txt', 'series/v1.cbz', 'series/deep/v2.cbz', '.git/objects/x.cbz',
+                         'raw_scans/big/p1.cbz', 'cover/comic_001.jpg', 'series/tmp.cbz.part'):
+            path = self.root / rel_path
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(b'x')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def files(self, scan_filter):
+        return sorted(os.path.relpath(entry.path, self.root).replace(os.sep, '/')
+                      for entry in scan_filter.iter_files(str(self.root)))
+
+    def test_default_excludes_and_extensions(self):
+        self.assertEqual(self.files(ScanFilter.from_config(None, ('.cbz',))),
+                         ['a.cbz', 'raw_scans/big/p1.cbz', 'series/deep/v2.cbz', 'series/v1.cbz'])
+
+    def test_excluded_directories_are_not_entered(self):
+        scan_filter = ScanFilter.from_config({'exclude': ['raw_*', '/cover']}, ('.cbz', '.jpg'))
+        real_scandir = os.scandir
+        with mock.patch('resource.scan_filter.os.scandir', side_effect=real_scandir) as scandir:
+            self.assertEqual(self.files(scan_filter), ['a.cbz', 'series/deep/v2.cbz', 'series/v1.cbz'])
+        visited = {os.path.relpath(call.args[0], self.root) for call in scandir.call_args_list}
+        self.assertEqual(visited, {'.', 'series', os.path.join('series', 'deep')})
+
+    def test_anchored_pattern_only_matches_from_root(self):
+        (self.root / 'series' / 'cover').mkdir()
+        (self.root / 'series' / 'cover' / 'c.cbz').write_bytes(b'x')
+        files = self.files(ScanFilter.from_config({'exclude': ['/cover']}, ('.cbz',)))
+        self.assertIn('series/cover/c.cbz', files)
+
+    def test_include_and_max_depth(self):
+        self.assertEqual(self.files(ScanFilter.from_config({'include': ['series/*']}, ('.cbz',))),
+                         ['series/deep/v2.cbz', 'series/v1.cbz'])
+        self.assertEqual(self.files(ScanFilter.from_config({'max_depth': 1}, ('.cbz',))),
+                         ['a.cbz', 'series/v1.cbz'])
+
+    @unittest.skipUnless(hasattr(os, 'symlink'), 'symlink unsupported')
+    def test_symlink_policies(self):
+        try:
+            os.symlink(self.root / 'series', self.root / 'linked')
+            os.symlink(self.root / 'a.cbz', self.root / 'b.cbz')
+            os.symlink(self.root, self.root / 'series' / 'loop')
+        except OSError:
+            self.skipTest('cannot create symlinks')
+        default = self.files(ScanFilter.from_config(None, ('.cbz',)))
+        self.assertIn('b.cbz', default)
+        self.assertNotIn('linked/v1.cbz', default)
+        self.assertNotIn('b.cbz', self.files(ScanFilter.from_config({'symlinks': SYMLINKS_SKIP}, ('.cbz',))))
+        followed = self.files(ScanFilter.from_config({'symlinks': SYMLINKS_FOLLOW}, ('.cbz',)))
+        # 链接指向已访问的目录时不重复进入，循环链接不会无限递归
+        self.assertEqual(len([path for path in followed if path.endswith('v1.cbz')]), 1)
+
+    def test_invalid_rules(self):
+        with self.assertRaises(ValueError):
+            ScanFilter.from_config({'symlinks': 'sometimes'})
+        with self.assertRaises(ValueError):
+            ScanFilter.from_config({'max_depth': -1})
+
+    def test_library_core_uses_library_rules(self):
+        core = LibraryCore(str(Path(self.temp_dir.name) / 'settings.json'))
+        self.assertEqual(core.add_library(str(self.root), scan=False), (True, None))
+        library_id = core.libraries[0]['id']
+        self.assertEqual(core.update_scan_rules(library_id, {'exclude': ['raw_scans']}), (True, None))
+        self.assertEqual(core.update_scan_rules(library_id, {'max_depth': 'x'})[0], False)
+        records, _ = core._scan_files(str(self.root), [], extract_covers=False)
+        names = sorted(record['name'] for record in records)
+        self.assertEqual(names, ['a.cbz', 'v1.cbz', 'v2.cbz'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import unittest
+import os
+import tempfile
+from pathlib import Path
+from unittest import mock
+from resource.scan_filter import ScanFilter
+from resource.scan_fs import AdaptiveConcurrency, ConcurrentWalker, LatencyFS, make_scanner, MAX_RETRIES
+
+
+class TestConcurrentWalker(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        for series in range(6):
+            for volume in range(3):
+                path = self.root / f'series{series}' / f'arc{volume % 2}' / f'v{volume}.cbz'
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_bytes(b'x' * (series + volume))
+        self.scan_filter = ScanFilter.from_config(None, ('.cbz',))
+        # 测试中退避时间缩短到毫秒级
+        patcher = mock.patch('resource.scan_fs.BACKOFF_BASE', 0.001)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def expected(self):
+        return sorted(entry.path for entry in self.scan_filter.iter_files(str(self.root)))
+
+    def test_same_files_as_sequential_walk_with_prefetched_stat(self):
+        fs = LatencyFS(latency=0.01)
+        entries = list(ConcurrentWalker(self.scan_filter, fs, max_workers=8).iter_files(str(self.root)))
+        self.assertEqual(sorted(entry.path for entry in entries), self.expected())
+        self.assertGreater(fs.max_active, 1)
+        round_trips = fs.round_trips
+        # 文件元数据已在遍历线程中取得，再读取不产生往返
+        self.assertEqual({entry.stat().st_size for entry in entries}, {os.path.getsize(e.path) for e in entries})
+        self.assertEqual(fs.round_trips, round_trips)
+
+    def test_transient_errors_are_retried_and_reduce_concurrency(self):
+        failing = str(self.root / 'series2')
+        fs = LatencyFS(latency=0.001, failures={failing: 2})
+        walker = ConcurrentWalker(self.scan_filter, fs, max_workers=8, initial=8)
+        files = sorted(entry.path for entry in walker.iter_files(str(self.root)))
+        self.assertEqual(files, self.expected())
+        self.assertEqual(walker.concurrency.errors, 2)
+        self.assertEqual(walker.failed, [])
+
+    def test_directory_is_skipped_after_retries(self):
+        failing = str(self.root / 'series3')
+        fs = LatencyFS(latency=0.001, failures={failing: MAX_RETRIES + 1})
+        walker = ConcurrentWalker(self.scan_filter, fs, max_workers=4)
+        files = list(walker.iter_files(str(self.root)))
+        self.assertEqual(len(files), len(self.expected()) - 3)
+        self.assertEqual([path for path, _ in walker.failed], [failing])
+
+    def test_unreadable_file_skips_only_that_file(self):
+        # 悬空链接（文件在列出后被删除同理）与多次超时的文件只跳过自身，同目录的其他文件照常返回
+        (self.root / 'series1' / 'arc0' / 'broken.cbz').symlink_to(self.root / 'missing.cbz')
+        flaky = str(self.root / 'series4' / 'arc1' / 'v1.cbz')
+        fs = LatencyFS(latency=0.001, failures={flaky: MAX_RETRIES + 1})
+        walker = ConcurrentWalker(self.scan_filter, fs, max_workers=4)
+        files = sorted(entry.path for entry in walker.iter_files(str(self.root)))
+        expected = [path for path in self.expected() if path != flaky and not path.endswith('broken.cbz')]
+        self.assertEqual(files, expected)
+        self.assertEqual([path for path, _ in walker.failed], [flaky])
+
+    def test_followed_directory_is_listed_after_transient_error(self):
+        # 跟随符号链接时，列出失败的目录不能被记为已访问，否则重试时整棵子树丢失
+        scan_filter = ScanFilter.from_config({'symlinks': 'follow'}, ('.cbz',))
+        failing = str(self.root / 'series5')
+        fs = LatencyFS(latency=0.001)
+        scandir = fs.scandir
+        calls = []
+
+        def flaky_scandir(path):
+            if path == failing and not calls:
+                calls.append(path)
+                raise TimeoutError('模拟的网络超时')
+            return scandir(path)
+
+        with mock.patch.object(fs, 'scandir', side_effect=flaky_scandir):
+            walker = ConcurrentWalker(scan_filter, fs, max_workers=4)
+            files = sorted(entry.path for entry in walker.iter_files(str(self.root)))
+        self.assertEqual(calls, [failing])
+        self.assertEqual(files, self.expected())
+        self.assertEqual(walker.failed, [])
+
+    def test_permanent_errors_are_not_retried(self):
+        fs = LatencyFS(latency=0)
+        with mock.patch.object(fs, 'scandir', side_effect=PermissionError('denied')):
+            walker = ConcurrentWalker(self.scan_filter, fs)
+            self.assertEqual(list(walker.walk(str(self.root))), [])
+        self.assertEqual(walker.concurrency.errors, 0)
+
+    def test_adaptive_concurrency(self):
+        concurrency = AdaptiveConcurrency(initial=8, minimum=1, maximum=10)
+        concurrency.on_error()
+        self.assertEqual(concurrency.limit, 4)
+        # 约每完成一个窗口的请求加1
+        for _ in range(5):
+            concurrency.on_success()
+        self.assertEqual(concurrency.limit, 5)
+        for _ in range(10):
+            concurrency.on_error()
+        self.assertEqual(concurrency.limit, 1)
+
+    def test_make_scanner(self):
+        self.assertIs(make_scanner(self.scan_filter, {}), self.scan_filter)
+        walker = make_scanner(self.scan_filter, {'network': True, 'concurrency': 6})
+        self.assertIsInstance(walker, ConcurrentWalker)
+        self.assertEqual(walker.max_workers, 6)
+        with self.assertRaises(ValueError):
+            make_scanner(self.scan_filter, {'network': True, 'concurrency': 0})
+
+
+if __name__ == '__main__':
+    unittest.main()
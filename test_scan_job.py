@@ -0,0 +1,122 @@
+import unittest
+import os
+import zipfile
+import tempfile
+from pathlib import Path
+from unittest import mock
+from resource.library_core import LibraryCore, EVENT_SCAN_CANCELLED
+from resource.lib_func import ComicLibraryUtils
+from resource.scan_job import ScanJob, ScanCancelled, scan_checkpoint_path
+
+
+class TestScanJob(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_path = Path(self.temp_dir.name)
+        self.env_patch = mock.patch.dict(os.environ, {'VEXEL_CACHE_DIR': str(self.temp_path / 'cache')})
+        self.env_patch.start()
+        self.core = LibraryCore(str(self.temp_path / 'settings.json'))
+        self.core.checkpoint_dir = str(self.temp_path / 'checkpoints')
+        self.events = []
+        self.core.events.subscribe(lambda event, payload: self.events.append(event))
+        self.lib_path = str(self.temp_path / 'lib')
+        for index in range(25):
+            folder = Path(self.lib_path) / f'vol{index % 3}'
+            folder.mkdir(parents=True, exist_ok=True)
+            with zipfile.ZipFile(folder / f'comic{index:02d}.cbz', 'w') as zf:
+                zf.writestr('001.jpg', f'page{index}'.encode())
+        self.assertEqual(self.core.add_library(self.lib_path, scan=False), (True, None))
+        self.covers = []
+        build_covers = self.core.build_covers
+
+        def counting_build_covers(records, cover_dir):
+            self.covers.extend(record['full_path'] for record in records)
+            return build_covers(records, cover_dir)
+
+        self.core.build_covers = counting_build_covers
+
+    def tearDown(self):
+        self.env_patch.stop()
+        self.temp_dir.cleanup()
+
+    def test_progress_reports_rate_and_total(self):
+        reports = []
+        job = ScanJob(self.lib_path, reports.append, interval=0)
+        self.assertEqual(self.core.scan_library(self.lib_path, job=job), (True, None))
+        final = reports[-1]
+        self.assertTrue(final.finished)
+        self.assertEqual((final.done, final.total, final.restored, final.eta), (25, 25, 0, 0.0))
+        self.assertGreater(final.rate, 0)
+        # 首次扫描先计数，开始时即可给出总数
+        self.assertEqual(reports[0].total, 25)
+
+    def test_cancelled_scan_resumes_from_checkpoint(self):
+        def cancel_after_first_batch(progress):
+            if progress.done >= 10:
+                job.cancel()
+
+        job = ScanJob(self.lib_path, cancel_after_first_batch, interval=0)
+        with mock.patch('resource.library_core.SCAN_BATCH_SIZE', 10):
+            self.assertEqual(self.core.scan_library(self.lib_path, job=job), (False, 'scan_cancelled'))
+            self.assertIn(EVENT_SCAN_CANCELLED, self.events)
+            self.assertEqual(self.core.load_records(self.lib_path), ([], None))
+            self.assertTrue(os.path.exists(scan_checkpoint_path(self.lib_path, self.core.checkpoint_dir)))
+            self.assertEqual(len(self.covers), 10)
+
+            job = ScanJob(self.lib_path, interval=0)
+            self.assertEqual(self.core.scan_library(self.lib_path, job=job), (True, None))
+        self.assertEqual(job.progress.restored, 10)
+        self.assertEqual(len(self.covers), 25)
+        self.assertEqual(len(set(self.covers)), 25)
+        records, _ = self.core.load_records(self.lib_path)
+        self.assertEqual(len(records), 25)
+        self.assertEqual(len({record['comic_id'] for record in records}), 25)
+        self.assertTrue(all(record['cover_path'] and os.path.exists(record['cover_path']) for record in records))
+        self.assertFalse(os.path.exists(scan_checkpoint_path(self.lib_path, self.core.checkpoint_dir)))
+
+    def test_resume_false_discards_checkpoint(self):
+        job = ScanJob(self.lib_path, lambda progress: progress.done and job.cancel(), interval=0)
+        with mock.patch('resource.library_core.SCAN_BATCH_SIZE', 10):
+            self.assertEqual(self.core.scan_library(self.lib_path, job=job), (False, 'scan_cancelled'))
+            self.assertEqual(self.core.scan_library(self.lib_path, resume=False), (True, None))
+        # 已处理的10个文件重新处理
+        self.assertEqual(len(self.covers), 10 + 25)
+        records, _ = self.core.load_records(self.lib_path)
+        self.assertEqual(len(records), 25)
+
+    def test_start_scan_runs_in_background(self):
+        finished = []
+        job = self.core.start_scan(self.lib_path, on_finished=finished.append)
+        self.assertEqual(job.wait(10), (True, None))
+        self.assertEqual(finished, [(True, None)])
+        self.assertEqual(len(self.core.load_records(self.lib_path)[0]), 25)
+
+    def test_eta_from_rate(self):
+        job = ScanJob('/lib', interval=0)
+        job.start(total=10)
+        with mock.patch('resource.scan_job.time.monotonic', return_value=job._started + 2.0):
+            job.advance(4)
+        progress = job.progress
+        self.assertAlmostEqual(progress.rate, 2.0)
+        self.assertAlmostEqual(progress.eta, 3.0)
+        self.assertAlmostEqual(progress.fraction, 0.4)
+        job.cancel()
+        with self.assertRaises(ScanCancelled):
+            job.check_cancelled()
+
+    def test_window_scan_reports_progress_and_cancels(self):
+        # 界面扫描（ComicLibraryUtils.scan_library）同样通过ScanJob报告进度并响应取消
+        reports = []
+        job = ScanJob(self.lib_path, reports.append, interval=0)
+        self.assertEqual(len(ComicLibraryUtils.scan_library(self.lib_path, job=job)), 25)
+        self.assertTrue(reports[-1].finished)
+        self.assertEqual(reports[-1].done, 25)
+
+        job = ScanJob(self.lib_path, lambda progress: progress.done == 5 and job.cancel(), interval=0)
+        with self.assertRaises(ScanCancelled):
+            ComicLibraryUtils.scan_library(self.lib_path, job=job)
+        self.assertEqual(job.progress.done, 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+import unittest
+import tempfile
+from pathlib import Path
+from resource.comic_record import ComicRecord
+from resource.reading_state import ReadingStateStore
+from resource.record_store import RecordStore
+from resource.smart_collection import CollectionIndex, compile_query, load_collections, save_collections
+from resource.tag_store import TagStore
+
+
+def make_record(name, size, mtime, library, **fields):
+    return ComicRecord(full_path=f'{library}/{name}', name=name, size=size, modified_time=mtime,
+                       library_path=library, **fields)
+
+
+class TestSmartCollection(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_path = Path(self.temp_dir.name)
+        self.records = [
+            make_record('a.cbz', 100, 10.0, '/lib/a', rating=5, favorite=True),
+            make_record('b.cbz', 200, 20.0, '/lib/a', rating=3),
+            make_record('c.cbz', 300, 30.0, '/lib/b', rating=4),
+            {'full_path': '/lib/b/d.zip', 'name': 'd.zip', 'size': 400, 'modified_time': None,
+             'library_path': '/lib/b'}
+        ]
+        self.store = RecordStore(self.records)
+        self.tags = TagStore(str(self.temp_path / 'tags.json'), flush_delay=60)
+        self.index = CollectionIndex(record_store=self.store, tag_store=self.tags)
+
+    def tearDown(self):
+        self.tags.flush()
+        self.temp_dir.cleanup()
+
+    def members(self, name):
+        return [record['name'] for record in self.store.records_at(self.index.members(name))]
+
+    def test_column_predicates(self):
+        self.index.set('good', {'min_rating': 4, 'max_size': 300})
+        self.index.set('lib b recent', {'library': '/lib/b', 'modified_after': 25})
+        self.index.set('unknown library', {'library': '/elsewhere'})
+        self.index.set('not favorite', {'favorite': False, 'modified_before': 25})
+        self.assertEqual(self.members('good'), ['a.cbz', 'c.cbz'])
+        # 缺失修改时间的记录不满足时间条件
+        self.assertEqual(self.members('lib b recent'), ['c.cbz'])
+        self.assertEqual(self.members('unknown library'), [])
+        self.assertEqual(self.members('not favorite'), ['b.cbz'])
+        self.assertEqual(self.index.count('good'), 2)
+
+    def test_invalid_queries(self):
+        for query in ({'colour': 'red'}, {'min_size': '1'}, {'min_rating': True}, {'tags_all': ['  ']}):
+            with self.assertRaises(ValueError):
+                compile_query(query)
+        # 空条件等于不限制
+        self.assertEqual(compile_query({'tags_any': [], 'library': None}).query, {})
+
+    def test_tag_predicates_follow_tag_changes(self):
+        self.index.set('both', {'tags_all': ['x', 'y']})
+        self.index.set('either not z', {'tags_any': ['x', 'y'], 'tags_none': ['z']})
+        self.index.set('plain', {'min_size': 0})
+        self.assertEqual(self.index.count('both'), 0)
+
+        changed = self.index.tags_changed(self.tags.apply(['/lib/a/a.cbz', '/lib/a/b.cbz'], ['x']))
+        self.assertEqual(changed, {'either not z'})
+        changed = self.index.tags_changed(self.tags.apply(['/lib/a/b.cbz', '/lib/b/c.cbz'], ['y']))
+        self.assertEqual(changed, {'both', 'either not z'})
+        self.assertEqual(self.members('both'), ['b.cbz'])
+        self.assertEqual(self.members('either not z'), ['a.cbz', 'b.cbz', 'c.cbz'])
+
+        self.index.tags_changed(self.tags.apply(['/lib/a/a.cbz'], ['z']))
+        self.assertEqual(self.members('either not z'), ['b.cbz', 'c.cbz'])
+        # 与合集无关的标签不触发重算
+        self.assertEqual(self.index.tags_changed(self.tags.apply(['/lib/a/a.cbz'], ['other'])), set())
+
+    def test_reading_state_updates_single_rows(self):
+        state = ReadingStateStore(str(self.temp_path / 'state.json'), flush_delay=60)
+        events = []
+        state.subscribe(lambda key, entry: events.append((key, entry)))
+        self.index.set('unread', {'read': False})
+        self.index.set('reading', {'read': True, 'finished': False, 'tags_none': ['done']})
+        self.index.set('finished', {'finished': True})
+        self.assertEqual(self.index.count('unread'), 4)
+
+        def read(path, page):
+            state.update(path, page, 10)
+            row = self.store.row_of(path)
+            self.store.set_reading_state(row, events[-1][1])
+            return self.index.update_rows([row])
+
+        self.assertEqual(read('/lib/a/b.cbz', 3), {'unread', 'reading'})
+        self.assertEqual(self.members('reading'), ['b.cbz'])
+        self.assertEqual(read('/lib/a/b.cbz', 4), set())
+        self.assertEqual(read('/lib/a/b.cbz', 9), {'reading', 'finished'})
+        self.assertEqual((self.members('finished'), self.index.count('reading')), (['b.cbz'], 0))
+
+        state.remove('/lib/a/b.cbz')
+        self.assertEqual(events[-1][1], None)
+        self.store.set_reading_state(self.store.row_of('/lib/a/b.cbz'), None)
+        self.assertEqual(self.index.update_rows([self.store.row_of('/lib/a/b.cbz')]), {'unread', 'finished'})
+        self.assertEqual(self.index.count('unread'), 4)
+
+    def test_rebuild_rename_and_persistence(self):
+        self.index.set('big', {'min_size': 250})
+        self.index.set('rated', {'min_rating': 1})
+        self.index.rename('big', 'large')
+        self.assertEqual(self.index.names(), ['large', 'rated'])
+        self.store = RecordStore(self.records[2:])
+        self.index.set_record_store(self.store)
+        self.assertEqual(self.members('large'), ['c.cbz', 'd.zip'])
+        self.assertEqual(self.members('rated'), ['c.cbz'])
+
+        path = str(self.temp_path / 'collections.json')
+        self.assertTrue(save_collections(self.index.collections(), path))
+        loaded = load_collections(path)
+        self.assertEqual(list(loaded), ['large', 'rated'])
+        self.assertEqual(loaded['large'], {'min_size': 250})
+        self.assertEqual(load_collections(str(self.temp_path / 'missing.json')), {})
+        # 文件中无效的合集被跳过
+        index = CollectionIndex({'bad': {'colour': 1}, **loaded}, self.store)
+        self.assertEqual(index.names(), ['large', 'rated'])
+        index.remove('large')
+        self.assertNotIn('large', index)
+
+
+if __name__ == '__main__':
+    unittest.main()
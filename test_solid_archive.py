@@ -0,0 +1,128 @@
+import unittest
+import io
+import os
+import tempfile
+import threading
+from pathlib import Path
+from unittest import mock
+from PIL import Image
+import py7zr
+from resource.page_manifest import load_manifest
+from resource.extraction_cache import ExtractionCache
+from resource.solid_archive import StreamingPageSource
+
+
+class TestStreamingPageSource(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_path = Path(self.temp_dir.name)
+        self.cache = ExtractionCache(str(self.temp_path / 'extracted'))
+        pages_dir = self.temp_path / 'pages'
+        pages_dir.mkdir()
+        for i in range(1, 13):
+            buf = io.BytesIO()
+            Image.new('RGB', (i, 7)).save(buf, format='PNG')
+            (pages_dir / f'{i}.png').write_bytes(buf.getvalue())
+        self.archive_path = str(self.temp_path / 'solid.7z')
+        with py7zr.SevenZipFile(self.archive_path, 'w') as archive:
+            archive.writeall(pages_dir, 'pages')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _open(self, on_page_ready=None):
+        manifest = load_manifest(self.archive_path, probe_dimensions=False)
+        self.assertTrue(manifest.solid)
+        return StreamingPageSource(self.archive_path, manifest, self.cache, on_page_ready)
+
+    def test_pages_stream_in_and_entry_is_cached(self):
+        done = threading.Event()
+        ready = []
+
+        def on_page_ready(index):
+            if index == -1:
+                done.set()
+            else:
+                ready.append(index)
+
+        source = self._open(on_page_ready)
+        # 第一页可在整体解压完成前读取
+        with Image.open(io.BytesIO(source.read_page(0))) as img:
+            self.assertEqual(img.size, (1, 7))
+        self.assertTrue(done.wait(10))
+        self.assertEqual(sorted(ready), list(range(12)))
+        with Image.open(io.BytesIO(source.read_page(11))) as img:
+            self.assertEqual(img.size, (12, 7))
+        source.close()
+
+        # 再次打开直接命中缓存，不再启动解压线程
+        reopened = self._open()
+        self.assertIsNone(reopened._thread)
+        self.assertTrue(all(reopened.is_page_ready(i) for i in range(12)))
+        reopened.close()
+
+    def test_close_before_finish_still_caches(self):
+        source = self._open()
+        source.close()
+        source._thread.join(10)
+        # 关闭后不再锁定，整体解压结果仍然写入缓存
+        self.assertEqual(self.cache._pins, {})
+        self.assertIsNotNone(self.cache.get(self.archive_path))
+
+    def test_second_source_attaches_to_running_extraction(self):
+        gate = threading.Event()
+        with mock.patch('resource.solid_archive._Extraction._stream_7z', autospec=True,
+                        side_effect=lambda extraction: _gated_stream(extraction, gate)) as stream:
+            first = self._open()
+            self.assertTrue(first.read_page(0))
+            second = self._open()
+            # 第二个来源挂到同一次解压上，不删除也不重写第一个来源正在读取的目录
+            self.assertIs(second._thread, first._thread)
+            for index in range(11):
+                self.assertEqual(first.read_page(index), second.read_page(index))
+            first.close()
+            # 关闭后在解压结束前重新打开，仍然挂到同一次解压
+            reopened = self._open()
+            self.assertIs(reopened._thread, second._thread)
+            gate.set()
+            second._thread.join(10)
+            self.assertEqual(stream.call_count, 1)
+            self.assertTrue(all(reopened.is_page_ready(i) for i in range(12)))
+            second.close()
+            reopened.close()
+        self.assertEqual(self.cache._pins, {})
+        self.assertIsNotNone(self.cache.get(self.archive_path))
+
+    def test_failed_extraction_keeps_pages_until_readers_close(self):
+        def fail_midway(extraction):
+            _gated_stream(extraction, stop_after=3)
+            raise IOError('损坏的数据块')
+
+        with mock.patch('resource.solid_archive._Extraction._stream_7z', autospec=True, side_effect=fail_midway):
+            source = self._open()
+            source._thread.join(10)
+        self.assertIsNotNone(source.error)
+        # 已解出的页面在来源关闭前仍可读取
+        self.assertTrue(source.read_page(2))
+        with self.assertRaises(IOError):
+            source.read_page(3)
+        entry_dir = self.cache.entry_dir(source.key)
+        self.assertTrue(os.path.isdir(entry_dir))
+        source.close()
+        self.assertFalse(os.path.isdir(entry_dir))
+        self.assertIsNone(self.cache.get(self.archive_path))
+
+
+def _gated_stream(extraction, gate=None, stop_after=None):
+    # 逐页标记解出，最后一页等待gate，模拟仍在进行中的大压缩包解压
+    with py7zr.SevenZipFile(extraction.archive_path, 'r') as archive:
+        archive.extractall(extraction.base_dir)
+    names = sorted((f'pages/{i}.png' for i in range(1, 13)), key=lambda name: int(name[6:-4]))
+    for position, name in enumerate(names[:stop_after]):
+        if gate is not None and position == len(names) - 1:
+            gate.wait(10)
+        extraction._mark_ready(name)
+
+
+if __name__ == '__main__':
+    unittest.main()
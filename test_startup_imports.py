@@ -0,0 +1,47 @@
+import unittest
+import os
+import sys
+import subprocess
+
+RESOURCE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'resource')
+
+# 首次绘制前不应加载的重量级/可选依赖
+DEFERRED_MODULES = ('PIL', 'fitz', 'pymupdf', 'numpy', 'py7zr', 'rarfile', 'zipfile', 'settings_dialog')
+# 除PyQt5绑定外全部模块的导入耗时之和上限，单位微秒
+IMPORT_BUDGET_US = 300000
+
+
+def measure_imports(module_name):
+    """以-X importtime在子进程中导入模块，返回{模块名: 自身耗时(微秒)}"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module_name}'],
+        cwd=RESOURCE_DIR, capture_output=True, text=True, timeout=120,
+        env=dict(os.environ, QT_QPA_PLATFORM='offscreen'))
+    if result.returncode != 0:
+        raise AssertionError(result.stderr[-2000:])
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        timings[name.strip()] = int(self_us)
+    return timings
+
+
+class TestStartupImports(unittest.TestCase):
+    def assert_startup_budget(self, module_name):
+        timings = measure_imports(module_name)
+        loaded = [name for name in timings if name.split('.')[0] in DEFERRED_MODULES]
+        self.assertEqual(loaded, [], f'{module_name}启动时加载了延迟依赖: {loaded}')
+        total = sum(cost for name, cost in timings.items() if name.split('.')[0] not in ('PyQt5', 'sip'))
+        self.assertLess(total, IMPORT_BUDGET_US, f'{module_name}导入耗时{total}us超出预算')
+
+    def test_library_window_import_budget(self):
+        self.assert_startup_budget('picture_lib')
+
+    def test_browser_import_budget(self):
+        self.assert_startup_budget('picture_browser')
+
+
+if __name__ == '__main__':
+    unittest.main()
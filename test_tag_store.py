@@ -0,0 +1,110 @@
+import unittest
+import json
+import tempfile
+from pathlib import Path
+from unittest import mock
+from resource.reading_state import normalize_path
+from resource.record_store import RecordStore
+from resource.tag_store import TagStore
+
+
+class TestTagStore(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.tags_path = str(Path(self.temp_dir.name) / 'tags.json')
+        self.store = TagStore(self.tags_path, flush_delay=60)
+        self.paths = [f'/lib/{name}.cbz' for name in 'abcd']
+
+    def tearDown(self):
+        self.store.flush()
+        self.temp_dir.cleanup()
+
+    def test_bulk_apply_and_remove_maintain_counts(self):
+        changed = self.store.apply(self.paths[:3], ['action', ' 冒险  漫画 '])
+        self.assertEqual(changed, {'action', '冒险 漫画'})
+        self.assertEqual(self.store.counts(), {'action': 3, '冒险 漫画': 3})
+        # 重复添加不改变计数，也不触发刷新
+        self.assertEqual(self.store.apply(self.paths[:2], ['action']), set())
+        self.assertEqual(self.store.remove(self.paths[1:], ['action']), {'action'})
+        self.assertEqual(self.store.count('action'), 1)
+        self.assertEqual(self.store.tags_of(self.paths[1]), ('冒险 漫画',))
+        self.assertEqual(self.store.paths_with('action'), {normalize_path(self.paths[0])})
+        # 未显式创建的标签在最后一本移除后消失
+        self.store.remove(self.paths, ['action'])
+        self.assertIsNone(self.store.count('action'))
+        self.assertNotIn('action', self.store)
+
+    def test_batch_is_written_once(self):
+        with mock.patch('resource.tag_store.atomic_write_bytes') as write:
+            self.store.apply(self.paths, ['a', 'b'])
+            self.store.remove(self.paths[:2], ['b'])
+            self.assertFalse(write.called)
+            self.store.flush()
+            self.store.flush()
+        self.assertEqual(write.call_count, 1)
+
+    def test_rename_merges_and_delete(self):
+        self.store.apply(self.paths[:2], ['old'])
+        self.store.apply(self.paths[1:3], ['new'])
+        self.assertEqual(self.store.rename('old', 'new'), {'old', 'new'})
+        self.assertEqual(self.store.counts(), {'new': 3})
+        with self.assertRaises(KeyError):
+            self.store.rename('old', 'x')
+        self.assertEqual(self.store.delete('new'), {'new'})
+        self.assertEqual(self.store.counts(), {})
+        self.assertEqual(self.store.tags_of(self.paths[1]), ())
+        with self.assertRaises(ValueError):
+            self.store.create('   ')
+
+    def test_defined_tags_persist_and_reload(self):
+        self.store.create('待读')
+        self.store.set_tags(self.paths[0], ['待读', 'x'])
+        self.store.set_tags(self.paths[0], ['x'])
+        self.assertEqual(self.store.counts(), {'待读': 0, 'x': 1})
+        self.assertTrue(self.store.flush())
+        with open(self.tags_path, encoding='utf-8') as f:
+            self.assertEqual(json.load(f)['defined'], ['待读'])
+        reloaded = TagStore(self.tags_path)
+        self.assertEqual(reloaded.counts(), {'待读': 0, 'x': 1})
+        self.assertEqual(reloaded.tags_of(self.paths[0]), ('x',))
+
+    def test_import_record_tags_and_listeners(self):
+        events = []
+        self.store.subscribe(events.append)
+        self.store.apply([self.paths[0]], ['kept'])
+        records = [{'full_path': self.paths[0], 'tags': ['ignored']},
+                   {'full_path': self.paths[1], 'tags': ['legacy', ' ']},
+                   {'full_path': self.paths[2], 'tags': []}]
+        self.assertEqual(self.store.import_record_tags(records), {'legacy'})
+        self.assertEqual(events, [{'kept'}, {'legacy'}])
+        self.assertEqual(self.store.counts(), {'kept': 1, 'legacy': 1})
+
+    def test_edited_comics_are_not_reimported_and_write_back(self):
+        records = [{'full_path': self.paths[0], 'tags': ['old']},
+                   {'full_path': self.paths[1], 'tags': ['keep']},
+                   {'full_path': self.paths[2]}]
+        self.store.import_record_tags(records)
+        self.store.remove([self.paths[0]], ['old'])
+        self.store.apply([self.paths[2]], ['new'])
+        # 标签已全部移除的漫画重新加载后也不会再导入记录中的旧标签
+        self.assertTrue(self.store.flush())
+        reloaded = TagStore(self.tags_path)
+        self.assertEqual(reloaded.import_record_tags(records), set())
+        self.assertEqual(reloaded.counts(), {'keep': 1, 'new': 1})
+
+        changed = reloaded.apply_to_records(records)
+        self.assertEqual([record['full_path'] for record in changed], [self.paths[0], self.paths[2]])
+        self.assertEqual([record.get('tags') for record in records], [[], ['keep'], ['new']])
+        self.assertEqual(reloaded.apply_to_records(records), [])
+
+    def test_rows_of_tagged_paths(self):
+        records = [{'full_path': path, 'name': path, 'size': 1} for path in self.paths]
+        store = RecordStore(records)
+        self.store.apply([self.paths[3], self.paths[1], '/elsewhere/x.cbz'], ['t'])
+        rows = store.rows_of(self.store.paths_with('t'), normalized=True)
+        self.assertEqual(rows.tolist(), [1, 3])
+        self.assertEqual(store.rows_of([self.paths[2]]).tolist(), [2])
+
+
+if __name__ == '__main__':
+    unittest.main()
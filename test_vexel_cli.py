@@ -0,0 +1,91 @@
+import unittest
+import io
+import os
+import json
+import zipfile
+import tempfile
+import contextlib
+from pathlib import Path
+from unittest import mock
+from resource.vexel_cli import main, run_tasks
+from resource.checkpoint import Checkpoint
+
+
+class TestVexelCLI(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_path = Path(self.temp_dir.name)
+        self.env_patch = mock.patch.dict(os.environ, {'VEXEL_CACHE_DIR': str(self.temp_path / 'cache')})
+        self.env_patch.start()
+        self.config = str(self.temp_path / 'settings.json')
+        self.lib_path = self.temp_path / 'lib'
+        self.lib_path.mkdir()
+        for name in ('a.cbz', 'copy.cbz'):
+            with zipfile.ZipFile(self.lib_path / name, 'w') as zf:
+                zf.writestr('01.jpg', b'same page')
+        (self.lib_path / 'broken.cbz').write_bytes(b'not a zip')
+
+    def tearDown(self):
+        self.env_patch.stop()
+        self.temp_dir.cleanup()
+
+    def run_cli(self, *argv):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            code = main(list(argv) + ['--config', self.config, '--json', '--jobs', '2'])
+        return code, json.loads(out.getvalue())
+
+    def test_scan_stats_dedupe_verify(self):
+        code, result = self.run_cli('scan', str(self.lib_path))
+        self.assertEqual(result['added'], [str(self.lib_path)])
+        self.assertEqual(result['covers'], {'generated': 2, 'failed': 1})
+
+        code, stats = self.run_cli('stats')
+        self.assertEqual((code, stats['count'], stats['missing_covers']), (0, 3, 1))
+
+        code, dedupe = self.run_cli('dedupe')
+        self.assertEqual(dedupe['groups'], [[str(self.lib_path / 'a.cbz'), str(self.lib_path / 'copy.cbz')]])
+
+        code, verify = self.run_cli('verify')
+        self.assertEqual(code, 1)
+        self.assertEqual(list(verify['corrupt']), [str(self.lib_path / 'broken.cbz')])
+
+    def test_gc_reports_reclaimed_space(self):
+        self.run_cli('scan', str(self.lib_path))
+        # a.cbz与copy.cbz封面内容相同，只保存一份
+        self.assertEqual(len(os.listdir(self.lib_path / 'cover')), 1)
+        orphan = self.lib_path / 'cover' / 'comic_009.jpg'
+        orphan.write_bytes(b'stale cover')
+        os.utime(orphan, (0, 0))
+        code, result = self.run_cli('gc', '--dry-run')
+        self.assertEqual((code, result['orphans'], result['reclaimed_bytes']), (0, 1, 11))
+        self.assertTrue(orphan.exists())
+        code, result = self.run_cli('gc')
+        self.assertEqual(result['orphans'], 1)
+        self.assertFalse(orphan.exists())
+
+    def test_interrupted_tasks_resume_from_checkpoint(self):
+        path = str(self.temp_path / 'task.json')
+        calls = []
+
+        def work(item):
+            if item == 3 and len(calls) == 3:
+                raise KeyboardInterrupt
+            calls.append(item)
+            return item * 10
+
+        with self.assertRaises(KeyboardInterrupt):
+            run_tasks(range(5), work, jobs=1, checkpoint=Checkpoint(path, 'demo'), key=str)
+
+        calls.clear()
+        checkpoint = Checkpoint(path, 'demo')
+        self.assertEqual(checkpoint.load(), 3)
+        results = run_tasks(range(5), work, jobs=1, checkpoint=checkpoint, key=str)
+        self.assertEqual(calls, [3, 4])
+        self.assertEqual(results, {str(i): i * 10 for i in range(5)})
+        # 任务不同的检查点不会被复用
+        self.assertEqual(Checkpoint(path, 'other').load(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
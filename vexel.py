@@ -0,0 +1,12 @@
+'''
+@version 1.0
+@brief vexel命令行入口：python vexel.py <子命令> [选项]
+@author 炎刃
+@date 2026-10-19
+'''
+import sys
+
+from resource.vexel_cli import main
+
+if __name__ == '__main__':
+    sys.exit(main())